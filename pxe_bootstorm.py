@@ -0,0 +1,184 @@
+"""
+RPI PXE Manager - 순차 부팅 (부팅 폭주 방지)
+
+랙 전체가 한꺼번에 켜지면 모든 Pi가 동시에 dnsmasq TFTP와 NFS 서버에
+몰려 부팅이 수 분으로 늘어난다. 여기서는 대상 클라이언트의 DHCP 예약을
+먼저 'ignore'로 바꿔(게이트) 응답하지 않게 한 뒤, 정해진 크기의 웨이브
+단위로 예약을 되돌리고 SIGHUP을 보내 차례로 부팅시킨다.
+Pi 부트로더는 DHCP를 계속 재시도하므로 게이트가 풀리면 바로 부팅을 시작한다.
+각 클라이언트의 부팅 지연은 게이트 해제부터 첫 ping 응답까지로 측정한다.
+해제 뒤 한 번도 응답이 끊기지 않은 클라이언트는 재부팅되지 않은 것이므로
+부팅으로 세지 않고 따로 보고한다 (지연 통계에서 제외).
+"""
+
+import subprocess
+import time
+from typing import Dict, Iterator, List, Optional
+
+import pxe_dnsmasq
+import pxe_icmp
+
+DEFAULT_WAVE_SIZE = 10
+DEFAULT_WAVE_INTERVAL = 15.0
+DEFAULT_BOOT_TIMEOUT = 180.0
+POLL_INTERVAL = 1.0
+
+
+def percentile(values: List[float], p: float) -> Optional[float]:
+    """선형 보간 백분위수 (값이 없으면 None)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * p / 100.0
+    lower = int(k)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (k - lower)
+
+
+def settings_from_config(config: dict) -> dict:
+    return {
+        'wave_size': int(config.get('boot_wave_size', DEFAULT_WAVE_SIZE)),
+        'wave_interval': float(config.get('boot_wave_interval', DEFAULT_WAVE_INTERVAL)),
+        'boot_timeout': float(config.get('boot_timeout', DEFAULT_BOOT_TIMEOUT)),
+        'power_command': config.get('boot_power_command', ''),
+    }
+
+
+def hold(config: dict, clients: List[dict]) -> int:
+    """대상 클라이언트의 DHCP 응답 차단 (게이트 설정). 바뀐 파일 수 반환
+
+    게이트 목록을 기록해 두어 그 사이 데몬/CLI의 dnsmasq 동기화가 게이트를 덮어쓰지 않게 한다.
+    """
+    pxe_dnsmasq.set_held(config, pxe_dnsmasq.held_serials(config) | {c['serial'] for c in clients})
+    changed = 0
+    for client in clients:
+        if pxe_dnsmasq.write_if_changed(pxe_dnsmasq.host_file(config, client),
+                                        pxe_dnsmasq.render_gated_entry(client)):
+            changed += 1
+    if changed:
+        pxe_dnsmasq.reload_hosts()
+    return changed
+
+
+def release(config: dict, clients: List[dict]) -> int:
+    """게이트 해제 - 원래 고정 IP 예약으로 되돌리고 SIGHUP"""
+    changed = 0
+    for client in clients:
+        if pxe_dnsmasq.write_if_changed(pxe_dnsmasq.host_file(config, client),
+                                        pxe_dnsmasq.render_host_entry(client)):
+            changed += 1
+    if changed:
+        pxe_dnsmasq.reload_hosts()
+    held = pxe_dnsmasq.held_serials(config)
+    if held:
+        pxe_dnsmasq.set_held(config, held - {c['serial'] for c in clients})
+    return changed
+
+
+def run_power_command(template: str, client: dict):
+    """전원 제어 훅 (예: PoE 스위치 포트 on) - {serial} {mac} {ip} 치환"""
+    if not template:
+        return
+    command = template.format(serial=client.get('serial', ''), mac=client.get('mac', ''),
+                              ip=client.get('ip', ''))
+    subprocess.run(['bash', '-c', command], stdout=subprocess.DEVNULL,
+                   stderr=subprocess.DEVNULL, timeout=30)
+
+
+def wave_stats(latencies: List[float], total: int, already_online: int = 0) -> dict:
+    return {
+        'total': total,
+        'booted': len(latencies),
+        'already_online': already_online,
+        'p50': percentile(latencies, 50),
+        'p90': percentile(latencies, 90),
+        'max': max(latencies) if latencies else None,
+    }
+
+
+def run_waves(config: dict, clients: List[dict], wave_size: int = DEFAULT_WAVE_SIZE,
+              wave_interval: float = DEFAULT_WAVE_INTERVAL,
+              boot_timeout: float = DEFAULT_BOOT_TIMEOUT,
+              power_command: str = '') -> Iterator[dict]:
+    """게이트를 웨이브 단위로 해제하면서 이벤트를 yield
+
+    이벤트 (dict, 'event' 키):
+      release   - wave, clients
+      booted    - wave, client, latency (응답이 끊겼다가 돌아온 클라이언트만)
+      wave_done - wave, stats (total/booted/already_online/p50/p90/max, 초)
+      timeout   - wave, clients (boot_timeout 안에 응답 없음)
+      already_online - wave, clients (boot_timeout 동안 응답이 끊기지 않음 - 재부팅되지 않음)
+    다음 웨이브는 wave_interval이 지나거나 현재 웨이브가 모두 부팅되면 해제한다.
+    어떤 경우든(중단 포함) 끝나면 모든 대상의 게이트를 해제한다.
+    """
+    targets = [c for c in clients if c.get('mac') and c.get('ip')]
+    waves = [targets[i:i + wave_size] for i in range(0, len(targets), max(1, wave_size))]
+
+    # IP → [웨이브 번호, 클라이언트, 해제 시각, 응답이 끊긴 적 있음]
+    pending: Dict[str, list] = {}
+    latencies: Dict[int, List[float]] = {n: [] for n in range(1, len(waves) + 1)}
+    skipped = {n: 0 for n in range(1, len(waves) + 1)}
+    remaining = {n: len(wave) for n, wave in enumerate(waves, 1)}
+
+    def finish_wave(number: int) -> dict:
+        return {'event': 'wave_done', 'wave': number,
+                'stats': wave_stats(latencies[number], len(waves[number - 1]), skipped[number])}
+
+    try:
+        next_wave = 0
+        next_release_at = time.monotonic()
+        while next_wave < len(waves) or pending:
+            now = time.monotonic()
+
+            # 1. 다음 웨이브 해제 (간격 경과 또는 진행 중인 웨이브가 없을 때)
+            current_busy = next_wave > 0 and remaining[next_wave] > 0
+            if next_wave < len(waves) and (now >= next_release_at or not current_busy):
+                wave = waves[next_wave]
+                next_wave += 1
+                release(config, wave)
+                released_at = time.monotonic()
+                for client in wave:
+                    pending[client['ip']] = [next_wave, client, released_at, False]
+                    run_power_command(power_command, client)
+                next_release_at = released_at + wave_interval
+                yield {'event': 'release', 'wave': next_wave, 'clients': wave}
+
+            # 2. 해제된 클라이언트 중 아직 부팅이 확인되지 않은 것만 한 번에 확인
+            if pending:
+                probe_start = time.monotonic()
+                results = pxe_icmp.probe_hosts(list(pending), timeout=POLL_INTERVAL)
+                now = time.monotonic()
+                for ip, rtt in results.items():
+                    number, client, released_at, went_down = pending[ip]
+                    if rtt is None:
+                        pending[ip][3] = True
+                    elif went_down:
+                        del pending[ip]
+                        # 응답을 받은 시각 기준 (다른 호스트의 시간 초과 대기 제외)
+                        latency = max(0.0, probe_start + rtt / 1000.0 - released_at)
+                        latencies[number].append(latency)
+                        remaining[number] -= 1
+                        yield {'event': 'booted', 'wave': number, 'client': client, 'latency': latency}
+                        if remaining[number] == 0:
+                            yield finish_wave(number)
+
+                # 3. 시간 초과 (계속 응답한 클라이언트는 재부팅되지 않은 것으로 따로 보고)
+                expired: Dict[tuple, List[dict]] = {}
+                for ip, (number, client, released_at, went_down) in list(pending.items()):
+                    if now - released_at > boot_timeout:
+                        del pending[ip]
+                        remaining[number] -= 1
+                        kind = 'timeout' if went_down else 'already_online'
+                        if kind == 'already_online':
+                            skipped[number] += 1
+                        expired.setdefault((number, kind), []).append(client)
+                for (number, kind), expired_clients in expired.items():
+                    yield {'event': kind, 'wave': number, 'clients': expired_clients}
+                for number in sorted({number for number, _ in expired}):
+                    if remaining[number] == 0:
+                        yield finish_wave(number)
+            else:
+                time.sleep(max(0.0, min(POLL_INTERVAL, next_release_at - time.monotonic())))
+    finally:
+        # 중단되어도 게이트가 남지 않도록 모든 대상 해제
+        release(config, targets)
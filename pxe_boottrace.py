@@ -0,0 +1,296 @@
+"""
+RPI PXE Manager - 부팅 지연 추적 (dnsmasq / mountd 로그)
+
+dnsmasq의 log-dhcp 출력과 TFTP 전송 로그, rpc.mountd의 마운트 요청 로그를
+따라가며 클라이언트(MAC)별 부팅 타임라인을 재구성한다.
+
+  DISCOVER → OFFER → ACK → bootcode.bin → start*.elf → kernel → NFS 마운트
+
+단계별 소요 시간의 최근 분포(백분위수)를 유지하고, 평소보다 느린 단계를
+클라이언트별로 표시한다.
+"""
+
+import re
+import subprocess
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Deque, Dict, Iterable, Iterator, List, Optional
+
+from pxe_bootstorm import percentile
+
+# (단계 키, 표시 이름) - 부팅 순서
+STAGES = [
+    ('discover', 'DISCOVER'),
+    ('offer', 'OFFER'),
+    ('ack', 'ACK'),
+    ('bootcode', 'bootcode.bin'),
+    ('start_elf', 'start*.elf'),
+    ('kernel', 'kernel'),
+    ('nfs_mount', 'NFS 마운트'),
+]
+STAGE_KEYS = [key for key, _ in STAGES]
+STAGE_NAMES = dict(STAGES)
+
+# journalctl 대상 유닛 (mountd 유닛 이름은 배포판마다 다름)
+JOURNAL_UNITS = ['dnsmasq', 'nfs-mountd', 'nfs-server', 'nfs-kernel-server']
+
+# 마지막 이벤트 후 이 시간이 지나면 새 부팅으로 간주
+BOOT_RESET_SECONDS = 300
+# 단계별 최근 샘플 수
+HISTORY_SIZE = 1000
+# 느린 단계 판정: 샘플이 충분할 때 중앙값의 SLOW_FACTOR배 초과 (최소 SLOW_MIN_SECONDS)
+SLOW_FACTOR = 2.0
+SLOW_MIN_SECONDS = 1.0
+MIN_SAMPLES = 5
+
+MAC = r'([0-9a-fA-F]{2}(?::[0-9a-fA-F]{2}){5})'
+IP = r'(\d+\.\d+\.\d+\.\d+)'
+DHCP_RE = re.compile(r'DHCP(DISCOVER|OFFER|REQUEST|ACK)\([^)]*\)\s+(?:' + IP + r'\s+)?' + MAC)
+TFTP_SENT_RE = re.compile(r'sent (\S+) to ' + IP)
+MOUNT_RE = re.compile(r'authenticated mount request from ' + IP + r'(?::\d+)? for (\S+)')
+UNIX_TS_RE = re.compile(r'^(\d{9,}\.\d+)\s')
+SYSLOG_TS_RE = re.compile(r'^([A-Z][a-z]{2}\s+\d+\s+\d\d:\d\d:\d\d)\s')
+
+
+def parse_timestamp(line: str) -> Optional[float]:
+    """journalctl -o short-unix 또는 syslog 형식 타임스탬프"""
+    match = UNIX_TS_RE.match(line)
+    if match:
+        return float(match.group(1))
+    match = SYSLOG_TS_RE.match(line)
+    if match:
+        try:
+            parsed = datetime.strptime(f"{datetime.now().year} {match.group(1)}", '%Y %b %d %H:%M:%S')
+            return parsed.timestamp()
+        except ValueError:
+            return None
+    return None
+
+
+def classify_tftp_file(path: str) -> Optional[str]:
+    name = Path(path).name
+    if name == 'bootcode.bin':
+        return 'bootcode'
+    if name.startswith('start') and name.endswith('.elf'):
+        return 'start_elf'
+    if name.startswith('kernel') and name.endswith('.img'):
+        return 'kernel'
+    return None
+
+
+class BootTracer:
+    """로그 줄을 받아 MAC별 부팅 타임라인과 단계별 분포를 유지"""
+
+    def __init__(self, clients: Iterable[dict] = ()):
+        self.mac_by_ip: Dict[str, str] = {}
+        self.serial_by_mac: Dict[str, str] = {}
+        for client in clients:
+            mac = (client.get('mac') or '').lower()
+            if mac:
+                self.serial_by_mac[mac] = client.get('serial', mac)
+                if client.get('ip'):
+                    self.mac_by_ip[client['ip']] = mac
+
+        # MAC → 진행 중인 부팅 {'stages': {단계: 시각}, 'last': 시각}
+        self.active: Dict[str, dict] = {}
+        # MAC → 마지막으로 끝난 부팅 결과
+        self.completed: Dict[str, dict] = {}
+        # 단계 → 직전 단계부터의 소요 시간(초) 최근 샘플, 'total' 포함
+        self.durations: Dict[str, Deque[float]] = {
+            key: deque(maxlen=HISTORY_SIZE) for key in STAGE_KEYS[1:] + ['total']}
+
+    def name(self, mac: str) -> str:
+        return self.serial_by_mac.get(mac, mac)
+
+    # ---------- 입력 ----------
+
+    def feed(self, line: str, now: Optional[float] = None) -> Optional[dict]:
+        """로그 한 줄 처리. 부팅이 끝나면(NFS 마운트) 결과 dict 반환"""
+        ts = parse_timestamp(line) or now or time.time()
+
+        match = DHCP_RE.search(line)
+        if match:
+            kind, ip, mac = match.group(1), match.group(2), match.group(3).lower()
+            if ip and kind in ('OFFER', 'ACK'):
+                self.mac_by_ip[ip] = mac
+            stage = {'DISCOVER': 'discover', 'OFFER': 'offer', 'ACK': 'ack'}.get(kind)
+            if stage:
+                self._mark(mac, stage, ts)
+            return None
+
+        match = TFTP_SENT_RE.search(line)
+        if match:
+            stage = classify_tftp_file(match.group(1))
+            mac = self.mac_by_ip.get(match.group(2))
+            if stage and mac:
+                self._mark(mac, stage, ts)
+            return None
+
+        match = MOUNT_RE.search(line)
+        if match:
+            mac = self.mac_by_ip.get(match.group(1))
+            if mac:
+                self._mark(mac, 'nfs_mount', ts)
+                return self._complete(mac)
+        return None
+
+    def _mark(self, mac: str, stage: str, ts: float):
+        boot = self.active.get(mac)
+        if boot is not None:
+            reached = max(STAGE_KEYS.index(key) for key in boot['stages'])
+            stale = ts - boot['last'] > BOOT_RESET_SECONDS
+            # 부트 파일 전송 중 다시 DISCOVER → 펌웨어 재시작.
+            # 커널 이후의 DISCOVER(ip=dhcp)는 같은 부팅으로 본다.
+            restarted = (stage == 'discover' and
+                         STAGE_KEYS.index('ack') < reached < STAGE_KEYS.index('kernel'))
+            if stale or restarted:
+                boot = None
+        if boot is None:
+            boot = {'stages': {}, 'last': ts}
+            self.active[mac] = boot
+        # 재시도는 첫 시각 유지
+        boot['stages'].setdefault(stage, ts)
+        boot['last'] = ts
+
+    def _complete(self, mac: str) -> dict:
+        boot = self.active.pop(mac)
+        stages = boot['stages']
+        seen = [key for key in STAGE_KEYS if key in stages]
+
+        steps = []
+        for previous, key in zip(seen, seen[1:]):
+            duration = max(0.0, stages[key] - stages[previous])
+            steps.append({'stage': key, 'from': previous, 'seconds': duration,
+                          'slow': self._is_slow(key, duration)})
+            self.durations[key].append(duration)
+
+        total = stages[seen[-1]] - stages[seen[0]] if seen else 0.0
+        result = {
+            'mac': mac,
+            'serial': self.name(mac),
+            'started': stages[seen[0]] if seen else None,
+            'total': total,
+            'total_slow': self._is_slow('total', total),
+            'steps': steps,
+            'missing': [key for key in STAGE_KEYS if key not in stages],
+        }
+        self.durations['total'].append(total)
+        self.completed[mac] = result
+        return result
+
+    def _is_slow(self, key: str, seconds: float) -> bool:
+        samples = self.durations[key]
+        if len(samples) < MIN_SAMPLES:
+            return False
+        median = percentile(list(samples), 50)
+        return seconds > max(SLOW_MIN_SECONDS, median * SLOW_FACTOR)
+
+    # ---------- 통계 ----------
+
+    def stage_stats(self) -> List[dict]:
+        """단계별 p50/p90/p99/최대 (초)"""
+        stats = []
+        for key in STAGE_KEYS[1:] + ['total']:
+            samples = list(self.durations[key])
+            stats.append({
+                'stage': key,
+                'name': STAGE_NAMES.get(key, '전체'),
+                'count': len(samples),
+                'p50': percentile(samples, 50),
+                'p90': percentile(samples, 90),
+                'p99': percentile(samples, 99),
+                'max': max(samples) if samples else None,
+            })
+        return stats
+
+    def slowest(self, limit: int = 10) -> List[dict]:
+        return sorted(self.completed.values(), key=lambda r: r['total'], reverse=True)[:limit]
+
+    def in_progress(self, now: Optional[float] = None) -> List[dict]:
+        """진행 중인 부팅 (마지막 단계와 경과 시간)"""
+        now = now or time.time()
+        rows = []
+        for mac, boot in self.active.items():
+            last_stage = max(boot['stages'], key=STAGE_KEYS.index)
+            rows.append({'mac': mac, 'serial': self.name(mac), 'stage': last_stage,
+                         'elapsed': now - min(boot['stages'].values())})
+        return sorted(rows, key=lambda r: r['elapsed'], reverse=True)
+
+
+def format_result(result: dict) -> str:
+    """부팅 한 건 요약 한 줄"""
+    parts = []
+    for step in result['steps']:
+        mark = '⚠' if step['slow'] else ''
+        parts.append(f"{STAGE_NAMES[step['stage']]} {step['seconds']:.1f}s{mark}")
+    slow = ' [느림]' if result['total_slow'] else ''
+    return f"{result['serial']}: 전체 {result['total']:.1f}s{slow} ({', '.join(parts)})"
+
+
+def format_report(tracer: BootTracer, limit: int = 10) -> str:
+    """단계별 분포와 느린 클라이언트 보고서 (텍스트)"""
+    fmt = lambda v: f"{v:.2f}s" if v is not None else '-'
+    lines = [f"{'단계':<14} {'횟수':>5} {'p50':>8} {'p90':>8} {'p99':>8} {'최대':>8}"]
+    for row in tracer.stage_stats():
+        lines.append(f"{row['name']:<14} {row['count']:>5} {fmt(row['p50']):>8} {fmt(row['p90']):>8} "
+                     f"{fmt(row['p99']):>8} {fmt(row['max']):>8}")
+
+    slowest = tracer.slowest(limit)
+    if slowest:
+        lines.append('')
+        lines.append('가장 느린 부팅:')
+        for result in slowest:
+            lines.append('  ' + format_result(result))
+
+    pending = tracer.in_progress()
+    if pending:
+        lines.append('')
+        lines.append('진행 중/미완료 부팅:')
+        for row in pending[:limit]:
+            lines.append(f"  {row['serial']}: {STAGE_NAMES[row['stage']]}까지 진행 ({row['elapsed']:.0f}s 경과)")
+    return '\n'.join(lines)
+
+
+# ---------- 로그 소스 ----------
+
+def _journal_command(follow: bool, since: Optional[str]) -> List[str]:
+    command = ['sudo', 'journalctl', '-o', 'short-unix', '--no-pager']
+    for unit in JOURNAL_UNITS:
+        command += ['-u', unit]
+    if follow:
+        command += ['-f', '-n', '0']
+    if since:
+        command += ['--since', since]
+    return command
+
+
+def read_journal(since: str = '-1h') -> List[str]:
+    """지난 로그 읽기 (분석용)"""
+    result = subprocess.run(_journal_command(False, since), capture_output=True, text=True, timeout=60)
+    return result.stdout.splitlines()
+
+
+def follow_journal() -> Iterator[str]:
+    """journalctl -f 출력 줄 단위 스트림 (제너레이터를 닫으면 프로세스 종료)"""
+    process = subprocess.Popen(_journal_command(True, None), stdout=subprocess.PIPE,
+                               stderr=subprocess.DEVNULL, text=True, bufsize=1)
+    try:
+        for line in process.stdout:
+            yield line.rstrip('\n')
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def follow_file(path: Path) -> Iterator[str]:
+    """dnsmasq log-facility 파일 따라가기 (tail -F)"""
+    process = subprocess.Popen(['sudo', 'tail', '-n', '0', '-F', str(path)], stdout=subprocess.PIPE,
+                               stderr=subprocess.DEVNULL, text=True, bufsize=1)
+    try:
+        for line in process.stdout:
+            yield line.rstrip('\n')
+    finally:
+        process.terminate()
+        process.wait()
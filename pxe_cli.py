@@ -0,0 +1,2798 @@
+#!/usr/bin/env python3
+"""
+RPI PXE Manager - CLI 본체 (실행은 ./pxe)
+
+모듈로 import되므로 바이트코드가 캐시되어 실행할 때마다 다시 컴파일하지 않는다.
+netifaces는 쓰는 메뉴에서 처음 import한다 (pxe_deps).
+"""
+
+import os
+import sys
+import subprocess
+import json
+import time
+import threading
+import re
+import pwd
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from datetime import datetime
+
+from typing import Dict, List, Optional
+
+import pxe_bootstorm
+import pxe_boottrace
+import pxe_commands
+import pxe_daemon
+import pxe_deps
+import pxe_dnsmasq
+import pxe_enroll
+import pxe_exports
+import pxe_fleet
+import pxe_history
+import pxe_icmp
+import pxe_imaging
+import pxe_ipam
+import pxe_leases
+import pxe_metrics
+import pxe_nfstraffic
+import pxe_privops
+import pxe_provision
+import pxe_registry
+import pxe_resources
+import pxe_services
+import pxe_ssh
+import pxe_telemetry
+import pxe_tftpstore
+
+netifaces = pxe_deps.lazy('netifaces')
+
+# ANSI 색상 코드
+class Colors:
+    HEADER = '\033[95m'
+    BLUE = '\033[94m'
+    CYAN = '\033[96m'
+    GREEN = '\033[92m'
+    YELLOW = '\033[93m'
+    WARNING = '\033[93m'
+    FAIL = '\033[91m'
+    ENDC = '\033[0m'
+    BOLD = '\033[1m'
+    UNDERLINE = '\033[4m'
+    CLEAR = '\033[2J\033[H'
+
+class RPIPXEManager:
+    def __init__(self):
+        self.config_file = Path.home() / '.rpi_pxe_config.json'
+        # 프로젝트 디렉토리의 클라이언트 백업 파일
+        self.project_dir = Path(__file__).parent.resolve()
+        self.clients_backup_file = self.project_dir / 'clients_backup.json'
+        self.config = self.load_config()
+        # 클라이언트 목록은 SQLite 레지스트리에 저장 (시리얼/MAC/IP 고유 인덱스)
+        self.registry = pxe_registry.ClientRegistry(Path.home() / '.rpi_pxe_clients.db')
+        self.migrate_clients_to_registry()
+        self.client_status = {}  # IP → RTT(ms) 또는 None (마지막 상태 확인 결과)
+        self._history_cache = None  # (파일 mtime, 요약) - 데몬이 없을 때
+        self.dnsmasq = pxe_dnsmasq.DnsmasqSync()
+        self.ssh_pool = pxe_ssh.SSHPool.from_config(self.config)
+        # 관리 데몬이 실행 중이면 클라이언트/서비스 상태는 데몬 값을 씀 (없으면 None)
+        self.daemon = pxe_daemon.connect(self.config)
+        if self.daemon:
+            # 프로비저닝 단계 소요 시간은 데몬의 /metrics로 보냄
+            pxe_metrics.forward_to(self.daemon.record_step)
+        # 데몬이 없으면 서버 자원은 직접 샘플 - 지금 기준점을 잡아 두면 상태 메뉴를 열 때 바로 초당 값이 나옴
+        self.resource_sampler = None
+        self.traffic_sampler = None
+        if self.daemon is None:
+            self.sample_resources()
+        self.running = True
+        
+    def load_config(self) -> dict:
+        """설정 파일 로드"""
+        if self.config_file.exists():
+            with open(self.config_file, 'r') as f:
+                return json.load(f)
+        return {
+            'server_ip': '192.168.0.10',
+            'dhcp_range_start': '192.168.0.100',
+            'dhcp_range_end': '192.168.0.200',
+            'network_interface': 'eth0',
+            'nfs_root': '/media/polygom3d/rpi-client',
+            'tftp_root': '/tftpboot',
+            'provision_mode': 'auto',
+            'golden_template': ''
+        }
+
+    def migrate_clients_to_registry(self):
+        """이전 버전의 설정 파일 'clients' 목록을 레지스트리로 이전"""
+        if 'clients' not in self.config:
+            return
+        legacy_clients = self.config.pop('clients') or []
+        if legacy_clients and self.registry.count() == 0:
+            count = self.registry.import_clients(legacy_clients)
+            print(f"{Colors.GREEN}  ✓ 클라이언트 {count}개를 레지스트리로 이전: {self.registry.path}{Colors.ENDC}")
+        self.save_config()
+    
+    def save_config(self):
+        """설정 파일 저장 (서버 설정만 - 클라이언트는 레지스트리에 행 단위로 저장됨)"""
+        try:
+            with open(self.config_file, 'w') as f:
+                json.dump(self.config, f, indent=2)
+            print(f"{Colors.GREEN}  ✓ 설정 파일 저장됨: {self.config_file} (클라이언트 수: {self.registry.count()}개){Colors.ENDC}")
+        except Exception as e:
+            print(f"{Colors.FAIL}  ✗ 설정 파일 저장 실패: {e}{Colors.ENDC}")
+
+    def save_clients_backup(self):
+        """프로젝트 디렉토리에 클라이언트 백업 저장"""
+        try:
+            self.registry.export_backup(self.clients_backup_file,
+                                        self.config.get('server_ip', ''),
+                                        self.config.get('nfs_root', ''))
+            print(f"{Colors.GREEN}  ✓ 클라이언트 백업 저장됨: {self.clients_backup_file}{Colors.ENDC}")
+        except Exception as e:
+            print(f"{Colors.WARNING}  ⚠️  클라이언트 백업 저장 실패: {e}{Colors.ENDC}")
+
+    def load_clients_backup(self) -> dict:
+        """프로젝트 디렉토리에서 클라이언트 백업 로드"""
+        if self.clients_backup_file.exists():
+            try:
+                with open(self.clients_backup_file, 'r') as f:
+                    return json.load(f)
+            except Exception as e:
+                print(f"{Colors.FAIL}  ✗ 백업 파일 로드 실패: {e}{Colors.ENDC}")
+        return None
+
+    def restore_clients_from_backup(self):
+        """백업에서 클라이언트 복원"""
+        self.print_header()
+        print(f"{Colors.BOLD}📦 클라이언트 백업/복원{Colors.ENDC}\n")
+
+        backup = self.load_clients_backup()
+
+        if backup:
+            print(f"{Colors.CYAN}현재 백업 정보:{Colors.ENDC}")
+            print(f"  백업 날짜: {backup.get('backup_date', '알 수 없음')}")
+            print(f"  서버 IP: {backup.get('server_ip', '알 수 없음')}")
+            print(f"  NFS 경로: {backup.get('nfs_root', '알 수 없음')}")
+            print(f"  클라이언트 수: {len(backup.get('clients', []))}개\n")
+
+            if backup.get('clients'):
+                print(f"{Colors.CYAN}백업된 클라이언트 목록:{Colors.ENDC}")
+                for i, client in enumerate(backup['clients'], 1):
+                    print(f"  {i}. {client.get('hostname', 'unknown')} - {client.get('serial', 'N/A')} ({client.get('ip', 'N/A')})")
+                print()
+        else:
+            print(f"{Colors.WARNING}저장된 백업이 없습니다.{Colors.ENDC}\n")
+
+        print(f"{Colors.BOLD}옵션:{Colors.ENDC}")
+        print(f"  {Colors.CYAN}1.{Colors.ENDC} 현재 설정을 백업으로 저장")
+        print(f"  {Colors.CYAN}2.{Colors.ENDC} 백업에서 클라이언트 복원")
+        print(f"  {Colors.CYAN}3.{Colors.ENDC} dnsmasq.conf에서 클라이언트 가져오기")
+        print(f"  {Colors.CYAN}0.{Colors.ENDC} 돌아가기")
+        print()
+
+        choice = input("선택: ").strip()
+
+        if choice == '1':
+            self.save_clients_backup()
+            print(f"\n{Colors.GREEN}✓ 백업 저장 완료{Colors.ENDC}")
+
+        elif choice == '2':
+            if not backup or not backup.get('clients'):
+                print(f"\n{Colors.FAIL}복원할 백업이 없습니다.{Colors.ENDC}")
+            else:
+                confirm = input(f"\n{Colors.WARNING}현재 클라이언트 목록을 백업으로 대체하시겠습니까? (y/N): {Colors.ENDC}").lower()
+                if confirm == 'y':
+                    self.registry.replace_all(backup['clients'])
+                    # dnsmasq 설정도 재생성
+                    self.generate_dnsmasq_config()
+                    print(f"\n{Colors.GREEN}✓ 클라이언트 복원 완료 ({len(backup['clients'])}개){Colors.ENDC}")
+
+        elif choice == '3':
+            self.import_clients_from_dnsmasq()
+
+        input("\n계속하려면 Enter...")
+
+    def import_clients_from_dnsmasq(self):
+        """dnsmasq.conf에서 클라이언트 정보 가져오기"""
+        dnsmasq_conf = pxe_dnsmasq.DNSMASQ_CONF
+
+        if not dnsmasq_conf.exists():
+            print(f"{Colors.FAIL}/etc/dnsmasq.conf 파일이 없습니다.{Colors.ENDC}")
+            return
+
+        try:
+            # dhcp-host=MAC,IP,hostname 줄과 dhcp-hostsdir 예약 파일 파싱
+            clients = pxe_dnsmasq.parse_clients(self.config, dnsmasq_conf)
+            for client in clients:
+                # 시리얼 번호 추출 (hostname에서)
+                if client['serial'].startswith('rpi-'):
+                    client['serial'] = client['serial'].replace('rpi-', '')
+
+            if clients:
+                print(f"\n{Colors.CYAN}dnsmasq.conf에서 발견된 클라이언트:{Colors.ENDC}")
+                for i, c in enumerate(clients, 1):
+                    print(f"  {i}. {c['hostname']} - {c['serial']} ({c['ip']})")
+
+                confirm = input(f"\n{Colors.YELLOW}이 클라이언트들을 가져오시겠습니까? (y/N): {Colors.ENDC}").lower()
+                if confirm == 'y':
+                    self.registry.replace_all(clients)
+                    print(f"\n{Colors.GREEN}✓ {len(clients)}개 클라이언트 가져오기 완료{Colors.ENDC}")
+            else:
+                print(f"{Colors.WARNING}dnsmasq.conf에서 클라이언트를 찾을 수 없습니다.{Colors.ENDC}")
+
+        except Exception as e:
+            print(f"{Colors.FAIL}dnsmasq.conf 읽기 실패: {e}{Colors.ENDC}")
+    
+    def clear_screen(self):
+        """화면 지우기"""
+        print(Colors.CLEAR, end='')
+    
+    def print_header(self):
+        """헤더 출력"""
+        self.clear_screen()
+        print(f"{Colors.BOLD}{Colors.CYAN}{'='*60}{Colors.ENDC}")
+        print(f"{Colors.BOLD}{Colors.GREEN}       RPI PXE Manager - 터미널 관리 시스템{Colors.ENDC}")
+        print(f"{Colors.BOLD}{Colors.CYAN}{'='*60}{Colors.ENDC}")
+        print()
+    
+    def print_menu(self):
+        """메인 메뉴 출력"""
+        print(f"{Colors.BOLD}메인 메뉴:{Colors.ENDC}")
+        print(f"  {Colors.CYAN}1.{Colors.ENDC} 📊 시스템 상태 확인")
+        print(f"  {Colors.CYAN}2.{Colors.ENDC} 🖥️  클라이언트 관리")
+        print(f"  {Colors.CYAN}3.{Colors.ENDC} ⚙️  서버 설정")
+        print(f"  {Colors.CYAN}4.{Colors.ENDC} 🚀 서비스 관리")
+        print(f"  {Colors.CYAN}5.{Colors.ENDC} 📝 로그 확인")
+        print(f"  {Colors.CYAN}6.{Colors.ENDC} 🔧 초기 설정 마법사")
+        print(f"  {Colors.CYAN}0.{Colors.ENDC} 🚪 종료")
+        print()
+    
+    def daemon_state(self) -> Optional[dict]:
+        """관리 데몬의 현재 상태 (데몬이 없거나 연결이 끊기면 None)"""
+        if self.daemon is None:
+            return None
+        try:
+            return self.daemon.state()
+        except pxe_daemon.DaemonError:
+            self.daemon = None
+            return None
+
+    def client_history(self) -> Dict[str, dict]:
+        """시리얼 → 가동률/상태 변화/스파크라인 (데몬 기록, 없으면 GUI가 저장한 파일)"""
+        if self.daemon is not None:
+            try:
+                return self.daemon.history()
+            except pxe_daemon.DaemonError:
+                self.daemon = None
+        path = Path(self.config.get('history_file') or pxe_history.HISTORY_FILE)
+        try:
+            mtime = path.stat().st_mtime_ns
+        except OSError:
+            return {}
+        if self._history_cache is None or self._history_cache[0] != mtime:
+            self._history_cache = (mtime, pxe_history.load(path).summaries())
+        return self._history_cache[1]
+
+    def client_telemetry(self, refresh: bool = False, serials: Optional[List[str]] = None) -> Dict[str, dict]:
+        """시리얼 → 시스템 정보 캐시 (pxe_telemetry entry)
+
+        데몬이 있으면 데몬이 주기적으로 수집한 값을 쓰고, 없으면 파일 캐시에서
+        유효 시간이 지난 온라인 클라이언트만 직접 수집한다. refresh면 대상 전체를 다시 수집.
+        """
+        if self.daemon is not None:
+            try:
+                if refresh:
+                    self.daemon.refresh_telemetry(serials)
+                return self.daemon.telemetry()
+            except pxe_daemon.DaemonError:
+                self.daemon = None
+
+        cache = pxe_telemetry.from_config(self.config)
+        clients = [c for c in self.registry.all() if not serials or c['serial'] in serials]
+        status = self.check_clients_status([c['ip'] for c in clients if c.get('ip')])
+        online = [ip for ip, rtt in status.items() if rtt is not None]
+        targets = cache.due(clients, online, 0 if refresh else cache.ttl)
+        if targets:
+            print(f"{Colors.CYAN}시스템 정보 수집 중... ({len(targets)}대){Colors.ENDC}")
+            cache.update(pxe_telemetry.collect(
+                self.ssh_pool, targets,
+                parallel=int(self.config.get('telemetry_parallel', pxe_telemetry.DEFAULT_PARALLEL))))
+            cache.forget(c['serial'] for c in self.registry.all())
+            try:
+                cache.save()
+            except OSError as e:
+                print(f"{Colors.WARNING}시스템 정보 캐시 저장 실패: {e}{Colors.ENDC}")
+        return cache.all()
+
+    def sample_resources(self, min_interval: float = 0) -> dict:
+        """서버 자원/처리량을 직접 샘플 (직전 샘플 이후의 초당 값, 기다리지 않음)"""
+        target = (self.config.get('network_interface') or 'eth0', self.config.get('nfs_root') or '/')
+        sampler = self.resource_sampler
+        if sampler is None or (sampler.interface, sampler.storage_path) != target:
+            sampler = self.resource_sampler = pxe_resources.ResourceSampler(*target)
+            sampler.sample()
+            # 기준점만 있으면 비율이 없으므로 새로 만든 경우엔 최소 구간을 둠
+            min_interval = max(min_interval, pxe_resources.MIN_INTERVAL)
+        return sampler.sample(min_interval)
+
+    def nfs_traffic(self, min_interval: float = 0) -> Optional[dict]:
+        """클라이언트별 NFS 트래픽 (데몬이 있으면 데몬의 마지막 샘플, 데몬이 막 시작했으면 None)"""
+        if self.daemon is not None:
+            try:
+                return self.daemon.traffic()
+            except pxe_daemon.DaemonError:
+                self.daemon = None
+        clients = self.registry.all()
+        nfs_root = self.config.get('nfs_root') or '/'
+        sampler = self.traffic_sampler
+        if sampler is None or sampler.nfs_root != nfs_root:
+            sampler = self.traffic_sampler = pxe_nfstraffic.NFSTrafficSampler(nfs_root)
+            sampler.sample(clients)
+            min_interval = max(min_interval, pxe_resources.MIN_INTERVAL)
+        return sampler.sample(clients, min_interval)
+
+    def get_system_status(self, min_interval: float = 0) -> Dict:
+        """시스템 상태 정보 수집 (자원/서비스는 데몬이 있으면 데몬이 마지막으로 확인한 값)"""
+        state = self.daemon_state()
+        resources = state['resources'] if state and state['resources'] else self.sample_resources(min_interval)
+        status = {
+            'cpu': resources['cpu'],
+            'iowait': resources['iowait'],
+            'memory': resources['memory'],
+            'disk': resources['disk'],
+            'resources': resources,
+            'network': {},
+            'services': {}
+        }
+        
+        # 네트워크 인터페이스 정보
+        try:
+            iface = self.config['network_interface']
+            addrs = netifaces.ifaddresses(iface)
+            if netifaces.AF_INET in addrs:
+                status['network']['ip'] = addrs[netifaces.AF_INET][0]['addr']
+                status['network']['netmask'] = addrs[netifaces.AF_INET][0]['netmask']
+        except:
+            status['network']['ip'] = 'N/A'
+            status['network']['netmask'] = 'N/A'
+        
+        # 서비스 상태 확인
+        if state and state['services']:
+            status['services'] = state['services']
+            return status
+        status['services'] = pxe_services.active_map(pxe_services.query())
+        return status
+    
+    def show_system_status(self):
+        """시스템 상태 표시"""
+        self.print_header()
+        print(f"{Colors.BOLD}시스템 상태{Colors.ENDC}\n")
+        
+        status = self.get_system_status()
+        
+        # 리소스 사용률
+        print(f"{Colors.BOLD}리소스 사용률:{Colors.ENDC}")
+        self.print_progress_bar("CPU", status['cpu'])
+        self.print_progress_bar("메모리", status['memory'])
+        self.print_progress_bar("디스크", status['disk'])
+        self.print_progress_bar("iowait", status['iowait'])
+        print()
+        
+        # 처리량 (부팅 폭주 때 NIC/디스크/nfsd 중 어디가 막히는지)
+        resources = status['resources']
+        window = f" (최근 {resources['interval']:.0f}초)" if resources.get('interval') else ''
+        print(f"{Colors.BOLD}처리량{window}:{Colors.ENDC}")
+        for label, value in pxe_resources.describe(resources):
+            print(f"  {label:<16} {value}")
+        found = pxe_resources.bottlenecks(resources)
+        color = Colors.FAIL if found else Colors.GREEN
+        print(f"  {'병목':<16} {color}{pxe_resources.format_bottlenecks(resources)}{Colors.ENDC}")
+        print()
+        
+        # 네트워크 정보
+        print(f"{Colors.BOLD}네트워크 설정:{Colors.ENDC}")
+        print(f"  인터페이스: {self.config['network_interface']}")
+        print(f"  IP 주소: {status['network'].get('ip', 'N/A')}")
+        print(f"  넷마스크: {status['network'].get('netmask', 'N/A')}")
+        print()
+        
+        # 서비스 상태
+        print(f"{Colors.BOLD}서비스 상태:{Colors.ENDC}")
+        for service, active in status['services'].items():
+            icon = "✅" if active else "❌"
+            color = Colors.GREEN if active else Colors.FAIL
+            print(f"  {icon} {color}{service:<20}{Colors.ENDC} {'실행 중' if active else '중지됨'}")
+        
+        print()
+        input(f"{Colors.CYAN}Enter를 눌러 계속...{Colors.ENDC}")
+    
+    def ip_allocator(self, exclude_serial: str = None) -> 'pxe_ipam.IPAllocator':
+        """등록된 클라이언트 IP를 예약한 고정 IP 할당기"""
+        clients = [c for c in self.registry.all() if c['serial'] != exclude_serial]
+        return pxe_ipam.IPAllocator.from_config(self.config, clients)
+    
+    def ip_to_number(self, ip_str):
+        """IP 주소를 숫자로 변환하여 정렬"""
+        if ip_str == 'N/A' or not ip_str or ip_str == '없음':
+            return 999999999
+        try:
+            parts = ip_str.split('.')
+            return int(parts[0]) * 256**3 + int(parts[1]) * 256**2 + int(parts[2]) * 256 + int(parts[3])
+        except:
+            return 999999999
+    
+    def print_progress_bar(self, label: str, percent: float, width: int = 30):
+        """프로그레스 바 출력 (값이 아직 없으면 '-')"""
+        if percent is None:
+            print(f"  {label:8} [{'░' * width}]     -")
+            return
+        filled = int(width * percent / 100)
+        bar = '█' * filled + '░' * (width - filled)
+        
+        if percent < 50:
+            color = Colors.GREEN
+        elif percent < 80:
+            color = Colors.WARNING
+        else:
+            color = Colors.FAIL
+        
+        print(f"  {label:8} [{color}{bar}{Colors.ENDC}] {percent:5.1f}%")
+    
+    def check_client_status(self, ip: str) -> bool:
+        """클라이언트 온라인 상태 확인"""
+        return self.check_clients_status([ip]).get(ip) is not None
+
+    def check_clients_status(self, ips: List[str]) -> Dict[str, Optional[float]]:
+        """여러 클라이언트 상태를 한 번에 확인 (IP → RTT ms, 오프라인이면 None)
+
+        데몬이 있으면 데몬이 이미 확인한 IP는 다시 ping하지 않는다.
+        """
+        state = self.daemon_state()
+        health = state['health'] if state else {}
+        results = {ip: health[ip] for ip in ips if ip in health}
+        pending = [ip for ip in ips if ip and ip not in results]
+        if pending:
+            try:
+                results.update(pxe_icmp.probe_hosts(pending, timeout=1.0))
+            except Exception:
+                results.update({ip: None for ip in pending})
+        self.client_status.update(results)
+        return results
+    
+    def manage_clients(self):
+        """클라이언트 관리 메뉴"""
+        while True:
+            self.print_header()
+            print(f"{Colors.BOLD}클라이언트 관리{Colors.ENDC}\n")
+            
+            # IP 주소로 정렬된 클라이언트 목록
+            sorted_clients = self.registry.all()
+            
+            # 클라이언트 목록 표시
+            if sorted_clients:
+                print(f"{Colors.BOLD}등록된 클라이언트:{Colors.ENDC}")
+                print(f"  {'번호':<4} {'시리얼/호스트명':<15} {'IP 주소':<15} {'MAC 주소':<20} {'DHCP 리스':<12} "
+                      f"{'24시간 가동률':<14} {'RTT (10분 단위)':<{pxe_history.SPARK_POINTS}} {'상태':<10}")
+                print(f"  {'-'*128}")
+                leases = pxe_leases.shared()
+                history = self.client_history()
+                for i, client in enumerate(sorted_clients, 1):
+                    # 호스트명이 시리얼과 같으므로 시리얼만 표시
+                    serial = client['serial']
+                    ip = client.get('ip', 'N/A')
+                    mac = client.get('mac', 'N/A')
+                    if ip not in self.client_status:
+                        state = '-'
+                    elif self.client_status[ip] is None:
+                        state = f"{Colors.FAIL}○ 오프라인{Colors.ENDC}"
+                    else:
+                        state = f"{Colors.GREEN}● {self.client_status[ip]:.1f}ms{Colors.ENDC}"
+                    lease = pxe_leases.format_remaining(leases.state(mac))
+                    summary = history.get(serial)
+                    uptime = pxe_history.format_summary(summary)
+                    spark = pxe_history.sparkline(summary['spark']) if summary else ''
+                    print(f"  {i:<4} {serial:<15} {ip:<15} {mac:<20} {lease:<12} {uptime:<14} "
+                          f"{spark:<{pxe_history.SPARK_POINTS}} {state}")
+                print()
+            else:
+                print(f"{Colors.WARNING}등록된 클라이언트가 없습니다.{Colors.ENDC}\n")
+            
+            print(f"{Colors.BOLD}옵션:{Colors.ENDC}")
+            print(f"  {Colors.CYAN}1.{Colors.ENDC} 새 클라이언트 추가")
+            print(f"  {Colors.CYAN}2.{Colors.ENDC} 클라이언트 제거")
+            print(f"  {Colors.CYAN}3.{Colors.ENDC} 클라이언트 정보 편집")
+            print(f"  {Colors.CYAN}4.{Colors.ENDC} SD 카드 / 이미지에서 시스템 복사")
+            print(f"  {Colors.CYAN}5.{Colors.ENDC} 📦 클라이언트 백업/복원")
+            print(f"  {Colors.CYAN}6.{Colors.ENDC} 🚀 일괄 작업 (명령/재부팅/종료)")
+            print(f"  {Colors.CYAN}7.{Colors.ENDC} ⏱  순차 부팅 (부팅 폭주 방지)")
+            print(f"  {Colors.CYAN}8.{Colors.ENDC} 📥 일괄 등록 (CSV / DHCP 리스 검색)")
+            print(f"  {Colors.CYAN}9.{Colors.ENDC} 🌡  시스템 정보 (온도/부하/메모리/디스크)")
+            print(f"  {Colors.CYAN}10.{Colors.ENDC} 📶 NFS 트래픽 상위 클라이언트")
+            print(f"  {Colors.CYAN}R.{Colors.ENDC} 상태 새로고침")
+            print(f"  {Colors.CYAN}0.{Colors.ENDC} 뒤로 가기")
+            print()
+
+            choice = input(f"{Colors.CYAN}선택: {Colors.ENDC}").strip().upper()
+
+            if choice == '1':
+                self.add_client()
+            elif choice == '2':
+                self.remove_client()
+            elif choice == '3':
+                self.edit_client()
+            elif choice == '4':
+                self.copy_from_sd()
+            elif choice == '5':
+                self.restore_clients_from_backup()
+            elif choice == '6':
+                self.run_fleet_action()
+            elif choice == '7':
+                self.staggered_boot()
+            elif choice == '8':
+                self.bulk_enroll()
+            elif choice == '9':
+                self.show_fleet_telemetry()
+            elif choice == '10':
+                self.show_nfs_hot_clients()
+            elif choice == 'R':
+                print(f"{Colors.CYAN}상태를 새로고침합니다...{Colors.ENDC}")
+                self.check_clients_status([c.get('ip', '') for c in sorted_clients])
+                continue  # 루프 다시 시작하여 상태 업데이트
+            elif choice == '0':
+                break
+    
+    def parse_selection(self, text: str, count: int) -> List[int]:
+        """'all', '1,3,5-8' 형식의 번호 선택을 0부터 시작하는 인덱스로 변환"""
+        text = text.strip().lower()
+        if text in ('all', 'a', '*'):
+            return list(range(count))
+        indexes = []
+        for part in text.replace(' ', '').split(','):
+            if not part:
+                continue
+            if '-' in part:
+                start, end = part.split('-', 1)
+                indexes.extend(range(int(start) - 1, int(end)))
+            else:
+                indexes.append(int(part) - 1)
+        return [i for i in dict.fromkeys(indexes) if 0 <= i < count]
+
+    def run_fleet_action(self):
+        """여러 클라이언트에 명령/재부팅/종료를 병렬로 실행하고 결과를 끝나는 순서대로 표시"""
+        self.print_header()
+        print(f"{Colors.BOLD}🚀 일괄 작업{Colors.ENDC}\n")
+
+        clients = self.registry.all()
+        if not clients:
+            print(f"{Colors.WARNING}등록된 클라이언트가 없습니다.{Colors.ENDC}")
+            input("\n계속하려면 Enter...")
+            return
+
+        for i, client in enumerate(clients, 1):
+            ip = client.get('ip', 'N/A')
+            state = ''
+            if ip in self.client_status:
+                state = f"{Colors.GREEN}●{Colors.ENDC}" if self.client_status[ip] is not None else f"{Colors.FAIL}○{Colors.ENDC}"
+            print(f"  {i:<4} {client['serial']:<15} {ip:<15} {state}")
+
+        print(f"\n{Colors.CYAN}대상 선택 (예: all, online, 1,3,5-8):{Colors.ENDC}")
+        selection = input("대상: ").strip()
+        if not selection:
+            return
+        if selection.lower() == 'online':
+            self.check_clients_status([c.get('ip', '') for c in clients])
+            targets = [c for c in clients if self.client_status.get(c.get('ip', '')) is not None]
+        else:
+            try:
+                targets = [clients[i] for i in self.parse_selection(selection, len(clients))]
+            except ValueError:
+                print(f"{Colors.FAIL}잘못된 선택입니다{Colors.ENDC}")
+                time.sleep(2)
+                return
+        if not targets:
+            print(f"{Colors.WARNING}선택된 클라이언트가 없습니다.{Colors.ENDC}")
+            time.sleep(2)
+            return
+
+        print(f"\n{Colors.BOLD}작업:{Colors.ENDC}")
+        print(f"  {Colors.CYAN}1.{Colors.ENDC} 명령 실행")
+        print(f"  {Colors.CYAN}2.{Colors.ENDC} 재부팅")
+        print(f"  {Colors.CYAN}3.{Colors.ENDC} 종료")
+        action = {'1': pxe_fleet.ACTION_COMMAND, '2': pxe_fleet.ACTION_REBOOT,
+                  '3': pxe_fleet.ACTION_SHUTDOWN}.get(input("선택: ").strip())
+        if not action:
+            return
+
+        command = ''
+        if action == pxe_fleet.ACTION_COMMAND:
+            command = input(f"{Colors.CYAN}실행할 명령: {Colors.ENDC}").strip()
+            if not command:
+                return
+
+        try:
+            parallel = int(input(f"동시 실행 수 [{pxe_fleet.DEFAULT_PARALLEL}]: ").strip() or pxe_fleet.DEFAULT_PARALLEL)
+            default_stagger = pxe_fleet.DEFAULT_STAGGER[action]
+            stagger = float(input(f"호스트 간 시작 간격(초) [{default_stagger}]: ").strip() or default_stagger)
+        except ValueError:
+            print(f"{Colors.FAIL}숫자를 입력하세요{Colors.ENDC}")
+            time.sleep(2)
+            return
+
+        label = pxe_fleet.ACTION_LABELS[action]
+        confirm = input(f"\n{Colors.WARNING}{len(targets)}개 클라이언트에 '{command or label}'을(를) 실행하시겠습니까? (y/N): {Colors.ENDC}").lower()
+        if confirm != 'y':
+            return
+
+        print(f"\n{Colors.CYAN}{label} 실행 중... (동시 {parallel}개, 간격 {stagger}초, Ctrl+C로 중단){Colors.ENDC}\n")
+        colors = {
+            pxe_fleet.STATUS_OK: Colors.GREEN,
+            pxe_fleet.STATUS_SENT: Colors.GREEN,
+            pxe_fleet.STATUS_FAILED: Colors.FAIL,
+            pxe_fleet.STATUS_UNREACHABLE: Colors.WARNING,
+            pxe_fleet.STATUS_CANCELLED: Colors.WARNING,
+        }
+        cancel = threading.Event()
+        results = []
+        start_time = time.time()
+        try:
+            for result in pxe_fleet.run_fleet(self.ssh_pool, targets, action, command,
+                                              parallel=parallel, stagger=stagger, cancel=cancel):
+                results.append(result)
+                code = '-' if result['returncode'] is None else result['returncode']
+                color = colors.get(result['status'], '')
+                print(f"  [{len(results)}/{len(targets)}] {result['serial']:<15} {result['ip']:<15} "
+                      f"{color}{result['status']:<12}{Colors.ENDC} 코드={code} ({result['elapsed']:.1f}초)")
+                output = (result['stdout'] or '').strip() if action == pxe_fleet.ACTION_COMMAND else ''
+                error = (result['stderr'] or '').strip() if result['status'] != pxe_fleet.STATUS_SENT else ''
+                for line in (output.splitlines() + error.splitlines())[:10]:
+                    print(f"      {line}")
+        except KeyboardInterrupt:
+            cancel.set()
+            print(f"\n{Colors.WARNING}중단 요청 - 실행 중인 호스트가 끝나기를 기다립니다...{Colors.ENDC}")
+
+        summary = pxe_fleet.summarize(results)
+        print(f"\n{Colors.BOLD}완료 ({time.time() - start_time:.1f}초):{Colors.ENDC} " +
+              ', '.join(f"{status} {count}개" for status, count in summary.items()))
+        input("\n계속하려면 Enter...")
+
+    def show_fleet_telemetry(self):
+        """클라이언트 시스템 정보 - 온도/부하/메모리/디스크로 정렬·필터"""
+        sort = 'temp'
+        filters = []
+        refresh = False
+        while True:
+            self.print_header()
+            print(f"{Colors.BOLD}🌡  클라이언트 시스템 정보{Colors.ENDC}\n")
+            telemetry = self.client_telemetry(refresh=refresh)
+            refresh = False
+            clients = [c for c in self.registry.all()
+                       if pxe_telemetry.matches(telemetry.get(c['serial']), filters)]
+            clients.sort(key=lambda c: pxe_telemetry.sort_key(telemetry.get(c['serial']), sort))
+
+            condition = f"   필터: {', '.join(f'{k}{op}{v:g}' for k, op, v in filters)}" if filters else ''
+            print(f"정렬: {pxe_telemetry.FIELDS[sort][2]} 높은 순{condition}\n")
+            print(f"  {'시리얼':<10} {'IP 주소':<15} {'온도':>7} {'부하':>6} {'메모리':>6} {'디스크':>6}  "
+                  f"{'스로틀링':<14} {'수집':<12}")
+            print(f"  {'-'*90}")
+            for client in clients:
+                entry = telemetry.get(client['serial'])
+                data = (entry or {}).get('data') or {}
+                temp = '-' if data.get('temp') is None else f"{data['temp']:.1f}°C"
+                color = {1: Colors.WARNING, 2: Colors.FAIL}.get(pxe_telemetry.temp_level(entry), '')
+                load = '-' if data.get('load1') is None else f"{data['load1']:.2f}"
+                memory = '-' if data.get('mem_percent') is None else f"{data['mem_percent']:.0f}%"
+                disk = '-' if data.get('disk_percent') is None else f"{data['disk_percent']:.0f}%"
+                throttled = pxe_telemetry.format_throttled(data.get('throttled')) if data else '-'
+                age = pxe_telemetry.format_age(entry)
+                if entry and not pxe_telemetry.is_fresh(entry, float(self.config.get('telemetry_ttl', pxe_telemetry.DEFAULT_TTL))):
+                    age = f"{Colors.WARNING}{age}{Colors.ENDC}"
+                print(f"  {client['serial']:<10} {client.get('ip', '-'):<15} {color}{temp:>7}{Colors.ENDC} "
+                      f"{load:>6} {memory:>6} {disk:>6}  {throttled:<14} {age}")
+            if not clients:
+                print(f"  {Colors.WARNING}조건에 맞는 클라이언트가 없습니다.{Colors.ENDC}")
+
+            print(f"\n{Colors.BOLD}옵션:{Colors.ENDC}")
+            print(f"  {Colors.CYAN}1.{Colors.ENDC} 정렬 (temp/load/memory/disk)")
+            print(f"  {Colors.CYAN}2.{Colors.ENDC} 필터 (예: temp>70, disk>=90 / 비우면 해제)")
+            print(f"  {Colors.CYAN}R.{Colors.ENDC} 지금 다시 수집")
+            print(f"  {Colors.CYAN}0.{Colors.ENDC} 뒤로 가기")
+            choice = input(f"\n{Colors.CYAN}선택: {Colors.ENDC}").strip().upper()
+            if choice == '1':
+                key = input(f"정렬 기준 [{sort}]: ").strip().lower() or sort
+                if key in pxe_telemetry.FIELDS:
+                    sort = key
+            elif choice == '2':
+                text = input("필터: ").strip()
+                try:
+                    filters = [pxe_telemetry.parse_filter(part) for part in text.split(',') if part.strip()]
+                except ValueError as e:
+                    print(f"{Colors.FAIL}{e}{Colors.ENDC}")
+                    time.sleep(2)
+            elif choice == 'R':
+                refresh = True
+            elif choice == '0':
+                break
+
+    def show_nfs_hot_clients(self):
+        """NFS를 많이 쓰는 클라이언트 - 몇 초마다 다시 샘플, Ctrl+C로 돌아감"""
+        try:
+            while True:
+                traffic = self.nfs_traffic()
+                self.print_header()
+                print(f"{Colors.BOLD}📶 NFS 트래픽 상위 클라이언트{Colors.ENDC}\n")
+                if not traffic or traffic['interval'] is None:
+                    print(f"{Colors.CYAN}첫 샘플을 모으는 중...{Colors.ENDC}")
+                else:
+                    print(f"카운터: {pxe_nfstraffic.describe_sources(traffic)}   "
+                          f"구간: 최근 {traffic['interval']:.0f}초   "
+                          f"누적: {datetime.fromtimestamp(traffic['started']).strftime('%H:%M:%S')} 이후\n")
+                    print(f"  {'#':<3} {'시리얼':<10} {'IP 주소':<15} {'읽기':>11} {'쓰기':>11} {'전송':>11} "
+                          f"{'패킷':>7} {'연결':>4} {'누적':>9}")
+                    print(f"  {'-'*90}")
+                    rows = pxe_nfstraffic.hot(traffic)
+                    for i, row in enumerate(rows, 1):
+                        text = pxe_nfstraffic.format_row(row)
+                        color = Colors.WARNING if i == 1 and row['bytes_s'] else ''
+                        print(f"  {i:<3} {color}{pxe_nfstraffic.label(row):<10}{Colors.ENDC} {row['ip'] or '-':<15} "
+                              f"{text['read']:>11} {text['write']:>11} {text['bytes']:>11} {text['packets']:>7} "
+                              f"{row['connections']:>4} {text['total']:>9}")
+                    if not rows:
+                        print(f"  {Colors.WARNING}NFS를 쓰는 클라이언트가 없습니다.{Colors.ENDC}")
+                print(f"\n{Colors.CYAN}{pxe_nfstraffic.REFRESH_INTERVAL}초마다 새로고침 - Ctrl+C로 돌아가기{Colors.ENDC}")
+                time.sleep(pxe_nfstraffic.REFRESH_INTERVAL)
+        except KeyboardInterrupt:
+            pass
+
+    def staggered_boot(self):
+        """DHCP 게이트로 클라이언트를 웨이브 단위로 부팅시키고 웨이브별 부팅 지연 표시"""
+        self.print_header()
+        print(f"{Colors.BOLD}⏱  순차 부팅 (부팅 폭주 방지){Colors.ENDC}\n")
+        print("대상 클라이언트의 DHCP 응답을 먼저 막은 뒤, 웨이브 단위로 풀어 차례로 부팅시킵니다.")
+        print("TFTP/NFS 서버에 동시에 몰리는 부팅 요청 수를 제한합니다.\n")
+
+        if not pxe_dnsmasq.uses_hostsdir():
+            print(f"{Colors.FAIL}dnsmasq가 dhcp-hostsdir 방식이 아닙니다. 먼저 dnsmasq 설정을 재생성하세요.{Colors.ENDC}")
+            input("\n계속하려면 Enter...")
+            return
+
+        clients = [c for c in self.registry.all() if c.get('mac') and c.get('ip')]
+        if not clients:
+            print(f"{Colors.WARNING}등록된 클라이언트가 없습니다.{Colors.ENDC}")
+            input("\n계속하려면 Enter...")
+            return
+
+        selection = input(f"{Colors.CYAN}대상 (all 또는 1,3,5-8) [all]: {Colors.ENDC}").strip() or 'all'
+        try:
+            targets = [clients[i] for i in self.parse_selection(selection, len(clients))]
+        except ValueError:
+            print(f"{Colors.FAIL}잘못된 선택입니다{Colors.ENDC}")
+            time.sleep(2)
+            return
+        if not targets:
+            return
+
+        settings = pxe_bootstorm.settings_from_config(self.config)
+        try:
+            wave_size = int(input(f"웨이브 크기 (한 번에 부팅할 대수) [{settings['wave_size']}]: ").strip() or settings['wave_size'])
+            wave_interval = float(input(f"웨이브 간격(초) [{settings['wave_interval']}]: ").strip() or settings['wave_interval'])
+            boot_timeout = float(input(f"부팅 시간 초과(초) [{settings['boot_timeout']}]: ").strip() or settings['boot_timeout'])
+        except ValueError:
+            print(f"{Colors.FAIL}숫자를 입력하세요{Colors.ENDC}")
+            time.sleep(2)
+            return
+        if wave_size < 1:
+            print(f"{Colors.FAIL}웨이브 크기는 1 이상이어야 합니다{Colors.ENDC}")
+            time.sleep(2)
+            return
+        self.config['boot_wave_size'] = wave_size
+        self.config['boot_wave_interval'] = wave_interval
+        self.config['boot_timeout'] = boot_timeout
+        self.save_config()
+
+        # 1. 게이트 설정
+        pxe_bootstorm.hold(self.config, targets)
+        print(f"\n{Colors.GREEN}✓ {len(targets)}개 클라이언트의 DHCP 응답을 막았습니다.{Colors.ENDC}")
+
+        # 게이트를 건 뒤 웨이브 해제가 시작되기 전에 중단/예외가 나도 게이트를 해제
+        # (시작된 뒤에는 run_waves가 끝날 때 직접 해제)
+        gated = True
+        try:
+            results = self.check_clients_status([c['ip'] for c in targets])
+            online = [c for c in targets if results.get(c['ip']) is not None]
+            if online:
+                reboot = input(f"{Colors.YELLOW}켜져 있는 {len(online)}대를 지금 재부팅할까요? (y/N): {Colors.ENDC}").lower()
+                if reboot == 'y':
+                    for result in pxe_fleet.run_fleet(self.ssh_pool, online, pxe_fleet.ACTION_REBOOT,
+                                                      parallel=32, stagger=0):
+                        print(f"  {result['serial']}: {result['status']}")
+            if settings['power_command']:
+                print(f"{Colors.CYAN}웨이브마다 전원 훅을 실행합니다: {settings['power_command']}{Colors.ENDC}")
+            else:
+                print(f"{Colors.CYAN}이제 클라이언트 전원을 켜세요 (DHCP 응답이 막혀 대기 상태가 됩니다).{Colors.ENDC}")
+
+            confirm = input(f"\n{Colors.YELLOW}Enter를 누르면 웨이브 해제를 시작합니다 (q: 취소): {Colors.ENDC}").strip().lower()
+            if confirm == 'q':
+                pxe_bootstorm.release(self.config, targets)
+                gated = False
+                print(f"{Colors.GREEN}✓ 게이트를 해제했습니다.{Colors.ENDC}")
+                input("\n계속하려면 Enter...")
+                return
+
+            # 2. 웨이브 해제 및 부팅 지연 측정
+            waves = (len(targets) + wave_size - 1) // wave_size
+            print(f"\n{Colors.CYAN}{waves}개 웨이브로 부팅합니다 (Ctrl+C: 중단 후 전체 해제){Colors.ENDC}\n")
+            wave_results = []
+            all_latencies = []
+            start_time = time.time()
+            events = pxe_bootstorm.run_waves(self.config, targets, wave_size, wave_interval,
+                                             boot_timeout, settings['power_command'])
+            try:
+                for event in events:
+                    gated = False
+                    elapsed = time.time() - start_time
+                    if event['event'] == 'release':
+                        names = ', '.join(c['serial'] for c in event['clients'])
+                        print(f"  [{elapsed:6.1f}s] {Colors.BOLD}웨이브 {event['wave']}/{waves} 해제{Colors.ENDC} ({len(event['clients'])}대: {names})")
+                    elif event['event'] == 'booted':
+                        all_latencies.append(event['latency'])
+                        print(f"  [{elapsed:6.1f}s]   {Colors.GREEN}●{Colors.ENDC} {event['client']['serial']} 부팅 ({event['latency']:.1f}초)")
+                    elif event['event'] == 'timeout':
+                        names = ', '.join(c['serial'] for c in event['clients'])
+                        print(f"  [{elapsed:6.1f}s]   {Colors.FAIL}✗ 시간 초과: {names}{Colors.ENDC}")
+                    elif event['event'] == 'already_online':
+                        names = ', '.join(c['serial'] for c in event['clients'])
+                        print(f"  [{elapsed:6.1f}s]   {Colors.YELLOW}○ 재부팅되지 않음 (계속 켜져 있음, 통계 제외): {names}{Colors.ENDC}")
+                    elif event['event'] == 'wave_done':
+                        stats = event['stats']
+                        wave_results.append((event['wave'], stats))
+                        if stats['booted']:
+                            print(f"  [{elapsed:6.1f}s] {Colors.CYAN}웨이브 {event['wave']} 완료: {stats['booted']}/{stats['total']}대, "
+                                  f"p50 {stats['p50']:.1f}초, p90 {stats['p90']:.1f}초, 최대 {stats['max']:.1f}초{Colors.ENDC}")
+                        else:
+                            print(f"  [{elapsed:6.1f}s] {Colors.FAIL}웨이브 {event['wave']} 완료: 부팅된 클라이언트 없음{Colors.ENDC}")
+            except KeyboardInterrupt:
+                print(f"\n{Colors.WARNING}중단 - 남은 게이트를 모두 해제합니다.{Colors.ENDC}")
+            finally:
+                events.close()
+        finally:
+            if gated:
+                pxe_bootstorm.release(self.config, targets)
+
+        # 3. 요약
+        print(f"\n{Colors.BOLD}웨이브별 부팅 지연 (게이트 해제 → 첫 ping 응답):{Colors.ENDC}")
+        print(f"  {'웨이브':<6} {'부팅':<8} {'p50':>8} {'p90':>8} {'최대':>8}")
+        for number, stats in sorted(wave_results):
+            fmt = lambda v: f"{v:.1f}s" if v is not None else '-'
+            skipped = f"  (재부팅 안 됨 {stats['already_online']}대)" if stats['already_online'] else ''
+            print(f"  {number:<6} {stats['booted']}/{stats['total']:<6} {fmt(stats['p50']):>8} {fmt(stats['p90']):>8} {fmt(stats['max']):>8}{skipped}")
+        if all_latencies:
+            print(f"\n  전체: {len(all_latencies)}/{len(targets)}대 부팅, "
+                  f"p50 {pxe_bootstorm.percentile(all_latencies, 50):.1f}초, "
+                  f"p90 {pxe_bootstorm.percentile(all_latencies, 90):.1f}초, "
+                  f"총 {time.time() - start_time:.1f}초")
+            print(f"  {Colors.CYAN}p90이 웨이브 간격보다 크게 늘어나면 웨이브 크기를 줄이거나 간격을 늘리세요.{Colors.ENDC}")
+        input("\n계속하려면 Enter...")
+
+    def add_client(self):
+        """새 클라이언트 추가 (MAC 주소 자동 완성 지원)"""
+        self.print_header()
+        print(f"{Colors.BOLD}새 클라이언트 추가{Colors.ENDC}\n")
+        
+        # 고정 IP 할당기 (레지스트리 + dnsmasq 리스/ARP 충돌 반영)
+        allocator = self.ip_allocator()
+        range_start, range_end = pxe_ipam.static_range(self.config)
+        print(f"{Colors.CYAN}※ 고정 IP 범위: {range_start} - {range_end} "
+              f"(사용 중 {allocator.size - allocator.free_count}개, 남음 {allocator.free_count}개){Colors.ENDC}")
+        print(f"{Colors.CYAN}※ 권장: 비워 두면 범위에서 가장 낮은 빈 주소를 할당{Colors.ENDC}")
+        
+        print(f"{Colors.CYAN}라즈베리파이 정보 입력{Colors.ENDC}")
+        print(f"{Colors.WARNING}팁: 모든 라즈베리파이 MAC 주소는 88:a2:9e:1b:로 시작합니다{Colors.ENDC}")
+        print(f"{Colors.WARNING}    마지막 4자리만 입력하면 자동 완성됩니다 (예: e3:0f){Colors.ENDC}\n")
+        
+        # 시리얼 번호 입력 (호스트명으로도 사용)
+        serial = input(f"시리얼 번호 (8자리 16진수): ").strip().lower()
+        if not serial:
+            print(f"{Colors.FAIL}시리얼 번호는 필수입니다{Colors.ENDC}")
+            time.sleep(2)
+            return
+        
+        # MAC 주소 입력 (짧은 형식 지원)
+        mac_input = input(f"MAC 주소 (전체 또는 마지막 4자리): ").strip().lower()
+        if not mac_input:
+            print(f"{Colors.FAIL}MAC 주소는 필수입니다{Colors.ENDC}")
+            time.sleep(2)
+            return
+        
+        # MAC 주소 자동 완성 + 유효성 검사
+        mac = pxe_enroll.normalize_mac(mac_input)
+        if not mac:
+            print(f"{Colors.FAIL}올바른 MAC 주소 형식이 아닙니다{Colors.ENDC}")
+            time.sleep(2)
+            return
+        if mac != mac_input:
+            print(f"  → 자동 완성: {mac}")
+        
+        # IP 주소 입력
+        suggested_ip = allocator.peek(mac)
+        if suggested_ip is None:
+            print(f"{Colors.WARNING}고정 IP 범위에 빈 주소가 없습니다 - 직접 입력하세요{Colors.ENDC}")
+        ip_input = input(f"고정 IP 주소 [{suggested_ip or ''}]: ").strip()
+        ip = ip_input if ip_input else suggested_ip
+        if not ip:
+            print(f"{Colors.FAIL}IP 주소는 필수입니다{Colors.ENDC}")
+            time.sleep(2)
+            return
+        problem = allocator.conflict(ip, mac)
+        if problem:
+            print(f"{Colors.WARNING}⚠️  {ip}: {problem}{Colors.ENDC}")
+            if input("그래도 이 주소를 사용하시겠습니까? (y/N): ").lower() != 'y':
+                return
+        
+        # 클라이언트 추가 (시리얼/MAC/IP 중복은 레지스트리 고유 인덱스로 확인)
+        new_client = {
+            'serial': serial,
+            'hostname': serial,  # 시리얼을 호스트명으로 사용
+            'mac': mac,
+            'ip': ip
+        }
+        
+        try:
+            self.registry.add(new_client)
+        except pxe_registry.DuplicateClientError as e:
+            print(f"{Colors.FAIL}{e}{Colors.ENDC}")
+            time.sleep(2)
+            return
+        
+        print(f"\n{Colors.GREEN}✓ 클라이언트가 추가되었습니다{Colors.ENDC}")
+        print(f"  시리얼/호스트명: {serial}")
+        print(f"  MAC 주소: {mac}")
+        print(f"  IP 주소: {ip}")
+        
+        # PXE 부팅 설정 생성 + 시스템 복사 (dnsmasq 적용은 끝에서 한 번)
+        with self.dnsmasq.batch():
+            self.create_client_directories(serial, mac, ip, serial)
+        
+            # 기존 클라이언트(또는 골든 템플릿)가 있으면 자동으로 시스템 복사
+            source_serial = self.find_clone_source(exclude={serial})
+            if source_serial:
+                print(f"\n{Colors.CYAN}기존 클라이언트({source_serial})에서 시스템을 자동 복사합니다...{Colors.ENDC}")
+                self.copy_system_from_existing(source_serial, serial, mac, ip, serial)
+            elif self.registry.count() > 1:
+                print(f"\n{Colors.YELLOW}시스템 파일이 없습니다. 나중에 SD 카드나 템플릿에서 복사하세요.{Colors.ENDC}")
+            else:
+                print(f"\n{Colors.YELLOW}첫 번째 클라이언트입니다. SD 카드에서 시스템을 복사하세요.{Colors.ENDC}")
+    
+    def bulk_enroll(self):
+        """CSV 파일 또는 DHCP 리스 검색으로 여러 클라이언트를 한 번에 등록"""
+        self.print_header()
+        print(f"{Colors.BOLD}클라이언트 일괄 등록{Colors.ENDC}\n")
+        print(f"  {Colors.CYAN}1.{Colors.ENDC} CSV 파일에서 가져오기 (serial,mac[,ip][,hostname])")
+        print(f"  {Colors.CYAN}2.{Colors.ENDC} DHCP 리스에서 미등록 라즈베리파이 찾기 ({pxe_enroll.RPI_MAC_PREFIX}:xx:xx)")
+        print(f"  {Colors.CYAN}0.{Colors.ENDC} 취소")
+        choice = input(f"\n{Colors.CYAN}선택: {Colors.ENDC}").strip()
+        
+        if choice == '1':
+            path = input("CSV 파일 경로: ").strip()
+            try:
+                rows = pxe_enroll.read_csv(Path(path).expanduser())
+            except (OSError, ValueError) as e:
+                print(f"{Colors.FAIL}CSV 읽기 실패: {e}{Colors.ENDC}")
+                time.sleep(2)
+                return
+        elif choice == '2':
+            print(f"{Colors.CYAN}DHCP 리스와 TFTP 로그(최근 1일) 확인 중...{Colors.ENDC}")
+            try:
+                log_lines = pxe_boottrace.read_journal('-1d')
+            except (OSError, subprocess.SubprocessError):
+                log_lines = []
+            rows = pxe_enroll.discover(pxe_leases.shared().all(), self.registry.all(), log_lines=log_lines)
+            if rows:
+                print(f"\n미등록 라즈베리파이 {len(rows)}대 발견:")
+            for row in rows:
+                label = f"{row['mac']} (리스 IP {row['lease_ip']})"
+                if row['serial']:
+                    print(f"  {label} → 시리얼 {row['serial']} (TFTP 로그)")
+                else:
+                    row['serial'] = input(f"  {label} 시리얼 번호 (Enter=건너뛰기): ").strip().lower()
+            rows = [row for row in rows if row['serial']]
+        else:
+            return
+        
+        if not rows:
+            print(f"{Colors.WARNING}등록할 클라이언트가 없습니다.{Colors.ENDC}")
+            time.sleep(2)
+            return
+        
+        # 검증 + IP 일괄 배정 (할당기 하나로 레지스트리를 다시 훑지 않음)
+        registered = self.registry.all()
+        allocator = pxe_ipam.IPAllocator.from_config(self.config, registered)
+        clients, errors = pxe_enroll.plan(rows, registered, allocator)
+        
+        if clients:
+            print(f"\n{Colors.BOLD}등록 예정 ({len(clients)}대):{Colors.ENDC}")
+            print(f"  {'시리얼':<12} {'MAC 주소':<20} {'IP 주소':<16} {'호스트명'}")
+            for client in clients:
+                print(f"  {client['serial']:<12} {client['mac']:<20} {client['ip']:<16} {client['hostname']}")
+        if errors:
+            print(f"\n{Colors.WARNING}건너뛸 항목 ({len(errors)}개):{Colors.ENDC}")
+            for number, message in errors:
+                print(f"  {number}번: {message}")
+        if not clients:
+            input("\n계속하려면 Enter...")
+            return
+        
+        if input(f"\n{len(clients)}대를 등록하시겠습니까? (y/N): ").lower() != 'y':
+            return
+        self.enroll_clients(clients)
+        input("\n계속하려면 Enter...")
+    
+    def enroll_clients(self, clients: List[dict]) -> Optional[List[str]]:
+        """검증된 클라이언트들 등록 - 디렉토리 일괄 생성, 시스템 병렬 복제, DHCP/NFS는 끝에서 한 번 반영
+
+        시스템 복사에 실패한 시리얼 목록 반환 (등록/디렉토리 생성 단계에서 중단되면 None)
+        """
+        start_time = time.time()
+        
+        # 1. 레지스트리 (하나의 트랜잭션 - 중복이 있으면 전부 취소)
+        try:
+            with pxe_metrics.timed('registry'), self.registry.transaction():
+                for client in clients:
+                    self.registry.add(client)
+        except pxe_registry.DuplicateClientError as e:
+            print(f"{Colors.FAIL}등록 실패: {e}{Colors.ENDC}")
+            return None
+        print(f"{Colors.GREEN}  ✓ 레지스트리 등록 {len(clients)}대{Colors.ENDC}")
+        
+        # 2. NFS/TFTP 디렉토리 (권한 작업 한 번)
+        batch = pxe_privops.OpBatch()
+        owner = os.environ.get('SUDO_USER', os.environ.get('USER', ''))
+        try:
+            pwd.getpwnam(owner)
+        except KeyError:
+            owner = ''
+        for client in clients:
+            nfs_path = Path(self.config['nfs_root']) / client['serial']
+            batch.mkdir(nfs_path, 0o755)
+            batch.mkdir(Path(self.config['tftp_root']) / client['serial'], 0o755)
+            if owner:
+                batch.chown(nfs_path, owner)
+        try:
+            with pxe_metrics.timed('directories'):
+                batch.apply()
+        except pxe_privops.BatchError as e:
+            print(f"{Colors.FAIL}  디렉토리 생성 실패: {e}{Colors.ENDC}")
+            return None
+        print(f"{Colors.GREEN}  ✓ 디렉토리 생성 {len(clients) * 2}개{Colors.ENDC}")
+        
+        # 3. 시스템 복제 (병렬) - 원본이 없으면 기본 TFTP 부트 파일만
+        source_serial = self.find_clone_source(exclude={c['serial'] for c in clients})
+        failed = []
+        if source_serial:
+            parallel = max(1, int(self.config.get('enroll_parallel', pxe_enroll.DEFAULT_PARALLEL)))
+            print(f"{Colors.CYAN}  {source_serial}에서 시스템 복제 중 (동시 {parallel}대)...{Colors.ENDC}")
+            
+            def clone(client: dict):
+                messages = []
+                started = time.time()
+                try:
+                    ok = self.copy_system_from_existing(source_serial, client['serial'], client['mac'],
+                                                        client['ip'], client['hostname'], log=messages.append)
+                except Exception as e:
+                    messages.append(str(e))
+                    ok = False
+                return ok, messages, time.time() - started
+            
+            with ThreadPoolExecutor(max_workers=min(parallel, len(clients))) as executor:
+                futures = {executor.submit(clone, client): client for client in clients}
+                for done, future in enumerate(as_completed(futures), 1):
+                    client = futures[future]
+                    ok, messages, elapsed = future.result()
+                    mark = f"{Colors.GREEN}✓{Colors.ENDC}" if ok else f"{Colors.FAIL}✗{Colors.ENDC}"
+                    print(f"  [{done}/{len(clients)}] {mark} {client['serial']} ({elapsed:.1f}초)")
+                    if not ok:
+                        failed.append(client['serial'])
+                        for message in messages:
+                            print(f"      {message}")
+        else:
+            print(f"{Colors.YELLOW}  복사할 시스템이 없습니다. 기본 TFTP 부트 파일만 만들고, 나중에 SD 카드나 템플릿에서 복사하세요.{Colors.ENDC}")
+            for client in clients:
+                self.setup_tftp_boot_files(client['serial'])
+        
+        # 4. DHCP 예약과 NFS exports는 모든 클라이언트를 모아 한 번에 반영
+        with pxe_metrics.timed('dhcp_sync'), self.dnsmasq.batch():
+            self.generate_dnsmasq_config()
+            self.update_dhcp_leases(claim=[(c['mac'], c['ip']) for c in clients])
+        with pxe_metrics.timed('exports_sync'):
+            self.sync_nfs_exports()
+        pxe_metrics.report_step('enroll_total', time.time() - start_time)
+        
+        print(f"\n{Colors.GREEN}✅ 일괄 등록 완료: {len(clients) - len(failed)}/{len(clients)}대 "
+              f"({time.time() - start_time:.1f}초){Colors.ENDC}")
+        if failed:
+            print(f"{Colors.WARNING}  시스템 복사 실패: {', '.join(failed)} - 레지스트리에는 등록됨{Colors.ENDC}")
+        return failed
+    
+    def find_clone_source(self, exclude: set = frozenset()) -> Optional[str]:
+        """시스템 복사 원본 클라이언트 (골든 템플릿이 있으면 부트 파일만 있으면 됨)"""
+        has_golden = (pxe_provision.golden_template_path(self.config) / 'etc').exists()
+        for client in self.registry.all():
+            if client['serial'] in exclude:
+                continue
+            nfs_path = Path(self.config['nfs_root']) / client['serial']
+            if has_golden or (nfs_path.exists() and (nfs_path / 'etc').exists()):
+                return client['serial']
+        return None
+    
+    def setup_ssh_for_client(self, target_nfs: Path, hostname: str, batch: Optional[pxe_privops.OpBatch] = None):
+        """SSH 서비스 설정 및 키 재생성
+
+        batch를 넘기면 작업만 추가하고 적용은 호출한 쪽에서 한 번에 한다.
+        """
+        own_batch = batch is None
+        batch = batch or pxe_privops.OpBatch()
+        ssh_dir = target_nfs / 'etc' / 'ssh'
+        wants_dir = target_nfs / 'etc' / 'systemd' / 'system' / 'multi-user.target.wants'
+
+        # 기존 SSH 호스트 키 삭제 후 모든 종류의 키를 한 번에 생성 (-A -f: 지정한 루트 아래에 생성)
+        batch.mkdir(ssh_dir)
+        batch.remove(ssh_dir / 'ssh_host_*')
+        batch.run(['ssh-keygen', '-A', '-f', str(target_nfs)])
+
+        # SSH 키 파일 권한 설정 (중요: SSH는 엄격한 권한을 요구함)
+        batch.chmod(ssh_dir, 0o755)
+        batch.chmod(ssh_dir / 'ssh_host_*_key', 0o600)
+        batch.chmod(ssh_dir / 'ssh_host_*.pub', 0o644)
+
+        # SSH 설정 파일 수정 (비밀번호 인증 허용)
+        sshd_config = ssh_dir / 'sshd_config'
+        batch.replace(sshd_config, r'^#PasswordAuthentication.*$', 'PasswordAuthentication yes')
+        batch.replace(sshd_config, r'^PasswordAuthentication no$', 'PasswordAuthentication yes')
+        batch.replace(sshd_config, r'^#PermitRootLogin.*$', 'PermitRootLogin yes')
+        batch.replace(sshd_config, r'^PermitRootLogin prohibit-password$', 'PermitRootLogin yes')
+        batch.chmod(sshd_config, 0o644)
+
+        # SSH 서비스 자동 활성화 (일부 시스템에서는 sshd.service 사용)
+        if not (wants_dir / 'ssh.service').exists():
+            batch.symlink('/lib/systemd/system/ssh.service', wants_dir / 'ssh.service')
+        if not (wants_dir / 'sshd.service').exists() and \
+                (target_nfs / 'lib' / 'systemd' / 'system' / 'sshd.service').exists():
+            batch.symlink('/lib/systemd/system/sshd.service', wants_dir / 'sshd.service')
+
+        if not own_batch:
+            return True
+        try:
+            print(f"  SSH 설정 중...")
+            batch.apply()
+            print(f"    - SSH 설정 완료")
+            return True
+        except pxe_privops.BatchError as e:
+            print(f"{Colors.WARNING}    - SSH 설정 중 오류 발생: {e}{Colors.ENDC}")
+            return False
+    
+    def copy_system_from_existing(self, source_serial: str, target_serial: str, mac: str, ip: str, hostname: str,
+                                  log=print) -> bool:
+        """기존 클라이언트(또는 골든 템플릿)에서 시스템 자동 복사
+
+        log: 진행 메시지 출력 함수 (일괄 등록에서 병렬로 돌릴 때 클라이언트별로 모음)
+        """
+        source_nfs = Path(self.config['nfs_root']) / source_serial
+        source_tftp = Path(self.config['tftp_root']) / source_serial
+        target_nfs = Path(self.config['nfs_root']) / target_serial
+        target_tftp = Path(self.config['tftp_root']) / target_serial
+
+        # 골든 템플릿이 있으면 루트 파일시스템은 템플릿에서 복제
+        golden = pxe_provision.golden_template_path(self.config)
+        if (golden / 'etc').exists():
+            source_nfs = golden
+
+        # 원본의 호스트명 (hosts 파일 치환용)
+        source_hostname = source_serial
+        try:
+            source_hostname = (source_nfs / 'etc' / 'hostname').read_text().strip() or source_serial
+        except OSError:
+            pass
+
+        try:
+            # TFTP boot 파일 복사
+            if source_tftp.exists():
+                log(f"  Boot 파일 링크 중...")
+                with pxe_metrics.timed('boot_files'):
+                    stats = pxe_tftpstore.privileged('populate', source_tftp, target_tftp, self.config['tftp_root'])
+                log(f"  Boot 파일 {stats['linked']}개 공유 저장소 링크, {stats['copied']}개 복사")
+                
+                # cmdline.txt 수정 - 매개변수로 받은 IP와 hostname 사용
+                cmdline_path = target_tftp / 'cmdline.txt'
+                if cmdline_path.exists():
+                    # 매개변수로 받은 정보 사용 (새 클라이언트는 아직 config에 없음)
+                    if ip:
+                        # 네트워크 설정
+                        network_base = '.'.join(self.config['server_ip'].split('.')[:3])
+                        gateway = f"{network_base}.1"
+                        netmask = "255.255.255.0"
+                        # 네트워크 인터페이스 자동 감지 (예측 가능한 이름 또는 eth0)
+                        # 최신 Raspberry Pi OS는 예측 가능한 네트워크 이름 사용 (예: end0, enxb827eb123456)
+                        iface = ":"  # 빈 값으로 설정하면 커널이 자동 감지
+                        # 고정 IP 형식
+                        cmdline = f"console=serial0,115200 console=tty1 root=/dev/nfs nfsroot={self.config['server_ip']}:{target_nfs},vers=3 rw ip={ip}:{self.config['server_ip']}:{gateway}:{netmask}:{hostname}:{iface}:off rootwait elevator=deadline"
+                    else:
+                        # IP가 없으면 DHCP 사용 (fallback)
+                        cmdline = f"console=serial0,115200 console=tty1 root=/dev/nfs nfsroot={self.config['server_ip']}:{target_nfs},vers=3 rw ip=dhcp rootwait"
+                    subprocess.run(['sudo', 'tee', str(cmdline_path)], 
+                                 input=cmdline.encode(), 
+                                 stdout=subprocess.DEVNULL, check=True)
+            
+            # NFS root 파일시스템 복사
+            if source_nfs.exists():
+                log(f"  Root 파일시스템 복사 중... ({source_nfs})")
+                start_time = time.time()
+                with pxe_metrics.timed('rootfs_clone'):
+                    method = pxe_provision.clone_tree(source_nfs, target_nfs,
+                                                      self.config.get('provision_mode', 'auto'))
+                log(f"  Root 파일시스템 복사 완료 ({method}, {time.time() - start_time:.1f}초)")
+
+                # 복사 후 설정 (fstab/hostname/sudo 권한/SSH/hosts)을 한 번에 적용
+                log(f"  클라이언트 설정 적용 중...")
+                fixup_start = time.time()
+                batch = pxe_privops.OpBatch()
+
+                # fstab 최소화
+                minimal_fstab = """proc            /proc           proc    defaults          0       0
+tmpfs           /tmp            tmpfs   defaults,nosuid   0       0
+devpts          /dev/pts        devpts  gid=5,mode=620    0       0
+"""
+                batch.write(target_nfs / 'etc' / 'fstab', minimal_fstab, optional=True)
+
+                # hostname 설정
+                batch.write(target_nfs / 'etc' / 'hostname', hostname, optional=True)
+
+                # sudo 권한 수정 (NFS 부팅 시 필요)
+                sudo_bin_path = target_nfs / 'usr' / 'bin' / 'sudo'
+                batch.chown(sudo_bin_path, 'root:root')
+                batch.chmod(sudo_bin_path, 0o4755)
+
+                sudo_conf_path = target_nfs / 'etc' / 'sudo.conf'
+                batch.chown(sudo_conf_path, 'root:root')
+                batch.chmod(sudo_conf_path, 0o644)
+
+                # sudo 플러그인 디렉토리: .so는 644, sudoers.so와 libsudo_util.so*는 실행 권한
+                sudo_lib_path = target_nfs / 'usr' / 'lib' / 'sudo'
+                batch.chown(sudo_lib_path, 'root:root', recursive=True)
+                batch.chmod(sudo_lib_path, 0o755)
+                batch.chmod(sudo_lib_path / '*.so', 0o644)
+                batch.chmod(sudo_lib_path / 'sudoers.so', 0o755)
+                batch.chmod(sudo_lib_path / 'libsudo_util.so*', 0o755)
+
+                # /etc/sudoers 파일과 /etc/sudoers.d
+                sudoers_path = target_nfs / 'etc' / 'sudoers'
+                batch.chown(sudoers_path, 'root:root')
+                batch.chmod(sudoers_path, 0o440)
+                sudoers_d_path = target_nfs / 'etc' / 'sudoers.d'
+                batch.chown(sudoers_d_path, 'root:root')
+                batch.chmod(sudoers_d_path, 0o755)
+                batch.chown(sudoers_d_path / '*', 'root:root')
+                batch.chmod(sudoers_d_path / '*', 0o440)
+
+                # SSH 설정 및 키 재생성
+                self.setup_ssh_for_client(target_nfs, hostname, batch)
+
+                # hosts 파일: raspberrypi와 원본 호스트명을 새 호스트명으로, 127.0.1.1 라인 재설정
+                hosts_path = target_nfs / 'etc' / 'hosts'
+                if hosts_path.exists():
+                    for old_name in ('raspberrypi', source_serial, source_hostname):
+                        batch.replace(hosts_path, rf'\b{re.escape(old_name)}\b', hostname)
+                    batch.replace(hosts_path, r'^127\.0\.1\.1.*\n?', '')
+                    batch.append(hosts_path, f"127.0.1.1\t{hostname}\n")
+
+                try:
+                    with pxe_metrics.timed('configure'):
+                        batch.apply()
+                    log(f"  클라이언트 설정 완료 ({len(batch)}개 작업, {time.time() - fixup_start:.2f}초)")
+                except pxe_privops.BatchError as e:
+                    log(f"{Colors.FAIL}  클라이언트 설정 실패 ({e.done}/{len(batch)}개 완료 후 중단): {e}{Colors.ENDC}")
+                    return False
+            
+            log(f"{Colors.GREEN}  ✓ 시스템 복사 완료!{Colors.ENDC}")
+            return True
+            
+        except (subprocess.CalledProcessError, pxe_privops.BatchError) as e:
+            log(f"{Colors.FAIL}  시스템 복사 실패: {e}{Colors.ENDC}")
+            return False
+    
+    def create_client_directories(self, serial: str, mac: str, ip: str, hostname: str):
+        """클라이언트용 디렉토리 생성 및 PXE 부팅 설정"""
+        nfs_path = Path(self.config['nfs_root']) / serial
+        tftp_path = Path(self.config['tftp_root']) / serial
+        
+        try:
+            # 디렉토리 생성
+            subprocess.run(['sudo', 'mkdir', '-p', str(nfs_path)], check=True)
+            subprocess.run(['sudo', 'mkdir', '-p', str(tftp_path)], check=True)
+            
+            # NFS 디렉토리 권한 설정 (적절한 권한 설정)
+            subprocess.run(['sudo', 'chmod', '755', str(nfs_path)], check=True)
+            
+            # 소유자 변경
+            current_user = os.environ.get('SUDO_USER', os.environ.get('USER', 'rpi-server'))
+            subprocess.run(['sudo', 'chown', f'{current_user}:{current_user}', str(nfs_path)], 
+                         stderr=subprocess.DEVNULL, check=False)
+            
+            # TFTP 디렉토리 권한 설정
+            subprocess.run(['sudo', 'chmod', '755', str(tftp_path)], check=True)
+            
+            print(f"\n{Colors.GREEN}✅ 디렉토리 생성 및 권한 설정 완료{Colors.ENDC}")
+            
+            # DHCP 설정 업데이트 (MAC 주소와 고정 IP 포함)
+            self.update_dhcp_config(serial, mac, ip, hostname)
+            
+            # NFS exports 동기화
+            self.sync_nfs_exports()
+            
+            # TFTP 부트 파일 설정
+            self.setup_tftp_boot_files(serial)
+            
+            print(f"\n{Colors.GREEN}✅ PXE 부팅 설정 완료!{Colors.ENDC}")
+            print(f"  - NFS: {nfs_path}")
+            print(f"  - TFTP: {tftp_path}")
+            print(f"  - 고정 IP: {ip} (MAC: {mac})")
+            
+        except subprocess.CalledProcessError as e:
+            print(f"{Colors.FAIL}설정 실패: {e}{Colors.ENDC}")
+    
+    def update_dhcp_config(self, serial: str, mac: str, ip: str, hostname: str):
+        """DHCP/TFTP 설정 업데이트 - 통합 설정 파일에 추가"""
+        print(f"{Colors.CYAN}DHCP 설정 업데이트 중...{Colors.ENDC}")
+        
+        # 클라이언트 정보를 레지스트리에 추가/업데이트 (해당 행만 기록)
+        try:
+            self.registry.upsert({'serial': serial, 'mac': mac, 'ip': ip, 'hostname': hostname})
+        except pxe_registry.DuplicateClientError as e:
+            print(f"{Colors.FAIL}  ✗ {e}{Colors.ENDC}")
+            return
+        
+        # 통합 dnsmasq 설정 재생성
+        self.generate_dnsmasq_config()
+        
+        # 다른 MAC/IP로 남아 있는 리스 정리
+        self.update_dhcp_leases(claim=[(mac, ip)])
+        
+        print(f"{Colors.GREEN}  ✓ DHCP 고정 IP 설정 완료 ({mac} → {ip}){Colors.ENDC}")
+    
+    def update_dhcp_leases(self, claim: List[tuple] = (), release: List[tuple] = ()):
+        """DHCP 리스 정리 - 예약할 (MAC, IP)와 충돌하는 리스, 삭제/변경 전 (MAC, IP) 리스를 한 번에 제거
+
+        리스는 dnsmasq가 dhcp_release로 직접 지운다 (배치 안이면 끝에서 한 번, 재시작 없음).
+        """
+        editor = pxe_leases.LeaseEditor(pxe_leases.shared().path)
+        for mac, ip in release:
+            editor.release(mac, ip)
+        for mac, ip in claim:
+            editor.claim(mac, ip)
+        stale = editor.stale()
+        if stale:
+            print(f"  이전 DHCP 리스 {len(stale)}개 정리")
+            try:
+                self.dnsmasq.drop_leases(self.config['network_interface'], stale)
+            except (OSError, pxe_privops.BatchError) as e:
+                print(f"{Colors.WARNING}  ! 리스 업데이트 실패: {e}{Colors.ENDC}")
+    
+    def sync_nfs_exports(self, clients: List[dict] = None) -> bool:
+        """레지스트리 기준으로 NFS exports 동기화 (바뀐 항목만 exportfs로 반영)"""
+        print(f"{Colors.CYAN}NFS exports 동기화 중...{Colors.ENDC}")
+        if clients is None:
+            clients = self.registry.all()
+        
+        try:
+            plan = pxe_exports.reconcile(self.config, clients)
+        except (pxe_privops.BatchError, subprocess.SubprocessError, OSError) as e:
+            print(f"{Colors.WARNING}  ! NFS exports 동기화 실패: {e}{Colors.ENDC}")
+            return False
+        
+        for line in plan.describe():
+            print(f"    {line}")
+        if plan:
+            print(f"{Colors.GREEN}  ✓ NFS exports 완료 ({plan.summary()}){Colors.ENDC}")
+        else:
+            print(f"{Colors.GREEN}  ✓ NFS exports 이미 설정됨{Colors.ENDC}")
+        return True
+    
+    def detect_network_interface(self, nfs_path: Path = None) -> str:
+        """실제 네트워크 인터페이스 이름 감지"""
+        try:
+            # NFS 경로가 제공되면 해당 시스템에서 감지
+            if nfs_path and nfs_path.exists():
+                # /sys/class/net 디렉토리에서 인터페이스 확인
+                net_path = nfs_path / 'sys' / 'class' / 'net'
+                if net_path.exists():
+                    interfaces = []
+                    for item in net_path.iterdir():
+                        if item.is_symlink() or item.is_dir():
+                            name = item.name
+                            # lo (loopback)와 wlan 인터페이스 제외
+                            if name != 'lo' and not name.startswith('wlan'):
+                                interfaces.append(name)
+                    
+                    if interfaces:
+                        # eth0가 있으면 우선 사용, 없으면 첫 번째 인터페이스 사용
+                        if 'eth0' in interfaces:
+                            return 'eth0'
+                        # end0 패턴 우선 (Raspberry Pi OS의 새로운 명명 규칙)
+                        for iface in interfaces:
+                            if iface.startswith('end'):
+                                return iface
+                        # 그 외 첫 번째 유선 인터페이스
+                        return interfaces[0]
+            
+            # 현재 시스템에서 감지 (SD 카드가 마운트된 경우)
+            result = subprocess.run(['ip', 'link', 'show'], 
+                                  capture_output=True, text=True, check=False)
+            if result.returncode == 0:
+                lines = result.stdout.split('\n')
+                for line in lines:
+                    if ':' in line and 'state' not in line:
+                        parts = line.split(':')
+                        if len(parts) >= 2:
+                            iface_name = parts[1].strip()
+                            # lo와 wlan 제외
+                            if iface_name != 'lo' and not iface_name.startswith('wlan'):
+                                # eth0 또는 end로 시작하는 인터페이스 우선
+                                if iface_name == 'eth0' or iface_name.startswith('end'):
+                                    return iface_name
+            
+            # 기본값: eth0
+            return 'eth0'
+            
+        except Exception as e:
+            print(f"{Colors.WARNING}  네트워크 인터페이스 감지 실패: {e}, 기본값 eth0 사용{Colors.ENDC}")
+            return 'eth0'
+    
+    def setup_tftp_boot_files(self, serial: str):
+        """TFTP 부트 파일 설정"""
+        print(f"{Colors.CYAN}TFTP 부트 파일 설정 중...{Colors.ENDC}")
+        
+        tftp_path = Path(self.config['tftp_root']) / serial
+        nfs_path = Path(self.config['nfs_root']) / serial
+        
+        # 클라이언트 정보에서 IP와 hostname 가져오기
+        client_info = self.registry.get(serial)
+        if client_info:
+            client_ip = client_info.get('ip', '')
+            hostname = client_info.get('hostname', serial)
+        else:
+            client_ip = ''
+            hostname = serial
+        
+        try:
+            # cmdline.txt 생성 (고정 IP로 NFS 부팅 설정)
+            network_base = '.'.join(self.config['server_ip'].split('.')[:3])
+            gateway = f"{network_base}.1"
+            netmask = "255.255.255.0"
+            
+            # 실제 네트워크 인터페이스 감지
+            iface = self.detect_network_interface(nfs_path)
+            print(f"  감지된 네트워크 인터페이스: {iface}")
+            
+            if client_ip:
+                # 고정 IP 명시 방식
+                cmdline = f"console=serial0,115200 console=tty1 root=/dev/nfs nfsroot={self.config['server_ip']}:{self.config['nfs_root']}/{serial},vers=3 rw ip={client_ip}:{self.config['server_ip']}:{gateway}:{netmask}:{hostname}:{iface}:off rootwait elevator=deadline"
+            else:
+                # IP가 없으면 DHCP 사용 (fallback)
+                cmdline = f"console=serial0,115200 console=tty1 root=/dev/nfs nfsroot={self.config['server_ip']}:{self.config['nfs_root']}/{serial},vers=3 rw ip=dhcp rootwait"
+            
+            cmdline_file = tftp_path / 'cmdline.txt'
+            temp_cmdline = os.path.expanduser('~/cmdline.txt.tmp')
+            with open(temp_cmdline, 'w') as f:
+                f.write(cmdline)
+            
+            subprocess.run(['sudo', 'cp', temp_cmdline, str(cmdline_file)], check=True)
+            os.remove(temp_cmdline)
+            
+            # config.txt 생성 (기본 설정)
+            config = """# Network Boot Configuration
+enable_uart=1
+kernel=kernel8.img
+"""
+            config_file = tftp_path / 'config.txt'
+            temp_config = os.path.expanduser('~/config.txt.tmp')
+            with open(temp_config, 'w') as f:
+                f.write(config)
+            
+            subprocess.run(['sudo', 'cp', temp_config, str(config_file)], check=True)
+            os.remove(temp_config)
+            
+            print(f"{Colors.GREEN}  ✓ TFTP 부트 파일 생성 완료{Colors.ENDC}")
+            
+        except Exception as e:
+            print(f"{Colors.WARNING}  ! TFTP 설정 실패: {e}{Colors.ENDC}")
+    
+    def list_clients(self):
+        """클라이언트 목록 반환"""
+        clients = {}
+        for client in self.registry.all():
+            clients[client['serial']] = {
+                'hostname': client.get('hostname', 'Unknown'),
+                'mac': client.get('mac', 'N/A'),
+                'ip': client.get('ip', 'N/A')
+            }
+        return clients
+    
+    def remove_client(self):
+        """클라이언트 제거"""
+        if not self.registry.count():
+            print(f"{Colors.WARNING}제거할 클라이언트가 없습니다.{Colors.ENDC}")
+            time.sleep(2)
+            return
+        
+        self.print_header()
+        print(f"{Colors.BOLD}클라이언트 제거{Colors.ENDC}\n")
+        
+        # IP 주소로 정렬된 클라이언트 목록
+        sorted_clients = self.registry.all()
+        
+        for i, client in enumerate(sorted_clients, 1):
+            print(f"  {i}. {client['serial']} - {client.get('hostname', 'N/A')} - IP: {client.get('ip', 'N/A')}")
+        print()
+        
+        try:
+            idx = int(input("제거할 클라이언트 번호: ")) - 1
+            if 0 <= idx < len(sorted_clients):
+                # 정렬된 목록에서 선택한 클라이언트 찾기
+                selected_client = sorted_clients[idx]
+                serial = selected_client['serial']
+                
+                # 확인 메시지
+                print(f"\n{Colors.WARNING}경고: 이 작업은 되돌릴 수 없습니다!{Colors.ENDC}")
+                print(f"다음 항목들이 삭제됩니다:")
+                print(f"  - NFS 디렉토리: {self.config['nfs_root']}/{serial}")
+                print(f"  - TFTP 디렉토리: {self.config['tftp_root']}/{serial}")
+                print(f"  - DHCP 예약: {pxe_dnsmasq.hosts_dir(self.config) / (serial + '.conf')}")
+                print(f"  - NFS exports 항목")
+                
+                confirm = input(f"\n정말 제거하시겠습니까? (y/N): ").lower()
+                if confirm != 'y':
+                    print(f"{Colors.WARNING}취소되었습니다.{Colors.ENDC}")
+                    time.sleep(1)
+                    return
+                
+                self.delete_clients([selected_client])
+                print(f"\n{Colors.GREEN}✅ {serial} 클라이언트가 완전히 제거되었습니다.{Colors.ENDC}")
+            else:
+                print(f"{Colors.FAIL}잘못된 번호입니다.{Colors.ENDC}")
+        except ValueError:
+            print(f"{Colors.FAIL}숫자를 입력해주세요.{Colors.ENDC}")
+        except Exception as e:
+            print(f"{Colors.FAIL}제거 중 오류 발생: {e}{Colors.ENDC}")
+        
+        time.sleep(2)
+    
+    def delete_clients(self, clients: List[dict]):
+        """클라이언트 삭제 - NFS/TFTP 디렉토리, NFS exports, 레지스트리, DHCP 예약과 리스
+
+        여러 대를 지우면 exports/dnsmasq/리스는 마지막에 한 번만 반영한다.
+        """
+        print(f"\n{Colors.CYAN}클라이언트 제거 중...{Colors.ENDC}")
+        serials = {client['serial'] for client in clients}
+        
+        for client in clients:
+            # 1. NFS 디렉토리 삭제
+            nfs_path = f"{self.config['nfs_root']}/{client['serial']}"
+            try:
+                subprocess.run(['sudo', 'rm', '-rf', nfs_path], check=True)
+                print(f"  ✓ NFS 디렉토리 삭제: {nfs_path}")
+            except:
+                print(f"  ⚠️  NFS 디렉토리 삭제 실패: {nfs_path}")
+            
+            # 2. TFTP 디렉토리 삭제
+            tftp_path = f"{self.config['tftp_root']}/{client['serial']}"
+            try:
+                subprocess.run(['sudo', 'rm', '-rf', tftp_path], check=True)
+                print(f"  ✓ TFTP 디렉토리 삭제: {tftp_path}")
+            except:
+                print(f"  ⚠️  TFTP 디렉토리 삭제 실패: {tftp_path}")
+        
+        # 3. NFS exports에서 항목 제거 (해당 클라이언트 export만 해제)
+        remaining = [c for c in self.registry.all() if c['serial'] not in serials]
+        if self.sync_nfs_exports(remaining):
+            print(f"  ✓ NFS exports 항목 제거")
+        else:
+            print(f"  ⚠️  NFS exports 업데이트 실패")
+        
+        # 4. 레지스트리에서 제거
+        with self.registry.transaction():
+            for serial in serials:
+                self.registry.remove(serial)
+        
+        with self.dnsmasq.batch():
+            # 5. DHCP 예약 제거
+            print(f"  DHCP 예약 갱신 중...")
+            self.generate_dnsmasq_config()
+            
+            # 6. 리스 파일에서 제거
+            self.update_dhcp_leases(release=[(c['mac'], c['ip']) for c in clients if c.get('mac') and c.get('ip')])
+        print(f"  ✓ DHCP 설정 적용")
+    
+    def edit_client(self):
+        """클라이언트 정보 편집"""
+        if not self.registry.count():
+            print(f"{Colors.WARNING}편집할 클라이언트가 없습니다.{Colors.ENDC}")
+            time.sleep(2)
+            return
+        
+        self.print_header()
+        print(f"{Colors.BOLD}클라이언트 정보 편집{Colors.ENDC}\n")
+        
+        # IP 주소로 정렬된 클라이언트 목록
+        sorted_clients = self.registry.all()
+        
+        # 클라이언트 목록 표시
+        for i, client in enumerate(sorted_clients, 1):
+            print(f"  {i}. {client['serial']} - {client.get('hostname', 'N/A')}")
+            print(f"     MAC: {client.get('mac', '없음')}")
+            print(f"     IP: {client.get('ip', '없음')}")
+        print()
+        
+        try:
+            idx = int(input("편집할 클라이언트 번호: ")) - 1
+            if 0 <= idx < len(sorted_clients):
+                # 정렬된 목록에서 선택한 클라이언트 찾기 (변경 전 값은 selected_client에 유지)
+                selected_client = sorted_clients[idx]
+                client = dict(selected_client)
+                
+                print(f"\n현재 정보:")
+                print(f"  시리얼: {client['serial']}")
+                print(f"  MAC: {client.get('mac', '없음')}")
+                print(f"  IP: {client.get('ip', '없음')}")
+                print(f"  호스트명: {client.get('hostname', '없음')}")
+                
+                # MAC 주소 수정/추가
+                current_mac = client.get('mac', '')
+                new_mac = input(f"\n새 MAC 주소 (Enter=유지, 현재: {current_mac}): ").strip().lower()
+                if new_mac:
+                    # MAC 주소 형식 검증
+                    if ':' in new_mac or '-' in new_mac:
+                        new_mac = new_mac.replace('-', ':')
+                        parts = new_mac.split(':')
+                        if len(parts) == 6 and all(len(p) == 2 for p in parts):
+                            client['mac'] = new_mac
+                        else:
+                            print(f"{Colors.FAIL}올바른 MAC 주소 형식이 아닙니다.{Colors.ENDC}")
+                
+                # IP 주소 수정/추가
+                allocator = self.ip_allocator(client['serial'])
+                if not client.get('ip'):
+                    # IP가 없으면 자동 할당
+                    suggested_ip = allocator.peek(client.get('mac'))
+                    
+                    new_ip = input(f"고정 IP 주소 (Enter={suggested_ip}): ").strip()
+                    client['ip'] = new_ip if new_ip else suggested_ip
+                else:
+                    new_ip = input(f"새 IP 주소 (Enter=유지, 현재: {client['ip']}): ").strip()
+                    if new_ip:
+                        client['ip'] = new_ip
+                if new_ip:
+                    problem = allocator.conflict(client['ip'], client.get('mac'))
+                    if problem:
+                        print(f"{Colors.WARNING}⚠️  {client['ip']}: {problem}{Colors.ENDC}")
+                
+                # 호스트명 수정
+                old_hostname = client.get('hostname', client['serial'])
+                new_hostname = input(f"새 호스트명 (Enter=유지, 현재: {old_hostname}): ").strip()
+                hostname_changed = bool(new_hostname) and new_hostname != old_hostname
+                if hostname_changed:
+                    client['hostname'] = new_hostname
+                
+                try:
+                    # 레지스트리를 먼저 갱신 - 중복으로 거부되면 클라이언트 파일은 건드리지 않음
+                    self.registry.update(client['serial'], **{k: v for k, v in client.items() if k != 'serial'})
+                except pxe_registry.DuplicateClientError as e:
+                    print(f"{Colors.FAIL}{e}{Colors.ENDC}")
+                    time.sleep(2)
+                    return
+                
+                if hostname_changed:
+                    # 실제 클라이언트 파일 시스템에 호스트명 업데이트
+                    nfs_path = Path(self.config['nfs_root']) / client['serial']
+                    
+                    # /etc/hostname 파일 업데이트
+                    hostname_path = nfs_path / 'etc' / 'hostname'
+                    if hostname_path.exists():
+                        print(f"  호스트명 파일 업데이트 중...")
+                        subprocess.run(['sudo', 'tee', str(hostname_path)], 
+                                     input=new_hostname.encode(), 
+                                     stdout=subprocess.DEVNULL, check=True)
+                    
+                    # /etc/hosts 파일 업데이트
+                    hosts_path = nfs_path / 'etc' / 'hosts'
+                    if hosts_path.exists():
+                        print(f"  hosts 파일 업데이트 중...")
+                        # 먼저 기존 호스트명을 새 호스트명으로 변경
+                        subprocess.run([
+                            'sudo', 'sed', '-i',
+                            f's/\\b{old_hostname}\\b/{new_hostname}/g',
+                            str(hosts_path)
+                        ], check=True)
+                        
+                        # raspberrypi가 남아있으면 그것도 변경
+                        subprocess.run([
+                            'sudo', 'sed', '-i',
+                            f's/\\braspberrypi\\b/{new_hostname}/g',
+                            str(hosts_path)
+                        ], check=True)
+                    
+                    print(f"{Colors.GREEN}  ✓ 클라이언트 파일 시스템의 호스트명이 업데이트되었습니다{Colors.ENDC}")
+                    print(f"{Colors.YELLOW}  ※ 변경사항 적용을 위해 클라이언트를 재부팅해주세요{Colors.ENDC}")
+                
+                print(f"\n{Colors.GREEN}✅ 클라이언트 정보가 업데이트되었습니다.{Colors.ENDC}")
+                
+                # 설정 파일 재생성
+                if client.get('mac') and client.get('ip'):
+                    print("\nPXE 설정을 업데이트합니다...")
+                    # 리스 정리와 예약 갱신을 묶어 dnsmasq에는 한 번만 적용
+                    with self.dnsmasq.batch():
+                        # MAC과 IP가 모두 바뀌었으면 이전 리스 제거 (하나만 바뀐 경우는 예약 때 정리됨)
+                        old_pair = (selected_client.get('mac'), selected_client.get('ip'))
+                        if all(old_pair) and old_pair != (client['mac'], client['ip']):
+                            self.update_dhcp_leases(release=[old_pair])
+                        self.update_dhcp_config(client['serial'], client['mac'], client['ip'], client.get('hostname', f"rpi-{client['serial'][-6:]}"))
+                    print(f"{Colors.GREEN}  ✓ DHCP 설정 적용 완료{Colors.ENDC}")
+                
+            else:
+                print(f"{Colors.FAIL}잘못된 번호입니다.{Colors.ENDC}")
+        except ValueError:
+            print(f"{Colors.FAIL}숫자를 입력해주세요.{Colors.ENDC}")
+        
+        time.sleep(2)
+    
+    def copy_from_sd(self):
+        """SD 카드 / 이미지 파일에서 시스템 복사 (여러 장 병렬, boot/root 동시 복사)"""
+        self.print_header()
+        print(f"{Colors.BOLD}SD 카드 / 이미지 파일에서 시스템 복사{Colors.ENDC}\n")
+        
+        clients = self.registry.all()
+        
+        # 1. 원본 선택 (SD 카드 여러 장 또는 .img 파일)
+        print(f"{Colors.BOLD}SD 카드 감지 중...{Colors.ENDC}")
+        cards = pxe_imaging.list_cards()
+        if cards:
+            print(f"\n{'번호':<5} {'장치':<16} {'크기':<8} {'boot':<18} {'root':<18} {'모델'}")
+            print("-" * 80)
+            for idx, card in enumerate(cards, 1):
+                mounted = f" {Colors.WARNING}(마운트됨){Colors.ENDC}" if card['mounted'] else ''
+                print(f"{idx:<5} {card['disk']:<16} {card['size']:<8} {card['boot']:<18} {card['root']:<18} "
+                      f"{card['model']}{mounted}")
+        else:
+            print(f"{Colors.WARNING}boot(vfat) + root(ext4) 파티션이 있는 SD 카드를 찾지 못했습니다.{Colors.ENDC}")
+        print(f"\n이미지 파일은 경로를 입력하세요 (예: ~/raspios.img)")
+        
+        text = input(f"{Colors.CYAN}원본 (예: 1,2 / all / 경로, 쉼표로 여러 개): {Colors.ENDC}").strip()
+        sources = []
+        card_tokens = []
+        for token in [t.strip() for t in text.split(',') if t.strip()]:
+            path = Path(token).expanduser()
+            if path.is_file():
+                sources.append(pxe_imaging.ImageSource(path))
+            else:
+                card_tokens.append(token)
+        for idx in self.parse_selection(','.join(card_tokens), len(cards)) if card_tokens else []:
+            card = cards[idx]
+            sources.append(pxe_imaging.CardSource(card['boot'], card['root'], card['disk']))
+        if not sources:
+            print(f"{Colors.FAIL}선택한 원본이 없습니다.{Colors.ENDC}")
+            time.sleep(2)
+            return
+        
+        # 2. 원본별 대상 (클라이언트 또는 골든 템플릿)
+        if clients:
+            print(f"\n{Colors.BOLD}대상 클라이언트:{Colors.ENDC}")
+            for idx, client in enumerate(clients, 1):
+                print(f"  {Colors.CYAN}{idx}.{Colors.ENDC} {client['serial']} ({client.get('hostname', client['serial'])})")
+        print(f"  {Colors.CYAN}g.{Colors.ENDC} 골든 템플릿 ({pxe_provision.golden_template_path(self.config)})")
+        
+        jobs = []
+        used_targets = set()
+        for source in sources:
+            answer = input(f"{Colors.CYAN}{source.label} → 대상 (번호/시리얼/g, Enter=건너뛰기): {Colors.ENDC}").strip().lower()
+            if not answer:
+                continue
+            if answer == 'g':
+                golden = pxe_provision.golden_template_path(self.config)
+                problem = pxe_provision.template_path_problem(golden, self.config, [c['serial'] for c in clients])
+                if problem:
+                    print(f"{Colors.FAIL}  골든 템플릿 경로를 쓸 수 없습니다: {problem}{Colors.ENDC}")
+                    continue
+                target = (None, golden, None)
+            else:
+                client = None
+                if answer.isdigit() and 1 <= int(answer) <= len(clients):
+                    client = clients[int(answer) - 1]
+                else:
+                    client = self.registry.get(answer)
+                if not client:
+                    print(f"{Colors.FAIL}  대상을 찾을 수 없습니다: {answer}{Colors.ENDC}")
+                    continue
+                serial = client['serial']
+                target = (serial, Path(self.config['nfs_root']) / serial, Path(self.config['tftp_root']) / serial)
+            if target[1] in used_targets:
+                print(f"{Colors.FAIL}  이미 다른 원본의 대상입니다{Colors.ENDC}")
+                continue
+            used_targets.add(target[1])
+            serial, root_target, boot_target = target
+            jobs.append((serial, pxe_imaging.ImagingJob(source, root_target, boot_target,
+                                                        name=serial or pxe_provision.GOLDEN_DIR_NAME)))
+        
+        if not jobs:
+            return
+        
+        print(f"\n{Colors.BOLD}복사 정보:{Colors.ENDC}")
+        for serial, job in jobs:
+            boot = f", boot → {job.boot_target}" if job.boot_target else ''
+            print(f"  {job.source.label}: root → {job.root_target}{boot}")
+        
+        confirm = input(f"\n{Colors.WARNING}계속하시겠습니까? (y/n): {Colors.ENDC}").lower()
+        if confirm != 'y':
+            print(f"{Colors.WARNING}취소되었습니다.{Colors.ENDC}")
+            time.sleep(2)
+            return
+        
+        # 3. 복사 (카드별 병렬, 카드 안에서 boot/root 동시) - 진행 상황을 제자리에서 갱신
+        parallel = int(self.config.get('imaging_parallel', pxe_imaging.DEFAULT_PARALLEL))
+        print(f"\n{Colors.WARNING}시스템 복사 중... (Ctrl+C로 중단){Colors.ENDC}")
+        drawn = [0]
+        
+        def draw(snapshots: List[dict]):
+            if drawn[0]:
+                print(f"\033[{drawn[0]}F", end='')
+            for snap in snapshots:
+                state = {pxe_imaging.STATUS_PENDING: '대기', pxe_imaging.STATUS_MOUNTING: '마운트',
+                         pxe_imaging.STATUS_COPYING: '복사', pxe_imaging.STATUS_DONE: '완료',
+                         pxe_imaging.STATUS_FAILED: '실패'}[snap['status']]
+                bar_width = 20
+                filled = int(bar_width * snap['percent'] / 100)
+                print(f"\033[K  {snap['name']:<12} [{'█' * filled}{'░' * (bar_width - filled)}] "
+                      f"{snap['percent']:5.1f}%  {pxe_imaging.format_rate(snap['rate']):>10}  "
+                      f"ETA {pxe_imaging.format_eta(snap['eta']):>7}  {state}")
+            drawn[0] = len(snapshots)
+        
+        try:
+            snapshots = pxe_imaging.run_jobs([job for _, job in jobs], parallel, on_tick=draw)
+        except KeyboardInterrupt:
+            print(f"\n{Colors.WARNING}중단되었습니다 (마운트/루프 장치는 정리됨).{Colors.ENDC}")
+            time.sleep(2)
+            return
+        
+        # 4. 클라이언트별 네트워크 부팅 설정
+        print()
+        for (serial, job), snap in zip(jobs, snapshots):
+            size_gb = snap['bytes'] / 1024 ** 3
+            if snap['status'] != pxe_imaging.STATUS_DONE:
+                print(f"{Colors.FAIL}✗ {snap['name']}: {snap['error']}{Colors.ENDC}")
+                continue
+            print(f"{Colors.GREEN}✓ {snap['name']}: {size_gb:.2f}GB, {snap['elapsed']:.0f}초 "
+                  f"(평균 {pxe_imaging.format_rate(snap['bytes'] / max(snap['elapsed'], 0.001))}){Colors.ENDC}")
+            if serial:
+                self.prepare_imaged_client(serial)
+            else:
+                print(f"  골든 템플릿 준비 완료 - 새 클라이언트는 이 템플릿에서 복제됩니다")
+        
+        input("\n계속하려면 Enter...")
+    
+    def prepare_imaged_client(self, serial: str) -> bool:
+        """SD 카드에서 복사한 시스템을 네트워크 부팅용으로 설정 (권한 작업 한 번)"""
+        nfs_path = Path(self.config['nfs_root']) / serial
+        tftp_path = Path(self.config['tftp_root']) / serial
+        
+        # 클라이언트 정보에서 IP와 hostname 가져오기
+        client_info = self.registry.get(serial)
+        if client_info:
+            client_ip = client_info.get('ip', '')
+            hostname = client_info.get('hostname', serial)
+        else:
+            client_ip = ''
+            hostname = serial
+        
+        # 네트워크 설정
+        network_base = '.'.join(self.config['server_ip'].split('.')[:3])
+        gateway = f"{network_base}.1"
+        netmask = "255.255.255.0"
+        
+        # 복사된 root 파일시스템에서 네트워크 인터페이스 감지
+        iface = self.detect_network_interface(nfs_path)
+        print(f"  감지된 네트워크 인터페이스: {iface}")
+        
+        if client_ip:
+            # 고정 IP 명시 방식
+            cmdline = f"console=serial0,115200 console=tty1 root=/dev/nfs nfsroot={self.config['server_ip']}:{nfs_path},vers=3 rw ip={client_ip}:{self.config['server_ip']}:{gateway}:{netmask}:{hostname}:{iface}:off rootwait elevator=deadline"
+        else:
+            # IP가 없으면 DHCP 사용 (fallback)
+            cmdline = f"console=serial0,115200 console=tty1 root=/dev/nfs nfsroot={self.config['server_ip']}:{nfs_path},vers=3 rw ip=dhcp rootwait"
+        
+        batch = pxe_privops.OpBatch()
+        batch.write(tftp_path / 'cmdline.txt', cmdline)
+        # 복사된 부트 파일을 공유 저장소 하드 링크로 변환
+        batch.call('pxe_tftpstore', 'dedupe', self.config['tftp_root'], [serial])
+        
+        # fstab 최소화, hostname (시리얼 번호 사용)
+        minimal_fstab = """proc            /proc           proc    defaults          0       0
+tmpfs           /tmp            tmpfs   defaults,nosuid   0       0
+devpts          /dev/pts        devpts  gid=5,mode=620    0       0
+"""
+        batch.write(nfs_path / 'etc' / 'fstab', minimal_fstab, optional=True)
+        batch.write(nfs_path / 'etc' / 'hostname', hostname, optional=True)
+        
+        # /etc/hosts: raspberrypi를 새 hostname으로, 127.0.1.1 라인 재설정
+        hosts_path = nfs_path / 'etc' / 'hosts'
+        if hosts_path.exists():
+            batch.replace(hosts_path, r'\braspberrypi\b', hostname)
+            batch.replace(hosts_path, r'^127\.0\.1\.1.*\n?', '')
+            batch.append(hosts_path, f"127.0.1.1\t{hostname}\n")
+        
+        # SSH 설정 및 키 재생성
+        self.setup_ssh_for_client(nfs_path, hostname, batch)
+        
+        # NFS 디렉토리 권한과 소유자
+        batch.chmod(nfs_path, 0o755)
+        owner = os.environ.get('SUDO_USER', os.environ.get('USER', 'rpi-server'))
+        try:
+            pwd.getpwnam(owner)
+            batch.chown(nfs_path, owner, recursive=True)
+        except KeyError:
+            pass
+        
+        try:
+            with pxe_metrics.timed('configure_imaged'):
+                batch.apply()
+        except pxe_privops.BatchError as e:
+            print(f"{Colors.FAIL}  네트워크 부팅 설정 실패 ({e.done}/{len(batch)}개 완료 후 중단): {e}{Colors.ENDC}")
+            return False
+        print(f"  cmdline.txt / fstab / hostname / hosts / SSH 설정 완료 (IP: {client_ip if client_ip else 'DHCP'})")
+        print(f"{Colors.GREEN}  클라이언트 {serial}이 네트워크 부팅할 준비가 되었습니다.{Colors.ENDC}")
+        return True
+    
+    def server_settings(self):
+        """서버 설정"""
+        while True:
+            self.print_header()
+            print(f"{Colors.BOLD}서버 설정{Colors.ENDC}\n")
+            
+            print(f"{Colors.BOLD}현재 설정:{Colors.ENDC}")
+            print(f"  서버 IP: {self.config['server_ip']}")
+            print(f"  DHCP 범위: {self.config['dhcp_range_start']} - {self.config['dhcp_range_end']}")
+            print(f"  네트워크 인터페이스: {self.config['network_interface']}")
+            print(f"  NFS 루트: {self.config['nfs_root']}")
+            print(f"  TFTP 루트: {self.config['tftp_root']}")
+            print()
+            
+            # ProxyDHCP 모드 상태 표시
+            proxy_mode = self.config.get('proxy_dhcp_mode', False)
+            mode_status = f"{Colors.GREEN}활성화{Colors.ENDC}" if proxy_mode else f"{Colors.WARNING}비활성화{Colors.ENDC}"
+            print(f"  ProxyDHCP 모드: {mode_status}")
+            print()
+            
+            print(f"{Colors.BOLD}옵션:{Colors.ENDC}")
+            print(f"  {Colors.CYAN}1.{Colors.ENDC} 서버 IP 변경")
+            print(f"  {Colors.CYAN}2.{Colors.ENDC} DHCP 범위 변경")
+            print(f"  {Colors.CYAN}3.{Colors.ENDC} 네트워크 인터페이스 변경")
+            print(f"  {Colors.CYAN}4.{Colors.ENDC} NFS/TFTP 경로 변경")
+            print(f"  {Colors.CYAN}5.{Colors.ENDC} ProxyDHCP 모드 전환")
+            print(f"  {Colors.CYAN}6.{Colors.ENDC} DHCP 충돌 검사")
+            print(f"  {Colors.CYAN}7.{Colors.ENDC} 골든 템플릿 / 프로비저닝 모드")
+            print(f"  {Colors.CYAN}0.{Colors.ENDC} 뒤로 가기")
+            print()
+            
+            choice = input(f"{Colors.CYAN}선택: {Colors.ENDC}")
+            
+            if choice == '1':
+                new_ip = input("새 서버 IP: ").strip()
+                if new_ip:
+                    self.config['server_ip'] = new_ip
+                    self.save_config()
+                    print(f"{Colors.GREEN}✅ 서버 IP가 변경되었습니다.{Colors.ENDC}")
+                    time.sleep(2)
+            elif choice == '2':
+                start = input("DHCP 시작 IP: ").strip()
+                end = input("DHCP 종료 IP: ").strip()
+                if start and end:
+                    self.config['dhcp_range_start'] = start
+                    self.config['dhcp_range_end'] = end
+                    self.save_config()
+                    print(f"{Colors.GREEN}✅ DHCP 범위가 변경되었습니다.{Colors.ENDC}")
+                    time.sleep(2)
+            elif choice == '3':
+                # 네트워크 인터페이스 선택
+                interfaces = self.get_network_interfaces()
+                if interfaces:
+                    print(f"\n{Colors.BOLD}사용 가능한 네트워크 인터페이스:{Colors.ENDC}")
+                    for i, (iface, ip) in enumerate(interfaces, 1):
+                        current = " (현재)" if iface == self.config['network_interface'] else ""
+                        print(f"  {Colors.CYAN}{i}.{Colors.ENDC} {iface:<15} IP: {ip}{current}")
+                    print(f"  {Colors.CYAN}0.{Colors.ENDC} 수동 입력")
+                    
+                    choice_iface = input("\n선택: ").strip()
+                    if choice_iface == '0':
+                        iface = input("인터페이스 이름: ").strip()
+                    else:
+                        try:
+                            idx = int(choice_iface) - 1
+                            if 0 <= idx < len(interfaces):
+                                iface = interfaces[idx][0]
+                            else:
+                                print(f"{Colors.FAIL}잘못된 선택{Colors.ENDC}")
+                                time.sleep(2)
+                                continue
+                        except:
+                            print(f"{Colors.FAIL}잘못된 입력{Colors.ENDC}")
+                            time.sleep(2)
+                            continue
+                    
+                    if iface:
+                        self.config['network_interface'] = iface
+                        self.save_config()
+                        print(f"{Colors.GREEN}✅ 네트워크 인터페이스가 {iface}로 변경되었습니다.{Colors.ENDC}")
+                        time.sleep(2)
+                else:
+                    iface = input("네트워크 인터페이스: ").strip()
+                    if iface:
+                        self.config['network_interface'] = iface
+                        self.save_config()
+                        print(f"{Colors.GREEN}✅ 네트워크 인터페이스가 변경되었습니다.{Colors.ENDC}")
+                        time.sleep(2)
+            elif choice == '4':
+                nfs = input(f"NFS 루트 경로 (현재: {self.config['nfs_root']}): ").strip()
+                tftp = input(f"TFTP 루트 경로 (현재: {self.config['tftp_root']}): ").strip()
+                if nfs:
+                    self.config['nfs_root'] = nfs
+                if tftp:
+                    self.config['tftp_root'] = tftp
+                self.save_config()
+                print(f"{Colors.GREEN}✅ 경로가 변경되었습니다.{Colors.ENDC}")
+                time.sleep(2)
+            elif choice == '5':
+                # ProxyDHCP 모드 전환
+                current_mode = self.config.get('proxy_dhcp_mode', False)
+                print(f"\n{Colors.BOLD}ProxyDHCP 모드 설정{Colors.ENDC}")
+                print(f"현재 상태: {'활성화' if current_mode else '비활성화'}")
+                print(f"\n{Colors.WARNING}ProxyDHCP 모드 설명:{Colors.ENDC}")
+                print("  - 활성화: 공유기와 함께 동작 (공유기가 IP 할당, PXE 서버는 부팅 정보만 제공)")
+                print("  - 비활성화: PXE 서버가 전체 DHCP 서비스 제공 (공유기 DHCP 비활성화 필요)")
+                
+                toggle = input(f"\n모드를 {'비활성화' if current_mode else '활성화'}하시겠습니까? (y/n): ").lower()
+                if toggle == 'y':
+                    self.config['proxy_dhcp_mode'] = not current_mode
+                    self.save_config()
+                    print(f"{Colors.GREEN}✅ ProxyDHCP 모드가 {'활성화' if not current_mode else '비활성화'}되었습니다.{Colors.ENDC}")
+                    print(f"{Colors.WARNING}변경사항을 적용하려면 dnsmasq 서비스를 재시작하세요.{Colors.ENDC}")
+                    time.sleep(3)
+            elif choice == '6':
+                # DHCP 충돌 검사
+                self.check_dhcp_conflicts()
+            elif choice == '7':
+                self.provisioning_settings()
+            elif choice == '0':
+                break
+    
+    def provisioning_settings(self):
+        """골든 템플릿 및 프로비저닝 모드 설정"""
+        self.print_header()
+        print(f"{Colors.BOLD}골든 템플릿 / 프로비저닝 모드{Colors.ENDC}\n")
+
+        golden = pxe_provision.golden_template_path(self.config)
+        mode = self.config.get('provision_mode', 'auto')
+        golden_ready = (golden / 'etc').exists()
+        reflink = pxe_provision.supports_reflink(Path(self.config['nfs_root']))
+
+        print(f"  골든 템플릿: {golden} ({'준비됨' if golden_ready else '없음'})")
+        print(f"  프로비저닝 모드: {mode}")
+        print(f"  NFS 루트 reflink 지원: {'예' if reflink else '아니오 (rsync 사용)'}")
+        usage = pxe_tftpstore.usage(self.config['tftp_root'])
+        print(f"  TFTP 부트 파일: {usage['files']}개, {usage['logical_bytes'] / 1024 ** 2:.0f}MB "
+              f"(실제 디스크 사용 {usage['actual_bytes'] / 1024 ** 2:.0f}MB)")
+        print()
+        print(f"{Colors.BOLD}옵션:{Colors.ENDC}")
+        print(f"  {Colors.CYAN}1.{Colors.ENDC} 클라이언트에서 골든 템플릿 생성/갱신")
+        print(f"  {Colors.CYAN}2.{Colors.ENDC} 프로비저닝 모드 변경 ({'/'.join(pxe_provision.MODES)})")
+        print(f"  {Colors.CYAN}3.{Colors.ENDC} 골든 템플릿 경로 변경")
+        print(f"  {Colors.CYAN}4.{Colors.ENDC} TFTP 부트 파일 중복 제거 (공유 저장소로 변환)")
+        print(f"  {Colors.CYAN}0.{Colors.ENDC} 뒤로 가기")
+        print()
+
+        choice = input(f"{Colors.CYAN}선택: {Colors.ENDC}").strip()
+
+        if choice == '1':
+            candidates = [c for c in self.registry.all()
+                          if (Path(self.config['nfs_root']) / c['serial'] / 'etc').exists()]
+            if not candidates:
+                print(f"{Colors.FAIL}루트 파일시스템이 있는 클라이언트가 없습니다.{Colors.ENDC}")
+                time.sleep(2)
+                return
+            for i, client in enumerate(candidates, 1):
+                print(f"  {i}. {client['serial']} ({client.get('ip', 'N/A')})")
+            try:
+                idx = int(input("\n원본 클라이언트 번호: ")) - 1
+                source = candidates[idx]
+            except (ValueError, IndexError):
+                print(f"{Colors.FAIL}잘못된 번호입니다.{Colors.ENDC}")
+                time.sleep(2)
+                return
+
+            problem = pxe_provision.template_path_problem(golden, self.config, [c['serial'] for c in self.registry.all()])
+            if problem:
+                print(f"{Colors.FAIL}골든 템플릿 경로를 쓸 수 없습니다: {golden} - {problem}{Colors.ENDC}")
+                time.sleep(2)
+                return
+            source_path = Path(self.config['nfs_root']) / source['serial']
+            print(f"\n{Colors.CYAN}골든 템플릿 생성 중: {source_path} → {golden}{Colors.ENDC}")
+            try:
+                start_time = time.time()
+                method = pxe_provision.replace_tree(source_path, golden, mode)
+                print(f"{Colors.GREEN}✅ 골든 템플릿 생성 완료 ({method}, {time.time() - start_time:.1f}초){Colors.ENDC}")
+            except subprocess.CalledProcessError as e:
+                print(f"{Colors.FAIL}골든 템플릿 생성 실패: {e}{Colors.ENDC}")
+            time.sleep(2)
+
+        elif choice == '2':
+            new_mode = input(f"모드 ({'/'.join(pxe_provision.MODES)}): ").strip().lower()
+            if new_mode in pxe_provision.MODES:
+                self.config['provision_mode'] = new_mode
+                self.save_config()
+                print(f"{Colors.GREEN}✅ 프로비저닝 모드가 {new_mode}로 변경되었습니다.{Colors.ENDC}")
+            else:
+                print(f"{Colors.FAIL}잘못된 모드입니다.{Colors.ENDC}")
+            time.sleep(2)
+
+        elif choice == '3':
+            new_path = input(f"골든 템플릿 경로 (Enter=기본값 {Path(self.config['nfs_root']) / pxe_provision.GOLDEN_DIR_NAME}): ").strip()
+            problem = new_path and pxe_provision.template_path_problem(new_path, self.config, [c['serial'] for c in self.registry.all()])
+            if problem:
+                print(f"{Colors.FAIL}사용할 수 없는 경로입니다: {problem}{Colors.ENDC}")
+                time.sleep(2)
+                return
+            self.config['golden_template'] = new_path
+            self.save_config()
+            print(f"{Colors.GREEN}✅ 골든 템플릿 경로가 변경되었습니다.{Colors.ENDC}")
+            time.sleep(2)
+
+        elif choice == '4':
+            print(f"\n{Colors.CYAN}TFTP 부트 파일 중복 제거 중: {self.config['tftp_root']}{Colors.ENDC}")
+            try:
+                stats = pxe_tftpstore.privileged('dedupe', self.config['tftp_root'])
+                pruned = pxe_tftpstore.privileged('prune', self.config['tftp_root'])
+            except pxe_privops.BatchError as e:
+                print(f"{Colors.FAIL}중복 제거 실패: {e}{Colors.ENDC}")
+                time.sleep(2)
+                return
+            print(f"{Colors.GREEN}✅ 파일 {stats['files']}개 검사: {stats['linked']}개 링크로 교체, "
+                  f"{stats['stored']}개 저장소에 추가 ({stats['saved_bytes'] / 1024 ** 2:.1f}MB 절약){Colors.ENDC}")
+            if pruned['removed']:
+                print(f"  사용하지 않는 저장소 파일 {pruned['removed']}개 삭제 ({pruned['freed_bytes'] / 1024 ** 2:.1f}MB)")
+            input("\n계속하려면 Enter...")
+
+    def manage_services(self):
+        """서비스 관리"""
+        services = {
+            '1': ('dnsmasq', 'DHCP/TFTP 서버'),
+            '2': ('nfs-kernel-server', 'NFS 서버'),
+            '3': ('tftpd-hpa', 'TFTP 서버'),
+        }
+        
+        while True:
+            self.print_header()
+            print(f"{Colors.BOLD}서비스 관리{Colors.ENDC}\n")
+            
+            # 서비스 상태 표시 (전체를 한 번에 조회)
+            states = pxe_services.query(service for service, _ in services.values())
+            for key, (service, desc) in services.items():
+                status = states[service]['active']
+                icon = "✅" if status else "❌"
+                color = Colors.GREEN if status else Colors.FAIL
+                print(f"  {key}. {icon} {color}{desc:<20}{Colors.ENDC} ({service})")
+            print()
+            
+            print(f"{Colors.BOLD}작업:{Colors.ENDC}")
+            print(f"  {Colors.CYAN}s.{Colors.ENDC} 시작 (번호 입력)")
+            print(f"  {Colors.CYAN}t.{Colors.ENDC} 중지 (번호 입력)")
+            print(f"  {Colors.CYAN}r.{Colors.ENDC} 재시작 (번호 입력)")
+            print(f"  {Colors.CYAN}a.{Colors.ENDC} 모두 시작")
+            print(f"  {Colors.CYAN}0.{Colors.ENDC} 뒤로 가기")
+            print()
+            
+            choice = input(f"{Colors.CYAN}선택: {Colors.ENDC}").lower()
+            
+            if choice == '0':
+                break
+            elif choice == 'a':
+                for _, (service, _) in services.items():
+                    subprocess.run(['sudo', 'systemctl', 'start', service])
+                print(f"{Colors.GREEN}✅ 모든 서비스를 시작했습니다.{Colors.ENDC}")
+                time.sleep(2)
+            elif choice.startswith('s') or choice.startswith('t') or choice.startswith('r'):
+                action = {'s': 'start', 't': 'stop', 'r': 'restart'}[choice[0]]
+                num = input(f"서비스 번호: ")
+                if num in services:
+                    service, _ = services[num]
+                    subprocess.run(['sudo', 'systemctl', action, service])
+                    print(f"{Colors.GREEN}✅ {service} 서비스를 {action}했습니다.{Colors.ENDC}")
+                    time.sleep(2)
+    
+    def view_logs(self):
+        """로그 확인"""
+        self.print_header()
+        print(f"{Colors.BOLD}로그 확인{Colors.ENDC}\n")
+        
+        print(f"  {Colors.CYAN}1.{Colors.ENDC} dnsmasq 로그")
+        print(f"  {Colors.CYAN}2.{Colors.ENDC} NFS 로그")
+        print(f"  {Colors.CYAN}3.{Colors.ENDC} 시스템 로그")
+        print(f"  {Colors.CYAN}4.{Colors.ENDC} ⏱  부팅 타임라인 실시간 추적")
+        print(f"  {Colors.CYAN}5.{Colors.ENDC} ⏱  최근 부팅 지연 분석")
+        print()
+        
+        choice = input(f"{Colors.CYAN}선택: {Colors.ENDC}")
+        
+        if choice == '1':
+            subprocess.run(['sudo', 'journalctl', '-u', 'dnsmasq', '-n', '50'])
+        elif choice == '2':
+            subprocess.run(['sudo', 'journalctl', '-u', 'nfs-kernel-server', '-n', '50'])
+        elif choice == '3':
+            subprocess.run(['sudo', 'journalctl', '-n', '50'])
+        elif choice == '4':
+            self.trace_boot_latency()
+        elif choice == '5':
+            since = input(f"{Colors.CYAN}분석 기간 (journalctl --since 형식, 예: -1h, today) [-1h]: {Colors.ENDC}").strip() or '-1h'
+            tracer = pxe_boottrace.BootTracer(self.registry.all())
+            for line in pxe_boottrace.read_journal(since):
+                tracer.feed(line)
+            print(f"\n{Colors.BOLD}부팅 단계별 소요 시간 ({since} 이후):{Colors.ENDC}\n")
+            print(pxe_boottrace.format_report(tracer))
+        
+        input(f"\n{Colors.CYAN}Enter를 눌러 계속...{Colors.ENDC}")
+    
+    def trace_boot_latency(self):
+        """dnsmasq/mountd 로그를 따라가며 클라이언트별 부팅 타임라인 표시"""
+        print(f"\n{Colors.CYAN}부팅 로그를 추적합니다 (DISCOVER → ACK → TFTP → kernel → NFS 마운트).{Colors.ENDC}")
+        print(f"{Colors.CYAN}클라이언트를 부팅하면 완료될 때마다 표시됩니다. Ctrl+C로 종료하고 요약을 봅니다.{Colors.ENDC}\n")
+
+        tracer = pxe_boottrace.BootTracer(self.registry.all())
+        lines = pxe_boottrace.follow_journal()
+        try:
+            for line in lines:
+                result = tracer.feed(line)
+                if result:
+                    slow = result['total_slow'] or any(step['slow'] for step in result['steps'])
+                    color = Colors.WARNING if slow else Colors.GREEN
+                    print(f"  {color}{datetime.now().strftime('%H:%M:%S')} {pxe_boottrace.format_result(result)}{Colors.ENDC}")
+        except KeyboardInterrupt:
+            pass
+        finally:
+            lines.close()
+
+        print(f"\n{Colors.BOLD}부팅 단계별 소요 시간:{Colors.ENDC}\n")
+        print(pxe_boottrace.format_report(tracer))
+
+    def check_dhcp_conflicts(self):
+        """DHCP 충돌 검사"""
+        self.print_header()
+        print(f"{Colors.BOLD}DHCP 충돌 검사{Colors.ENDC}\n")
+        
+        print(f"{Colors.CYAN}네트워크에서 DHCP 서버를 검색 중...{Colors.ENDC}")
+        
+        # nmap을 사용한 DHCP 서버 검색 (가능한 경우)
+        try:
+            result = subprocess.run(
+                ['sudo', 'nmap', '--script', 'broadcast-dhcp-discover'],
+                capture_output=True, text=True, timeout=10
+            )
+            
+            if result.returncode == 0:
+                print(f"\n{Colors.BOLD}검색 결과:{Colors.ENDC}")
+                print(result.stdout)
+                
+                # 여러 DHCP 서버가 발견된 경우 경고
+                if result.stdout.count('DHCP Offer') > 1:
+                    print(f"\n{Colors.FAIL}⚠️  경고: 네트워크에 여러 DHCP 서버가 감지되었습니다!{Colors.ENDC}")
+                    print(f"{Colors.WARNING}ProxyDHCP 모드를 사용하거나 하나의 DHCP 서버만 활성화하세요.{Colors.ENDC}")
+                else:
+                    print(f"\n{Colors.GREEN}✅ DHCP 충돌이 감지되지 않았습니다.{Colors.ENDC}")
+            else:
+                raise subprocess.CalledProcessError(result.returncode, 'nmap')
+                
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired, FileNotFoundError):
+            # nmap이 없거나 실패한 경우 대체 방법
+            print(f"\n{Colors.WARNING}nmap을 사용할 수 없습니다. 기본 검사를 수행합니다...{Colors.ENDC}")
+            
+            # ARP 테이블에서 게이트웨이 확인
+            try:
+                arp_result = subprocess.run(['arp', '-n'], capture_output=True, text=True)
+                gateway_ip = '.'.join(self.config['server_ip'].split('.')[:3]) + '.1'
+                
+                if gateway_ip in arp_result.stdout:
+                    print(f"\n{Colors.WARNING}⚠️  공유기/게이트웨이({gateway_ip})가 감지되었습니다.{Colors.ENDC}")
+                    print(f"공유기에 DHCP 서버가 활성화되어 있을 가능성이 높습니다.")
+                    print(f"\n{Colors.BOLD}해결 방법:{Colors.ENDC}")
+                    print(f"  1. ProxyDHCP 모드 사용 (권장)")
+                    print(f"  2. 공유기 DHCP 비활성화")
+                    print(f"  3. MAC 주소 기반 필터링 사용")
+                    
+                # 현재 dnsmasq 상태 확인
+                dnsmasq_status = pxe_services.query(['dnsmasq'])['dnsmasq']['state']
+                
+                print(f"\n{Colors.BOLD}PXE 서버 상태:{Colors.ENDC}")
+                print(f"  dnsmasq: {Colors.GREEN if dnsmasq_status == 'active' else Colors.FAIL}{dnsmasq_status}{Colors.ENDC}")
+                
+                if self.config.get('proxy_dhcp_mode', False):
+                    print(f"  모드: {Colors.GREEN}ProxyDHCP (충돌 방지){Colors.ENDC}")
+                else:
+                    print(f"  모드: {Colors.WARNING}일반 DHCP (충돌 가능){Colors.ENDC}")
+                    
+            except Exception as e:
+                print(f"{Colors.FAIL}검사 중 오류 발생: {e}{Colors.ENDC}")
+        
+        input(f"\n{Colors.CYAN}Enter를 눌러 계속...{Colors.ENDC}")
+    
+    def get_network_interfaces(self):
+        """사용 가능한 네트워크 인터페이스 목록 가져오기"""
+        interfaces = []
+        for iface in netifaces.interfaces():
+            if iface == 'lo':  # 루프백 제외
+                continue
+            addrs = netifaces.ifaddresses(iface)
+            if netifaces.AF_INET in addrs:  # IPv4 주소가 있는 인터페이스만
+                ip = addrs[netifaces.AF_INET][0]['addr']
+                interfaces.append((iface, ip))
+        return interfaces
+    
+    def apply_network_config(self):
+        """네트워크 설정 적용"""
+        print(f"\n{Colors.CYAN}네트워크 설정을 적용합니다...{Colors.ENDC}")
+        
+        # Ubuntu/Debian 구분
+        if Path('/etc/netplan').exists():
+            # Ubuntu (Netplan 사용)
+            self.apply_netplan_config()
+        elif Path('/etc/dhcpcd.conf').exists():
+            # Raspberry Pi OS / Debian (dhcpcd 사용)
+            self.apply_dhcpcd_config()
+        else:
+            print(f"{Colors.WARNING}네트워크 설정 방식을 자동으로 감지할 수 없습니다.{Colors.ENDC}")
+            print("수동으로 설정해주세요.")
+    
+    def apply_netplan_config(self):
+        """Netplan 설정 적용 (Ubuntu)"""
+        netplan_config = f"""network:
+  version: 2
+  ethernets:
+    {self.config['network_interface']}:
+      addresses:
+        - {self.config['server_ip']}/24
+      routes:
+        - to: default
+          via: {'.'.join(self.config['server_ip'].split('.')[:3])}.1
+      nameservers:
+        addresses: [8.8.8.8, 8.8.4.4]
+"""
+        
+        netplan_file = '/etc/netplan/99-pxe-server.yaml'
+        
+        try:
+            # 설정 파일 작성
+            temp_netplan = os.path.expanduser('~/netplan_config.yaml.tmp')
+            with open(temp_netplan, 'w') as f:
+                f.write(netplan_config)
+            
+            # sudo로 복사
+            subprocess.run(['sudo', 'cp', temp_netplan, netplan_file], check=True)
+            os.remove(temp_netplan)
+            
+            print(f"{Colors.GREEN}Netplan 설정 파일이 생성되었습니다: {netplan_file}{Colors.ENDC}")
+            print("설정을 적용합니다...")
+            
+            # netplan apply
+            result = subprocess.run(['sudo', 'netplan', 'apply'], 
+                                  capture_output=True, text=True)
+            
+            if result.returncode == 0:
+                print(f"{Colors.GREEN}✅ 네트워크 설정이 적용되었습니다!{Colors.ENDC}")
+                print(f"새 IP 주소: {self.config['server_ip']}")
+            else:
+                print(f"{Colors.FAIL}❌ 설정 적용 실패: {result.stderr}{Colors.ENDC}")
+                
+        except Exception as e:
+            print(f"{Colors.FAIL}❌ 오류 발생: {e}{Colors.ENDC}")
+    
+    def apply_dhcpcd_config(self):
+        """dhcpcd 설정 적용 (Debian/Raspberry Pi OS)"""
+        dhcpcd_config = f"""
+# PXE Server Configuration
+interface {self.config['network_interface']}
+static ip_address={self.config['server_ip']}/24
+static routers={'.'.join(self.config['server_ip'].split('.')[:3])}.1
+static domain_name_servers=8.8.8.8 8.8.4.4
+"""
+        
+        try:
+            # 기존 설정 백업
+            subprocess.run(['sudo', 'cp', '/etc/dhcpcd.conf', '/etc/dhcpcd.conf.backup'], 
+                         check=True)
+            
+            # 설정 추가
+            temp_dhcpcd = os.path.expanduser('~/dhcpcd_append.conf.tmp')
+            with open(temp_dhcpcd, 'w') as f:
+                f.write(dhcpcd_config)
+            
+            subprocess.run(['sudo', 'bash', '-c', 
+                          f'cat {temp_dhcpcd} >> /etc/dhcpcd.conf'], 
+                         check=True)
+            os.remove(temp_dhcpcd)
+            
+            print(f"{Colors.GREEN}dhcpcd 설정이 추가되었습니다.{Colors.ENDC}")
+            print("서비스를 재시작합니다...")
+            
+            # dhcpcd 재시작
+            subprocess.run(['sudo', 'systemctl', 'restart', 'dhcpcd'], check=True)
+            
+            print(f"{Colors.GREEN}✅ 네트워크 설정이 적용되었습니다!{Colors.ENDC}")
+            print(f"새 IP 주소: {self.config['server_ip']}")
+            
+        except Exception as e:
+            print(f"{Colors.FAIL}❌ 오류 발생: {e}{Colors.ENDC}")
+    
+    def generate_dnsmasq_config(self):
+        """dnsmasq 설정 동기화 - 바뀐 파일만 쓰고 필요한 경우에만 재시작/리로드"""
+        try:
+            stats = self.dnsmasq.sync(self.config, self.registry.all())
+
+            if stats['main']:
+                print(f"  ✓ dnsmasq 공통 설정 갱신 (/etc/dnsmasq.conf)")
+            if stats['written'] or stats['removed']:
+                print(f"  ✓ 클라이언트 예약 갱신 (변경 {stats['written']}개, 삭제 {stats['removed']}개)")
+            if not any(stats.values()):
+                print(f"  ✓ dnsmasq 설정 변경 없음")
+
+            if self.dnsmasq.pending_restart or self.dnsmasq.pending_reload:
+                print(f"  ✓ dnsmasq 적용 예약됨 (일괄 작업 종료 시 한 번 적용)")
+            elif stats['main']:
+                print(f"  ✓ dnsmasq 서비스 재시작 완료")
+            elif stats['written'] or stats['removed']:
+                print(f"  ✓ dnsmasq 예약 다시 읽기 완료 (SIGHUP, 재시작 없음)")
+
+        except Exception as e:
+            print(f"  ⚠️  설정 파일 생성 실패: {e}")
+    
+    def initial_setup_wizard(self):
+        """초기 설정 마법사 - 원클릭 자동 설정"""
+        self.print_header()
+        print(f"{Colors.BOLD}{Colors.GREEN}🚀 원클릭 PXE 부팅 설정 마법사{Colors.ENDC}\n")
+        print(f"{Colors.CYAN}모든 설정을 자동으로 구성합니다!{Colors.ENDC}\n")
+        
+        confirm = input("자동 설정을 시작하시겠습니까? (Y/n): ").lower()
+        if confirm == 'n':
+            return
+
+        # 필수 시스템 패키지 확인 및 설치
+        print(f"\n{Colors.CYAN}📦 필수 패키지 확인 중...{Colors.ENDC}")
+        required_packages = ['dnsmasq', 'dnsmasq-utils', 'nfs-kernel-server']
+        missing_packages = []
+
+        for pkg in required_packages:
+            result = subprocess.run(['dpkg', '-l', pkg], capture_output=True)
+            if result.returncode != 0:
+                missing_packages.append(pkg)
+                print(f"  ✗ {pkg} 미설치")
+            else:
+                print(f"  ✓ {pkg} 설치됨")
+
+        if missing_packages:
+            print(f"\n{Colors.WARNING}⚠️  필수 패키지가 설치되어 있지 않습니다!{Colors.ENDC}")
+            print(f"{Colors.YELLOW}다음 명령어로 설치하세요:{Colors.ENDC}")
+            print(f"  sudo apt update && sudo apt install -y {' '.join(missing_packages)}\n")
+
+            install_now = input(f"지금 자동으로 설치하시겠습니까? (Y/n): ").lower()
+            if install_now != 'n':
+                try:
+                    print(f"\n{Colors.CYAN}📦 패키지 설치 중...{Colors.ENDC}")
+                    subprocess.run(['sudo', 'apt', 'update'], check=True)
+                    subprocess.run(['sudo', 'apt', 'install', '-y'] + missing_packages, check=True)
+                    print(f"{Colors.GREEN}  ✓ 패키지 설치 완료!{Colors.ENDC}\n")
+                except Exception as e:
+                    print(f"{Colors.FAIL}  ✗ 설치 실패: {e}{Colors.ENDC}")
+                    print(f"  수동으로 설치 후 다시 시도하세요.")
+                    return
+            else:
+                print(f"\n{Colors.WARNING}패키지 설치 후 다시 실행하세요.{Colors.ENDC}")
+                return
+
+        print(f"\n{Colors.CYAN}🔍 네트워크 환경 자동 감지 중...{Colors.ENDC}")
+        
+        # 네트워크 인터페이스 자동 감지 및 설정
+        interfaces = self.get_network_interfaces()
+        if interfaces:
+            # 유선 인터페이스 우선 선택 (enp로 시작하는 것)
+            selected_iface = None
+            for iface, ip in interfaces:
+                if iface.startswith('enp') or iface.startswith('eth'):
+                    selected_iface = (iface, ip)
+                    break
+            
+            if not selected_iface:
+                selected_iface = interfaces[0]
+            
+            self.config['network_interface'] = selected_iface[0]
+            detected_ip = selected_iface[1]
+            print(f"  ✓ 인터페이스: {selected_iface[0]} (IP: {detected_ip})")
+            
+            # IP 대역 자동 설정 - 서버는 항상 .10 사용
+            ip_parts = detected_ip.split('.')
+            network_base = '.'.join(ip_parts[:3])
+            
+            # 서버 IP를 .10으로 고정 (공유기와 충돌 방지)
+            self.config['server_ip'] = f"{network_base}.10"
+            # 클라이언트만 사용할 고정 IP 범위 (동적 할당 없음)
+            self.config['dhcp_range_start'] = ""  # 동적 DHCP 사용 안 함
+            self.config['dhcp_range_end'] = ""  # 동적 DHCP 사용 안 함
+            print(f"  ✓ 서버 IP: {self.config['server_ip']}")
+            print(f"  ✓ DHCP 범위: 고정 IP만 사용 (100-199 범위)")
+        else:
+            print(f"{Colors.WARNING}  ! 네트워크 인터페이스를 찾을 수 없습니다.{Colors.ENDC}")
+            self.config['network_interface'] = 'enp0s31f6'  # 기본값
+            self.config['server_ip'] = '192.168.0.10'
+            network_base = '192.168.0'  # 기본값 설정
+        
+        # Netplan 설정 (고정 IP)
+        print(f"\n{Colors.CYAN}🔧 서버 네트워크 고정 IP 설정...{Colors.ENDC}")
+        gateway_ip = f"{network_base}.1"
+        
+        netplan_config = f"""# Let NetworkManager manage all devices on this system
+network:
+  version: 2
+  renderer: NetworkManager
+  ethernets:
+    {self.config['network_interface']}:
+      dhcp4: no
+      dhcp6: no
+      addresses:
+      - {self.config['server_ip']}/24
+      gateway4: {gateway_ip}
+      nameservers:
+        addresses: [8.8.8.8, 1.1.1.1]
+"""
+        
+        # Netplan 설정 파일 작성
+        try:
+            temp_netplan_file = os.path.expanduser('~/01-network-manager-all.yaml.tmp')
+            with open(temp_netplan_file, 'w') as f:
+                f.write(netplan_config)
+            
+            # 백업 생성
+            subprocess.run(['sudo', 'cp', '/etc/netplan/01-network-manager-all.yaml', 
+                          '/etc/netplan/01-network-manager-all.yaml.backup'], 
+                          stderr=subprocess.DEVNULL)
+            
+            # 새 설정 적용
+            subprocess.run(['sudo', 'cp', temp_netplan_file, 
+                          '/etc/netplan/01-network-manager-all.yaml'], check=True)
+            
+            # 임시 파일 삭제
+            os.remove(temp_netplan_file)
+            
+            print(f"  ✓ Netplan 설정 완료")
+            print(f"    - 인터페이스: {self.config['network_interface']}")
+            print(f"    - 고정 IP: {self.config['server_ip']}")
+            print(f"    - 게이트웨이: {gateway_ip}")
+            
+            # Netplan 적용 옵션
+            apply_now = input(f"\n  {Colors.YELLOW}지금 네트워크 설정을 적용하시겠습니까? (y/N): {Colors.ENDC}").lower()
+            if apply_now == 'y':
+                print(f"  {Colors.WARNING}네트워크가 잠시 끊길 수 있습니다...{Colors.ENDC}")
+                subprocess.run(['sudo', 'netplan', 'apply'], check=True)
+                print(f"  ✓ 네트워크 설정 적용 완료")
+            else:
+                print(f"  ℹ️  나중에 수동으로 적용하려면: {Colors.YELLOW}sudo netplan apply{Colors.ENDC}")
+            
+        except Exception as e:
+            print(f"  ⚠️  Netplan 설정 실패: {e}")
+            print(f"  수동으로 /etc/netplan/01-network-manager-all.yaml 파일을 수정하세요.")
+        
+        
+        # DHCP 충돌 자동 검사 및 해결
+        print(f"\n{Colors.CYAN}🔍 DHCP 충돌 검사 중...{Colors.ENDC}")
+        network_base = '.'.join(self.config['server_ip'].split('.')[:3])
+        gateway_ip = f"{network_base}.1"
+        
+        # 공유기 존재 확인 (ping으로 더 확실하게)
+        try:
+            ping_result = subprocess.run(['ping', '-c', '1', '-W', '1', gateway_ip], 
+                                       capture_output=True, text=True)
+            if ping_result.returncode == 0:
+                print(f"  ✓ 공유기({gateway_ip}) 감지됨")
+                print(f"  ✓ 일반 DHCP 모드 사용 (고정 IP 할당)")
+                self.config['proxy_dhcp_mode'] = False
+                # 공유기가 있어도 우리가 특정 MAC에만 응답하도록 설정
+            else:
+                print(f"  ⚠️  공유기 없음 - 독립 DHCP 서버로 동작")
+                self.config['proxy_dhcp_mode'] = False
+        except:
+            self.config['proxy_dhcp_mode'] = False
+        
+        # 디렉토리 생성 및 권한 설정
+        print(f"\n{Colors.CYAN}📁 디렉토리 생성 및 권한 설정...{Colors.ENDC}")
+        
+        # NFS 및 TFTP 디렉토리 생성
+        self.config['nfs_root'] = '/media/rpi-client'
+        self.config['tftp_root'] = '/tftpboot'
+        
+        for path in [self.config['nfs_root'], self.config['tftp_root']]:
+            if not os.path.exists(path):
+                try:
+                    subprocess.run(['sudo', 'mkdir', '-p', path], check=True)
+                    print(f"  ✓ {path} 디렉토리 생성됨")
+                except:
+                    print(f"  ⚠️  {path} 생성 실패 (권한 필요)")
+        
+        # /media/polygom3d/rpi-client 권한 설정 (모두에게 읽기/쓰기/실행 권한)
+        try:
+            subprocess.run(['sudo', 'chmod', '777', self.config['nfs_root']], check=True)
+            print(f"  ✓ {self.config['nfs_root']} 권한 설정 완료 (777)")
+            
+            # 소유자도 변경 (선택적)
+            current_user = os.environ.get('SUDO_USER', os.environ.get('USER', 'rpi-server'))
+            subprocess.run(['sudo', 'chown', f'{current_user}:{current_user}', self.config['nfs_root']], 
+                         stderr=subprocess.DEVNULL, check=False)
+            print(f"  ✓ {self.config['nfs_root']} 소유자 변경 완료 ({current_user})")
+        except Exception as e:
+            print(f"  ⚠️  권한 설정 실패: {e}")
+        
+        # /tftpboot 권한 설정
+        try:
+            subprocess.run(['sudo', 'chmod', '755', self.config['tftp_root']], check=True)
+            print(f"  ✓ {self.config['tftp_root']} 권한 설정 완료 (755)")
+        except:
+            pass
+        
+        # 서비스 충돌 자동 해결
+        print(f"\n{Colors.CYAN}🔧 서비스 충돌 자동 해결 중...{Colors.ENDC}")
+        
+        # tftpd-hpa 중지 (dnsmasq가 TFTP 제공)
+        try:
+            subprocess.run(['sudo', 'systemctl', 'stop', 'tftpd-hpa'], 
+                         stderr=subprocess.DEVNULL, check=False)
+            subprocess.run(['sudo', 'systemctl', 'disable', 'tftpd-hpa'], 
+                         stderr=subprocess.DEVNULL, check=False)
+            print(f"  ✓ tftpd-hpa 서비스 비활성화 (dnsmasq 통합 사용)")
+        except:
+            pass
+        
+        # 설정 저장
+        self.save_config()
+        
+        # dnsmasq 설정 자동 생성
+        print(f"\n{Colors.CYAN}📝 PXE 부팅 설정 생성 중...{Colors.ENDC}")
+        self.generate_dnsmasq_config()
+        
+        # 서비스 자동 시작
+        print(f"\n{Colors.CYAN}🚀 서비스 자동 시작 중...{Colors.ENDC}")
+        services = ['nfs-kernel-server', 'dnsmasq']
+        restarted = []
+        for service in services:
+            try:
+                subprocess.run(['sudo', 'systemctl', 'restart', service], 
+                             stderr=subprocess.DEVNULL, check=False)
+                restarted.append(service)
+            except:
+                print(f"  ⚠️  {service} 시작 실패 (sudo 권한 필요)")
+
+        # 상태 확인 (한 번에 조회)
+        states = pxe_services.query(restarted) if restarted else {}
+        for service in restarted:
+            if states[service]['active']:
+                print(f"  ✓ {service} 시작됨")
+            else:
+                print(f"  ⚠️  {service} 시작 실패 (수동 시작 필요)")
+        
+        print(f"\n{Colors.GREEN}{'='*50}{Colors.ENDC}")
+        print(f"{Colors.GREEN}✅ 원클릭 설정 완료!{Colors.ENDC}")
+        print(f"{Colors.GREEN}{'='*50}{Colors.ENDC}")
+        print(f"\n{Colors.BOLD}현재 설정:{Colors.ENDC}")
+        print(f"  서버 IP: {self.config['server_ip']}")
+        print(f"  DHCP 범위: {self.config['dhcp_range_start']} - {self.config['dhcp_range_end']}")
+        print(f"  ProxyDHCP: {'활성화' if self.config.get('proxy_dhcp_mode', False) else '비활성화'}")
+        print(f"\n{Colors.BOLD}다음 단계:{Colors.ENDC}")
+        print(f"  1. 클라이언트 관리 → 새 클라이언트 추가")
+        print(f"  2. SD 카드에서 시스템 복사")
+        print(f"  3. 라즈베리파이 PXE 부팅!")
+        
+        print(f"\n{Colors.WARNING}문제 발생 시:{Colors.ENDC}")
+        print(f"  - 서버 설정 → DHCP 충돌 검사")
+        print(f"  - 서비스 관리 → dnsmasq 재시작")
+        
+        # 수동으로 서비스 시작 명령어 제공
+        print(f"\n{Colors.CYAN}수동 서비스 시작 명령어:{Colors.ENDC}")
+        print(f"  sudo systemctl restart dnsmasq")
+        print(f"  sudo systemctl restart nfs-kernel-server")
+        
+        input(f"\n{Colors.CYAN}Enter를 눌러 계속...{Colors.ENDC}")
+    
+    def run(self):
+        """메인 루프"""
+        try:
+            while self.running:
+                self.print_header()
+                self.print_menu()
+                
+                choice = input(f"{Colors.CYAN}선택: {Colors.ENDC}")
+                
+                try:
+                    if choice == '1':
+                        self.show_system_status()
+                    elif choice == '2':
+                        self.manage_clients()
+                    elif choice == '3':
+                        self.server_settings()
+                    elif choice == '4':
+                        self.manage_services()
+                    elif choice == '5':
+                        self.view_logs()
+                    elif choice == '6':
+                        self.initial_setup_wizard()
+                    elif choice == '0':
+                        self.running = False
+                        print(f"\n{Colors.GREEN}프로그램을 종료합니다. 안녕히 가세요!{Colors.ENDC}")
+                    else:
+                        print(f"{Colors.WARNING}잘못된 선택입니다.{Colors.ENDC}")
+                        time.sleep(1)
+                except pxe_deps.MissingDependencyError as e:
+                    print(f"\n{Colors.FAIL}{e}{Colors.ENDC}")
+                    input("\n계속하려면 Enter...")
+        except KeyboardInterrupt:
+            print(f"\n\n{Colors.WARNING}프로그램이 중단되었습니다.{Colors.ENDC}")
+            sys.exit(0)
+        finally:
+            # 클라이언트 백업은 변경이 있었을 때 종료 시 한 번만 내보냄
+            if self.registry.changes:
+                self.save_clients_backup()
+
+def install_dependencies() -> int:
+    """필요한 Python 패키지 설치 (./pxe install)"""
+    missing = pxe_deps.missing(pxe_deps.REQUIRED + pxe_deps.GUI_REQUIRED)
+    if not missing:
+        print(f"{Colors.GREEN}✅ 필요한 패키지가 모두 설치되어 있습니다.{Colors.ENDC}")
+        return 0
+    print(f"📦 필요한 패키지 설치 중: {', '.join(missing)}")
+    code = pxe_deps.install(missing)
+    for name in pxe_deps.missing(missing):
+        print(f"{Colors.WARNING}  ! {name} 설치 필요: {pxe_deps.install_hint(name)}{Colors.ENDC}")
+    if code == 0:
+        print(f"{Colors.GREEN}✅ 패키지 설치 완료!{Colors.ENDC}")
+    return code
+
+
+def run_daemon() -> int:
+    """관리 데몬을 포그라운드로 실행 (./pxe daemon)"""
+    manager = RPIPXEManager()
+    if not manager.config_file.exists():
+        manager.save_config()
+    pxe_daemon.run(manager.config_file, manager.registry.path)
+    return 0
+
+
+def main(started: Optional[float] = None):
+    # 인자가 있으면 비대화형 명령 (--help/사용법 오류는 sudo 전에 처리)
+    args = pxe_commands.parse(sys.argv[1:]) if len(sys.argv) > 1 else None
+    
+    # Root 권한 확인
+    if os.geteuid() != 0:
+        print(f"{Colors.WARNING}이 프로그램은 root 권한이 필요합니다.{Colors.ENDC}", file=sys.stderr)
+        print(f"다시 실행합니다...", file=sys.stderr)
+        os.execvp('sudo', ['sudo', sys.executable] + sys.argv)
+    
+    if args is not None:
+        if args.command == 'install':
+            sys.exit(install_dependencies())
+        if args.command == 'daemon':
+            sys.exit(run_daemon())
+        sys.exit(pxe_commands.run(args, RPIPXEManager))
+    
+    manager = RPIPXEManager()
+    if started is not None:
+        pxe_deps.report_startup('pxe', started)
+    manager.run()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
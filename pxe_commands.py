@@ -0,0 +1,396 @@
+"""
+RPI PXE Manager - 비대화형 명령 (자동화/스크립트용)
+
+  ./pxe status [--ping] [--json]
+  ./pxe client ls [--ping] [--json]
+  ./pxe client add SERIAL MAC [--ip IP] [--hostname NAME] [--json]
+  ./pxe client add --csv FILE [--skip-invalid] [--json]
+  ./pxe client rm SERIAL... --yes [--json]
+  ./pxe client top [--sort temp|load|memory|disk] [--where 'temp>70']... [--refresh] [--json]
+  ./pxe client hot [--sort bytes|read|write|packets|total] [--limit N] [--interval SEC] [--json]
+  ./pxe reconcile [--dry-run] [--json]
+  ./pxe daemon
+  ./pxe install
+
+메뉴와 같은 RPIPXEManager 메서드를 쓰지만 입력을 묻거나 sleep하지 않는다
+(client hot은 데몬이 없으면 --interval 동안 카운터 차이를 잰다).
+진행 메시지는 stderr로, 결과는 stdout으로 출력한다 (--json이면 JSON 객체 하나).
+종료 코드: 0 성공, 1 실패, 2 잘못된 사용법.
+
+관리 데몬(pxe_daemon)이 실행 중이면 status/client ls의 상태는 데몬이 마지막으로
+확인한 값을, client hot은 데몬의 마지막 NFS 트래픽 샘플을 쓰고, reconcile은 데몬에
+요청한다 (데몬의 쓰기 락으로 직렬화).
+"""
+
+import argparse
+import contextlib
+import json
+import sys
+from typing import Callable, List, Optional
+
+import pxe_daemon
+import pxe_deps
+import pxe_enroll
+import pxe_exports
+import pxe_history
+import pxe_leases
+import pxe_nfstraffic
+import pxe_resources
+import pxe_telemetry
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+
+
+class CommandError(Exception):
+    """명령 실패 (code: 종료 코드, details: JSON 출력에 함께 넣을 값)"""
+
+    def __init__(self, message: str, code: int = EXIT_FAILED, details: Optional[dict] = None):
+        super().__init__(message)
+        self.code = code
+        self.details = details or {}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--json', action='store_true', help='결과를 JSON으로 출력')
+
+    parser = argparse.ArgumentParser(prog='pxe', description='RPI PXE Manager (인자 없이 실행하면 메뉴)')
+    commands = parser.add_subparsers(dest='command', metavar='COMMAND')
+    commands.required = True
+
+    status = commands.add_parser('status', parents=[common], help='서버 자원/서비스/클라이언트 요약')
+    status.add_argument('--ping', action='store_true', help='클라이언트 온라인 여부 확인')
+
+    client = commands.add_parser('client', help='클라이언트 관리')
+    client_commands = client.add_subparsers(dest='action', metavar='ACTION')
+    client_commands.required = True
+
+    ls = client_commands.add_parser('ls', parents=[common], help='등록된 클라이언트 목록')
+    ls.add_argument('--ping', action='store_true', help='온라인 여부와 RTT 확인')
+
+    add = client_commands.add_parser('add', parents=[common], help='클라이언트 등록 (시스템 복제, DHCP/NFS 반영)')
+    add.add_argument('serial', nargs='?', help='시리얼 번호 (8자리)')
+    add.add_argument('mac', nargs='?', help='MAC 주소 (마지막 4자리만 써도 됨)')
+    add.add_argument('--ip', default='', help='고정 IP (생략하면 자동 할당)')
+    add.add_argument('--hostname', default='', help='호스트명 (생략하면 시리얼)')
+    add.add_argument('--csv', help='CSV 파일로 여러 대 등록 (serial,mac,ip,hostname)')
+    add.add_argument('--skip-invalid', action='store_true', help='CSV의 잘못된 행은 건너뛰고 나머지 등록')
+
+    rm = client_commands.add_parser('rm', parents=[common], help='클라이언트 삭제 (디렉토리 포함)')
+    rm.add_argument('serials', nargs='+', metavar='SERIAL')
+    rm.add_argument('--yes', action='store_true', help='삭제 확인 (필수)')
+
+    top = client_commands.add_parser('top', parents=[common],
+                                     help='클라이언트 시스템 정보 (온도/부하/메모리/디스크, 높은 순)')
+    top.add_argument('--sort', choices=list(pxe_telemetry.FIELDS), default='temp', help='정렬 기준 (기본 temp)')
+    top.add_argument('--where', action='append', default=[], metavar='EXPR',
+                     help="필터 (예: 'temp>70', 'disk>=90', 여러 번 쓰면 모두 만족)")
+    top.add_argument('--limit', type=int, default=0, help='상위 N대만')
+    top.add_argument('--refresh', action='store_true', help='캐시 대신 지금 다시 수집')
+
+    hot = client_commands.add_parser('hot', parents=[common],
+                                     help='NFS 트래픽이 많은 클라이언트 (conntrack/export_stats, root 필요)')
+    hot.add_argument('--sort', choices=list(pxe_nfstraffic.SORTS), default='bytes', help='정렬 기준 (기본 bytes)')
+    hot.add_argument('--limit', type=int, default=pxe_nfstraffic.DEFAULT_LIMIT,
+                     help=f'상위 N대 (기본 {pxe_nfstraffic.DEFAULT_LIMIT}, 0이면 전체)')
+    hot.add_argument('--interval', type=float, default=pxe_nfstraffic.REFRESH_INTERVAL,
+                     help='데몬이 없을 때 측정 구간 (초)')
+
+    reconcile = commands.add_parser('reconcile', parents=[common],
+                                    help='레지스트리 기준으로 dnsmasq 예약/리스/NFS exports 동기화')
+    reconcile.add_argument('--dry-run', action='store_true', help='바뀔 내용만 출력')
+
+    commands.add_parser('daemon', help='관리 데몬 실행 (포그라운드, systemd 유닛용)')
+    commands.add_parser('install', help='필요한 Python 패키지 설치')
+    return parser
+
+
+def parse(argv: List[str]) -> argparse.Namespace:
+    """인자 해석 (--help나 잘못된 사용법이면 여기서 종료 - root 권한 불필요)"""
+    return build_parser().parse_args(argv)
+
+
+# ---------- 명령 ----------
+
+def _client_row(client: dict, leases: 'pxe_leases.LeaseIndex', status: dict, history: dict) -> dict:
+    lease = leases.state(client.get('mac', ''))
+    row = {'serial': client['serial'], 'hostname': client.get('hostname') or client['serial'],
+           'mac': client.get('mac', ''), 'ip': client.get('ip', ''),
+           'lease': {'ip': lease['ip'], 'active': lease['active'], 'expires_in': lease['expires_in'],
+                     'last_seen': lease['last_seen']} if lease else None,
+           'history': history.get(client['serial'])}
+    if status:
+        rtt = status.get(client.get('ip'))
+        row['online'] = rtt is not None
+        row['rtt_ms'] = rtt
+    return row
+
+
+def cmd_status(manager, args) -> dict:
+    # 데몬이 없으면 manager를 만들 때 잡은 기준점과 최소 MIN_INTERVAL 떨어진 샘플
+    status = manager.get_system_status(min_interval=pxe_resources.MIN_INTERVAL)
+    clients = manager.registry.all()
+    resources = status['resources']
+    result = {'cpu': status['cpu'], 'iowait': status['iowait'], 'memory': status['memory'], 'disk': status['disk'],
+              'network': dict(status['network'], interface=manager.config['network_interface']),
+              'throughput': {key: resources.get(key) for key in ('interval', 'nic', 'storage', 'nfsd', 'processes')},
+              'bottlenecks': pxe_resources.bottlenecks(resources),
+              'services': status['services'], 'clients': {'registered': len(clients)}}
+    if args.ping:
+        probed = manager.check_clients_status([c['ip'] for c in clients if c.get('ip')])
+        result['clients']['online'] = sum(1 for rtt in probed.values() if rtt is not None)
+    return result
+
+
+def cmd_client_ls(manager, args) -> dict:
+    clients = manager.registry.all()
+    status = manager.check_clients_status([c['ip'] for c in clients if c.get('ip')]) if args.ping else {}
+    leases = pxe_leases.shared()
+    history = manager.client_history()
+    return {'clients': [_client_row(client, leases, status, history) for client in clients]}
+
+
+def cmd_client_add(manager, args) -> dict:
+    if args.csv:
+        rows = pxe_enroll.read_csv(args.csv)
+    elif args.serial and args.mac:
+        rows = [{'serial': args.serial, 'mac': args.mac, 'ip': args.ip, 'hostname': args.hostname}]
+    else:
+        raise CommandError("SERIAL과 MAC, 또는 --csv가 필요합니다", EXIT_USAGE)
+
+    clients, errors = pxe_enroll.plan(rows, manager.registry.all(), manager.ip_allocator())
+    invalid = [{'row': number, 'error': message} for number, message in errors]
+    if invalid and not args.skip_invalid:
+        raise CommandError(f"잘못된 항목 {len(invalid)}개 - 아무것도 등록하지 않았습니다",
+                           details={'invalid': invalid})
+    if not clients:
+        raise CommandError("등록할 클라이언트가 없습니다", details={'invalid': invalid})
+
+    failed = manager.enroll_clients(clients)
+    if failed is None:
+        raise CommandError("등록 실패 (레지스트리/디렉토리 생성)")
+    return {'enrolled': clients, 'clone_failed': failed, 'invalid': invalid}
+
+
+def cmd_client_rm(manager, args) -> dict:
+    if not args.yes:
+        raise CommandError("삭제하려면 --yes가 필요합니다 (NFS/TFTP 디렉토리도 삭제됨)", EXIT_USAGE)
+    clients, unknown = [], []
+    for serial in args.serials:
+        client = manager.registry.get(serial.lower())
+        if client:
+            clients.append(client)
+        else:
+            unknown.append(serial)
+    if unknown:
+        raise CommandError(f"등록되지 않은 시리얼: {', '.join(unknown)}", details={'unknown': unknown})
+    manager.delete_clients(clients)
+    return {'removed': [client['serial'] for client in clients]}
+
+
+def cmd_client_top(manager, args) -> dict:
+    try:
+        filters = [pxe_telemetry.parse_filter(expr) for expr in args.where]
+    except ValueError as e:
+        raise CommandError(str(e), EXIT_USAGE)
+    telemetry = manager.client_telemetry(refresh=args.refresh)
+    ttl = float(manager.config.get('telemetry_ttl', pxe_telemetry.DEFAULT_TTL))
+    rows = []
+    for client in manager.registry.all():
+        entry = telemetry.get(client['serial'])
+        if not pxe_telemetry.matches(entry, filters):
+            continue
+        rows.append({'serial': client['serial'], 'hostname': client.get('hostname') or client['serial'],
+                     'ip': client.get('ip', ''), 'collected': entry.get('time') if entry else None,
+                     'fresh': pxe_telemetry.is_fresh(entry, ttl), 'error': entry.get('error') if entry else None,
+                     'system': entry.get('data') if entry else None})
+    rows.sort(key=lambda row: pxe_telemetry.sort_key({'data': row['system']}, args.sort))
+    if args.limit > 0:
+        rows = rows[:args.limit]
+    return {'sort': args.sort, 'clients': rows}
+
+
+def cmd_client_hot(manager, args) -> dict:
+    if args.limit < 0 or args.interval <= 0:
+        raise CommandError("--limit은 0 이상, --interval은 0보다 커야 합니다", EXIT_USAGE)
+    traffic = manager.nfs_traffic(min_interval=args.interval)
+    if not traffic or traffic['interval'] is None:
+        raise CommandError("데몬이 아직 첫 샘플을 모으는 중입니다. 잠시 뒤 다시 실행하세요")
+    sources = traffic['sources']
+    if not sources['conntrack'] and not sources['export_stats']:
+        raise CommandError(pxe_nfstraffic.describe_sources(traffic), details={'sources': sources})
+    return {'sort': args.sort, 'interval': traffic['interval'], 'sources': sources,
+            'clients': pxe_nfstraffic.hot(traffic, args.limit, args.sort)}
+
+
+def cmd_reconcile(manager, args) -> dict:
+    if manager.daemon:
+        result = manager.daemon.reconcile(dry_run=args.dry_run)
+        result.pop('ok', None)
+        return result
+
+    clients = manager.registry.all()
+    pairs = [(c['mac'], c['ip']) for c in clients if c.get('mac') and c.get('ip')]
+
+    if args.dry_run:
+        dnsmasq = manager.dnsmasq.sync(manager.config, clients, dry_run=True)
+        editor = pxe_leases.LeaseEditor()
+        for mac, ip in pairs:
+            editor.claim(mac, ip)
+        stale_leases = len(editor.stale())
+        plan = pxe_exports.plan(manager.config, clients)
+        return {'dry_run': True, 'dnsmasq': dnsmasq, 'stale_leases': stale_leases,
+                'exports': {'summary': plan.summary(), 'changes': plan.describe()}}
+
+    with manager.dnsmasq.batch():
+        dnsmasq = manager.dnsmasq.sync(manager.config, clients)
+        manager.update_dhcp_leases(claim=pairs)
+    plan = pxe_exports.reconcile(manager.config, clients)
+    return {'dry_run': False, 'dnsmasq': dnsmasq,
+            'exports': {'summary': plan.summary(), 'changes': plan.describe()}}
+
+
+COMMANDS = {
+    ('status', None): cmd_status,
+    ('client', 'ls'): cmd_client_ls,
+    ('client', 'add'): cmd_client_add,
+    ('client', 'rm'): cmd_client_rm,
+    ('client', 'top'): cmd_client_top,
+    ('client', 'hot'): cmd_client_hot,
+    ('reconcile', None): cmd_reconcile,
+}
+
+
+# ---------- 출력 ----------
+
+def _format_lease(lease: Optional[dict]) -> str:
+    if lease is None:
+        return '-'
+    return pxe_leases.format_remaining(lease)
+
+
+def _format_percent(value: Optional[float]) -> str:
+    return '-' if value is None else f"{value:.1f}%"
+
+
+def _format_throughput(throughput: dict) -> List[str]:
+    rate = pxe_resources.format_rate
+    lines = []
+    nic = throughput['nic']
+    if nic:
+        lines.append(f"nic {nic['interface']} rx {rate(nic['rx_bytes_s'])} tx {rate(nic['tx_bytes_s'])} "
+                     f"util {_format_percent(nic['utilization'])}")
+    storage = throughput['storage']
+    lines.append(f"storage {storage['device'] or '-'} read {rate(storage['read_bytes_s'])} "
+                 f"write {rate(storage['write_bytes_s'])} util {_format_percent(storage['utilization'])} "
+                 f"await {'-' if storage['await_ms'] is None else '%.1fms' % storage['await_ms']} "
+                 f"usage {_format_percent(storage['usage'])}")
+    nfsd = throughput['nfsd']
+    if nfsd:
+        calls = '-' if nfsd['rpc_calls_s'] is None else f"{nfsd['rpc_calls_s']:.0f}/s"
+        lines.append(f"nfsd threads {nfsd['threads'] or '-'} rpc {calls} read {rate(nfsd['read_bytes_s'])} "
+                     f"write {rate(nfsd['write_bytes_s'])} queued {_format_percent(nfsd['queued_percent'])}")
+    else:
+        lines.append("nfsd not-running")
+    for name, process in throughput['processes'].items():
+        lines.append(f"process {name} cpu {_format_percent(process['cpu'])} "
+                     f"rss {pxe_resources.format_size(process['rss_bytes'])} write {rate(process['write_bytes_s'])}")
+    return lines
+
+
+def format_human(key: tuple, result: dict) -> List[str]:
+    """사람이 읽는 출력 (공백 정렬, 색 없음 - 파이프/grep용)"""
+    if key == ('status', None):
+        lines = [f"cpu {_format_percent(result['cpu'])}  iowait {_format_percent(result['iowait'])}  "
+                 f"memory {_format_percent(result['memory'])}  disk {_format_percent(result['disk'])}",
+                 f"network {result['network']['interface']} {result['network'].get('ip', 'N/A')}"]
+        lines += _format_throughput(result['throughput'])
+        lines.append(f"bottleneck {','.join(result['bottlenecks']) or 'none'}")
+        lines += [f"service {name} {'active' if active else 'inactive'}" for name, active in result['services'].items()]
+        online = result['clients'].get('online')
+        lines.append(f"clients {result['clients']['registered']}" + (f" online {online}" if online is not None else ''))
+        return lines
+    if key == ('client', 'ls'):
+        lines = []
+        for row in result['clients']:
+            history = row['history']
+            line = (f"{row['serial']:<10} {row['ip'] or '-':<15} {row['mac'] or '-':<18} {row['hostname']:<16} "
+                    f"{_format_lease(row['lease']):<12} {pxe_history.format_summary(history):<14} "
+                    f"{pxe_history.sparkline(history['spark']) if history else '-'}")
+            if 'online' in row:
+                line += f"  {'%.1fms' % row['rtt_ms'] if row['online'] else 'offline'}"
+            lines.append(line)
+        return lines
+    if key == ('client', 'add'):
+        lines = [f"enrolled {c['serial']} {c['mac']} {c['ip']}" for c in result['enrolled']]
+        lines += [f"clone-failed {serial}" for serial in result['clone_failed']]
+        lines += [f"skipped row {item['row']}: {item['error']}" for item in result['invalid']]
+        return lines
+    if key == ('client', 'rm'):
+        return [f"removed {serial}" for serial in result['removed']]
+    if key == ('client', 'top'):
+        lines = []
+        for row in result['clients']:
+            entry = {'data': row['system'], 'time': row['collected']}
+            age = pxe_telemetry.format_age(entry)
+            if row['collected'] and not row['fresh']:
+                age += ' (stale)'
+            if row['error']:
+                age += f" error: {row['error']}"
+            lines.append(f"{row['serial']:<10} {row['ip'] or '-':<15} {row['hostname']:<16} "
+                         f"{pxe_telemetry.format_brief(entry):<26} {age}")
+        return lines
+    if key == ('client', 'hot'):
+        lines = []
+        for row in result['clients']:
+            text = pxe_nfstraffic.format_row(row)
+            lines.append(f"{row['serial'] or '-':<10} {row['ip'] or '-':<15} read {text['read']:<10} "
+                         f"write {text['write']:<10} bytes {text['bytes']:<10} packets {text['packets']:<7} "
+                         f"conn {row['connections']} total {text['total']}")
+        return lines
+    if key == ('reconcile', None):
+        d = result['dnsmasq']
+        prefix = 'would ' if result['dry_run'] else ''
+        lines = [f"dnsmasq {prefix}main {d['main']} written {d['written']} removed {d['removed']}"]
+        if 'stale_leases' in result:
+            lines.append(f"leases {prefix}remove {result['stale_leases']}")
+        lines.append(f"exports {result['exports']['summary']}")
+        lines += [f"  {line}" for line in result['exports']['changes']]
+        return lines
+    return [json.dumps(result, ensure_ascii=False)]
+
+
+def run(args: argparse.Namespace, manager_factory: Callable) -> int:
+    """명령 실행 → 종료 코드. 진행 메시지(print)는 stderr로 보낸다"""
+    key = (args.command, getattr(args, 'action', None))
+    out = sys.stdout
+    code = EXIT_OK
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            manager = manager_factory()
+            try:
+                result = COMMANDS[key](manager, args)
+            finally:
+                if manager.registry.changes:
+                    manager.save_clients_backup()
+        result = dict(result, ok=True)
+    except (CommandError, pxe_daemon.DaemonError, pxe_deps.MissingDependencyError) as e:
+        code = getattr(e, 'code', EXIT_FAILED)
+        result = dict(getattr(e, 'details', {}), ok=False, error=str(e))
+    except Exception as e:
+        code = EXIT_FAILED
+        result = {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+
+    if args.json:
+        json.dump(result, out, ensure_ascii=False, default=str)
+        out.write('\n')
+    elif result['ok']:
+        for line in format_human(key, result):
+            print(line, file=out)
+    else:
+        print(f"오류: {result['error']}", file=sys.stderr)
+        for item in result.get('invalid', []):
+            print(f"  행 {item['row']}: {item['error']}", file=sys.stderr)
+    return code
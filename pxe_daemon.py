@@ -0,0 +1,716 @@
+"""
+RPI PXE Manager - 관리 데몬 (pxed)
+
+설정 파일, 클라이언트 레지스트리, 클라이언트 상태 확인(ICMP), 서비스 상태,
+dnsmasq/리스/NFS exports 동기화를 한 프로세스가 맡고 Unix 소켓 HTTP API로
+제공한다. CLI와 GUI는 데몬이 떠 있으면 각자 ping/systemctl을 돌리지 않고
+데몬이 한 번 계산한 상태를 가져다 쓴다.
+
+  GET    /v1/state                 설정 요약 + 클라이언트 + 상태 + 서비스 + 자원/처리량 (pxe_resources)
+  GET    /v1/clients[/<시리얼>]
+  POST   /v1/clients               {"serial", "mac", "ip", "hostname"} 검증(pxe_enroll.plan) 후 등록, 디렉토리 생성, 동기화
+  PUT    /v1/clients/<시리얼>       {"mac", "ip", "hostname", "boot_mode"} 변경 후 동기화
+  DELETE /v1/clients/<시리얼>       레지스트리에서 삭제 후 동기화 (디렉토리는 그대로)
+  POST   /v1/reconcile[?dry_run=1] dnsmasq 예약/리스/NFS exports 동기화
+  GET    /v1/history[?window=초&points=칸]  클라이언트별 가동률/상태 변화/RTT 스파크라인
+  GET    /v1/telemetry             클라이언트별 시스템 정보 캐시 (온도/부하/메모리/디스크)
+  POST   /v1/telemetry/refresh     {"serials": [...]} 지금 수집 (생략하면 온라인 전체)
+  GET    /v1/traffic               클라이언트별 NFS 트래픽 (pxe_nfstraffic, 자원 샘플과 같은 주기)
+  GET    /v1/events?since=<seq>    변경 알림 스트림 (NDJSON, 15초마다 heartbeat)
+  POST   /v1/metrics/steps         {"step", "seconds"} CLI/GUI에서 잰 프로비저닝 단계
+  GET    /metrics                  Prometheus 메트릭 (metrics_port로도 제공, 기본 9410)
+
+API는 Unix 소켓(daemon_socket_mode, 기본 0660)으로만 제공해 파일 권한으로 접근을 제한한다.
+쓰기 요청은 락 하나로 순서대로 처리한다. CLI/GUI가 레지스트리를 직접 고쳐도
+SQLite data_version으로 감지해 clients 이벤트를 낸다.
+
+실행: sudo ./pxe daemon  (systemd 유닛 예시는 README)
+"""
+
+import http.client
+import json
+import os
+import re
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+import pxe_boottrace
+import pxe_dnsmasq
+import pxe_enroll
+import pxe_exports
+import pxe_history
+import pxe_icmp
+import pxe_ipam
+import pxe_leases
+import pxe_metrics
+import pxe_nfstraffic
+import pxe_privops
+import pxe_registry
+import pxe_resources
+import pxe_services
+import pxe_ssh
+import pxe_telemetry
+
+
+DEFAULT_SOCKET = '/run/rpi-pxe/pxed.sock'
+
+DEFAULT_PROBE_INTERVAL = 10.0
+DEFAULT_RESOURCE_INTERVAL = 5.0
+WATCH_INTERVAL = 1.0
+HISTORY_SAVE_INTERVAL = 300.0
+# 수집 대상(온라인이고 주기가 지난 클라이언트) 확인 간격
+TELEMETRY_CHECK_INTERVAL = 30.0
+TELEMETRY_REFRESH_TIMEOUT = 300.0
+HEARTBEAT_INTERVAL = 15.0
+EVENT_BUFFER = 1000
+
+
+class DaemonError(RuntimeError):
+    """데몬 API 오류 응답 (status: HTTP 상태 코드)"""
+
+    def __init__(self, message: str, status: int = 500):
+        super().__init__(message)
+        self.status = status
+
+
+def socket_path(config: dict) -> str:
+    return config.get('daemon_socket') or DEFAULT_SOCKET
+
+
+# ---------- 변경 알림 ----------
+
+class EventBus:
+    """순번이 붙은 이벤트 링 버퍼 - 구독자는 마지막으로 받은 순번 이후를 기다린다"""
+
+    def __init__(self, size: int = EVENT_BUFFER):
+        self._events = deque(maxlen=size)
+        self._cond = threading.Condition()
+        self.seq = 0
+        self.closed = False
+
+    def publish(self, kind: str, data) -> dict:
+        with self._cond:
+            self.seq += 1
+            event = {'seq': self.seq, 'type': kind, 'time': time.time(), 'data': data}
+            self._events.append(event)
+            self._cond.notify_all()
+        return event
+
+    def since(self, seq: int) -> List[dict]:
+        with self._cond:
+            return [event for event in self._events if event['seq'] > seq]
+
+    def wait(self, seq: int, timeout: float) -> List[dict]:
+        with self._cond:
+            self._cond.wait_for(lambda: self.seq > seq or self.closed, timeout)
+            return [event for event in self._events if event['seq'] > seq]
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+# ---------- 데몬 ----------
+
+class PXEDaemon:
+    """레지스트리/상태/설정 동기화를 소유하는 관리 데몬"""
+
+    def __init__(self, config_file: Path, registry_file: Path, socket_file: Optional[str] = None):
+        self.config_file = Path(config_file)
+        self.config = self._load_config()
+        self._config_mtime = self._mtime(self.config_file)
+        self.registry = pxe_registry.ClientRegistry(registry_file)
+        self._data_version = self.registry.data_version()
+        self.socket_file = socket_file or socket_path(self.config)
+        self.dnsmasq = pxe_dnsmasq.DnsmasqSync()
+        self.events = EventBus()
+        self.clients: List[dict] = self.registry.all()
+        self.health: Dict[str, Optional[float]] = {}
+        self.services: Dict[str, bool] = {}
+        self.resources: dict = {}
+        self.traffic: Optional[dict] = None
+        self.service_monitor = pxe_services.ServiceMonitor()
+        self.service_monitor.add_listener(self._on_services)
+        self.history = pxe_history.load(Path(self.config.get('history_file') or pxe_history.HISTORY_FILE))
+        self.telemetry = pxe_telemetry.from_config(self.config)
+        self.ssh_pool = pxe_ssh.SSHPool.from_config(self.config)
+        self._telemetry_lock = threading.Lock()
+        self.metrics = pxe_metrics.shared()
+        self.metrics.add_collector(self._collect_metrics)
+        self.started = time.time()
+        self._write_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._servers = []
+        self._metrics_server = None
+
+    @staticmethod
+    def _mtime(path: Path) -> Optional[int]:
+        try:
+            return path.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def _load_config(self) -> dict:
+        with open(self.config_file, 'r') as f:
+            config = json.load(f)
+        config.pop('clients', None)
+        return config
+
+    # ---------- 상태 ----------
+
+    def state(self) -> dict:
+        return {
+            'seq': self.events.seq,
+            'started': self.started,
+            'config': {key: self.config.get(key) for key in
+                       ('server_ip', 'network_interface', 'nfs_root', 'tftp_root', 'proxy_dhcp_mode')},
+            'clients': self.clients,
+            'health': self.health,
+            'services': self.services,
+            'resources': self.resources,
+        }
+
+    def _reload_clients(self):
+        self.clients = self.registry.all()
+        self.history.forget(c['serial'] for c in self.clients)
+        self.telemetry.forget(c['serial'] for c in self.clients)
+        pxe_metrics.forget(c['serial'] for c in self.clients)
+        self.events.publish('clients', self.clients)
+
+    def _watch_loop(self):
+        """설정 파일과 레지스트리의 외부 변경 감지, 기록 주기적 저장"""
+        saved = time.monotonic()
+        while not self._stop.wait(WATCH_INTERVAL):
+            if time.monotonic() - saved >= HISTORY_SAVE_INTERVAL:
+                saved = time.monotonic()
+                self._save_history()
+            mtime = self._mtime(self.config_file)
+            if mtime != self._config_mtime:
+                self._config_mtime = mtime
+                try:
+                    self.config = self._load_config()
+                    self.events.publish('config', self.state()['config'])
+                except (OSError, ValueError):
+                    pass
+            version = self.registry.data_version()
+            if version != self._data_version:
+                self._data_version = version
+                self._reload_clients()
+
+    def _probe_loop(self):
+        """등록된 클라이언트 ICMP 확인 - 바뀐 IP만 알림"""
+        interval = float(self.config.get('daemon_probe_interval', DEFAULT_PROBE_INTERVAL))
+        while not self._stop.is_set():
+            ips = [c['ip'] for c in self.clients if c.get('ip')]
+            try:
+                results = pxe_icmp.probe_hosts(ips, timeout=1.0) if ips else {}
+            except Exception:
+                results = {ip: None for ip in ips}
+            changed = {ip: rtt for ip, rtt in results.items()
+                       if ip not in self.health or (rtt is None) != (self.health[ip] is None)}
+            self.health = results
+            pxe_metrics.record_probes(results, self.clients)
+            self.history.record(results, self.clients)
+            if changed:
+                self.events.publish('health', changed)
+            self._stop.wait(interval)
+
+    def _save_history(self):
+        try:
+            self.history.save()
+        except OSError as e:
+            print(f"pxed: 기록 저장 실패: {e}", flush=True)
+
+    def _on_services(self, states: Dict[str, dict]):
+        """서비스 모니터 리스너 - 유닛 상태가 바뀌었을 때만 호출됨"""
+        self.services = pxe_services.active_map(states)
+        pxe_metrics.record_services(states)
+        self.events.publish('services', self.services)
+
+    def _collect_metrics(self):
+        """스크레이프 직전 - 캐시된 값만 옮김"""
+        pxe_metrics.record_clients(len(self.clients))
+        pxe_metrics.record_resources(self.resources)
+        pxe_metrics.record_nfs_traffic(self.traffic)
+        pxe_metrics.record_telemetry(self.telemetry.fresh())
+
+    def _telemetry_loop(self):
+        """온라인 클라이언트 시스템 정보를 telemetry_interval마다 수집"""
+        interval = float(self.config.get('telemetry_interval', pxe_telemetry.DEFAULT_INTERVAL))
+        while not self._stop.wait(TELEMETRY_CHECK_INTERVAL):
+            online = [ip for ip, rtt in self.health.items() if rtt is not None]
+            due = self.telemetry.due(self.clients, online, interval)
+            if due:
+                self.collect_telemetry(due)
+
+    def collect_telemetry(self, clients: List[dict]) -> Dict[str, dict]:
+        """지금 수집해 캐시/파일에 반영하고 telemetry 알림 (시리얼 → entry)"""
+        with self._telemetry_lock:
+            entries = pxe_telemetry.collect(
+                self.ssh_pool, clients,
+                parallel=int(self.config.get('telemetry_parallel', pxe_telemetry.DEFAULT_PARALLEL)))
+            self.telemetry.update(entries)
+            try:
+                self.telemetry.save()
+            except OSError as e:
+                print(f"pxed: 시스템 정보 저장 실패: {e}", flush=True)
+        updated = {entry['serial']: self.telemetry.get(entry['serial']) for entry in entries}
+        if updated:
+            self.events.publish('telemetry', updated)
+        return updated
+
+    def _journal_loop(self):
+        """dnsmasq/mountd 로그를 계속 따라가며 DHCP/TFTP/마운트 이벤트 집계"""
+        while not self._stop.is_set():
+            counter = pxe_metrics.LogEventCounter(self.clients)
+            try:
+                for line in pxe_boottrace.follow_journal():
+                    counter.feed(line)
+                    if self._stop.is_set():
+                        break
+            except OSError:
+                pass
+            self._stop.wait(30)
+
+    def _resource_loop(self):
+        """서버 자원/처리량, 클라이언트별 NFS 트래픽 샘플 (알림 없이 state/API와 메트릭에만 반영)"""
+        interval = float(self.config.get('daemon_resource_interval', DEFAULT_RESOURCE_INTERVAL))
+        sampler = traffic = None
+        while not self._stop.is_set():
+            target = (self.config.get('network_interface') or 'eth0', self.config.get('nfs_root') or '/')
+            if sampler is None or (sampler.interface, sampler.storage_path) != target:
+                sampler = pxe_resources.ResourceSampler(*target)
+                traffic = pxe_nfstraffic.NFSTrafficSampler(target[1])
+            self.resources = sampler.sample()
+            self.traffic = traffic.sample(self.clients)
+            self._stop.wait(interval)
+
+    # ---------- 쓰기 (직렬화) ----------
+
+    def reconcile(self, dry_run: bool = False) -> dict:
+        """레지스트리 기준 dnsmasq 예약/리스/NFS exports 동기화"""
+        with self._write_lock:
+            clients = self.registry.all()
+            pairs = [(c['mac'], c['ip']) for c in clients if c.get('mac') and c.get('ip')]
+            editor = pxe_leases.LeaseEditor()
+            for mac, ip in pairs:
+                editor.claim(mac, ip)
+            stale = editor.stale()
+            if dry_run:
+                dnsmasq = self.dnsmasq.sync(self.config, clients, dry_run=True)
+                plan = pxe_exports.plan(self.config, clients)
+            else:
+                with pxe_metrics.timed('dhcp_sync'), self.dnsmasq.batch():
+                    dnsmasq = self.dnsmasq.sync(self.config, clients)
+                    if stale:
+                        self.dnsmasq.drop_leases(self.config['network_interface'], stale)
+                with pxe_metrics.timed('exports_sync'):
+                    plan = pxe_exports.reconcile(self.config, clients)
+            result = {'dry_run': dry_run, 'dnsmasq': dnsmasq, 'stale_leases': len(stale),
+                      'exports': {'summary': plan.summary(), 'changes': plan.describe()}}
+        if not dry_run:
+            self.events.publish('reconcile', result)
+        return result
+
+    def _enroll(self, row: dict) -> dict:
+        """CLI 일괄 등록과 같은 검증/IP 배정 후 등록하고 NFS/TFTP 디렉토리 생성 (시스템 복제는 CLI에서)"""
+        registered = self.registry.all()
+        allocator = pxe_ipam.IPAllocator.from_config(self.config, registered)
+        clients, errors = pxe_enroll.plan([row], registered, allocator)
+        if errors:
+            raise DaemonError(errors[0][1], 400)
+        client = self.registry.add(clients[0])
+        batch = pxe_privops.OpBatch()
+        batch.mkdir(Path(self.config['nfs_root']) / client['serial'], 0o755)
+        batch.mkdir(Path(self.config['tftp_root']) / client['serial'], 0o755)
+        try:
+            batch.apply()
+        except pxe_privops.BatchError as e:
+            raise DaemonError(f"등록됨, 디렉토리 생성 실패: {e}")
+        return client
+
+    @staticmethod
+    def _update_fields(fields: dict) -> dict:
+        """PUT 본문에서 바꿀 수 있는 필드만 검증해서 반환 (serial, 모르는 키는 버림)"""
+        fields = {k: v for k, v in fields.items() if k in pxe_registry.FIELDS and k != 'serial'}
+        if 'mac' in fields:
+            mac = pxe_enroll.normalize_mac(fields['mac'] or '')
+            if not mac:
+                raise DaemonError(f"올바른 MAC 주소 형식이 아닙니다: {fields['mac']}", 400)
+            fields['mac'] = mac
+        if fields.get('ip') and pxe_registry.ip_to_number(fields['ip']) is None:
+            raise DaemonError(f"올바른 IP 주소가 아닙니다: {fields['ip']}", 400)
+        if 'hostname' in fields and not pxe_enroll.HOSTNAME_RE.fullmatch(fields['hostname'] or ''):
+            raise DaemonError(f"올바른 호스트명이 아닙니다: {fields['hostname']}", 400)
+        return fields
+
+    def _write_client(self, action: str, serial: Optional[str] = None, fields: Optional[dict] = None) -> dict:
+        with self._write_lock:
+            try:
+                if action == 'add':
+                    client = self._enroll(fields)
+                elif action == 'update':
+                    client = self.registry.update(serial, **self._update_fields(fields))
+                elif not self.registry.remove(serial):
+                    raise KeyError(serial)
+                else:
+                    client = {'serial': serial}
+            except KeyError:
+                raise DaemonError(f"등록되지 않은 시리얼: {serial}", 404)
+            except pxe_registry.DuplicateClientError as e:
+                raise DaemonError(str(e), 409)
+            self._data_version = self.registry.data_version()
+            self._reload_clients()
+        self.reconcile()
+        return client
+
+    # ---------- 실행 ----------
+
+    def serve(self):
+        """소켓을 열고 백그라운드 작업을 시작한 뒤 멈출 때까지 대기"""
+        directory = os.path.dirname(self.socket_file)
+        os.makedirs(directory, exist_ok=True)
+        if os.path.exists(self.socket_file):
+            os.unlink(self.socket_file)
+        server = _UnixServer(self.socket_file, _Handler)
+        server.pxe = self
+        os.chmod(self.socket_file, int(str(self.config.get('daemon_socket_mode', '660')), 8))
+        self._servers.append(server)
+
+        metrics_port = int(self.config.get('metrics_port', pxe_metrics.DEFAULT_PORT))
+        if metrics_port:
+            bind = pxe_metrics.bind_address(self.config)
+            try:
+                self._metrics_server = pxe_metrics.serve(self.metrics, metrics_port, bind)
+            except OSError as e:
+                print(f"pxed: 메트릭 서버를 열 수 없습니다 ({bind}:{metrics_port}): {e}", flush=True)
+
+        self.service_monitor.start()
+        loops = [self._watch_loop, self._probe_loop, self._resource_loop]
+        if self.config.get('metrics_journal', True):
+            loops.append(self._journal_loop)
+        if self.config.get('telemetry_enabled', True):
+            loops.append(self._telemetry_loop)
+        for target in loops:
+            threading.Thread(target=target, name=target.__name__.strip('_'), daemon=True).start()
+        try:
+            server.serve_forever()
+        finally:
+            self.stop()
+
+    def stop(self):
+        self._stop.set()
+        self.service_monitor.stop()
+        self._save_history()
+        self.events.close()
+        for server in self._servers:
+            server.server_close()
+        if self._metrics_server:
+            self._metrics_server.shutdown()
+            self._metrics_server.server_close()
+        if os.path.exists(self.socket_file):
+            os.unlink(self.socket_file)
+
+
+# ---------- HTTP ----------
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'pxed'
+
+    ROUTES = [
+        ('GET', re.compile(r'^/v1/state$'), 'get_state'),
+        ('GET', re.compile(r'^/v1/clients$'), 'get_clients'),
+        ('GET', re.compile(r'^/v1/clients/(\w+)$'), 'get_client'),
+        ('POST', re.compile(r'^/v1/clients$'), 'add_client'),
+        ('PUT', re.compile(r'^/v1/clients/(\w+)$'), 'update_client'),
+        ('DELETE', re.compile(r'^/v1/clients/(\w+)$'), 'remove_client'),
+        ('POST', re.compile(r'^/v1/reconcile$'), 'post_reconcile'),
+        ('GET', re.compile(r'^/v1/history$'), 'get_history'),
+        ('GET', re.compile(r'^/v1/telemetry$'), 'get_telemetry'),
+        ('POST', re.compile(r'^/v1/telemetry/refresh$'), 'refresh_telemetry'),
+        ('GET', re.compile(r'^/v1/traffic$'), 'get_traffic'),
+        ('GET', re.compile(r'^/v1/events$'), 'get_events'),
+        ('POST', re.compile(r'^/v1/metrics/steps$'), 'post_step'),
+        ('GET', re.compile(r'^/metrics$'), 'get_metrics'),
+    ]
+
+    def log_message(self, format, *args):
+        pass
+
+    def address_string(self) -> str:
+        return 'unix'
+
+    def _dispatch(self, method: str):
+        url = urlsplit(self.path)
+        self.query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        for route_method, pattern, name in self.ROUTES:
+            match = pattern.match(url.path)
+            if match and route_method == method:
+                try:
+                    result = getattr(self, name)(*match.groups())
+                except DaemonError as e:
+                    self._send(e.status, {'ok': False, 'error': str(e)})
+                except Exception as e:
+                    self._send(500, {'ok': False, 'error': f"{type(e).__name__}: {e}"})
+                else:
+                    if result is not None:
+                        self._send(200, dict(result, ok=True) if isinstance(result, dict) else result)
+                return
+        self._send(404, {'ok': False, 'error': f"없는 경로: {method} {url.path}"})
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_PUT(self):
+        self._dispatch('PUT')
+
+    def do_DELETE(self):
+        self._dispatch('DELETE')
+
+    def _send(self, status: int, body):
+        data = json.dumps(body, ensure_ascii=False, default=str).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _body(self) -> dict:
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            return json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            raise DaemonError("JSON 본문이 올바르지 않습니다", 400)
+
+    @property
+    def pxe(self) -> PXEDaemon:
+        return self.server.pxe
+
+    def get_state(self):
+        return self.pxe.state()
+
+    def get_clients(self):
+        return {'clients': self.pxe.clients}
+
+    def get_client(self, serial: str):
+        client = self.pxe.registry.get(serial)
+        if client is None:
+            raise DaemonError(f"등록되지 않은 시리얼: {serial}", 404)
+        return dict(client, rtt_ms=self.pxe.health.get(client.get('ip')))
+
+    def add_client(self):
+        body = self._body()
+        if not body.get('serial'):
+            raise DaemonError("serial이 필요합니다", 400)
+        return self.pxe._write_client('add', fields=body)
+
+    def update_client(self, serial: str):
+        return self.pxe._write_client('update', serial, self._body())
+
+    def remove_client(self, serial: str):
+        return self.pxe._write_client('remove', serial)
+
+    def post_reconcile(self):
+        return self.pxe.reconcile(dry_run=self.query.get('dry_run') in ('1', 'true'))
+
+    def get_history(self):
+        kwargs = {}
+        try:
+            if 'window' in self.query:
+                kwargs['window'] = int(self.query['window'])
+            if 'points' in self.query:
+                kwargs['points'] = max(1, min(int(self.query['points']), pxe_history.CAPACITY))
+        except ValueError:
+            raise DaemonError("window/points는 정수여야 합니다", 400)
+        return {'history': self.pxe.history.summaries(**kwargs)}
+
+    def get_telemetry(self):
+        return {'telemetry': self.pxe.telemetry.all(), 'ttl': self.pxe.telemetry.ttl}
+
+    def get_traffic(self):
+        return {'traffic': self.pxe.traffic}
+
+    def refresh_telemetry(self):
+        serials = self._body().get('serials')
+        if serials:
+            clients = [c for c in self.pxe.clients if c['serial'] in set(serials)]
+        else:
+            clients = [c for c in self.pxe.clients if self.pxe.health.get(c.get('ip')) is not None]
+        return {'telemetry': self.pxe.collect_telemetry(clients)}
+
+    def post_step(self):
+        body = self._body()
+        try:
+            pxe_metrics.record_step(str(body['step']), float(body['seconds']))
+        except (KeyError, TypeError, ValueError):
+            raise DaemonError("step과 seconds가 필요합니다", 400)
+        return {}
+
+    def get_metrics(self):
+        openmetrics = 'application/openmetrics-text' in self.headers.get('Accept', '')
+        data = self.pxe.metrics.render(openmetrics).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', pxe_metrics.OPENMETRICS_TYPE if openmetrics else pxe_metrics.PROMETHEUS_TYPE)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        return None
+
+    def get_events(self):
+        """NDJSON 스트림 - 연결이 끊기거나 데몬이 멈출 때까지"""
+        seq = int(self.query.get('since') or self.pxe.events.seq)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+        try:
+            while not self.pxe.events.closed:
+                events = self.pxe.events.wait(seq, HEARTBEAT_INTERVAL)
+                if not events:
+                    events = [{'seq': seq, 'type': 'heartbeat', 'time': time.time(), 'data': None}]
+                for event in events:
+                    self.wfile.write(json.dumps(event, ensure_ascii=False, default=str).encode() + b'\n')
+                    seq = max(seq, event['seq'])
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        return None
+
+
+# ---------- 클라이언트 (CLI/GUI) ----------
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: Optional[float]):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self.sock = sock
+
+
+class DaemonClient:
+    """pxed Unix 소켓 API 클라이언트"""
+
+    def __init__(self, path: str = DEFAULT_SOCKET, timeout: float = 5.0):
+        self.path = path
+        self.timeout = timeout
+        self._stream: Optional[_UnixHTTPConnection] = None
+
+    def request(self, method: str, path: str, body: Optional[dict] = None,
+                timeout: Optional[float] = None) -> dict:
+        conn = _UnixHTTPConnection(self.path, timeout or self.timeout)
+        try:
+            data = json.dumps(body).encode() if body is not None else None
+            headers = {'Content-Type': 'application/json'} if data is not None else {}
+            conn.request(method, path, body=data, headers=headers)
+            response = conn.getresponse()
+            result = json.loads(response.read() or b'{}')
+        except (OSError, ValueError, http.client.HTTPException) as e:
+            raise DaemonError(f"데몬 연결 실패 ({self.path}): {e}", 503)
+        finally:
+            conn.close()
+        if response.status >= 400:
+            raise DaemonError(result.get('error', f"HTTP {response.status}"), response.status)
+        return result
+
+    def available(self) -> bool:
+        if not os.path.exists(self.path):
+            return False
+        try:
+            self.request('GET', '/v1/clients')
+            return True
+        except DaemonError:
+            return False
+
+    def state(self) -> dict:
+        return self.request('GET', '/v1/state')
+
+    def reconcile(self, dry_run: bool = False) -> dict:
+        return self.request('POST', f"/v1/reconcile{'?dry_run=1' if dry_run else ''}")
+
+    def history(self) -> Dict[str, dict]:
+        return self.request('GET', '/v1/history')['history']
+
+    def telemetry(self) -> Dict[str, dict]:
+        return self.request('GET', '/v1/telemetry')['telemetry']
+
+    def refresh_telemetry(self, serials: Optional[List[str]] = None) -> Dict[str, dict]:
+        """지금 수집 (수집이 끝날 때까지 기다림)"""
+        return self.request('POST', '/v1/telemetry/refresh', {'serials': serials or []},
+                            timeout=TELEMETRY_REFRESH_TIMEOUT)['telemetry']
+
+    def traffic(self) -> Optional[dict]:
+        """클라이언트별 NFS 트래픽 마지막 샘플 (데몬이 막 시작했으면 None)"""
+        return self.request('GET', '/v1/traffic')['traffic']
+
+    def record_step(self, step: str, seconds: float):
+        self.request('POST', '/v1/metrics/steps', {'step': step, 'seconds': seconds})
+
+    def events(self, since: Optional[int] = None) -> Iterator[dict]:
+        """변경 알림 (heartbeat 포함). 연결이 끊기면 DaemonError"""
+        conn = self._stream = _UnixHTTPConnection(self.path, HEARTBEAT_INTERVAL * 3)
+        try:
+            conn.request('GET', '/v1/events' + (f'?since={since}' if since is not None else ''))
+            response = conn.getresponse()
+            while True:
+                line = response.readline()
+                if not line:
+                    break
+                yield json.loads(line)
+        except (OSError, ValueError, http.client.HTTPException) as e:
+            raise DaemonError(f"이벤트 스트림 끊김: {e}", 503)
+        finally:
+            self._stream = None
+            conn.close()
+        raise DaemonError("이벤트 스트림 끊김", 503)
+
+    def close_stream(self):
+        """다른 스레드에서 events() 대기를 끊는다"""
+        conn = self._stream
+        if conn is not None and conn.sock is not None:
+            try:
+                conn.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+def connect(config: dict, timeout: float = 5.0) -> Optional[DaemonClient]:
+    """데몬이 실행 중이면 클라이언트, 아니면 None (daemon_enabled: false면 항상 None)"""
+    if config.get('daemon_enabled', True) is False or os.environ.get('PXE_NO_DAEMON') == '1':
+        return None
+    client = DaemonClient(socket_path(config), timeout)
+    return client if client.available() else None
+
+
+def run(config_file: Path, registry_file: Path):
+    """포그라운드 실행 (systemd 유닛에서 호출)"""
+    daemon = PXEDaemon(config_file, registry_file)
+    print(f"pxed: {daemon.socket_file} 에서 대기 (클라이언트 {len(daemon.clients)}대)", flush=True)
+    # systemctl stop(SIGTERM)에도 serve()의 정리(기록 저장, 소켓 삭제)를 거치도록
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        daemon.serve()
+    except KeyboardInterrupt:
+        pass
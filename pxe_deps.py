@@ -0,0 +1,126 @@
+"""
+RPI PXE Manager - 외부 패키지 지연 로딩과 설치
+
+netifaces는 실제로 쓰는 메뉴에 들어갈 때 처음 import한다 (서버 자원은 pxe_resources가 /proc에서 직접 읽음).
+실행할 때마다 패키지를 확인하거나 pip를 부르지 않고, 설치는
+'./pxe install'로 명시적으로 한다. 패키지가 없으면 쓰는 시점에
+설치 방법을 담은 MissingDependencyError가 난다.
+
+시작 시간은 PXE_STARTUP_TIMING=1 환경 변수로 측정한다 (프로세스 시작부터
+메뉴 표시 직전까지, 인터프리터 기동 포함). 진입점별 예산은 STARTUP_BUDGET_MS.
+"""
+
+import importlib
+import importlib.util
+import os
+import subprocess
+import sys
+import time
+import types
+from typing import Dict, List, Optional
+
+# pip 패키지 (CLI/GUI 공통)
+REQUIRED = ['netifaces']
+# GUI 전용 - apt 패키지 권장
+GUI_REQUIRED = ['PyQt5']
+APT_PACKAGES = {'PyQt5': 'python3-pyqt5'}
+
+# 진입점별 시작 시간 예산 (ms)
+STARTUP_BUDGET_MS = {'pxe': 250, 'pxe_gui_qt': 1500}
+
+_available: Dict[str, bool] = {}
+
+
+class MissingDependencyError(ImportError):
+    """필요한 외부 패키지가 설치되지 않음"""
+
+
+def install_hint(name: str) -> str:
+    if name in APT_PACKAGES:
+        return f"sudo apt install {APT_PACKAGES[name]}"
+    return "./pxe install"
+
+
+def available(name: str) -> bool:
+    """패키지 설치 여부 (import하지 않고 확인, 프로세스 안에서 캐시)"""
+    if name not in _available:
+        _available[name] = name in sys.modules or importlib.util.find_spec(name) is not None
+    return _available[name]
+
+
+def missing(names: Optional[List[str]] = None) -> List[str]:
+    return [name for name in (names or REQUIRED) if not available(name)]
+
+
+class LazyModule(types.ModuleType):
+    """처음 속성에 접근할 때 import하는 모듈 대리 객체"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__['_module'] = None
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__['_module']
+        if module is None:
+            try:
+                module = importlib.import_module(self.__name__)
+            except ImportError as e:
+                _available[self.__name__] = False
+                raise MissingDependencyError(
+                    f"{self.__name__} 패키지가 없습니다. 설치: {install_hint(self.__name__)}") from e
+            self.__dict__['_module'] = module
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def lazy(name: str) -> types.ModuleType:
+    """이미 import된 모듈이면 그대로, 아니면 지연 로딩 대리 객체"""
+    return sys.modules.get(name) or LazyModule(name)
+
+
+def install(names: Optional[List[str]] = None) -> int:
+    """없는 pip 패키지 설치 → pip 종료 코드 (설치할 것이 없으면 0)"""
+    targets = [name for name in missing(names) if name not in APT_PACKAGES]
+    if not targets:
+        return 0
+    result = subprocess.run([sys.executable, '-m', 'pip', 'install', '--user',
+                             '--break-system-packages'] + targets)
+    for name in targets:
+        _available.pop(name, None)
+    importlib.invalidate_caches()
+    return result.returncode
+
+
+def process_uptime() -> Optional[float]:
+    """현재 프로세스가 시작된 뒤 지난 시간 (초, /proc 기준 10ms 단위)"""
+    try:
+        with open('/proc/self/stat') as f:
+            # comm에 공백이 있을 수 있으므로 마지막 ')' 뒤에서 필드를 센다 (starttime = 22번째)
+            fields = f.read().rsplit(')', 1)[1].split()
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+    except (OSError, IndexError, ValueError):
+        return None
+    return uptime - int(fields[19]) / os.sysconf('SC_CLK_TCK')
+
+
+def report_startup(entry: str, started: float):
+    """PXE_STARTUP_TIMING=1이면 시작 시간과 예산 출력
+
+    started: 진입점 첫 줄에서 잰 time.perf_counter() (import + 초기화 시간)
+    """
+    if os.environ.get('PXE_STARTUP_TIMING') != '1':
+        return
+    imports_ms = (time.perf_counter() - started) * 1000
+    uptime = process_uptime()
+    total_ms = uptime * 1000 if uptime is not None else imports_ms
+    budget = STARTUP_BUDGET_MS.get(entry)
+    verdict = ''
+    if budget:
+        verdict = f" / 예산 {budget}ms {'초과' if total_ms > budget else '이내'}"
+    print(f"[시작 시간] {entry}: {total_ms:.0f}ms (import/초기화 {imports_ms:.0f}ms){verdict}", file=sys.stderr)
@@ -0,0 +1,374 @@
+"""
+RPI PXE Manager - dnsmasq 설정 관리 (증분 적용)
+
+공통 설정은 /etc/dnsmasq.conf에, 클라이언트별 고정 IP 예약은
+dhcp-hostsdir 디렉토리의 파일 하나씩(<시리얼>.conf)에 기록한다.
+내용이 바뀐 파일만 다시 쓰고, 클라이언트 변경은 재시작 대신 SIGHUP으로
+다시 읽게 하여 부팅 중인 클라이언트의 DHCP/TFTP 세션이 끊기지 않게 한다.
+dnsmasq 재시작은 공통 설정(dnsmasq.conf)이 실제로 바뀐 경우에만 한다.
+오래된 리스도 dhcp_release(dnsmasq-utils)로 실행 중인 dnsmasq가 지우게 하고,
+dhcp_release가 없을 때만 dnsmasq를 멈춘 상태에서 리스 파일을 고친다.
+"""
+
+import json
+import os
+import re
+import shutil
+import subprocess
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pxe_leases
+
+DNSMASQ_CONF = Path('/etc/dnsmasq.conf')
+DEFAULT_HOSTS_DIR = '/etc/rpi-pxe/dhcp-hosts'
+# 순차 부팅으로 게이트가 걸린 시리얼 (hostsdir 밖 - dnsmasq가 읽지 않게). 재부팅하면 사라짐
+DEFAULT_HOLD_FILE = '/run/rpi-pxe/boot-hold.json'
+
+HOST_LINE_RE = re.compile(r'dhcp-host=([0-9a-fA-F:]+),([0-9.]+),([^,\n]+)')
+
+
+def hosts_dir(config: dict) -> Path:
+    """클라이언트 예약 파일 디렉토리"""
+    return Path(config.get('dhcp_hosts_dir') or DEFAULT_HOSTS_DIR)
+
+
+def render_main_config(config: dict) -> str:
+    """dnsmasq.conf 공통 설정 생성 (클라이언트 목록과 무관)"""
+    network_base = '.'.join(config['server_ip'].split('.')[:3])
+    server_ip = config['server_ip']
+
+    return f"""# Unified dnsmasq configuration - RPI PXE Manager
+port=0
+
+# PXE Boot Configuration
+interface={config['network_interface']}
+bind-interfaces
+
+# DHCP Range for dynamic allocation (avoid fixed IPs)
+# Fixed IPs: 100-199 reserved for manual assignment (100 devices)
+# Dynamic range: 200-250 for DHCP
+dhcp-range={network_base}.200,{network_base}.250,255.255.255.0,1h
+
+# Set this server as authoritative DHCP
+dhcp-authoritative
+
+# Faster DHCP response (beat router)
+dhcp-rapid-commit
+
+# DHCP Options
+dhcp-option=3,{network_base}.1
+dhcp-option=6,8.8.8.8,8.8.4.4
+dhcp-option=66,{server_ip}
+dhcp-option=150,{server_ip}
+
+# Tag for all PXE clients
+dhcp-match=set:pxeclient,60,PXEClient*
+
+# Tag for Raspberry Pi
+dhcp-vendorclass=set:rpi,PXEClient:Arch:00000:UNDI:002001
+
+# PXE/TFTP - Respond to all PXE requests
+dhcp-boot=tag:pxeclient,bootcode.bin,rpi-server,{server_ip}
+dhcp-boot=tag:rpi,bootcode.bin,rpi-server,{server_ip}
+dhcp-boot=bootcode.bin,rpi-server,{server_ip}
+
+# Enable TFTP
+enable-tftp
+tftp-root={config['tftp_root']}
+tftp-no-blocksize
+
+# PXE Service
+pxe-service=0,"Raspberry Pi Boot",bootcode.bin,{server_ip}
+pxe-prompt="Booting Raspberry Pi",1
+
+# Logging
+log-dhcp
+log-queries
+
+# Client Configurations
+# 클라이언트별 고정 IP 예약은 아래 디렉토리의 <시리얼>.conf 파일에 있음
+# (변경 시 SIGHUP으로 다시 읽음 - 재시작 불필요)
+dhcp-hostsdir={hosts_dir(config)}
+"""
+
+
+def render_host_entry(client: dict) -> str:
+    """클라이언트 예약 한 줄 (dhcp-hostsfile 형식: MAC,IP,호스트명,리스시간)"""
+    hostname = client.get('hostname') or client['serial']
+    return f"# Client: {client['serial']}\n{client['mac']},{client['ip']},{hostname},infinite\n"
+
+
+def render_gated_entry(client: dict) -> str:
+    """부팅 대기 예약 - dnsmasq가 이 MAC의 DHCP 요청에 응답하지 않음 (순차 부팅용)"""
+    return f"# Client: {client['serial']} (부팅 대기)\n{client['mac']},ignore\n"
+
+
+def host_file(config: dict, client: dict) -> Path:
+    return hosts_dir(config) / f"{client['serial']}.conf"
+
+
+def hold_file(config: dict) -> Path:
+    return Path(config.get('boot_hold_file') or DEFAULT_HOLD_FILE)
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def held_serials(config: dict) -> set:
+    """게이트가 걸려 있는 시리얼 - 건 프로세스가 죽었으면 빈 집합 (다음 sync에서 원래 예약으로 복구)"""
+    text = _read(hold_file(config))
+    try:
+        state = json.loads(text) if text else {}
+    except ValueError:
+        return set()
+    if not state.get('serials') or not _alive(int(state.get('pid', 0))):
+        return set()
+    return set(state['serials'])
+
+
+def set_held(config: dict, serials: set):
+    """게이트 목록 기록 (비면 파일 삭제)"""
+    path = hold_file(config)
+    if not serials:
+        remove_file(path)
+        return
+    if not path.parent.is_dir():
+        subprocess.run(['sudo', 'mkdir', '-p', str(path.parent)], check=True)
+    write_file(path, json.dumps({'pid': os.getpid(), 'serials': sorted(serials)}))
+
+
+def _read(path: Path) -> Optional[str]:
+    try:
+        return path.read_text()
+    except FileNotFoundError:
+        return None
+    except PermissionError:
+        result = subprocess.run(['sudo', 'cat', str(path)], capture_output=True, text=True)
+        return result.stdout if result.returncode == 0 else None
+
+
+def write_file(path: Path, content: str):
+    """같은 디렉토리의 임시 파일에 쓴 뒤 rename (원자적 교체)"""
+    path = Path(path)
+    tmp = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    if os.access(path.parent, os.W_OK):
+        with open(tmp, 'w') as f:
+            f.write(content)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    else:
+        subprocess.run(['sudo', 'tee', str(tmp)], input=content.encode(),
+                       stdout=subprocess.DEVNULL, check=True)
+        subprocess.run(['sudo', 'chmod', '644', str(tmp)], check=True)
+        subprocess.run(['sudo', 'mv', '-f', str(tmp), str(path)], check=True)
+
+
+def write_if_changed(path: Path, content: str) -> bool:
+    """내용이 다를 때만 쓰기. 썼으면 True"""
+    if _read(path) == content:
+        return False
+    write_file(path, content)
+    return True
+
+
+def remove_file(path: Path) -> bool:
+    path = Path(path)
+    if not path.exists():
+        return False
+    try:
+        path.unlink()
+    except PermissionError:
+        subprocess.run(['sudo', 'rm', '-f', str(path)], check=True)
+    return True
+
+
+def uses_hostsdir(conf_path: Path = DNSMASQ_CONF) -> bool:
+    """현재 dnsmasq.conf가 dhcp-hostsdir 방식인지 확인"""
+    content = _read(conf_path) or ''
+    return 'dhcp-hostsdir=' in content
+
+
+def parse_clients(config: dict, conf_path: Path = DNSMASQ_CONF) -> List[dict]:
+    """dnsmasq 설정에서 클라이언트 목록 복원 (hostsdir 파일 + 이전 방식의 dhcp-host 줄)"""
+    clients: Dict[str, dict] = {}
+
+    content = _read(conf_path) or ''
+    for mac, ip, hostname in HOST_LINE_RE.findall(content):
+        clients[hostname] = {
+            'serial': hostname,
+            'hostname': hostname,
+            'mac': mac.lower(),
+            'ip': ip,
+            'boot_mode': 'nfs'
+        }
+
+    directory = hosts_dir(config)
+    if directory.is_dir():
+        for host_file in sorted(directory.glob('*.conf')):
+            for line in (_read(host_file) or '').splitlines():
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                parts = line.split(',')
+                if len(parts) < 3:
+                    continue
+                serial = host_file.stem
+                clients[serial] = {
+                    'serial': serial,
+                    'hostname': parts[2],
+                    'mac': parts[0].lower(),
+                    'ip': parts[1],
+                    'boot_mode': 'nfs'
+                }
+
+    return list(clients.values())
+
+
+class DnsmasqSync:
+    """dnsmasq 설정 동기화: 바뀐 파일만 쓰고, 재시작/리로드는 한 번으로 모은다"""
+
+    def __init__(self, conf_path: Path = DNSMASQ_CONF):
+        self.conf_path = Path(conf_path)
+        self.pending_restart = False
+        self.pending_reload = False
+        # (인터페이스, 리스) - flush에서 dhcp_release
+        self.pending_leases: List[tuple] = []
+        self._batch_depth = 0
+
+    def sync(self, config: dict, clients: Optional[List[dict]] = None, dry_run: bool = False) -> Dict[str, int]:
+        """설정과 클라이언트 목록을 dnsmasq 파일에 반영하고 변경 통계 반환
+
+        dry_run=True면 파일을 쓰지 않고 바뀔 파일 수만 센다.
+        순차 부팅 게이트가 걸린 클라이언트(held_serials)의 예약 파일은 그대로 둔다.
+        """
+        if clients is None:
+            clients = config.get('clients', [])
+        stats = {'main': 0, 'written': 0, 'removed': 0}
+        directory = hosts_dir(config)
+        held = held_serials(config)
+
+        if dry_run:
+            stats['main'] = int(_read(self.conf_path) != render_main_config(config))
+            wanted = {f"{c['serial']}.conf": render_host_entry(c) for c in clients if c.get('mac') and c.get('ip')}
+            stats['written'] = sum(1 for name, content in wanted.items()
+                                   if name[:-len('.conf')] not in held and _read(directory / name) != content)
+            if directory.is_dir():
+                stats['removed'] = sum(1 for f in directory.glob('*.conf') if f.name not in wanted)
+            return stats
+
+        if not directory.is_dir():
+            subprocess.run(['sudo', 'mkdir', '-p', str(directory)], check=True)
+
+        # 1. 공통 설정 - 바뀐 경우에만 백업 후 교체 (재시작 필요)
+        main_conf = render_main_config(config)
+        if _read(self.conf_path) != main_conf:
+            subprocess.run(['sudo', 'cp', str(self.conf_path), str(self.conf_path) + '.backup'],
+                           stderr=subprocess.DEVNULL, check=False)
+            write_file(self.conf_path, main_conf)
+            # 이전 방식의 개별 설정 파일 정리
+            subprocess.run(['sudo', 'bash', '-c', 'rm -f /etc/dnsmasq.d/client-*.conf /etc/dnsmasq.d/pxe-*.conf'],
+                           stderr=subprocess.DEVNULL)
+            stats['main'] = 1
+            self.pending_restart = True
+
+        # 2. 클라이언트별 예약 파일 - 바뀐 파일만 쓰기
+        wanted = set()
+        for client in clients:
+            if not (client.get('mac') and client.get('ip')):
+                continue
+            wanted.add(f"{client['serial']}.conf")
+            if client['serial'] in held:
+                continue
+            if write_if_changed(directory / f"{client['serial']}.conf", render_host_entry(client)):
+                stats['written'] += 1
+
+        # 3. 삭제된 클라이언트의 예약 파일 제거
+        for host_file in directory.glob('*.conf'):
+            if host_file.name not in wanted and remove_file(host_file):
+                stats['removed'] += 1
+
+        if stats['written'] or stats['removed']:
+            self.pending_reload = True
+
+        if self._batch_depth == 0:
+            self.flush()
+        return stats
+
+    @contextmanager
+    def batch(self):
+        """여러 변경을 묶어 마지막에 한 번만 재시작/리로드"""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self.flush()
+
+    def request_restart(self):
+        """재시작 예약 - 배치 밖이면 바로 실행"""
+        self.pending_restart = True
+        if self._batch_depth == 0:
+            self.flush()
+
+    def drop_leases(self, interface: str, leases: List[dict]):
+        """오래된 리스 제거 예약 (LeaseEditor.stale() 결과) - 배치 밖이면 바로 실행"""
+        self.pending_leases += [(interface, lease) for lease in leases]
+        if self._batch_depth == 0:
+            self.flush()
+
+    def _release_leases(self) -> bool:
+        """dhcp_release로 실행 중인 dnsmasq에서 리스 제거. dhcp_release가 없으면 False"""
+        if not shutil.which('dhcp_release'):
+            return False
+        for interface, lease in self.pending_leases:
+            client_id = [] if lease.get('client_id', '*') == '*' else [lease['client_id']]
+            subprocess.run(['sudo', 'dhcp_release', interface, lease['ip'], lease['mac'], *client_id],
+                           stderr=subprocess.DEVNULL, check=False)
+        return True
+
+    def flush(self) -> str:
+        """대기 중인 재시작/리로드 실행 → 'restart' / 'reload' / 'none'"""
+        action = 'none'
+        stopped_edit = None
+        if self.pending_leases:
+            if self._release_leases():
+                self.pending_reload = True
+            else:
+                # dhcp_release가 없으면 멈춘 상태에서 리스 파일을 고치고 다시 시작
+                stopped_edit = pxe_leases.LeaseEditor()
+                for _, lease in self.pending_leases:
+                    stopped_edit.drop(lease['mac'], lease['ip'])
+            self.pending_leases = []
+        if stopped_edit is not None:
+            subprocess.run(['sudo', 'systemctl', 'stop', 'dnsmasq'], stderr=subprocess.DEVNULL, check=False)
+            try:
+                stopped_edit.apply()
+            finally:
+                subprocess.run(['sudo', 'systemctl', 'start', 'dnsmasq'], stderr=subprocess.DEVNULL, check=False)
+            action = 'restart'
+        elif self.pending_restart:
+            subprocess.run(['sudo', 'systemctl', 'restart', 'dnsmasq'],
+                           stderr=subprocess.DEVNULL, check=False)
+            action = 'restart'
+        elif self.pending_reload:
+            reload_hosts()
+            action = 'reload'
+        self.pending_restart = False
+        self.pending_reload = False
+        return action
+
+
+def reload_hosts():
+    """dnsmasq에 SIGHUP 전송 - hostsdir/hostsfile을 다시 읽음 (세션 유지)"""
+    subprocess.run(['sudo', 'systemctl', 'kill', '--signal=HUP', '--kill-who=main', 'dnsmasq'],
+                   stderr=subprocess.DEVNULL, check=False)
@@ -0,0 +1,146 @@
+"""
+RPI PXE Manager - 클라이언트 일괄 등록
+
+CSV 파일(시리얼, MAC, [IP], [호스트명])이나 dnsmasq 리스에서 찾은 미등록
+라즈베리파이(MAC 접두사 88:a2:9e:1b)로 등록 목록을 만들고 한 번에 검증한다.
+시리얼은 리스에 없으므로 dnsmasq TFTP 로그(<시리얼>/start4.elf 요청)에서
+IP로 찾아 채운다. IP가 없는 항목은 고정 IP 할당기로 한 번에 배정한다.
+
+실제 디렉토리 생성/시스템 복제/DHCP·NFS 반영은 CLI(pxe)에서 수행한다.
+"""
+
+import csv
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pxe_ipam
+
+RPI_MAC_PREFIX = '88:a2:9e:1b'
+
+# 동시에 복제하는 루트 파일시스템 수 (config: enroll_parallel)
+DEFAULT_PARALLEL = 4
+
+MAC_RE = re.compile(r'^([0-9a-f]{2}:){5}[0-9a-f]{2}$')
+SERIAL_RE = re.compile(r'^[0-9a-f]{8}$')
+# RFC 1123 호스트명 레이블 (NFS 경로, cmdline.txt, dnsmasq 설정에 그대로 들어감)
+HOSTNAME_RE = re.compile(r'[a-z0-9]([a-z0-9-]{0,61}[a-z0-9])?', re.IGNORECASE)
+# dnsmasq-tftp: "sent /tftpboot/1a2b3c4d/start4.elf to 192.168.0.201"
+#               "file /tftpboot/1a2b3c4d/start4.elf not found for 192.168.0.201"
+TFTP_SERIAL_RE = re.compile(r'(?:sent|file) \S*?/([0-9a-f]{8})/\S+ (?:not found )?(?:to|for) (\d+\.\d+\.\d+\.\d+)')
+
+CSV_FIELDS = ['serial', 'mac', 'ip', 'hostname']
+
+
+def normalize_mac(text: str, prefix: str = RPI_MAC_PREFIX) -> Optional[str]:
+    """MAC 주소 정규화 - 마지막 4자리(e3:0f 또는 e30f)만 있으면 접두사로 완성"""
+    text = (text or '').strip().lower().replace('-', ':')
+    if len(text) == 5 and ':' in text:
+        text = f"{prefix}:{text}"
+    elif len(text) == 4 and ':' not in text:
+        text = f"{prefix}:{text[:2]}:{text[2:]}"
+    elif len(text) == 12 and ':' not in text:
+        text = ':'.join(text[i:i + 2] for i in range(0, 12, 2))
+    return text if MAC_RE.match(text) else None
+
+
+def read_csv(path: Path) -> List[dict]:
+    """CSV 읽기 - 헤더(serial,mac,ip,hostname)가 없으면 이 순서로 간주. #으로 시작하는 줄은 무시"""
+    with open(path, newline='') as f:
+        lines = [line for line in f if line.strip() and not line.lstrip().startswith('#')]
+    if not lines:
+        return []
+    first = [cell.strip().lower() for cell in next(csv.reader(lines[:1]))]
+    if 'serial' in first and 'mac' in first:
+        reader = csv.DictReader(lines)
+        reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+        rows = list(reader)
+    else:
+        rows = [dict(zip(CSV_FIELDS, cells)) for cells in csv.reader(lines)]
+    return [{key: (row.get(key) or '').strip() for key in CSV_FIELDS} for row in rows]
+
+
+def serials_from_log(lines: Iterable[str]) -> Dict[str, str]:
+    """TFTP 로그에서 IP → 요청한 시리얼 디렉토리 (마지막 요청 기준)"""
+    found = {}
+    for line in lines:
+        match = TFTP_SERIAL_RE.search(line)
+        if match:
+            found[match.group(2)] = match.group(1)
+    return found
+
+
+def discover(leases: Iterable[dict], registered: Iterable[dict], prefix: str = RPI_MAC_PREFIX,
+             log_lines: Iterable[str] = ()) -> List[dict]:
+    """리스에서 미등록 라즈베리파이 찾기 → [{'serial', 'mac', 'ip': '', 'lease_ip', 'hostname'}]"""
+    known = {(c.get('mac') or '').lower() for c in registered}
+    serial_by_ip = serials_from_log(log_lines)
+    found, seen = [], set()
+    for lease in leases:
+        mac = lease['mac'].lower()
+        if not mac.startswith(prefix.lower()) or mac in known or mac in seen:
+            continue
+        seen.add(mac)
+        hostname = lease.get('hostname', '')
+        serial = serial_by_ip.get(lease['ip'], '')
+        if not serial and SERIAL_RE.match(hostname):
+            serial = hostname
+        found.append({'serial': serial, 'mac': mac, 'ip': '', 'lease_ip': lease['ip'],
+                      'hostname': '' if hostname == '*' else hostname})
+    return found
+
+
+def plan(rows: List[dict], registered: List[dict],
+         allocator: 'pxe_ipam.IPAllocator') -> Tuple[List[dict], List[Tuple[int, str]]]:
+    """등록 목록 검증 + IP 배정 → (등록할 클라이언트, [(행 번호, 오류)])
+
+    시리얼/호스트명 형식, 레지스트리와 목록 안의 시리얼/MAC/IP 중복, IP 충돌(리스/ARP)을 확인한다.
+    오류가 있는 행은 건너뛰고, 나머지 행의 IP는 할당기에서 예약된다.
+    """
+    serials = {c['serial'] for c in registered}
+    macs = {(c.get('mac') or '').lower() for c in registered}
+    ips = {c.get('ip') for c in registered if c.get('ip')}
+    clients, errors = [], []
+
+    for number, row in enumerate(rows, 1):
+        serial = (row.get('serial') or '').strip().lower()
+        mac = normalize_mac(row.get('mac', ''))
+        ip = (row.get('ip') or '').strip()
+        hostname = (row.get('hostname') or '').strip() or serial
+        if not serial:
+            errors.append((number, "시리얼 번호가 없습니다"))
+            continue
+        if not SERIAL_RE.fullmatch(serial):
+            errors.append((number, f"올바른 시리얼 번호가 아닙니다 (16진수 8자리): {serial}"))
+            continue
+        if not HOSTNAME_RE.fullmatch(hostname):
+            errors.append((number, f"올바른 호스트명이 아닙니다 (영문/숫자/-, 63자 이하): {hostname}"))
+            continue
+        if not mac:
+            errors.append((number, f"올바른 MAC 주소 형식이 아닙니다: {row.get('mac', '')}"))
+            continue
+        if serial in serials:
+            errors.append((number, f"시리얼 중복: {serial}"))
+            continue
+        if mac in macs:
+            errors.append((number, f"MAC 중복: {mac}"))
+            continue
+
+        if ip:
+            problem = "IP 중복" if ip in ips else allocator.conflict(ip, mac)
+            if problem:
+                errors.append((number, f"{ip}: {problem}"))
+                continue
+            allocator.reserve([ip])
+        else:
+            try:
+                ip = allocator.allocate(mac)
+            except pxe_ipam.AddressExhaustedError as e:
+                errors.append((number, str(e)))
+                continue
+
+        serials.add(serial)
+        macs.add(mac)
+        ips.add(ip)
+        clients.append({'serial': serial, 'mac': mac, 'ip': ip, 'hostname': hostname})
+    return clients, errors
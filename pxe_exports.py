@@ -0,0 +1,246 @@
+"""
+RPI PXE Manager - NFS exports 선언적 동기화
+
+클라이언트 레지스트리로부터 있어야 할 export 목록(nfs_root/<시리얼>)을 계산해
+/etc/exports 파일과 커널의 현재 export 테이블(exportfs -v)을 각각 비교하고,
+달라진 항목만 exportfs -o (추가/변경) / exportfs -u (제거)로 반영한다.
+NFS 서버는 재시작하지 않으므로 이미 마운트한 클라이언트는 영향을 받지 않는다.
+
+nfs_root 바로 아래 경로의 export만 관리 대상이며, 그 밖의 줄(주석, 다른
+공유 등)은 그대로 둔다.
+"""
+
+import subprocess
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pxe_privops
+
+EXPORTS_FILE = Path('/etc/exports')
+DEFAULT_EXPORT_HOSTS = '*'
+DEFAULT_EXPORT_OPTIONS = 'rw,sync,no_subtree_check,no_root_squash'
+
+# 경로 → {호스트: 옵션 문자열}
+ExportMap = Dict[str, Dict[str, str]]
+
+
+def settings_from_config(config: dict) -> Tuple[List[str], str]:
+    """(export 대상 호스트 목록, 옵션)"""
+    hosts = config.get('nfs_export_hosts', DEFAULT_EXPORT_HOSTS)
+    if isinstance(hosts, str):
+        hosts = hosts.split()
+    return list(hosts) or [DEFAULT_EXPORT_HOSTS], config.get('nfs_export_options', DEFAULT_EXPORT_OPTIONS)
+
+
+def client_path(config: dict, client: dict) -> str:
+    serial = client.get('serial') or client.get('hostname', '')
+    return f"{str(config['nfs_root']).rstrip('/')}/{serial}"
+
+
+def is_managed(config: dict, path: str) -> bool:
+    """nfs_root 바로 아래 경로인지 (골든 템플릿 같은 숨김 디렉토리 제외)"""
+    root = str(config['nfs_root']).rstrip('/') + '/'
+    name = path.rstrip('/')[len(root):] if path.startswith(root) else ''
+    return bool(name) and '/' not in name and not name.startswith('.')
+
+
+def desired_exports(config: dict, clients: Iterable[dict]) -> ExportMap:
+    hosts, options = settings_from_config(config)
+    desired: ExportMap = {}
+    for client in clients:
+        if client.get('serial') or client.get('hostname'):
+            desired[client_path(config, client)] = {host: options for host in hosts}
+    return desired
+
+
+# ---------- 파싱 ----------
+
+def _split_host(spec: str) -> Tuple[str, str]:
+    host, _, options = spec.partition('(')
+    return host or DEFAULT_EXPORT_HOSTS, options.rstrip(')')
+
+
+def parse_exports_line(line: str) -> Tuple[Optional[str], Dict[str, str]]:
+    """exports 한 줄 → (경로, {호스트: 옵션}). 주석/빈 줄은 (None, {})"""
+    text = line.split('#', 1)[0].strip()
+    if not text:
+        return None, {}
+    if text.startswith('"'):
+        path, _, rest = text[1:].partition('"')
+    else:
+        path, rest = (text.split(None, 1) + [''])[:2]
+    hosts = dict(_split_host(spec) for spec in rest.split())
+    return path, hosts
+
+
+def _logical_lines(text: str) -> List[str]:
+    """백슬래시 줄 이음을 합친 줄 목록"""
+    lines, pending = [], ''
+    for raw in text.splitlines():
+        if raw.rstrip().endswith('\\'):
+            pending += raw.rstrip()[:-1] + ' '
+            continue
+        lines.append(pending + raw)
+        pending = ''
+    if pending:
+        lines.append(pending)
+    return lines
+
+
+def parse_exports(text: str) -> List[Tuple[str, Optional[str], Dict[str, str]]]:
+    """exports 파일 → [(원래 줄, 경로 또는 None, {호스트: 옵션})]"""
+    return [(line, *parse_exports_line(line)) for line in _logical_lines(text)]
+
+
+def parse_exportfs(output: str) -> ExportMap:
+    """`exportfs -v` 출력 → {경로: {호스트: 옵션}}
+
+    긴 경로는 호스트가 다음 줄로 넘어가고, 모든 호스트(*)는 <world>로 표시된다.
+    """
+    live: ExportMap = {}
+    path = None
+    for raw in output.splitlines():
+        if not raw.strip():
+            continue
+        if not raw[0].isspace():
+            parts = raw.split(None, 1)
+            path = parts[0]
+            if len(parts) == 1:
+                continue
+            spec = parts[1]
+        elif path is not None:
+            spec = raw.strip()
+        else:
+            continue
+        host, options = _split_host(spec)
+        if host == '<world>':
+            host = '*'
+        live.setdefault(path, {})[host] = options
+    return live
+
+
+def render_line(path: str, hosts: Dict[str, str]) -> str:
+    quoted = f'"{path}"' if ' ' in path else path
+    return quoted + ' ' + ' '.join(f"{host}({options})" for host, options in hosts.items())
+
+
+# ---------- 읽기 ----------
+
+def read_exports(path: Path = EXPORTS_FILE) -> str:
+    try:
+        return path.read_text()
+    except FileNotFoundError:
+        return ''
+    except PermissionError:
+        result = subprocess.run(['sudo', 'cat', str(path)], capture_output=True, text=True)
+        return result.stdout
+
+
+def read_live_exports() -> ExportMap:
+    result = subprocess.run(['sudo', 'exportfs', '-v'], capture_output=True, text=True, timeout=30)
+    return parse_exportfs(result.stdout) if result.returncode == 0 else {}
+
+
+# ---------- 계획 / 적용 ----------
+
+def _options_match(wanted: str, live: Optional[str]) -> bool:
+    """live 옵션에 원하는 옵션이 모두 있는지 (exportfs -v는 기본값까지 펼쳐서 보여줌)"""
+    if live is None:
+        return False
+    return set(filter(None, wanted.split(','))) <= set(live.split(','))
+
+
+class ExportsPlan:
+    """/etc/exports 새 내용과 exportfs로 반영할 변경 목록"""
+
+    def __init__(self, content: str, file_changed: bool,
+                 export: List[Tuple[str, str, str]], unexport: List[Tuple[str, str]],
+                 missing: Optional[List[str]] = None):
+        self.content = content
+        self.file_changed = file_changed
+        self.export = export        # [(호스트, 경로, 옵션)]
+        self.unexport = unexport    # [(호스트, 경로)]
+        self.missing = missing or []  # 디렉토리가 없어 export를 미룬 경로
+
+    def __bool__(self) -> bool:
+        return self.file_changed or bool(self.export) or bool(self.unexport)
+
+    def summary(self) -> str:
+        parts = [f"export {len(self.export)}개", f"해제 {len(self.unexport)}개"]
+        if self.file_changed:
+            parts.append(f"{EXPORTS_FILE} 갱신")
+        return ', '.join(parts)
+
+    def describe(self) -> List[str]:
+        lines = [f"+ {host}:{path} ({options})" for host, path, options in self.export]
+        lines += [f"- {host}:{path}" for host, path in self.unexport]
+        lines += [f"? {path} (디렉토리 없음 - export 보류)" for path in self.missing]
+        return lines
+
+    def commands(self) -> List[List[str]]:
+        """옵션별로 묶은 exportfs 명령 (호스트:경로 여러 개를 한 번에)"""
+        commands = []
+        if self.unexport:
+            commands.append(['exportfs', '-u'] + [f"{host}:{path}" for host, path in self.unexport])
+        by_options: Dict[str, List[str]] = {}
+        for host, path, options in self.export:
+            by_options.setdefault(options, []).append(f"{host}:{path}")
+        for options, targets in by_options.items():
+            commands.append(['exportfs', '-i', '-o', options] + targets)
+        return commands
+
+
+def plan(config: dict, clients: Iterable[dict], exports_text: Optional[str] = None,
+         live: Optional[ExportMap] = None) -> ExportsPlan:
+    """레지스트리 기준 desired 상태와 exports 파일/커널 테이블 비교"""
+    desired = desired_exports(config, clients)
+    if exports_text is None:
+        exports_text = read_exports()
+    if live is None:
+        live = read_live_exports()
+
+    # 1. 파일: 관리 대상 줄은 제자리에서 교체/삭제, 새 항목은 끝에 추가
+    output, written = [], set()
+    for line, path, hosts in parse_exports(exports_text):
+        if path is None or not is_managed(config, path):
+            output.append(line)
+        elif path in desired and path not in written:
+            # 내용이 같으면 원래 줄(공백/주석) 유지
+            output.append(line if hosts == desired[path] else render_line(path, desired[path]))
+            written.add(path)
+    for path, hosts in desired.items():
+        if path not in written:
+            output.append(render_line(path, hosts))
+    content = '\n'.join(output) + '\n' if output else ''
+    file_changed = content != exports_text
+
+    # 2. 커널 테이블: 관리 대상 중 다른 것만 (없는 디렉토리는 exportfs가 실패하므로 보류)
+    missing = [path for path in desired if not Path(path).is_dir()]
+    skipped = set(missing)
+    export = [(host, path, options)
+              for path, hosts in desired.items() if path not in skipped
+              for host, options in hosts.items()
+              if not _options_match(options, live.get(path, {}).get(host))]
+    unexport = [(host, path)
+                for path, hosts in live.items() if is_managed(config, path)
+                for host in hosts
+                if host not in desired.get(path, {})]
+    return ExportsPlan(content, file_changed, export, unexport, missing)
+
+
+def apply(export_plan: ExportsPlan) -> dict:
+    """파일 교체와 exportfs 명령을 권한 작업 한 번으로 적용"""
+    batch = pxe_privops.OpBatch()
+    if export_plan.file_changed:
+        batch.write(EXPORTS_FILE, export_plan.content, mode=0o644)
+    for command in export_plan.commands():
+        batch.run(command)
+    return batch.apply()
+
+
+def reconcile(config: dict, clients: Iterable[dict], dry_run: bool = False) -> ExportsPlan:
+    """계획을 세우고 (dry_run이 아니면) 적용. 실패 시 pxe_privops.BatchError"""
+    export_plan = plan(config, clients)
+    if export_plan and not dry_run:
+        apply(export_plan)
+    return export_plan
@@ -0,0 +1,130 @@
+"""
+RPI PXE Manager - 여러 클라이언트 일괄 작업
+
+선택한 클라이언트들에 명령/재부팅/종료를 동시 실행 수를 제한해 병렬로 보내고,
+끝나는 순서대로 호스트별 결과(종료 코드, 출력)를 돌려준다.
+재부팅처럼 다시 부팅이 일어나는 작업은 시작 간격(stagger)을 두어
+수십 대가 동시에 TFTP/NFS에 몰리지 않게 한다.
+"""
+
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator, List, Optional
+
+import pxe_ssh
+
+ACTION_COMMAND = 'command'
+ACTION_REBOOT = 'reboot'
+ACTION_SHUTDOWN = 'shutdown'
+
+ACTION_LABELS = {
+    ACTION_COMMAND: '명령 실행',
+    ACTION_REBOOT: '재부팅',
+    ACTION_SHUTDOWN: '종료',
+}
+
+# 연결이 끊기는 작업 (명령 전송 후 마스터 연결 종료)
+DETACHED_COMMANDS = {
+    ACTION_REBOOT: 'sudo reboot',
+    ACTION_SHUTDOWN: 'sudo shutdown -h now',
+}
+
+DEFAULT_PARALLEL = 8
+DEFAULT_STAGGER = {ACTION_COMMAND: 0.0, ACTION_REBOOT: 2.0, ACTION_SHUTDOWN: 0.0}
+DEFAULT_TIMEOUT = 30
+
+# 결과 상태
+STATUS_OK = 'ok'          # 종료 코드 0
+STATUS_SENT = 'sent'      # 재부팅/종료 명령 전송 (응답 전에 연결이 끊길 수 있음)
+STATUS_FAILED = 'failed'  # 0이 아닌 종료 코드
+STATUS_UNREACHABLE = 'unreachable'
+STATUS_CANCELLED = 'cancelled'
+
+
+def _run_one(pool: 'pxe_ssh.SSHPool', client: dict, action: str, command: str,
+             timeout: float, start_at: float, cancel: threading.Event) -> dict:
+    ip = client.get('ip', '')
+    result = {
+        'serial': client.get('serial', ''),
+        'hostname': client.get('hostname', client.get('serial', '')),
+        'ip': ip,
+        'status': STATUS_CANCELLED,
+        'returncode': None,
+        'stdout': '',
+        'stderr': '',
+        'elapsed': 0.0,
+    }
+
+    # 시작 간격: 예정 시각까지 대기 (취소되면 바로 종료)
+    if cancel.wait(max(0.0, start_at - time.monotonic())):
+        return result
+
+    started = time.monotonic()
+    try:
+        master = pool.connect(ip)
+        if master.returncode != 0:
+            result.update(status=STATUS_UNREACHABLE, returncode=master.returncode,
+                          stderr=(master.stderr or '').strip())
+            return result
+
+        if action in DETACHED_COMMANDS:
+            try:
+                proc = pool.run_detached(ip, DETACHED_COMMANDS[action], timeout=timeout)
+                result.update(returncode=proc.returncode, stdout=proc.stdout, stderr=proc.stderr)
+            except subprocess.TimeoutExpired:
+                pass
+            result['status'] = STATUS_SENT
+        else:
+            proc = pool.run(ip, command, timeout=timeout)
+            result.update(status=STATUS_OK if proc.returncode == 0 else STATUS_FAILED,
+                          returncode=proc.returncode, stdout=proc.stdout, stderr=proc.stderr)
+    except subprocess.TimeoutExpired:
+        result.update(status=STATUS_FAILED, stderr='시간 초과')
+    except Exception as e:
+        result.update(status=STATUS_FAILED, stderr=str(e))
+    finally:
+        result['elapsed'] = time.monotonic() - started
+    return result
+
+
+def run_fleet(pool: 'pxe_ssh.SSHPool', clients: List[dict], action: str = ACTION_COMMAND,
+              command: str = '', parallel: int = DEFAULT_PARALLEL, stagger: Optional[float] = None,
+              timeout: float = DEFAULT_TIMEOUT,
+              cancel: Optional[threading.Event] = None) -> Iterator[dict]:
+    """클라이언트들에 작업을 병렬 실행하고 끝나는 순서대로 결과를 yield
+
+    parallel: 동시에 실행하는 최대 호스트 수
+    stagger: 호스트 간 시작 간격(초), None이면 작업별 기본값
+    cancel: set()하면 아직 시작하지 않은 호스트는 건너뜀
+    """
+    if action == ACTION_COMMAND and not command:
+        raise ValueError("실행할 명령이 없습니다")
+    if stagger is None:
+        stagger = DEFAULT_STAGGER.get(action, 0.0)
+    cancel = cancel or threading.Event()
+
+    targets = [c for c in clients if c.get('ip')]
+    if not targets:
+        return
+
+    t0 = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max(1, min(parallel, len(targets)))) as executor:
+        futures = [executor.submit(_run_one, pool, client, action, command, timeout,
+                                   t0 + i * stagger, cancel)
+                   for i, client in enumerate(targets)]
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            # 소비자가 중간에 멈추면 남은 호스트는 시작하지 않음
+            cancel.set()
+
+
+def summarize(results: List[dict]) -> dict:
+    """상태별 개수"""
+    summary = {}
+    for result in results:
+        summary[result['status']] = summary.get(result['status'], 0) + 1
+    return summary
@@ -3,195 +3,626 @@
 RPI PXE Manager - PyQt5 GUI
 """
 
+import time
+
+STARTED = time.perf_counter()
+
 import os
 import sys
 import subprocess
 import json
 import re
 import threading
-import time
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional
-from concurrent.futures import ThreadPoolExecutor
-
-from PyQt5.QtWidgets import (
-    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QLabel, QPushButton, QFrame, QScrollArea, QTableWidget, QTableWidgetItem,
-    QHeaderView, QMessageBox, QInputDialog, QDialog, QFormLayout,
-    QLineEdit, QComboBox, QTextEdit, QProgressBar, QStackedWidget,
-    QSplitter, QGroupBox, QTabWidget, QDialogButtonBox, QFileDialog,
-    QGridLayout, QSizePolicy, QSpacerItem, QCheckBox
-)
-from PyQt5.QtCore import Qt, QTimer, QThread, pyqtSignal, QSize
-from PyQt5.QtGui import QFont, QColor, QPalette, QIcon
+from typing import Callable, Dict, List, Optional, Tuple
 
 try:
-    import psutil
+    from PyQt5.QtWidgets import (
+        QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
+        QLabel, QPushButton, QFrame, QScrollArea, QTableWidget, QTableWidgetItem,
+        QHeaderView, QMessageBox, QInputDialog, QDialog, QFormLayout,
+        QLineEdit, QComboBox, QTextEdit, QProgressBar, QStackedWidget,
+        QSplitter, QGroupBox, QTabWidget, QDialogButtonBox, QFileDialog,
+        QGridLayout, QSizePolicy, QSpacerItem, QCheckBox, QTableView,
+        QStyledItemDelegate, QStyleOptionViewItem, QStyle, QAbstractItemView,
+        QSpinBox, QDoubleSpinBox
+    )
+    from PyQt5.QtCore import (
+        Qt, QTimer, QThread, pyqtSignal, QSize, QRect, QEvent,
+        QAbstractTableModel, QModelIndex, QSortFilterProxyModel
+    )
+    from PyQt5.QtGui import QFont, QColor, QPalette, QIcon, QPainter
 except ImportError:
-    subprocess.run([sys.executable, '-m', 'pip', 'install', 'psutil', '--user', '--break-system-packages'],
-                   capture_output=True)
-    import psutil
-
-try:
-    import netifaces
-except ImportError:
-    subprocess.run([sys.executable, '-m', 'pip', 'install', 'netifaces', '--user', '--break-system-packages'],
-                   capture_output=True)
-    import netifaces
+    print("PyQt5가 설치되지 않았습니다. 설치: sudo apt install python3-pyqt5 (또는 ./pxe install)", file=sys.stderr)
+    sys.exit(1)
+
+import pxe_boottrace
+import pxe_daemon
+import pxe_deps
+import pxe_dnsmasq
+import pxe_exports
+import pxe_fleet
+import pxe_history
+import pxe_icmp
+import pxe_ipam
+import pxe_leases
+import pxe_nfstraffic
+import pxe_privops
+import pxe_registry
+import pxe_resources
+import pxe_services
+import pxe_ssh
+import pxe_telemetry
+
+netifaces = pxe_deps.lazy('netifaces')
 
 
 class PingThread(QThread):
-    """클라이언트 ping 체크 스레드"""
-    result_ready = pyqtSignal(str, bool)  # ip, is_online
+    """클라이언트 ping 체크 스레드 (단일 ICMP 소켓으로 전체 확인)"""
+    results_ready = pyqtSignal(dict)  # ip → rtt_ms (오프라인이면 None), 전체 결과를 한 번에 전달
 
     def __init__(self, clients: List[dict]):
         super().__init__()
         self.clients = clients
         self.running = True
 
-    def ping_host(self, ip: str) -> tuple:
+    def run(self):
+        ips = [c.get('ip', '') for c in self.clients if c.get('ip')]
         try:
-            result = subprocess.run(
-                ['ping', '-c', '1', '-W', '1', ip],
-                capture_output=True, timeout=2
-            )
-            return ip, result.returncode == 0
-        except:
-            return ip, False
+            results = pxe_icmp.probe_hosts(ips, timeout=1.0)
+        except Exception as e:
+            print(f"[상태] ICMP 확인 실패: {e}")
+            results = {ip: None for ip in ips}
+        if self.running:
+            self.results_ready.emit(results)
+
+    def stop(self):
+        self.running = False
+
+
+class SSHCommandThread(QThread):
+    """SSH 명령을 UI 스레드 밖에서 실행 (세션 풀의 마스터 연결 재사용)"""
+    command_finished = pyqtSignal(str, int, str, str)  # ip, returncode, stdout, stderr
+
+    def __init__(self, pool: 'pxe_ssh.SSHPool', ip: str, command: str,
+                 timeout: float = 15, detached: bool = False):
+        super().__init__()
+        self.pool = pool
+        self.ip = ip
+        self.command = command
+        self.timeout = timeout
+        self.detached = detached
 
     def run(self):
-        with ThreadPoolExecutor(max_workers=20) as executor:
-            ips = [c.get('ip', '') for c in self.clients if c.get('ip')]
-            results = executor.map(self.ping_host, ips)
-            for ip, is_online in results:
-                if self.running:
-                    self.result_ready.emit(ip, is_online)
+        try:
+            runner = self.pool.run_detached if self.detached else self.pool.run
+            result = runner(self.ip, self.command, timeout=self.timeout)
+            self.command_finished.emit(self.ip, result.returncode, result.stdout or '', result.stderr or '')
+        except subprocess.TimeoutExpired:
+            self.command_finished.emit(self.ip, -1, '', "연결 시간 초과")
+        except Exception as e:
+            self.command_finished.emit(self.ip, -1, '', str(e))
+
+
+class FleetThread(QThread):
+    """여러 클라이언트 일괄 작업 - 호스트별 결과를 끝나는 순서대로 전달"""
+    result_ready = pyqtSignal(dict)
+    all_done = pyqtSignal(dict)  # 상태별 개수
+
+    def __init__(self, pool: 'pxe_ssh.SSHPool', clients: List[dict], action: str,
+                 command: str, parallel: int, stagger: float):
+        super().__init__()
+        self.pool = pool
+        self.clients = clients
+        self.action = action
+        self.command = command
+        self.parallel = parallel
+        self.stagger = stagger
+        self.cancel_event = threading.Event()
+
+    def run(self):
+        results = []
+        try:
+            for result in pxe_fleet.run_fleet(self.pool, self.clients, self.action, self.command,
+                                              parallel=self.parallel, stagger=self.stagger,
+                                              cancel=self.cancel_event):
+                results.append(result)
+                self.result_ready.emit(result)
+        except Exception as e:
+            print(f"[일괄 작업] 오류: {e}")
+        self.all_done.emit(pxe_fleet.summarize(results))
 
     def stop(self):
-        self.running = False
+        self.cancel_event.set()
+
+
+class TelemetryThread(QThread):
+    """클라이언트 시스템 정보 수집 (로컬 SSH 또는 데몬 요청) - 시리얼 → entry 전달"""
+    collected = pyqtSignal(dict)
+
+    def __init__(self, collect: Callable[[List[dict]], dict], clients: List[dict]):
+        super().__init__()
+        self.collect = collect
+        self.clients = clients
+
+    def run(self):
+        try:
+            self.collected.emit(self.collect(self.clients))
+        except (pxe_daemon.DaemonError, OSError) as e:
+            print(f"[시스템 정보] 수집 실패: {e}")
 
 
 class StatusUpdateThread(QThread):
-    """시스템 상태 업데이트 스레드"""
+    """서버 자원/처리량 샘플 스레드 (pxe_resources - 직전 샘플과의 차이라 측정 구간을 기다리지 않음)"""
     status_updated = pyqtSignal(dict)
+    traffic_updated = pyqtSignal(dict)  # 클라이언트별 NFS 트래픽 (pxe_nfstraffic 샘플)
 
-    def __init__(self):
+    def __init__(self, config: dict, traffic_fn: Callable[[], Optional[dict]]):
         super().__init__()
+        self.config = config
+        self.traffic_fn = traffic_fn
         self.running = True
 
     def run(self):
+        sampler = None
         while self.running:
-            status = {
-                'cpu': psutil.cpu_percent(interval=1),
-                'memory': psutil.virtual_memory().percent,
-                'disk': psutil.disk_usage('/').percent
-            }
-            self.status_updated.emit(status)
-            time.sleep(2)
+            # 설정에서 인터페이스/NFS 경로를 바꾸면 새 샘플러로
+            target = (self.config.get('network_interface') or 'eth0', self.config.get('nfs_root') or '/')
+            if sampler is None or (sampler.interface, sampler.storage_path) != target:
+                sampler = pxe_resources.ResourceSampler(*target)
+                sampler.sample()
+            time.sleep(pxe_nfstraffic.REFRESH_INTERVAL)
+            self.status_updated.emit(sampler.sample())
+            try:
+                traffic = self.traffic_fn()
+            except pxe_daemon.DaemonError as e:
+                print(f"[NFS 트래픽] 데몬 요청 실패: {e}")
+                traffic = None
+            if traffic:
+                self.traffic_updated.emit(traffic)
 
     def stop(self):
         self.running = False
 
 
-class ClientCard(QFrame):
-    """클라이언트 카드 위젯"""
-    edit_clicked = pyqtSignal(dict)
-    delete_clicked = pyqtSignal(dict)
-    detail_clicked = pyqtSignal(dict)
+class DaemonEventThread(QThread):
+    """관리 데몬 변경 알림 수신 스레드 - 끊기면 5초 뒤 다시 연결"""
+    state_ready = pyqtSignal(dict)    # 연결할 때마다 전체 상태
+    event_received = pyqtSignal(dict)
+    history_ready = pyqtSignal(dict)  # 시리얼 → 기록 요약 (연결 시, health 알림/heartbeat마다)
+    telemetry_ready = pyqtSignal(dict)  # 시리얼 → 시스템 정보 (연결 시 전체, 이후는 telemetry 알림)
 
-    def __init__(self, client: dict, index: int):
+    def __init__(self, client: 'pxe_daemon.DaemonClient'):
         super().__init__()
         self.client = client
-        self.index = index
-        self.is_online = None
-        self.init_ui()
+        self.running = True
 
-    def init_ui(self):
-        self.setObjectName("client_card")
-        self.setFixedHeight(60)
-
-        layout = QHBoxLayout(self)
-        layout.setContentsMargins(12, 8, 12, 8)
-        layout.setSpacing(10)
-
-        # 상태 표시등
-        self.status_indicator = QLabel("●")
-        self.status_indicator.setObjectName("status_pending")
-        self.status_indicator.setFixedWidth(16)
-        layout.addWidget(self.status_indicator)
-
-        # 번호
-        num_label = QLabel(f"{self.index}")
-        num_label.setObjectName("card_num")
-        num_label.setFixedWidth(28)
-        num_label.setAlignment(Qt.AlignCenter)
-        layout.addWidget(num_label)
-
-        # 호스트명
-        hostname = self.client.get('hostname', self.client.get('serial', 'N/A'))
-        host_label = QLabel(hostname)
-        host_label.setObjectName("card_hostname")
-        host_label.setFixedWidth(120)
-        layout.addWidget(host_label)
-
-        # IP
-        ip_label = QLabel(self.client.get('ip', 'N/A'))
-        ip_label.setObjectName("card_detail")
-        ip_label.setFixedWidth(110)
-        layout.addWidget(ip_label)
-
-        # MAC
-        mac_label = QLabel(self.client.get('mac', 'N/A'))
-        mac_label.setObjectName("card_detail")
-        layout.addWidget(mac_label, 1)
-
-        # 버튼 영역
-        detail_btn = QPushButton("상세")
-        detail_btn.setObjectName("card_btn")
-        detail_btn.setFixedSize(55, 28)
-        detail_btn.clicked.connect(lambda: self.detail_clicked.emit(self.client))
-        layout.addWidget(detail_btn)
-
-        edit_btn = QPushButton("편집")
-        edit_btn.setObjectName("card_btn")
-        edit_btn.setFixedSize(55, 28)
-        edit_btn.clicked.connect(lambda: self.edit_clicked.emit(self.client))
-        layout.addWidget(edit_btn)
-
-        del_btn = QPushButton("삭제")
-        del_btn.setObjectName("card_btn_danger")
-        del_btn.setFixedSize(55, 28)
-        del_btn.clicked.connect(lambda: self.delete_clicked.emit(self.client))
-        layout.addWidget(del_btn)
-
-    def set_status(self, is_online: bool):
-        self.is_online = is_online
-        if is_online:
-            self.status_indicator.setText("●")
-            self.status_indicator.setObjectName("status_online")
-            self.status_indicator.setToolTip("온라인")
+    def run(self):
+        while self.running:
+            try:
+                state = self.client.state()
+                self.state_ready.emit(state)
+                self.history_ready.emit(self.client.history())
+                self.telemetry_ready.emit(self.client.telemetry())
+                for event in self.client.events(since=state['seq']):
+                    if not self.running:
+                        break
+                    if event['type'] != 'heartbeat':
+                        self.event_received.emit(event)
+                    if event['type'] in ('heartbeat', 'health'):
+                        self.history_ready.emit(self.client.history())
+            except pxe_daemon.DaemonError as e:
+                if self.running:
+                    print(f"[데몬] {e}")
+            for _ in range(50):
+                if not self.running:
+                    break
+                time.sleep(0.1)
+
+    def stop(self):
+        self.running = False
+        self.client.close_stream()
+
+
+# 클라이언트 목록 열
+COL_STATUS, COL_NUM, COL_HOSTNAME, COL_IP, COL_MAC, COL_HISTORY, COL_SYSTEM, COL_ACTIONS = range(8)
+
+# 정렬 모드 (정렬 콤보 항목 순서와 동일)
+(SORT_IP, SORT_HOSTNAME, SORT_ONLINE_FIRST, SORT_OFFLINE_FIRST,
+ SORT_TEMP, SORT_LOAD, SORT_MEMORY, SORT_DISK) = range(8)
+# 시스템 정보 정렬 모드 → pxe_telemetry 키
+TELEMETRY_SORTS = {SORT_TEMP: 'temp', SORT_LOAD: 'load', SORT_MEMORY: 'memory', SORT_DISK: 'disk'}
+
+CLIENT_ROLE = Qt.UserRole + 1   # 클라이언트 dict
+STATUS_ROLE = Qt.UserRole + 2   # True(온라인) / False(오프라인) / None(확인 전)
+HISTORY_ROLE = Qt.UserRole + 3  # pxe_history 요약 또는 None
+TELEMETRY_ROLE = Qt.UserRole + 4  # pxe_telemetry entry 또는 None
+
+# 기록 저장 주기 (데몬이 없을 때 GUI가 직접 기록)
+HISTORY_SAVE_MS = 5 * 60 * 1000
+STATUS_CHECK_MS = 60 * 1000
+# 시스템 정보 수집 대상 확인 간격 (데몬이 없을 때 - 실제 수집은 telemetry_interval마다)
+TELEMETRY_CHECK_MS = 30 * 1000
+
+# 로그 페이지의 부팅 지연 분석 항목
+BOOT_TRACE_LOG = '부팅 지연 분석'
+
+STATUS_COLORS = {True: '#58a6ff', False: '#f0883e', None: '#8b949e'}
+# 온도 수준별 색 (pxe_telemetry.temp_level)
+TEMP_COLORS = {0: '#c9d1d9', 1: '#d29922', 2: '#f85149'}
+# 대시보드 NFS 상위 클라이언트 표
+HOT_COLUMNS = ["시리얼", "IP", "읽기", "쓰기", "전송", "패킷", "연결", "누적"]
+
+
+class ClientTableModel(QAbstractTableModel):
+    """클라이언트 목록 모델 - 새로고침/상태 확인 시 바뀐 행만 갱신"""
+    HEADERS = ["", "#", "호스트명", "IP 주소", "MAC 주소", "최근 24시간", "온도 · 부하 · 메모리 · 디스크", ""]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.clients: List[dict] = []
+        self.status: Dict[str, Optional[bool]] = {}
+        self.rtt: Dict[str, float] = {}
+        self.history: Dict[str, dict] = {}
+        self.telemetry: Dict[str, dict] = {}
+        self.telemetry_ttl = float(pxe_telemetry.DEFAULT_TTL)
+        self._ip_numbers: List[int] = []
+        self._row_by_ip: Dict[str, int] = {}
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.clients)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        client = self.clients[index.row()]
+        column = index.column()
+        ip = client.get('ip', '')
+
+        if role == CLIENT_ROLE:
+            return client
+        if role == STATUS_ROLE:
+            return self.status.get(ip)
+        if role == HISTORY_ROLE:
+            return self.history.get(client.get('serial'))
+        if role == TELEMETRY_ROLE:
+            return self.telemetry.get(client.get('serial'))
+
+        if column == COL_SYSTEM:
+            entry = self.telemetry.get(client.get('serial'))
+            if role == Qt.DisplayRole:
+                return pxe_telemetry.format_brief(entry)
+            if role == Qt.ForegroundRole:
+                if not pxe_telemetry.is_fresh(entry, self.telemetry_ttl):
+                    return QColor('#8b949e')
+                return QColor(TEMP_COLORS[pxe_telemetry.temp_level(entry)])
+            if role == Qt.ToolTipRole:
+                return '\n'.join(f"{label}: {text}" for label, text in
+                                 pxe_telemetry.describe(entry, self.telemetry_ttl))
+            return None
+
+        if column == COL_HISTORY and role == Qt.ToolTipRole:
+            summary = self.history.get(client.get('serial'))
+            if not summary or summary['uptime'] is None:
+                return "기록 없음"
+            return (f"가동률 {summary['uptime']:.1f}% · 상태 변화 {summary['flaps']}회 · "
+                    f"확인 {summary['probes']}회 (24시간, 막대 하나 = 10분)")
+
+        if column == COL_STATUS:
+            is_online = self.status.get(ip)
+            if role == Qt.DisplayRole:
+                return "○" if is_online is False else "●"
+            if role == Qt.ForegroundRole:
+                return QColor(STATUS_COLORS[is_online])
+            if role == Qt.ToolTipRole:
+                if is_online is None:
+                    return "확인 중"
+                rtt = self.rtt.get(ip, -1.0)
+                if is_online:
+                    return f"온라인 ({rtt:.1f}ms)" if rtt >= 0 else "온라인"
+                return "오프라인"
+            if role == Qt.TextAlignmentRole:
+                return Qt.AlignCenter
+            return None
+
+        if role == Qt.DisplayRole:
+            if column == COL_NUM:
+                return str(index.row() + 1)
+            if column == COL_HOSTNAME:
+                return client.get('hostname', client.get('serial', 'N/A'))
+            if column == COL_IP:
+                return client.get('ip', 'N/A')
+            if column == COL_MAC:
+                return client.get('mac', 'N/A')
+            if column == COL_HISTORY:
+                return pxe_history.format_summary(self.history.get(client.get('serial')))
+        return None
+
+    def client_at(self, row: int) -> dict:
+        return self.clients[row]
+
+    def sort_key(self, row: int, mode: int) -> tuple:
+        """정렬 키 (IP 정수는 set_clients에서 미리 계산)"""
+        client = self.clients[row]
+        ip_number = self._ip_numbers[row]
+        if mode == SORT_HOSTNAME:
+            return (client.get('hostname', '').lower(), ip_number)
+        if mode == SORT_ONLINE_FIRST:
+            return (0 if self.status.get(client.get('ip', '')) is True else 1, ip_number)
+        if mode == SORT_OFFLINE_FIRST:
+            return (0 if self.status.get(client.get('ip', '')) is False else 1, ip_number)
+        if mode in TELEMETRY_SORTS:
+            entry = self.telemetry.get(client.get('serial'))
+            return (*pxe_telemetry.sort_key(entry, TELEMETRY_SORTS[mode]), ip_number)
+        return (ip_number,)
+
+    def accepts(self, row: int, filters: List[tuple]) -> bool:
+        """시스템 정보 필터 (pxe_telemetry.parse_filter 결과 목록)"""
+        return pxe_telemetry.matches(self.telemetry.get(self.clients[row].get('serial')), filters)
+
+    def set_clients(self, clients: List[dict]):
+        """목록 교체 - 구성이 같으면 바뀐 행만 dataChanged, 다르면 모델 리셋"""
+        if [c.get('serial') for c in clients] == [c.get('serial') for c in self.clients]:
+            changed = [row for row, client in enumerate(clients) if client != self.clients[row]]
+            self.clients = list(clients)
+            self._reindex()
+            for row in changed:
+                self.dataChanged.emit(self.index(row, 0), self.index(row, self.columnCount() - 1))
+            return
+
+        self.beginResetModel()
+        self.clients = list(clients)
+        self._reindex()
+        self.endResetModel()
+
+    def _reindex(self):
+        self._ip_numbers = [pxe_registry.ip_to_number(c.get('ip')) or 0 for c in self.clients]
+        self._row_by_ip = {c.get('ip', ''): row for row, c in enumerate(self.clients) if c.get('ip')}
+
+    def set_history(self, summaries: Dict[str, dict]):
+        """시리얼 → 기록 요약 교체 (기록 열 전체 다시 그림)"""
+        self.history = dict(summaries)
+        if self.clients:
+            self.dataChanged.emit(self.index(0, COL_HISTORY), self.index(len(self.clients) - 1, COL_HISTORY),
+                                  [Qt.DisplayRole, Qt.ToolTipRole, HISTORY_ROLE])
+
+    def set_telemetry(self, entries: Dict[str, dict], replace: bool = True):
+        """시리얼 → 시스템 정보 교체(replace) 또는 병합 (시스템 열 전체 다시 그림)"""
+        if replace:
+            self.telemetry = dict(entries)
+        else:
+            self.telemetry.update(entries)
+        if self.clients:
+            self.dataChanged.emit(self.index(0, COL_SYSTEM), self.index(len(self.clients) - 1, COL_SYSTEM),
+                                  [Qt.DisplayRole, Qt.ForegroundRole, Qt.ToolTipRole, TELEMETRY_ROLE])
+
+    def update_status(self, results: Dict[str, Optional[float]]):
+        """ping 결과(IP → RTT 또는 None) 반영 - 바뀐 행 범위에 dataChanged 한 번"""
+        rows = []
+        for ip, rtt in results.items():
+            is_online = rtt is not None
+            new_rtt = rtt if rtt is not None else -1.0
+            if self.status.get(ip) == is_online and self.rtt.get(ip) == new_rtt:
+                continue
+            self.status[ip] = is_online
+            self.rtt[ip] = new_rtt
+            row = self._row_by_ip.get(ip)
+            if row is not None:
+                rows.append(row)
+
+        if rows:
+            self.dataChanged.emit(self.index(min(rows), COL_STATUS), self.index(max(rows), COL_STATUS),
+                                  [Qt.DisplayRole, Qt.ForegroundRole, Qt.ToolTipRole, STATUS_ROLE])
+
+
+class ClientSortProxyModel(QSortFilterProxyModel):
+    """정렬 콤보 선택에 따른 클라이언트 정렬 (원본 모델은 그대로 유지)"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.mode = SORT_IP
+        self.filters: List[tuple] = []
+        self.setDynamicSortFilter(True)
+
+    def set_mode(self, mode: int):
+        self.mode = mode
+        self.invalidate()
+        self.sort(COL_STATUS, Qt.AscendingOrder)
+
+    def set_filters(self, filters: List[tuple]):
+        self.filters = filters
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent) -> bool:
+        return not self.filters or self.sourceModel().accepts(source_row, self.filters)
+
+    def lessThan(self, left, right) -> bool:
+        model = self.sourceModel()
+        return model.sort_key(left.row(), self.mode) < model.sort_key(right.row(), self.mode)
+
+
+class ClientItemDelegate(QStyledItemDelegate):
+    """번호 배지와 상세/편집/삭제 버튼을 위젯 없이 직접 그리는 델리게이트"""
+    detail_clicked = pyqtSignal(dict)
+    edit_clicked = pyqtSignal(dict)
+    delete_clicked = pyqtSignal(dict)
+
+    BUTTONS = (("상세", 'detail'), ("편집", 'edit'), ("삭제", 'delete'))
+    BUTTON_SIZE = QSize(55, 28)
+    BUTTON_SPACING = 6
+    SPARK_WIDTH = 4 * pxe_history.SPARK_POINTS
+
+    def button_rects(self, rect: QRect) -> List[QRect]:
+        width = self.BUTTON_SIZE.width()
+        height = self.BUTTON_SIZE.height()
+        top = rect.top() + (rect.height() - height) // 2
+        x = rect.right() - len(self.BUTTONS) * (width + self.BUTTON_SPACING) + self.BUTTON_SPACING
+        rects = []
+        for _ in self.BUTTONS:
+            rects.append(QRect(x, top, width, height))
+            x += width + self.BUTTON_SPACING
+        return rects
+
+    def paint(self, painter, option, index):
+        column = index.column()
+        if column not in (COL_NUM, COL_HISTORY, COL_ACTIONS):
+            super().paint(painter, option, index)
+            return
+
+        # 선택/hover 배경만 기본 스타일로 그림
+        opt = QStyleOptionViewItem(option)
+        self.initStyleOption(opt, index)
+        opt.text = ""
+        style = opt.widget.style() if opt.widget else QApplication.style()
+        style.drawControl(QStyle.CE_ItemViewItem, opt, painter, opt.widget)
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        if column == COL_NUM:
+            # 프록시 행 번호 = 화면에 보이는 순서
+            badge = QRect(0, 0, 28, 24)
+            badge.moveCenter(option.rect.center())
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(QColor('#21262d'))
+            painter.drawRoundedRect(badge, 4, 4)
+            font = QFont(option.font)
+            font.setBold(True)
+            painter.setFont(font)
+            painter.setPen(QColor('#8b949e'))
+            painter.drawText(badge, Qt.AlignCenter, str(index.row() + 1))
+        elif column == COL_HISTORY:
+            self.paint_history(painter, option.rect, index.data(HISTORY_ROLE), option.font)
         else:
-            self.status_indicator.setText("○")
-            self.status_indicator.setObjectName("status_offline")
-            self.status_indicator.setToolTip("오프라인")
-        self.status_indicator.setStyle(self.status_indicator.style())
+            font = QFont(option.font)
+            font.setPointSizeF(max(font.pointSizeF() - 1, 8))
+            painter.setFont(font)
+            for rect, (label, action) in zip(self.button_rects(option.rect), self.BUTTONS):
+                danger = action == 'delete'
+                painter.setBrush(QColor('#21262d'))
+                painter.setPen(QColor('#da3633' if danger else '#30363d'))
+                painter.drawRoundedRect(rect.adjusted(0, 0, -1, -1), 6, 6)
+                painter.setPen(QColor('#f85149' if danger else '#c9d1d9'))
+                painter.drawText(rect, Qt.AlignCenter, label)
+        painter.restore()
+
+    def paint_history(self, painter, rect: QRect, summary: Optional[dict], font: QFont):
+        """RTT 스파크라인 (무응답 칸은 빨간 막대) + 가동률"""
+        if not summary or summary['uptime'] is None:
+            painter.setPen(QColor('#8b949e'))
+            painter.drawText(rect.adjusted(8, 0, 0, 0), Qt.AlignLeft | Qt.AlignVCenter, "-")
+            return
+        values = summary['spark']
+        rtts = [v for v in values if v is not None and v >= 0]
+        high = max(rtts) if rtts else 1.0
+        chart = QRect(rect.left() + 8, rect.top() + 12, self.SPARK_WIDTH, rect.height() - 24)
+        bar = max(1, chart.width() // max(len(values), 1))
+        painter.setPen(Qt.NoPen)
+        for n, value in enumerate(values):
+            if value is None:
+                continue
+            x = chart.left() + n * bar
+            if value < 0:
+                painter.setBrush(QColor('#f85149'))
+                painter.drawRect(x, chart.top(), max(bar - 1, 1), chart.height())
+            else:
+                height = max(2, int(chart.height() * value / high)) if high > 0 else 2
+                painter.setBrush(QColor('#58a6ff'))
+                painter.drawRect(x, chart.bottom() - height + 1, max(bar - 1, 1), height)
+        small = QFont(font)
+        small.setPointSizeF(max(small.pointSizeF() - 1, 8))
+        painter.setFont(small)
+        uptime = summary['uptime']
+        painter.setPen(QColor('#3fb950' if uptime >= 99 else '#d29922' if uptime >= 90 else '#f85149'))
+        text = f"{uptime:.0f}%" + (f" ↕{summary['flaps']}" if summary['flaps'] else "")
+        painter.drawText(QRect(chart.right() + 8, rect.top(), rect.right() - chart.right() - 8, rect.height()),
+                         Qt.AlignLeft | Qt.AlignVCenter, text)
+
+    def sizeHint(self, option, index):
+        if index.column() == COL_ACTIONS:
+            width = len(self.BUTTONS) * (self.BUTTON_SIZE.width() + self.BUTTON_SPACING)
+            return QSize(width, self.BUTTON_SIZE.height() + 16)
+        return super().sizeHint(option, index)
+
+    def editorEvent(self, event, model, option, index):
+        if (index.column() == COL_ACTIONS and event.type() == QEvent.MouseButtonRelease
+                and event.button() == Qt.LeftButton):
+            for rect, (_, action) in zip(self.button_rects(option.rect), self.BUTTONS):
+                if rect.contains(event.pos()):
+                    client = index.data(CLIENT_ROLE)
+                    signal = getattr(self, f'{action}_clicked')
+                    # 대화상자가 모델을 바꿀 수 있으므로 이벤트 처리가 끝난 뒤 전달
+                    QTimer.singleShot(0, lambda: signal.emit(client))
+                    return True
+        return super().editorEvent(event, model, option, index)
 
 
 class RPIPXEManagerGUI(QMainWindow):
+    # 서비스 모니터 스레드 → UI 스레드 (서비스 → 실행 중 여부)
+    services_changed = pyqtSignal(dict)
+
     def __init__(self):
         super().__init__()
 
         self.config_file = Path.home() / '.rpi_pxe_config.json'
         self.project_dir = Path(__file__).parent.resolve()
         self.clients_backup_file = self.project_dir / 'clients_backup.json'
+        self.registry = pxe_registry.ClientRegistry(Path.home() / '.rpi_pxe_clients.db')
         self.config = self.load_config()
-        self.client_cards = {}
-        self.client_status = {}
+        # 클라이언트 목록/상태는 모델이 보관 (뷰는 보이는 행만 그림)
+        self.client_model = ClientTableModel(self)
+        self.client_status = self.client_model.status
+        self.client_rtt = self.client_model.rtt
         self.ping_thread = None
+        # 클라이언트별 SSH 마스터 연결 풀 (상세 보기/재부팅/종료/터미널이 공유)
+        self.ssh_pool = pxe_ssh.SSHPool.from_config(self.config)
+        self.ssh_threads = []
+        # 관리 데몬이 실행 중이면 ping/systemctl 대신 데몬 상태와 변경 알림을 씀
+        self.daemon = pxe_daemon.connect(self.config)
+        self.daemon_thread = None
+        self.daemon_health: Dict[str, Optional[float]] = {}
+        # 서비스 상태 캐시 - 데몬 알림 또는 로컬 서비스 모니터(systemd D-Bus)가 갱신
+        self.service_states: Dict[str, bool] = {}
+        self.service_monitor = None
+        # 데몬이 없으면 GUI가 직접 응답/RTT 기록 (있으면 데몬 기록을 받아 표시)
+        self.history = None
+        if self.daemon is None:
+            self.history = pxe_history.load(Path(self.config.get('history_file') or pxe_history.HISTORY_FILE))
+        # 클라이언트 시스템 정보 캐시 - 데몬이 없으면 GUI가 주기적으로 수집
+        self.telemetry = None if self.daemon else pxe_telemetry.from_config(self.config)
+        self.telemetry_thread = None     # 주기 수집
+        self.telemetry_threads = []      # 상세 보기 새로고침
+        self.detail_serial = None
+        self.client_model.telemetry_ttl = float(self.config.get('telemetry_ttl', pxe_telemetry.DEFAULT_TTL))
+        # 클라이언트별 NFS 트래픽 - 데몬이 없으면 상태 스레드가 직접 샘플
+        self.traffic_sampler = None
 
         self.init_ui()
         self.start_status_thread()
+        self.start_daemon_thread()
+        self.start_service_monitor()
+        if self.history is not None:
+            self.client_model.set_history(self.history.summaries())
+            self.history_timer = QTimer(self)
+            self.history_timer.timeout.connect(self.save_history)
+            self.history_timer.start(HISTORY_SAVE_MS)
+            # 데몬이 없으면 기록이 끊기지 않도록 주기적으로 상태 확인
+            self.status_check_timer = QTimer(self)
+            self.status_check_timer.timeout.connect(self.check_all_clients_status)
+            self.status_check_timer.start(STATUS_CHECK_MS)
+        if self.telemetry is not None and self.config.get('telemetry_enabled', True):
+            self.client_model.set_telemetry(self.telemetry.all())
+            self.telemetry_timer = QTimer(self)
+            self.telemetry_timer.timeout.connect(self.collect_due_telemetry)
+            self.telemetry_timer.start(TELEMETRY_CHECK_MS)
 
     def load_config(self) -> dict:
         config = {
@@ -212,40 +643,31 @@ class RPIPXEManagerGUI(QMainWindow):
             except:
                 pass
 
-        config['clients'] = self.parse_clients_from_dnsmasq()
+        config['clients'] = self.load_clients(config)
         return config
 
-    def parse_clients_from_dnsmasq(self) -> List[dict]:
-        clients = []
-        dnsmasq_conf = Path('/etc/dnsmasq.conf')
-
-        if not dnsmasq_conf.exists():
-            return clients
+    def load_clients(self, config: dict = None) -> List[dict]:
+        """레지스트리(IP 순 정렬)에서 클라이언트 목록 로드, 비어 있으면 dnsmasq 설정에서 파싱"""
+        try:
+            if self.registry.count():
+                return self.registry.all()
+        except Exception as e:
+            print(f"레지스트리 읽기 오류: {e}")
+        return self.parse_clients_from_dnsmasq(config)
 
+    def parse_clients_from_dnsmasq(self, config: dict = None) -> List[dict]:
         try:
-            with open(dnsmasq_conf, 'r') as f:
-                content = f.read()
-
-            pattern = r'dhcp-host=([0-9a-fA-F:]+),([0-9.]+),([^,\n]+)'
-            matches = re.findall(pattern, content)
-
-            for mac, ip, hostname in matches:
-                clients.append({
-                    'serial': hostname,
-                    'hostname': hostname,
-                    'mac': mac.lower(),
-                    'ip': ip,
-                    'boot_mode': 'nfs'
-                })
+            return pxe_dnsmasq.parse_clients(config if config is not None else self.config)
         except Exception as e:
             print(f"dnsmasq.conf 읽기 오류: {e}")
-
-        return clients
+            return []
 
     def save_config(self):
         try:
+            # 클라이언트 목록은 레지스트리에 저장되므로 서버 설정만 기록
+            settings = {k: v for k, v in self.config.items() if k != 'clients'}
             with open(self.config_file, 'w') as f:
-                json.dump(self.config, f, indent=2)
+                json.dump(settings, f, indent=2)
         except Exception as e:
             print(f"설정 저장 실패: {e}")
 
@@ -354,64 +776,25 @@ class RPIPXEManagerGUI(QMainWindow):
                 color: #8b949e;
             }
 
-            QFrame#client_card {
+            QTableView#client_table {
                 background-color: #161b22;
                 border: 1px solid #30363d;
                 border-radius: 8px;
+                selection-background-color: #1f2a37;
+                selection-color: #c9d1d9;
             }
-            QFrame#client_card:hover {
-                border-color: #58a6ff;
+            QTableView#client_table::item {
+                border-bottom: 1px solid #21262d;
+                padding: 0 6px;
             }
-
-            QLabel#card_num {
-                font-size: 14px;
-                font-weight: bold;
+            QTableView#client_table QHeaderView::section {
+                background-color: #161b22;
                 color: #8b949e;
-                background-color: #21262d;
-                border-radius: 4px;
-                padding: 4px;
-            }
-            QLabel#card_hostname {
-                font-size: 15px;
                 font-weight: bold;
-                color: #c9d1d9;
-            }
-            QLabel#card_detail {
-                font-size: 13px;
-                color: #c9d1d9;
-                font-family: 'D2Coding', 'Consolas', 'Monaco', monospace;
-            }
-
-            QLabel#status_online {
-                color: #58a6ff;
-                font-size: 14px;
-                font-weight: bold;
-            }
-            QLabel#status_offline {
-                color: #f0883e;
-                font-size: 14px;
-            }
-            QLabel#status_pending {
-                color: #8b949e;
-                font-size: 14px;
-            }
-
-            QPushButton#card_btn {
-                background-color: #21262d;
-                border: 1px solid #30363d;
-                padding: 2px 6px;
-                font-size: 11px;
-            }
-            QPushButton#card_btn_danger {
-                background-color: #21262d;
-                border: 1px solid #da3633;
-                color: #f85149;
-                padding: 2px 6px;
-                font-size: 11px;
-            }
-            QPushButton#card_btn_danger:hover {
-                background-color: #da3633;
-                color: white;
+                font-size: 12px;
+                border: none;
+                border-bottom: 1px solid #30363d;
+                padding: 8px 6px;
             }
 
             QGroupBox {
@@ -654,6 +1037,31 @@ class RPIPXEManagerGUI(QMainWindow):
         info_layout.addWidget(service_group)
 
         layout.addLayout(info_layout)
+
+        # 처리량 - 부팅 폭주 때 NIC/디스크/nfsd 중 어디가 막히는지
+        self.throughput_group = QGroupBox("서버 처리량")
+        self.throughput_layout = QGridLayout(self.throughput_group)
+        self.throughput_layout.setHorizontalSpacing(15)
+        self.throughput_layout.setVerticalSpacing(8)
+        self.throughput_rows: List[Tuple[QLabel, QLabel]] = []
+        layout.addWidget(self.throughput_group)
+
+        # NFS를 많이 쓰는 클라이언트 (폭주하는 로거/카메라 작업 찾기)
+        hot_group = QGroupBox("NFS 상위 클라이언트")
+        hot_layout = QVBoxLayout(hot_group)
+        self.hot_source_label = QLabel("첫 샘플을 모으는 중...")
+        self.hot_source_label.setObjectName("subtitle")
+        self.hot_source_label.setWordWrap(True)
+        hot_layout.addWidget(self.hot_source_label)
+        self.hot_table = QTableWidget(0, len(HOT_COLUMNS))
+        self.hot_table.setHorizontalHeaderLabels(HOT_COLUMNS)
+        self.hot_table.verticalHeader().setVisible(False)
+        self.hot_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.hot_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.hot_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.hot_table.setMinimumHeight(160)
+        hot_layout.addWidget(self.hot_table)
+        layout.addWidget(hot_group)
         layout.addStretch()
 
         return page
@@ -685,11 +1093,19 @@ class RPIPXEManagerGUI(QMainWindow):
         header_layout.addWidget(sort_label)
 
         self.sort_combo = QComboBox()
-        self.sort_combo.addItems(["IP 순", "호스트명 순", "온라인 우선", "오프라인 우선"])
-        self.sort_combo.setFixedWidth(120)
+        self.sort_combo.addItems(["IP 순", "호스트명 순", "온라인 우선", "오프라인 우선",
+                                  "온도 높은 순", "부하 높은 순", "메모리 높은 순", "디스크 높은 순"])
+        self.sort_combo.setFixedWidth(130)
         self.sort_combo.currentTextChanged.connect(self.sort_clients)
         header_layout.addWidget(self.sort_combo)
 
+        # 시스템 정보 필터 (예: temp>70, disk>=90)
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("필터: temp>70, disk>=90")
+        self.filter_edit.setFixedWidth(180)
+        self.filter_edit.textChanged.connect(self.filter_clients)
+        header_layout.addWidget(self.filter_edit)
+
         # 버튼들
         add_btn = QPushButton("+ 추가")
         add_btn.setObjectName("primary_btn")
@@ -704,52 +1120,53 @@ class RPIPXEManagerGUI(QMainWindow):
         ping_btn.clicked.connect(self.check_all_clients_status)
         header_layout.addWidget(ping_btn)
 
+        fleet_btn = QPushButton("일괄 작업")
+        fleet_btn.clicked.connect(self.show_fleet_dialog)
+        header_layout.addWidget(fleet_btn)
+
         backup_btn = QPushButton("백업/복원")
         backup_btn.clicked.connect(self.show_backup_dialog)
         header_layout.addWidget(backup_btn)
 
         layout.addLayout(header_layout)
 
-        # 열 헤더
-        col_header = QFrame()
-        col_header.setStyleSheet("background-color: #161b22; border-radius: 4px; padding: 5px;")
-        col_header_layout = QHBoxLayout(col_header)
-        col_header_layout.setContentsMargins(12, 8, 12, 8)
-        col_header_layout.setSpacing(10)
-
-        headers = [
-            ("", 16),
-            ("#", 28),
-            ("호스트명", 120),
-            ("IP 주소", 110),
-            ("MAC 주소", 0),
-            ("", 120)
-        ]
-        for text, width in headers:
-            lbl = QLabel(text)
-            lbl.setStyleSheet("color: #8b949e; font-weight: bold; font-size: 12px;")
-            if width > 0:
-                lbl.setFixedWidth(width)
-            else:
-                col_header_layout.addWidget(lbl, 1)
-                continue
-            col_header_layout.addWidget(lbl)
-
-        layout.addWidget(col_header)
-
-        # 클라이언트 리스트 (스크롤)
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-
-        self.clients_container = QWidget()
-        self.clients_layout = QVBoxLayout(self.clients_container)
-        self.clients_layout.setContentsMargins(0, 0, 10, 0)
-        self.clients_layout.setSpacing(6)
-        self.clients_layout.addStretch()
-
-        scroll.setWidget(self.clients_container)
-        layout.addWidget(scroll)
+        # 클라이언트 테이블 (모델/프록시 정렬/델리게이트)
+        self.client_proxy = ClientSortProxyModel(self)
+        self.client_proxy.setSourceModel(self.client_model)
+        self.client_proxy.set_mode(self.sort_combo.currentIndex())
+
+        self.client_delegate = ClientItemDelegate(self)
+        self.client_delegate.detail_clicked.connect(self.show_client_detail)
+        self.client_delegate.edit_clicked.connect(self.edit_client)
+        self.client_delegate.delete_clicked.connect(self.delete_client)
+
+        self.client_view = QTableView()
+        self.client_view.setObjectName("client_table")
+        self.client_view.setModel(self.client_proxy)
+        self.client_view.setItemDelegate(self.client_delegate)
+        self.client_view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        # 여러 행 선택 → 일괄 작업 대상
+        self.client_view.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.client_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.client_view.setShowGrid(False)
+        self.client_view.setWordWrap(False)
+        self.client_view.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.client_view.verticalHeader().setVisible(False)
+        self.client_view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.client_view.verticalHeader().setDefaultSectionSize(48)
+        self.client_view.doubleClicked.connect(
+            lambda index: self.show_client_detail(index.data(CLIENT_ROLE)))
+
+        header = self.client_view.horizontalHeader()
+        header.setHighlightSections(False)
+        header.setDefaultAlignment(Qt.AlignLeft | Qt.AlignVCenter)
+        for column, width in ((COL_STATUS, 36), (COL_NUM, 48), (COL_HOSTNAME, 150),
+                              (COL_IP, 130), (COL_HISTORY, 200), (COL_SYSTEM, 210), (COL_ACTIONS, 190)):
+            header.setSectionResizeMode(column, QHeaderView.Fixed)
+            header.resizeSection(column, width)
+        header.setSectionResizeMode(COL_MAC, QHeaderView.Stretch)
+
+        layout.addWidget(self.client_view)
 
         self.refresh_clients()
 
@@ -860,7 +1277,7 @@ class RPIPXEManagerGUI(QMainWindow):
         select_layout.addWidget(QLabel("서비스:"))
 
         self.log_service_combo = QComboBox()
-        self.log_service_combo.addItems(['dnsmasq', 'nfs-kernel-server'])
+        self.log_service_combo.addItems(['dnsmasq', 'nfs-kernel-server', BOOT_TRACE_LOG])
         self.log_service_combo.setFixedWidth(200)
         self.log_service_combo.currentTextChanged.connect(self.load_log)
         select_layout.addWidget(self.log_service_combo)
@@ -917,7 +1334,7 @@ class RPIPXEManagerGUI(QMainWindow):
         # 버튼들
         btn_layout = QHBoxLayout()
 
-        gen_exports_btn = QPushButton("exports 생성/적용")
+        gen_exports_btn = QPushButton("exports 동기화")
         gen_exports_btn.setObjectName("primary_btn")
         gen_exports_btn.clicked.connect(self.generate_exports)
         btn_layout.addWidget(gen_exports_btn)
@@ -987,22 +1404,107 @@ class RPIPXEManagerGUI(QMainWindow):
     # ========== 기능 ==========
 
     def start_status_thread(self):
-        self.status_thread = StatusUpdateThread()
+        self.status_thread = StatusUpdateThread(self.config, self.sample_nfs_traffic)
         self.status_thread.status_updated.connect(self.on_status_updated)
+        self.status_thread.traffic_updated.connect(self.on_traffic_updated)
         self.status_thread.start()
 
-    def on_status_updated(self, status: dict):
-        cpu_val = self.cpu_card.findChild(QLabel, "stat_value")
-        if cpu_val:
-            cpu_val.setText(f"{status['cpu']:.0f}%")
+    def sample_nfs_traffic(self) -> Optional[dict]:
+        """상태 스레드에서 호출 - 데몬이 있으면 데몬의 마지막 샘플, 없으면 직접 샘플"""
+        if self.daemon is not None:
+            return self.daemon.traffic()
+        nfs_root = self.config.get('nfs_root') or '/'
+        if self.traffic_sampler is None or self.traffic_sampler.nfs_root != nfs_root:
+            self.traffic_sampler = pxe_nfstraffic.NFSTrafficSampler(nfs_root)
+        return self.traffic_sampler.sample(list(self.config.get('clients', [])))
+
+    def on_traffic_updated(self, traffic: dict):
+        if traffic['interval'] is None:
+            return
+        self.hot_source_label.setText(f"카운터: {pxe_nfstraffic.describe_sources(traffic)}   "
+                                      f"구간: 최근 {traffic['interval']:.0f}초")
+        rows = pxe_nfstraffic.hot(traffic)
+        self.hot_table.setRowCount(len(rows))
+        for i, row in enumerate(rows):
+            text = pxe_nfstraffic.format_row(row)
+            values = [pxe_nfstraffic.label(row), row['ip'] or '-', text['read'], text['write'], text['bytes'],
+                      text['packets'], str(row['connections']), text['total']]
+            for column, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if column >= 2:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                if i == 0 and row['bytes_s']:
+                    item.setForeground(QColor("#f0883e"))
+                self.hot_table.setItem(i, column, item)
+
+    def start_service_monitor(self):
+        if self.daemon is not None:
+            return
+        self.services_changed.connect(self.on_services_changed)
+        self.service_monitor = pxe_services.ServiceMonitor()
+        self.service_monitor.add_listener(
+            lambda states: self.services_changed.emit(pxe_services.active_map(states)))
+        self.service_monitor.start()
+
+    def on_services_changed(self, services: dict):
+        self.service_states = dict(services)
+        self.update_service_status()
 
-        mem_val = self.mem_card.findChild(QLabel, "stat_value")
-        if mem_val:
-            mem_val.setText(f"{status['memory']:.0f}%")
+    def start_daemon_thread(self):
+        if self.daemon is None:
+            return
+        self.daemon_thread = DaemonEventThread(self.daemon)
+        self.daemon_thread.state_ready.connect(self.on_daemon_state)
+        self.daemon_thread.event_received.connect(self.on_daemon_event)
+        self.daemon_thread.history_ready.connect(self.client_model.set_history)
+        self.daemon_thread.telemetry_ready.connect(self.on_telemetry)
+        self.daemon_thread.start()
+
+    def on_daemon_state(self, state: dict):
+        self.daemon_health = dict(state['health'])
+        self.on_ping_results(self.daemon_health)
+        self.on_services_changed(state['services'])
+
+    def on_daemon_event(self, event: dict):
+        if event['type'] == 'health':
+            self.daemon_health.update(event['data'])
+            self.on_ping_results(event['data'])
+        elif event['type'] == 'services':
+            self.on_services_changed(event['data'])
+        elif event['type'] == 'clients':
+            self.refresh_clients(keep_status=True)
+        elif event['type'] == 'telemetry':
+            self.on_telemetry(event['data'], replace=False)
 
-        disk_val = self.disk_card.findChild(QLabel, "stat_value")
-        if disk_val:
-            disk_val.setText(f"{status['disk']:.0f}%")
+    def on_status_updated(self, status: dict):
+        for card, key in ((self.cpu_card, 'cpu'), (self.mem_card, 'memory'), (self.disk_card, 'disk')):
+            value = card.findChild(QLabel, "stat_value")
+            if value:
+                value.setText("-" if status[key] is None else f"{status[key]:.0f}%")
+
+        found = pxe_resources.bottlenecks(status)
+        rows = pxe_resources.describe(status) + [("병목", pxe_resources.format_bottlenecks(status))]
+        window = f" (최근 {status['interval']:.0f}초)" if status.get('interval') else ""
+        self.throughput_group.setTitle(f"서버 처리량{window}")
+        for i, (label, value) in enumerate(rows):
+            if i == len(self.throughput_rows):
+                name_label, value_label = QLabel(), QLabel()
+                name_label.setObjectName("subtitle")
+                value_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
+                self.throughput_layout.addWidget(name_label, i, 0)
+                self.throughput_layout.addWidget(value_label, i, 1)
+                self.throughput_layout.setColumnStretch(1, 1)
+                self.throughput_rows.append((name_label, value_label))
+            name_label, value_label = self.throughput_rows[i]
+            name_label.setText(label)
+            value_label.setText(value)
+            name_label.show()
+            value_label.show()
+        for name_label, value_label in self.throughput_rows[len(rows):]:
+            name_label.hide()
+            value_label.hide()
+        self.throughput_rows[len(rows) - 1][1].setStyleSheet(
+            "color: #f85149; font-weight: bold;" if found else "color: #3fb950;")
 
     def update_dashboard(self):
         self.net_interface_label.setText(self.config.get('network_interface', 'N/A'))
@@ -1016,96 +1518,105 @@ class RPIPXEManagerGUI(QMainWindow):
         self.update_service_status()
 
     def update_service_status(self):
-        for service, label in self.service_labels.items():
-            try:
-                result = subprocess.run(['systemctl', 'is-active', service],
-                                       capture_output=True, text=True, timeout=5)
-                if result.stdout.strip() == 'active':
+        # 캐시된 값만 표시 - 바뀌면 services_changed/데몬 알림으로 다시 호출됨
+        for labels, prefix in ((self.service_labels, "● "), (self.service_status_labels, "")):
+            for service, label in labels.items():
+                active = self.service_states.get(service)
+                if active is None:
+                    label.setStyleSheet("color: #8b949e;")
+                    label.setText(f"{prefix}알 수 없음")
+                elif active:
                     label.setStyleSheet("color: #3fb950; font-weight: bold;")
-                    label.setText("● 실행 중")
+                    label.setText(f"{prefix}실행 중")
                 else:
                     label.setStyleSheet("color: #f85149; font-weight: bold;")
-                    label.setText("● 중지됨")
-            except:
-                label.setStyleSheet("color: #8b949e;")
-                label.setText("● 알 수 없음")
-
-        for service, label in self.service_status_labels.items():
-            try:
-                result = subprocess.run(['systemctl', 'is-active', service],
-                                       capture_output=True, text=True, timeout=5)
-                if result.stdout.strip() == 'active':
-                    label.setStyleSheet("color: #3fb950; font-weight: bold;")
-                    label.setText("실행 중")
-                else:
-                    label.setStyleSheet("color: #f85149; font-weight: bold;")
-                    label.setText("중지됨")
-            except:
-                label.setStyleSheet("color: #8b949e;")
-                label.setText("알 수 없음")
+                    label.setText(f"{prefix}중지됨")
 
     def refresh_clients(self, keep_status=False):
         print("[클라이언트] 목록 새로고침")
-        self.config['clients'] = self.parse_clients_from_dnsmasq()
-
-        # 기존 상태 저장
-        if keep_status:
-            for ip, card in self.client_cards.items():
-                if card.is_online is not None:
-                    self.client_status[ip] = card.is_online
-
-        # 정렬
-        clients = self.get_sorted_clients()
-
-        # 기존 카드 제거
-        while self.clients_layout.count() > 1:
-            item = self.clients_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
-
-        self.client_cards.clear()
+        self.config['clients'] = self.load_clients()
 
-        for i, client in enumerate(clients):
-            card = ClientCard(client, i + 1)
-            card.detail_clicked.connect(self.show_client_detail)
-            card.edit_clicked.connect(self.edit_client)
-            card.delete_clicked.connect(self.delete_client)
-            self.clients_layout.insertWidget(i, card)
-            ip = client.get('ip', '')
-            self.client_cards[ip] = card
-
-            # 기존 상태 복원
-            if ip in self.client_status:
-                card.set_status(self.client_status[ip])
-
-        self.client_count_label.setText(f"총 {len(clients)}개 등록됨")
+        # 모델이 바뀐 행만 갱신하고 상태(ping 결과)는 IP 기준으로 유지
+        self.client_model.set_clients(self.config['clients'])
+        self.client_count_label.setText(f"총 {len(self.config['clients'])}개 등록됨")
 
         # 상태 체크 (keep_status가 아닐 때만)
         if not keep_status:
             self.check_all_clients_status()
 
-    def get_sorted_clients(self) -> list:
-        clients = self.config.get('clients', [])
-        sort_option = self.sort_combo.currentText() if hasattr(self, 'sort_combo') else "IP 순"
-
-        if sort_option == "IP 순":
-            return sorted(clients, key=lambda c: self.ip_to_number(c.get('ip', '0.0.0.0')))
-        elif sort_option == "호스트명 순":
-            return sorted(clients, key=lambda c: c.get('hostname', '').lower())
-        elif sort_option == "온라인 우선":
-            return sorted(clients, key=lambda c: (
-                0 if self.client_status.get(c.get('ip', '')) == True else 1,
-                self.ip_to_number(c.get('ip', '0.0.0.0'))
-            ))
-        elif sort_option == "오프라인 우선":
-            return sorted(clients, key=lambda c: (
-                0 if self.client_status.get(c.get('ip', '')) == False else 1,
-                self.ip_to_number(c.get('ip', '0.0.0.0'))
-            ))
-        return clients
-
     def sort_clients(self):
-        self.refresh_clients(keep_status=True)
+        self.client_proxy.set_mode(self.sort_combo.currentIndex())
+
+    def filter_clients(self, text: str):
+        try:
+            filters = [pxe_telemetry.parse_filter(part) for part in text.split(',') if part.strip()]
+        except ValueError as e:
+            # 입력 중인 식 - 이전 필터 유지
+            self.filter_edit.setStyleSheet("border: 1px solid #f85149;")
+            self.filter_edit.setToolTip(str(e))
+            return
+        self.filter_edit.setStyleSheet("")
+        self.filter_edit.setToolTip("")
+        self.client_proxy.set_filters(filters)
+
+    # ---------- 클라이언트 시스템 정보 ----------
+
+    def on_telemetry(self, entries: dict, replace: bool = True):
+        self.client_model.set_telemetry(entries, replace)
+        # 시스템 정보로 정렬/필터 중이면 다시 적용
+        if self.client_proxy.mode in TELEMETRY_SORTS or self.client_proxy.filters:
+            self.client_proxy.set_mode(self.client_proxy.mode)
+        if self.detail_serial in entries:
+            self.show_detail_telemetry()
+
+    def collect_telemetry(self, clients: List[dict]) -> dict:
+        """(작업 스레드) 수집 → 시리얼 → entry. 데몬이 있으면 데몬이 수집"""
+        if self.daemon is not None:
+            return self.daemon.refresh_telemetry([c['serial'] for c in clients])
+        entries = pxe_telemetry.collect(
+            self.ssh_pool, clients,
+            parallel=int(self.config.get('telemetry_parallel', pxe_telemetry.DEFAULT_PARALLEL)))
+        self.telemetry.update(entries)
+        try:
+            self.telemetry.save()
+        except OSError as e:
+            print(f"[시스템 정보] 캐시 저장 실패: {e}")
+        return {entry['serial']: self.telemetry.get(entry['serial']) for entry in entries}
+
+    def collect_due_telemetry(self):
+        """온라인이고 telemetry_interval이 지난 클라이언트 수집 (데몬이 없을 때 타이머)"""
+        if self.telemetry_thread and self.telemetry_thread.isRunning():
+            return
+        online = [ip for ip, is_online in self.client_status.items() if is_online]
+        interval = float(self.config.get('telemetry_interval', pxe_telemetry.DEFAULT_INTERVAL))
+        due = self.telemetry.due(self.config.get('clients', []), online, interval)
+        if not due:
+            return
+        print(f"[시스템 정보] {len(due)}개 클라이언트 수집")
+        self.telemetry_thread = TelemetryThread(self.collect_telemetry, due)
+        self.telemetry_thread.collected.connect(self.on_telemetry_collected)
+        self.telemetry_thread.start()
+
+    def on_telemetry_collected(self, entries: dict):
+        self.on_telemetry(entries, replace=False)
+
+    def refresh_client_telemetry(self, client: dict):
+        """상세 보기의 '정보 새로고침' - 해당 클라이언트만 지금 수집"""
+        self.sys_info_text.append("\n수집 중...")
+        thread = TelemetryThread(self.collect_telemetry, [client])
+        thread.collected.connect(self.on_telemetry_collected)
+        thread.finished.connect(lambda: self.telemetry_threads.remove(thread))
+        self.telemetry_threads.append(thread)
+        thread.start()
+
+    def show_detail_telemetry(self):
+        entry = self.client_model.telemetry.get(self.detail_serial)
+        try:
+            self.sys_info_text.setPlainText('\n'.join(
+                f"{label}: {text}" for label, text in pxe_telemetry.describe(entry, self.client_model.telemetry_ttl)))
+        except RuntimeError:
+            # 상세 다이얼로그가 이미 닫힘
+            self.detail_serial = None
 
     def check_all_clients_status(self):
         print(f"[상태] 클라이언트 상태 확인 시작 ({len(self.config.get('clients', []))}개)")
@@ -1117,21 +1628,29 @@ class RPIPXEManagerGUI(QMainWindow):
         if not clients:
             return
 
+        if self.daemon_thread and self.daemon_thread.isRunning():
+            # 데몬이 확인한 값 - 새로 등록된 IP는 데몬의 다음 확인 때 health 알림으로 들어옴
+            self.on_ping_results({c['ip']: self.daemon_health[c['ip']]
+                                  for c in clients if c.get('ip') in self.daemon_health})
+            return
+
         self.ping_thread = PingThread(clients)
-        self.ping_thread.result_ready.connect(self.on_ping_result)
+        self.ping_thread.results_ready.connect(self.on_ping_results)
         self.ping_thread.start()
 
-    def on_ping_result(self, ip: str, is_online: bool):
-        self.client_status[ip] = is_online
-        if ip in self.client_cards:
-            self.client_cards[ip].set_status(is_online)
+    def on_ping_results(self, results: dict):
+        self.client_model.update_status(results)
+        if self.history is not None:
+            self.history.record(results, self.config.get('clients', []))
+            self.client_model.set_history(self.history.summaries())
 
-    def ip_to_number(self, ip: str) -> int:
+    def save_history(self):
+        if self.history is None:
+            return
         try:
-            parts = ip.split('.')
-            return int(parts[0]) * 256**3 + int(parts[1]) * 256**2 + int(parts[2]) * 256 + int(parts[3])
-        except:
-            return 0
+            self.history.save()
+        except OSError as e:
+            print(f"[기록] 저장 실패: {e}")
 
     def add_client(self):
         dialog = QDialog(self)
@@ -1176,21 +1695,16 @@ class RPIPXEManagerGUI(QMainWindow):
                 return
 
             if not ip:
-                ip = self.get_next_ip()
+                ip = self.get_next_ip(mac)
 
             QMessageBox.information(self, "알림",
                 f"클라이언트 추가:\n시리얼: {serial}\nMAC: {mac}\nIP: {ip}\n\n"
                 "CLI에서 './pxe' 실행 후 클라이언트 추가 메뉴를 이용하세요.")
 
-    def get_next_ip(self) -> str:
-        used_ips = [c.get('ip', '') for c in self.config.get('clients', [])]
-        base = '.'.join(self.config.get('server_ip', '192.168.0.10').split('.')[:3])
-
-        for i in range(100, 200):
-            ip = f"{base}.{i}"
-            if ip not in used_ips:
-                return ip
-        return f"{base}.100"
+    def get_next_ip(self, mac: str = None) -> str:
+        """CLI와 같은 할당기로 다음 고정 IP 계산 (리스/ARP 충돌 제외)"""
+        allocator = pxe_ipam.IPAllocator.from_config(self.config, self.config.get('clients', []))
+        return allocator.peek(mac) or ''
 
     def show_client_detail(self, client: dict):
         """클라이언트 상세 정보 다이얼로그"""
@@ -1224,6 +1738,21 @@ class RPIPXEManagerGUI(QMainWindow):
         status_label.setStyleSheet(f"color: {'#3fb950' if is_online else '#f85149'}; font-weight: bold;")
         info_layout.addRow("상태:", status_label)
 
+        lease = pxe_leases.shared().state(client.get('mac', ''))
+        lease_text = pxe_leases.format_remaining(lease)
+        if lease:
+            lease_text = f"{lease['ip']} ({lease_text})"
+            if lease['last_seen']:
+                lease_text += f", 마지막 갱신 {datetime.fromtimestamp(lease['last_seen']).strftime('%H:%M:%S')}"
+        info_layout.addRow("DHCP 리스:", QLabel(lease_text))
+
+        summary = self.client_model.history.get(serial)
+        history_text = "기록 없음"
+        if summary and summary['uptime'] is not None:
+            history_text = (f"가동률 {summary['uptime']:.1f}%, 상태 변화 {summary['flaps']}회  "
+                            f"{pxe_history.sparkline(summary['spark'])}")
+        info_layout.addRow("최근 24시간:", QLabel(history_text))
+
         layout.addWidget(info_group)
 
         # 파일 시스템 정보
@@ -1262,25 +1791,28 @@ class RPIPXEManagerGUI(QMainWindow):
 
         layout.addWidget(fs_group)
 
-        # 온라인일 경우 시스템 정보 표시
-        if is_online:
-            sys_group = QGroupBox("시스템 정보 (SSH)")
-            sys_layout = QVBoxLayout(sys_group)
+        # 시스템 정보 - 수집해 둔 값을 바로 표시 (오프라인이면 마지막 값)
+        sys_group = QGroupBox("시스템 정보")
+        sys_layout = QVBoxLayout(sys_group)
 
-            self.sys_info_text = QTextEdit()
-            self.sys_info_text.setReadOnly(True)
-            self.sys_info_text.setMaximumHeight(200)
-            self.sys_info_text.setPlainText("정보 수집 중...")
-            sys_layout.addWidget(self.sys_info_text)
+        self.sys_info_text = QTextEdit()
+        self.sys_info_text.setReadOnly(True)
+        self.sys_info_text.setMaximumHeight(200)
+        sys_layout.addWidget(self.sys_info_text)
+        self.detail_serial = serial
+        self.show_detail_telemetry()
 
-            refresh_btn = QPushButton("정보 새로고침")
-            refresh_btn.clicked.connect(lambda: self.fetch_client_system_info(ip))
-            sys_layout.addWidget(refresh_btn)
+        refresh_btn = QPushButton("정보 새로고침")
+        refresh_btn.setEnabled(is_online)
+        refresh_btn.clicked.connect(lambda: self.refresh_client_telemetry(client))
+        sys_layout.addWidget(refresh_btn)
 
-            layout.addWidget(sys_group)
+        layout.addWidget(sys_group)
 
-            # 자동으로 정보 수집
-            QTimer.singleShot(100, lambda: self.fetch_client_system_info(ip))
+        if is_online:
+            # 값이 없거나 유효 시간이 지났으면 지금 수집
+            if not pxe_telemetry.is_fresh(self.client_model.telemetry.get(serial), self.client_model.telemetry_ttl):
+                self.refresh_client_telemetry(client)
 
             # 관리 버튼
             manage_layout = QHBoxLayout()
@@ -1300,7 +1832,7 @@ class RPIPXEManagerGUI(QMainWindow):
 
             layout.addLayout(manage_layout)
         else:
-            offline_label = QLabel("클라이언트가 오프라인 상태입니다.\n시스템 정보를 수집할 수 없습니다.")
+            offline_label = QLabel("클라이언트가 오프라인 상태입니다.\n시스템 정보는 마지막으로 수집한 값입니다.")
             offline_label.setStyleSheet("color: #8b949e; padding: 20px;")
             offline_label.setAlignment(Qt.AlignCenter)
             layout.addWidget(offline_label)
@@ -1311,52 +1843,15 @@ class RPIPXEManagerGUI(QMainWindow):
         layout.addWidget(close_btn)
 
         dialog.exec_()
+        self.detail_serial = None
 
-    def fetch_client_system_info(self, ip: str):
-        """SSH로 클라이언트 시스템 정보 수집"""
-        print(f"[SSH] 시스템 정보 수집 중: {ip}")
-        try:
-            # 여러 명령어를 한번에 실행
-            commands = [
-                "echo '=== 시스템 정보 ==='",
-                "uname -a",
-                "echo ''",
-                "echo '=== 업타임 ==='",
-                "uptime",
-                "echo ''",
-                "echo '=== CPU 정보 ==='",
-                "cat /proc/cpuinfo | grep -E '^(model name|Hardware|Revision)' | head -3",
-                "echo ''",
-                "echo '=== 메모리 ==='",
-                "free -h | head -2",
-                "echo ''",
-                "echo '=== 디스크 ==='",
-                "df -h / | tail -1",
-                "echo ''",
-                "echo '=== 온도 ==='",
-                "vcgencmd measure_temp 2>/dev/null || echo 'N/A'",
-                "echo ''",
-                "echo '=== IP 주소 ==='",
-                "hostname -I"
-            ]
-
-            cmd = "; ".join(commands)
-            result = subprocess.run(
-                ['sshpass', '-p', 'raspberry', 'ssh',
-                 '-o', 'StrictHostKeyChecking=no', '-o', 'ConnectTimeout=5',
-                 f'pi@{ip}', cmd],
-                capture_output=True, text=True, timeout=15
-            )
-
-            if result.returncode == 0:
-                self.sys_info_text.setPlainText(result.stdout)
-            else:
-                self.sys_info_text.setPlainText(f"오류: {result.stderr}")
-
-        except subprocess.TimeoutExpired:
-            self.sys_info_text.setPlainText("연결 시간 초과")
-        except Exception as e:
-            self.sys_info_text.setPlainText(f"오류: {e}")
+    def run_ssh_command(self, ip: str, command: str, callback, timeout: float = 15, detached: bool = False):
+        """SSH 명령을 백그라운드 스레드에서 실행하고 완료 시 callback(ip, returncode, stdout, stderr)"""
+        thread = SSHCommandThread(self.ssh_pool, ip, command, timeout=timeout, detached=detached)
+        thread.command_finished.connect(callback)
+        thread.finished.connect(lambda: self.ssh_threads.remove(thread))
+        self.ssh_threads.append(thread)
+        thread.start()
 
     def edit_client(self, client: dict):
         """클라이언트 편집 다이얼로그"""
@@ -1428,6 +1923,15 @@ class RPIPXEManagerGUI(QMainWindow):
         layout.addLayout(btn_layout)
         dialog.exec_()
 
+    def update_registry_client(self, client: dict):
+        """편집한 클라이언트 행만 레지스트리에 반영"""
+        if not client.get('serial'):
+            return
+        try:
+            self.registry.upsert(client)
+        except pxe_registry.DuplicateClientError as e:
+            print(f"[레지스트리] {e}")
+
     def save_client_edit(self, client: dict, new_hostname: str, new_mac: str, new_ip: str, dialog: QDialog):
         """클라이언트 편집 저장 - dnsmasq.conf 수정"""
         print(f"[저장] 클라이언트 정보 저장: {new_hostname} ({new_ip})")
@@ -1448,7 +1952,30 @@ class RPIPXEManagerGUI(QMainWindow):
             dialog.accept()
             return
 
+        if new_ip != old_ip:
+            others = [c for c in self.config.get('clients', []) if c.get('serial') != client.get('serial')]
+            problem = pxe_ipam.IPAllocator.from_config(self.config, others).conflict(new_ip, new_mac)
+            if problem:
+                reply = QMessageBox.question(self, "IP 충돌",
+                    f"{new_ip}: {problem}\n\n그래도 이 주소를 사용하시겠습니까?",
+                    QMessageBox.Yes | QMessageBox.No)
+                if reply != QMessageBox.Yes:
+                    return
+
         try:
+            if pxe_dnsmasq.uses_hostsdir():
+                # 클라이언트 예약 파일만 교체 후 SIGHUP (dnsmasq 재시작 없음)
+                updated = dict(client, hostname=new_hostname, mac=new_mac, ip=new_ip)
+                host_file = pxe_dnsmasq.hosts_dir(self.config) / f"{client.get('serial', old_hostname)}.conf"
+                pxe_dnsmasq.write_file(host_file, pxe_dnsmasq.render_host_entry(updated))
+                pxe_dnsmasq.reload_hosts()
+                self.update_registry_client(updated)
+
+                QMessageBox.information(self, "완료", "클라이언트 정보가 수정되었습니다.")
+                dialog.accept()
+                self.refresh_clients()
+                return
+
             # dnsmasq.conf 읽기
             result = subprocess.run(['sudo', 'cat', '/etc/dnsmasq.conf'],
                                    capture_output=True, text=True, timeout=10)
@@ -1475,6 +2002,7 @@ class RPIPXEManagerGUI(QMainWindow):
 
             # dnsmasq 재시작
             subprocess.run(['sudo', 'systemctl', 'restart', 'dnsmasq'], check=True, timeout=30)
+            self.update_registry_client(dict(client, hostname=new_hostname, mac=new_mac, ip=new_ip))
 
             QMessageBox.information(self, "완료", "클라이언트 정보가 수정되었습니다.")
             dialog.accept()
@@ -1556,8 +2084,11 @@ class RPIPXEManagerGUI(QMainWindow):
         errors = []
 
         try:
-            # 1. dnsmasq.conf에서 제거
-            if del_dnsmasq:
+            # 1. dnsmasq 예약 제거
+            if del_dnsmasq and pxe_dnsmasq.uses_hostsdir():
+                if pxe_dnsmasq.remove_file(pxe_dnsmasq.hosts_dir(self.config) / f"{serial}.conf"):
+                    pxe_dnsmasq.reload_hosts()
+            elif del_dnsmasq:
                 result = subprocess.run(['sudo', 'cat', '/etc/dnsmasq.conf'],
                                        capture_output=True, text=True)
                 lines = result.stdout.split('\n')
@@ -1569,18 +2100,17 @@ class RPIPXEManagerGUI(QMainWindow):
                 subprocess.run(['sudo', 'cp', temp_file, '/etc/dnsmasq.conf'], check=True)
                 subprocess.run(['sudo', 'systemctl', 'restart', 'dnsmasq'], timeout=30)
 
+            if del_dnsmasq:
+                self.registry.remove(serial)
+
             # 2. /etc/exports에서 제거
             if del_exports:
-                result = subprocess.run(['sudo', 'cat', '/etc/exports'],
-                                       capture_output=True, text=True)
-                lines = result.stdout.split('\n')
-                new_lines = [l for l in lines if serial not in l]
-
-                temp_file = '/tmp/exports.tmp'
-                with open(temp_file, 'w') as f:
-                    f.write('\n'.join(new_lines))
-                subprocess.run(['sudo', 'cp', temp_file, '/etc/exports'], check=True)
-                subprocess.run(['sudo', 'exportfs', '-ra'], timeout=30)
+                # 이 클라이언트를 뺀 목록으로 동기화 - 해당 export만 해제
+                remaining = [c for c in self.config.get('clients', []) if c.get('serial') != serial]
+                try:
+                    pxe_exports.reconcile(self.config, remaining)
+                except pxe_privops.BatchError as e:
+                    errors.append(f"NFS exports 해제 실패: {e}")
 
             # 3. tftpboot 삭제
             if del_tftpboot:
@@ -1622,18 +2152,10 @@ class RPIPXEManagerGUI(QMainWindow):
             QMessageBox.Yes | QMessageBox.No)
 
         if reply == QMessageBox.Yes:
-            try:
-                result = subprocess.run(
-                    ['sshpass', '-p', 'raspberry', 'ssh',
-                     '-o', 'StrictHostKeyChecking=no', '-o', 'ConnectTimeout=5',
-                     f'pi@{ip}', 'sudo reboot'],
-                    capture_output=True, text=True, timeout=15
-                )
-                QMessageBox.information(self, "완료", f"'{hostname}' 재부팅 명령을 전송했습니다.")
-            except subprocess.TimeoutExpired:
-                QMessageBox.information(self, "완료", f"'{hostname}' 재부팅 명령을 전송했습니다.")
-            except Exception as e:
-                QMessageBox.warning(self, "오류", f"재부팅 실패: {e}")
+            # 재부팅하면 연결이 끊기므로 명령 전송 후 마스터 연결도 닫음
+            self.run_ssh_command(ip, 'sudo reboot',
+                                 lambda *_: QMessageBox.information(self, "완료", f"'{hostname}' 재부팅 명령을 전송했습니다."),
+                                 detached=True)
 
     def shutdown_client(self, client: dict, dialog: QDialog = None):
         """클라이언트 종료"""
@@ -1646,35 +2168,178 @@ class RPIPXEManagerGUI(QMainWindow):
             QMessageBox.Yes | QMessageBox.No)
 
         if reply == QMessageBox.Yes:
-            try:
-                result = subprocess.run(
-                    ['sshpass', '-p', 'raspberry', 'ssh',
-                     '-o', 'StrictHostKeyChecking=no', '-o', 'ConnectTimeout=5',
-                     f'pi@{ip}', 'sudo shutdown -h now'],
-                    capture_output=True, text=True, timeout=15
-                )
-                QMessageBox.information(self, "완료", f"'{hostname}' 종료 명령을 전송했습니다.")
-            except subprocess.TimeoutExpired:
-                QMessageBox.information(self, "완료", f"'{hostname}' 종료 명령을 전송했습니다.")
-            except Exception as e:
-                QMessageBox.warning(self, "오류", f"종료 실패: {e}")
+            self.run_ssh_command(ip, 'sudo shutdown -h now',
+                                 lambda *_: QMessageBox.information(self, "완료", f"'{hostname}' 종료 명령을 전송했습니다."),
+                                 detached=True)
 
     def open_ssh_terminal(self, client: dict):
         """SSH 터미널 열기"""
         ip = client.get('ip', '')
         hostname = client.get('hostname', '')
         print(f"[SSH] 터미널 열기: {hostname} ({ip})")
+        # 마스터 연결이 열려 있으면 인증 없이 바로 접속
+        ssh_command = self.ssh_pool.terminal_command(ip)
         try:
-            # gnome-terminal에서 sshpass 사용
-            subprocess.Popen(['gnome-terminal', '--', 'sshpass', '-p', 'raspberry', 'ssh',
-                            '-o', 'StrictHostKeyChecking=no', f'pi@{ip}'])
+            subprocess.Popen(['gnome-terminal', '--', *ssh_command])
         except FileNotFoundError:
             try:
-                subprocess.Popen(['xterm', '-e', f'sshpass -p raspberry ssh -o StrictHostKeyChecking=no pi@{ip}'])
+                subprocess.Popen(['xterm', '-e', *ssh_command])
             except FileNotFoundError:
                 QMessageBox.warning(self, "오류",
                     f"터미널을 열 수 없습니다.\n\n수동으로 연결하세요:\nsshpass -p raspberry ssh pi@{ip}")
 
+    def selected_clients(self) -> List[dict]:
+        """클라이언트 테이블에서 선택한 행 (화면 순서)"""
+        rows = sorted(index.row() for index in self.client_view.selectionModel().selectedRows())
+        return [self.client_proxy.index(row, 0).data(CLIENT_ROLE) for row in rows]
+
+    def show_fleet_dialog(self):
+        """선택한 클라이언트(없으면 전체)에 명령/재부팅/종료 일괄 실행"""
+        selected = self.selected_clients()
+        clients = selected or self.get_clients_in_view_order()
+        if not clients:
+            QMessageBox.warning(self, "오류", "등록된 클라이언트가 없습니다.")
+            return
+
+        dialog = QDialog(self)
+        dialog.setWindowTitle("일괄 작업")
+        dialog.setMinimumSize(650, 500)
+        dialog.setStyleSheet(self.styleSheet())
+
+        layout = QVBoxLayout(dialog)
+        layout.setSpacing(12)
+
+        target_label = QLabel(f"대상: {len(clients)}개 클라이언트" +
+                              ("" if selected else " (선택 없음 → 전체)"))
+        target_label.setObjectName("subtitle")
+        layout.addWidget(target_label)
+
+        form = QFormLayout()
+        online_check = QCheckBox("온라인 클라이언트만")
+        online_check.setChecked(True)
+        form.addRow("", online_check)
+
+        action_combo = QComboBox()
+        actions = [pxe_fleet.ACTION_COMMAND, pxe_fleet.ACTION_REBOOT, pxe_fleet.ACTION_SHUTDOWN]
+        action_combo.addItems([pxe_fleet.ACTION_LABELS[a] for a in actions])
+        form.addRow("작업:", action_combo)
+
+        command_edit = QLineEdit()
+        command_edit.setPlaceholderText("예: uptime")
+        form.addRow("명령:", command_edit)
+
+        parallel_spin = QSpinBox()
+        parallel_spin.setRange(1, 64)
+        parallel_spin.setValue(pxe_fleet.DEFAULT_PARALLEL)
+        form.addRow("동시 실행 수:", parallel_spin)
+
+        stagger_spin = QDoubleSpinBox()
+        stagger_spin.setRange(0.0, 60.0)
+        stagger_spin.setSingleStep(0.5)
+        stagger_spin.setSuffix(" 초")
+        stagger_spin.setValue(pxe_fleet.DEFAULT_STAGGER[pxe_fleet.ACTION_COMMAND])
+        form.addRow("시작 간격:", stagger_spin)
+        layout.addLayout(form)
+
+        def on_action_changed(index):
+            action = actions[index]
+            command_edit.setEnabled(action == pxe_fleet.ACTION_COMMAND)
+            stagger_spin.setValue(pxe_fleet.DEFAULT_STAGGER[action])
+        action_combo.currentIndexChanged.connect(on_action_changed)
+
+        progress = QProgressBar()
+        progress.setRange(0, len(clients))
+        progress.setValue(0)
+        layout.addWidget(progress)
+
+        log = QTextEdit()
+        log.setReadOnly(True)
+        layout.addWidget(log)
+
+        btn_layout = QHBoxLayout()
+        run_btn = QPushButton("실행")
+        run_btn.setObjectName("primary_btn")
+        btn_layout.addWidget(run_btn)
+        stop_btn = QPushButton("중단")
+        stop_btn.setEnabled(False)
+        btn_layout.addWidget(stop_btn)
+        close_btn = QPushButton("닫기")
+        btn_layout.addWidget(close_btn)
+        layout.addLayout(btn_layout)
+
+        state = {'thread': None, 'action': None}
+
+        def on_result(result):
+            progress.setValue(progress.value() + 1)
+            code = '-' if result['returncode'] is None else result['returncode']
+            color = {pxe_fleet.STATUS_OK: '#3fb950', pxe_fleet.STATUS_SENT: '#3fb950',
+                     pxe_fleet.STATUS_FAILED: '#f85149'}.get(result['status'], '#d29922')
+            log.append(f"<span style='color:{color}'>[{result['status']}]</span> "
+                       f"{result['hostname']} ({result['ip']}) 코드={code} {result['elapsed']:.1f}초")
+            text = result['stdout'] if state['action'] == pxe_fleet.ACTION_COMMAND else ''
+            if result['status'] not in (pxe_fleet.STATUS_OK, pxe_fleet.STATUS_SENT):
+                text += result['stderr']
+            for line in text.strip().splitlines()[:20]:
+                log.append(f"<pre style='margin:0'>    {line}</pre>")
+
+        def on_done(summary):
+            log.append("<b>완료:</b> " + ', '.join(f"{k} {v}개" for k, v in summary.items()))
+            run_btn.setEnabled(True)
+            stop_btn.setEnabled(False)
+
+        def start():
+            action = actions[action_combo.currentIndex()]
+            command = command_edit.text().strip()
+            if action == pxe_fleet.ACTION_COMMAND and not command:
+                QMessageBox.warning(dialog, "오류", "실행할 명령을 입력하세요.")
+                return
+            targets = clients
+            if online_check.isChecked():
+                targets = [c for c in clients if self.client_status.get(c.get('ip', '')) is True]
+            if not targets:
+                QMessageBox.warning(dialog, "오류", "대상 클라이언트가 없습니다.")
+                return
+            if action != pxe_fleet.ACTION_COMMAND:
+                reply = QMessageBox.question(dialog, "확인",
+                    f"{len(targets)}개 클라이언트를 {pxe_fleet.ACTION_LABELS[action]}하시겠습니까?",
+                    QMessageBox.Yes | QMessageBox.No)
+                if reply != QMessageBox.Yes:
+                    return
+
+            print(f"[일괄 작업] {pxe_fleet.ACTION_LABELS[action]}: {len(targets)}개")
+            log.clear()
+            progress.setRange(0, len(targets))
+            progress.setValue(0)
+            thread = FleetThread(self.ssh_pool, targets, action, command,
+                                 parallel_spin.value(), stagger_spin.value())
+            thread.result_ready.connect(on_result)
+            thread.all_done.connect(on_done)
+            state['thread'] = thread
+            state['action'] = action
+            run_btn.setEnabled(False)
+            stop_btn.setEnabled(True)
+            thread.start()
+
+        def stop():
+            if state['thread']:
+                state['thread'].stop()
+            stop_btn.setEnabled(False)
+
+        run_btn.clicked.connect(start)
+        stop_btn.clicked.connect(stop)
+        close_btn.clicked.connect(dialog.close)
+
+        dialog.exec_()
+
+        # 닫으면 시작하지 않은 호스트는 취소하고 실행 중인 작업이 끝나기를 기다림
+        if state['thread'] and state['thread'].isRunning():
+            state['thread'].stop()
+            state['thread'].wait()
+
+    def get_clients_in_view_order(self) -> List[dict]:
+        return [self.client_proxy.index(row, 0).data(CLIENT_ROLE)
+                for row in range(self.client_proxy.rowCount())]
+
     def show_backup_dialog(self):
         dialog = QDialog(self)
         dialog.setWindowTitle("클라이언트 백업/복원")
@@ -1723,16 +2388,13 @@ class RPIPXEManagerGUI(QMainWindow):
         return None
 
     def save_backup(self, dialog):
-        backup_data = {
-            'backup_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'server_ip': self.config.get('server_ip', ''),
-            'nfs_root': self.config.get('nfs_root', ''),
-            'clients': self.config.get('clients', [])
-        }
-
         try:
-            with open(self.clients_backup_file, 'w') as f:
-                json.dump(backup_data, f, indent=2, ensure_ascii=False)
+            if not self.registry.count():
+                # 레지스트리가 비어 있으면 dnsmasq에서 읽은 목록을 먼저 가져옴
+                self.registry.import_clients(self.config.get('clients', []))
+            self.registry.export_backup(self.clients_backup_file,
+                                        self.config.get('server_ip', ''),
+                                        self.config.get('nfs_root', ''))
             QMessageBox.information(self, "완료", "백업이 저장되었습니다.")
             dialog.close()
         except Exception as e:
@@ -1749,8 +2411,11 @@ class RPIPXEManagerGUI(QMainWindow):
             QMessageBox.Yes | QMessageBox.No)
 
         if reply == QMessageBox.Yes:
-            self.config['clients'] = backup['clients']
-            self.save_config()
+            try:
+                self.registry.replace_all(backup['clients'])
+            except pxe_registry.DuplicateClientError as e:
+                QMessageBox.warning(self, "오류", f"복원 실패: {e}")
+                return
             QMessageBox.information(self, "완료", "복원되었습니다.")
             dialog.close()
             self.refresh_clients()
@@ -1770,13 +2435,17 @@ class RPIPXEManagerGUI(QMainWindow):
             subprocess.run(['sudo', 'systemctl', action, service], check=True, timeout=30)
             print(f"[서비스] {service} {action} 완료")
             QMessageBox.information(self, "완료", f"{service} {action} 완료")
-            self.update_service_status()
+            if self.service_monitor:
+                self.service_monitor.poke()
         except subprocess.CalledProcessError as e:
             QMessageBox.warning(self, "오류", f"서비스 제어 실패: {e}")
         except Exception as e:
             QMessageBox.warning(self, "오류", f"오류: {e}")
 
     def load_log(self, service: str):
+        if service == BOOT_TRACE_LOG:
+            self.load_boot_trace()
+            return
         try:
             result = subprocess.run(
                 ['journalctl', '-u', service, '-n', '100', '--no-pager'],
@@ -1786,6 +2455,16 @@ class RPIPXEManagerGUI(QMainWindow):
         except Exception as e:
             self.log_text.setPlainText(f"로그 로드 실패: {e}")
 
+    def load_boot_trace(self):
+        """최근 1시간 dnsmasq/mountd 로그로 부팅 단계별 소요 시간 분석"""
+        try:
+            tracer = pxe_boottrace.BootTracer(self.config.get('clients', []))
+            for line in pxe_boottrace.read_journal('-1h'):
+                tracer.feed(line)
+            self.log_text.setPlainText("최근 1시간 부팅 단계별 소요 시간\n\n" + pxe_boottrace.format_report(tracer))
+        except Exception as e:
+            self.log_text.setPlainText(f"부팅 분석 실패: {e}")
+
     def run_setup_wizard(self):
         self.setup_log.clear()
         self.setup_log.append("터미널에서 다음 명령어를 실행하세요:\n")
@@ -1795,8 +2474,8 @@ class RPIPXEManagerGUI(QMainWindow):
     # ========== NFS 설정 기능 ==========
 
     def generate_exports(self):
-        """등록된 클라이언트 기반으로 /etc/exports 생성"""
-        print("[NFS] exports 생성 시작")
+        """등록된 클라이언트 기준으로 /etc/exports 동기화 (바뀐 항목만 exportfs로 반영)"""
+        print("[NFS] exports 동기화 시작")
         clients = self.config.get('clients', [])
         nfs_root = self.config.get('nfs_root', '/media/polygom3d/rpi-client')
 
@@ -1805,30 +2484,32 @@ class RPIPXEManagerGUI(QMainWindow):
             return
 
         self.setup_log.clear()
-        self.setup_log.append("NFS exports 생성 시작...")
+        self.setup_log.append("NFS exports 동기화 시작...")
         self.setup_log.append(f"NFS 경로: {nfs_root}")
         self.setup_log.append(f"클라이언트 수: {len(clients)}")
         self.setup_log.append("-" * 50)
 
-        # exports 라인 생성
-        export_lines = []
-        for client in clients:
-            serial = client.get('serial', client.get('hostname', ''))
-            if serial:
-                line = f"{nfs_root}/{serial} *(rw,sync,no_subtree_check,no_root_squash)"
-                export_lines.append(line)
-                self.setup_log.append(line)
-
-        if not export_lines:
-            QMessageBox.warning(self, "오류", "생성할 export 설정이 없습니다.")
+        try:
+            plan = pxe_exports.plan(self.config, clients)
+        except Exception as e:
+            self.setup_log.append(f"오류: {e}")
+            QMessageBox.warning(self, "오류", str(e))
+            return
+
+        for line in plan.describe():
+            self.setup_log.append(line)
+
+        if not plan:
+            self.setup_log.append("변경 사항 없음 - 이미 동기화되어 있습니다.")
+            QMessageBox.information(self, "완료", "NFS exports가 이미 최신 상태입니다.")
             return
 
         self.setup_log.append("-" * 50)
 
         # 확인 다이얼로그
         reply = QMessageBox.question(self, "확인",
-            f"{len(export_lines)}개의 NFS export 설정을 /etc/exports에 추가하시겠습니까?\n\n"
-            "기존 설정에 추가됩니다.",
+            f"NFS exports를 동기화하시겠습니까?\n\n{plan.summary()}\n\n"
+            "NFS 서버는 재시작하지 않으며 마운트된 클라이언트에는 영향이 없습니다.",
             QMessageBox.Yes | QMessageBox.No)
 
         if reply != QMessageBox.Yes:
@@ -1836,42 +2517,12 @@ class RPIPXEManagerGUI(QMainWindow):
             return
 
         try:
-            # 임시 파일에 저장
-            temp_file = '/tmp/new_exports.txt'
-            with open(temp_file, 'w') as f:
-                f.write('\n'.join(export_lines) + '\n')
-
-            # sudo로 /etc/exports에 추가
-            result = subprocess.run(
-                ['sudo', 'sh', '-c', f'cat {temp_file} >> /etc/exports'],
-                capture_output=True, text=True, timeout=30
-            )
-
-            if result.returncode != 0:
-                self.setup_log.append(f"오류: {result.stderr}")
-                QMessageBox.warning(self, "오류", f"exports 적용 실패:\n{result.stderr}")
-                return
-
-            self.setup_log.append("\n/etc/exports에 추가 완료")
-
-            # exportfs -ra 실행
-            result = subprocess.run(
-                ['sudo', 'exportfs', '-ra'],
-                capture_output=True, text=True, timeout=30
-            )
-
-            if result.returncode == 0:
-                self.setup_log.append("NFS exports 리로드 완료 (exportfs -ra)")
-            else:
-                self.setup_log.append(f"exportfs 경고: {result.stderr}")
-
-            self.setup_log.append(f"\n완료! {len(export_lines)}개 설정 적용됨")
-            QMessageBox.information(self, "완료",
-                f"{len(export_lines)}개의 NFS export 설정이 적용되었습니다.")
-
-        except Exception as e:
+            pxe_exports.apply(plan)
+            self.setup_log.append(f"\n완료! {plan.summary()}")
+            QMessageBox.information(self, "완료", f"NFS exports 동기화 완료\n{plan.summary()}")
+        except pxe_privops.BatchError as e:
             self.setup_log.append(f"오류: {e}")
-            QMessageBox.warning(self, "오류", str(e))
+            QMessageBox.warning(self, "오류", f"exports 적용 실패:\n{e}")
 
     def show_cmdline_update_dialog(self):
         """cmdline.txt 경로 수정 다이얼로그"""
@@ -1982,10 +2633,27 @@ class RPIPXEManagerGUI(QMainWindow):
             self.status_thread.stop()
             self.status_thread.wait()
 
+        if self.daemon_thread:
+            self.daemon_thread.stop()
+            self.daemon_thread.wait()
+
+        if self.service_monitor:
+            self.service_monitor.stop()
+
+        self.save_history()
+
+        for thread in [self.telemetry_thread, *self.telemetry_threads]:
+            if thread:
+                thread.wait()
+
         if self.ping_thread and self.ping_thread.isRunning():
             self.ping_thread.stop()
             self.ping_thread.wait()
 
+        for thread in list(self.ssh_threads):
+            thread.wait()
+        self.ssh_pool.close_all()
+
         event.accept()
 
 
@@ -1997,6 +2665,7 @@ def main():
 
     window = RPIPXEManagerGUI()
     window.show()
+    pxe_deps.report_startup('pxe_gui_qt', STARTED)
 
     sys.exit(app.exec_())
 
@@ -0,0 +1,258 @@
+"""
+RPI PXE Manager - 클라이언트 응답/RTT 기록
+
+클라이언트(시리얼)마다 고정 크기 링 버퍼 하나. 확인 결과를 SLOT_SECONDS 단위
+칸에 모아 두므로 확인 주기와 상관없이 메모리가 일정하다.
+
+  칸 하나: 시작 시각(u32) + 평균 RTT(u16, 0.1ms 단위) + 응답/무응답 횟수(u8 ×2) + 상태 변화 횟수(u8)
+  = 9바이트 → 기본 4032칸(10분 × 28일) = 클라이언트당 약 36KB, 1000대 약 36MB
+
+디스크에는 array.tobytes() 그대로 저장하고 읽을 때도 frombytes로 한 번에 올린다
+(임시 파일에 쓴 뒤 rename). 관리 데몬이 있으면 데몬이 기록하고 CLI/GUI는 데몬에서
+요약을 가져오며, 데몬이 없으면 GUI가 직접 기록한다.
+"""
+
+import os
+import struct
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+HISTORY_FILE = Path.home() / '.rpi_pxe_history.bin'
+
+SLOT_SECONDS = 600
+CAPACITY = 4032
+# 요약/스파크라인 기본 구간
+SUMMARY_WINDOW = 24 * 3600
+SPARK_POINTS = 24
+
+RTT_NONE = 0xFFFF
+RTT_SCALE = 10          # 0.1ms 단위
+COUNT_MAX = 0xFF
+
+MAGIC = b'PXEH'
+VERSION = 1
+_FILE_HEADER = struct.Struct('<4sHII I')     # magic, version, slot_seconds, capacity, clients
+_CLIENT_HEADER = struct.Struct('<B II b')    # 시리얼 길이, head, size, 마지막 상태(-1/0/1)
+
+SPARK_BARS = '▁▂▃▄▅▆▇█'
+
+
+class ClientHistory:
+    """클라이언트 하나의 링 버퍼"""
+
+    __slots__ = ('capacity', 'start', 'rtt', 'up', 'down', 'flaps', 'head', 'size', 'last_state')
+
+    def __init__(self, capacity: int = CAPACITY):
+        self.capacity = capacity
+        self.start = array('I', bytes(4 * capacity))
+        self.rtt = array('H', [RTT_NONE]) * capacity
+        self.up = array('B', bytes(capacity))
+        self.down = array('B', bytes(capacity))
+        self.flaps = array('B', bytes(capacity))
+        self.head = 0           # 다음에 쓸 칸
+        self.size = 0
+        self.last_state: Optional[bool] = None
+
+    def _current(self) -> int:
+        return (self.head - 1) % self.capacity
+
+    def record(self, now: float, rtt_ms: Optional[float], slot_seconds: int = SLOT_SECONDS):
+        slot_start = int(now // slot_seconds * slot_seconds)
+        index = self._current()
+        if not self.size or self.start[index] != slot_start:
+            index = self.head
+            self.start[index] = slot_start
+            self.rtt[index] = RTT_NONE
+            self.up[index] = self.down[index] = self.flaps[index] = 0
+            self.head = (self.head + 1) % self.capacity
+            self.size = min(self.size + 1, self.capacity)
+
+        online = rtt_ms is not None
+        if online:
+            ups = self.up[index]
+            value = min(int(rtt_ms * RTT_SCALE), RTT_NONE - 1)
+            # 칸 안에서는 응답 RTT 누적 평균
+            self.rtt[index] = value if self.rtt[index] == RTT_NONE else \
+                (self.rtt[index] * ups + value) // (ups + 1)
+            self.up[index] = min(ups + 1, COUNT_MAX)
+        else:
+            self.down[index] = min(self.down[index] + 1, COUNT_MAX)
+        if self.last_state is not None and online != self.last_state:
+            self.flaps[index] = min(self.flaps[index] + 1, COUNT_MAX)
+        self.last_state = online
+
+    def indexes(self, since: Optional[int] = None) -> List[int]:
+        """오래된 칸부터 (since 이후 시작한 칸만)"""
+        if since is None:
+            first = (self.head - self.size) % self.capacity
+            return [(first + i) % self.capacity for i in range(self.size)]
+        # 칸은 시간순이므로 최근 칸부터 거슬러 올라가다 since 이전에서 멈춤
+        order = []
+        index = self._current()
+        for _ in range(self.size):
+            if self.start[index] < since:
+                break
+            order.append(index)
+            index = (index - 1) % self.capacity
+        order.reverse()
+        return order
+
+    def summary(self, now: Optional[float] = None, window: int = SUMMARY_WINDOW,
+                points: int = SPARK_POINTS, slot_seconds: int = SLOT_SECONDS) -> dict:
+        """가동률(%), 상태 변화 횟수, 스파크라인 값 (최근 points칸, 칸마다 RTT ms 또는 None)"""
+        now = time.time() if now is None else now
+        since = int(now - window)
+        indexes = self.indexes(since)
+        ups = sum(self.up[i] for i in indexes)
+        downs = sum(self.down[i] for i in indexes)
+        by_start = {self.start[i]: i for i in indexes}
+        last_slot = int(now // slot_seconds * slot_seconds)
+        spark = []
+        for n in range(points - 1, -1, -1):
+            i = by_start.get(last_slot - n * slot_seconds)
+            if i is None:
+                spark.append(None)          # 기록 없음
+            elif self.rtt[i] == RTT_NONE:
+                spark.append(-1.0)          # 무응답만
+            else:
+                spark.append(self.rtt[i] / RTT_SCALE)
+        return {
+            'uptime': round(100.0 * ups / (ups + downs), 1) if ups + downs else None,
+            'flaps': sum(self.flaps[i] for i in indexes),
+            'probes': ups + downs,
+            'spark': spark,
+        }
+
+
+class HistoryStore:
+    """시리얼 → ClientHistory (스레드 안전)"""
+
+    def __init__(self, path: Path = HISTORY_FILE, capacity: int = CAPACITY, slot_seconds: int = SLOT_SECONDS):
+        self.path = Path(path)
+        self.capacity = capacity
+        self.slot_seconds = slot_seconds
+        self.clients: Dict[str, ClientHistory] = {}
+        self.dirty = False
+        self._lock = threading.Lock()
+
+    def record(self, results: Dict[str, Optional[float]], clients: Iterable[dict], now: Optional[float] = None):
+        """확인 결과(IP → RTT ms 또는 None)를 등록된 클라이언트 시리얼로 기록"""
+        now = time.time() if now is None else now
+        with self._lock:
+            for client in clients:
+                ip = client.get('ip')
+                if not ip or ip not in results:
+                    continue
+                history = self.clients.get(client['serial'])
+                if history is None:
+                    history = self.clients[client['serial']] = ClientHistory(self.capacity)
+                history.record(now, results[ip], self.slot_seconds)
+            self.dirty = True
+
+    def forget(self, keep: Iterable[str]):
+        """등록되지 않은 시리얼의 기록 삭제"""
+        keep = set(keep)
+        with self._lock:
+            for serial in [s for s in self.clients if s not in keep]:
+                del self.clients[serial]
+                self.dirty = True
+
+    def summary(self, serial: str, **kwargs) -> Optional[dict]:
+        with self._lock:
+            history = self.clients.get(serial)
+            return history.summary(slot_seconds=self.slot_seconds, **kwargs) if history else None
+
+    def summaries(self, **kwargs) -> Dict[str, dict]:
+        with self._lock:
+            return {serial: history.summary(slot_seconds=self.slot_seconds, **kwargs)
+                    for serial, history in self.clients.items()}
+
+    # ---------- 파일 ----------
+
+    def save(self):
+        """바뀐 것이 있으면 저장 (임시 파일 → rename)"""
+        with self._lock:
+            if not self.dirty:
+                return
+            parts = [_FILE_HEADER.pack(MAGIC, VERSION, self.slot_seconds, self.capacity, len(self.clients))]
+            for serial, history in self.clients.items():
+                name = serial.encode()[:255]
+                state = -1 if history.last_state is None else int(history.last_state)
+                parts.append(_CLIENT_HEADER.pack(len(name), history.head, history.size, state) + name)
+                for column in (history.start, history.rtt, history.up, history.down, history.flaps):
+                    parts.append(column.tobytes())
+            self.dirty = False
+        tmp = self.path.with_name(f'.{self.path.name}.{os.getpid()}.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(b''.join(parts))
+        os.replace(tmp, self.path)
+
+    def load(self) -> bool:
+        """파일에서 읽기 (없거나 형식이 다르면 빈 기록으로 시작, False)"""
+        try:
+            data = self.path.read_bytes()
+        except OSError:
+            return False
+        try:
+            magic, version, slot_seconds, capacity, count = _FILE_HEADER.unpack_from(data, 0)
+            if magic != MAGIC or version != VERSION or slot_seconds != self.slot_seconds or capacity != self.capacity:
+                return False
+            offset = _FILE_HEADER.size
+            clients = {}
+            for _ in range(count):
+                length, head, size, state = _CLIENT_HEADER.unpack_from(data, offset)
+                offset += _CLIENT_HEADER.size
+                # 잘린 파일이나 범위를 벗어난 head/size는 링 배열 크기를 바꾸므로 전체를 버림
+                if head >= capacity or size > capacity or len(data) < offset + length:
+                    raise ValueError('잘못된 클라이언트 헤더')
+                serial = data[offset:offset + length].decode()
+                offset += length
+                history = ClientHistory(capacity)
+                for column in (history.start, history.rtt, history.up, history.down, history.flaps):
+                    size_bytes = column.itemsize * capacity
+                    if len(data) - offset < size_bytes:
+                        raise ValueError('잘린 열')
+                    column[:] = array(column.typecode, data[offset:offset + size_bytes])
+                    offset += size_bytes
+                history.head, history.size = head, size
+                history.last_state = None if state < 0 else bool(state)
+                clients[serial] = history
+        except (struct.error, ValueError, UnicodeDecodeError):
+            return False
+        with self._lock:
+            self.clients = clients
+            self.dirty = False
+        return True
+
+
+def sparkline(values: List[Optional[float]]) -> str:
+    """스파크라인 문자열 (기록 없음 ' ', 무응답 '×', 응답은 RTT 높이)"""
+    rtts = [v for v in values if v is not None and v >= 0]
+    low, high = (min(rtts), max(rtts)) if rtts else (0.0, 0.0)
+    chars = []
+    for value in values:
+        if value is None:
+            chars.append(' ')
+        elif value < 0:
+            chars.append('×')
+        elif high - low < 0.05:
+            chars.append(SPARK_BARS[0])
+        else:
+            chars.append(SPARK_BARS[int((value - low) / (high - low) * (len(SPARK_BARS) - 1))])
+    return ''.join(chars)
+
+
+def format_summary(summary: Optional[dict]) -> str:
+    """'99.5% 변화 2' (기록 없으면 '-')"""
+    if not summary or summary['uptime'] is None:
+        return '-'
+    return f"{summary['uptime']:.1f}% 변화 {summary['flaps']}"
+
+
+def load(path: Path = HISTORY_FILE) -> HistoryStore:
+    store = HistoryStore(path)
+    store.load()
+    return store
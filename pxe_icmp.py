@@ -0,0 +1,159 @@
+"""
+RPI PXE Manager - 비동기 ICMP 상태 확인
+
+클라이언트마다 ping 프로세스를 띄우는 대신, 하나의 ICMP 소켓으로 모든
+echo 요청을 한 번에 보내고 id/seq로 응답을 매칭한다.
+비특권 ICMP 소켓(SOCK_DGRAM, net.ipv4.ping_group_range 허용 시)을 먼저
+사용하고, 안 되면 raw 소켓(root 필요)을, 둘 다 안 되면 ping 명령으로 대체한다.
+"""
+
+import os
+import socket
+import struct
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Tuple
+
+import pxe_deps
+
+# CLI 시작 시간 단축 - 상태 확인을 처음 할 때 import
+asyncio = pxe_deps.lazy('asyncio')
+
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+
+DEFAULT_TIMEOUT = 1.0
+
+
+def _checksum(data: bytes) -> int:
+    """인터넷 체크섬 (RFC 1071)"""
+    if len(data) % 2:
+        data += b'\x00'
+    total = sum(struct.unpack(f'!{len(data) // 2}H', data))
+    total = (total >> 16) + (total & 0xffff)
+    total += total >> 16
+    return ~total & 0xffff
+
+
+def _build_echo(ident: int, seq: int) -> bytes:
+    payload = struct.pack('!d', time.monotonic()) + b'rpi-pxe-manager'
+    header = struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, 0, ident, seq)
+    checksum = _checksum(header + payload)
+    return struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, checksum, ident, seq) + payload
+
+
+def open_icmp_socket() -> Tuple[socket.socket, bool]:
+    """ICMP 소켓 생성 (비특권 DGRAM 우선) → (소켓, raw 여부)"""
+    try:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+        raw = False
+    except (PermissionError, OSError):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
+        raw = True
+
+    sock.setblocking(False)
+    try:
+        # 대규모 플릿의 응답이 한꺼번에 도착해도 버려지지 않도록
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+    except OSError:
+        pass
+    return sock, raw
+
+
+async def async_probe(ips: Iterable[str], timeout: float = DEFAULT_TIMEOUT) -> Dict[str, Optional[float]]:
+    """모든 호스트에 echo 요청을 동시에 보내고 IP → RTT(ms, 응답 없으면 None) 반환"""
+    targets = [ip for ip in dict.fromkeys(ips) if ip]
+    results: Dict[str, Optional[float]] = {ip: None for ip in targets}
+    if not targets:
+        return results
+
+    loop = asyncio.get_running_loop()
+    sock, raw = open_icmp_socket()
+    # DGRAM 소켓은 커널이 id를 소켓 포트로 바꾸므로 seq + 발신 주소로 매칭
+    ident = os.getpid() & 0xffff
+    pending: Dict[int, Tuple[str, float]] = {}
+    done = asyncio.Event()
+
+    def on_readable():
+        while True:
+            try:
+                packet, addr = sock.recvfrom(2048)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                return
+
+            if raw:
+                # raw 소켓은 IP 헤더 포함
+                packet = packet[(packet[0] & 0x0f) * 4:]
+            if len(packet) < 8:
+                continue
+
+            icmp_type, _, _, reply_id, seq = struct.unpack('!BBHHH', packet[:8])
+            if icmp_type != ICMP_ECHO_REPLY:
+                continue
+            if raw and reply_id != ident:
+                continue
+
+            entry = pending.get(seq)
+            if entry is None or entry[0] != addr[0]:
+                continue
+
+            ip, sent_at = pending.pop(seq)
+            results[ip] = (time.monotonic() - sent_at) * 1000.0
+            if not pending:
+                done.set()
+
+    loop.add_reader(sock.fileno(), on_readable)
+    try:
+        for seq, ip in enumerate(targets, 1):
+            seq &= 0xffff
+            packet = _build_echo(ident, seq)
+            pending[seq] = (ip, time.monotonic())
+            while True:
+                try:
+                    sock.sendto(packet, (ip, 0))
+                    break
+                except (BlockingIOError, InterruptedError):
+                    await asyncio.sleep(0.001)
+                except OSError:
+                    # 라우팅 불가 등: 응답 없음으로 처리
+                    pending.pop(seq, None)
+                    break
+
+        if pending:
+            try:
+                await asyncio.wait_for(done.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        loop.remove_reader(sock.fileno())
+        sock.close()
+
+    return results
+
+
+def _ping_subprocess(ip: str, timeout: float) -> Tuple[str, Optional[float]]:
+    """ICMP 소켓을 열 수 없을 때의 대체 경로 (ping 명령)"""
+    try:
+        start = time.monotonic()
+        result = subprocess.run(
+            ['ping', '-c', '1', '-W', str(max(1, int(round(timeout)))), ip],
+            capture_output=True, timeout=timeout + 1
+        )
+        if result.returncode == 0:
+            return ip, (time.monotonic() - start) * 1000.0
+    except Exception:
+        pass
+    return ip, None
+
+
+def probe_hosts(ips: Iterable[str], timeout: float = DEFAULT_TIMEOUT) -> Dict[str, Optional[float]]:
+    """동기 래퍼: IP → RTT(ms) 또는 None"""
+    ips = [ip for ip in dict.fromkeys(ips) if ip]
+    try:
+        return asyncio.run(async_probe(ips, timeout))
+    except (PermissionError, OSError):
+        with ThreadPoolExecutor(max_workers=20) as executor:
+            return dict(executor.map(lambda ip: _ping_subprocess(ip, timeout), ips))
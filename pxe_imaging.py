@@ -0,0 +1,322 @@
+"""
+RPI PXE Manager - SD 카드 / 이미지 파일 복사 파이프라인
+
+SD 카드(또는 루프 장치로 연결한 .img 파일)의 boot 파티션과 root 파티션을
+읽기 전용으로 마운트하고 두 파티션을 동시에 rsync로 복사한다.
+카드 리더가 여러 개면 작업(ImagingJob) 여러 개를 병렬로 돌린다.
+
+rsync --info=progress2 출력(\r로 갱신되는 한 줄)을 파싱해 작업별
+전송량/속도(MB/s)/남은 시간을 구조화된 값으로 제공한다.
+"""
+
+import json
+import os
+import re
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from pxe_provision import DEFAULT_EXCLUDES
+
+DEFAULT_PARALLEL = 4
+
+# "  1,234,567,890  45%   12.34MB/s    0:01:23 (xfr#123, to-chk=456/7890)"
+PROGRESS_RE = re.compile(r'^\s*([\d,]+)\s+(\d+)%\s+([\d.]+)([kMGT]?B)/s\s+(\d+):(\d\d):(\d\d)')
+UNITS = {'B': 1, 'kB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3, 'TB': 1024 ** 4}
+
+# 작업 상태
+STATUS_PENDING = 'pending'
+STATUS_MOUNTING = 'mounting'
+STATUS_COPYING = 'copying'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+
+
+def parse_progress(line: str) -> Optional[dict]:
+    """progress2 한 줄 → {'bytes', 'percent', 'rate'(B/s), 'eta'(초)}"""
+    match = PROGRESS_RE.match(line)
+    if not match:
+        return None
+    hours, minutes, seconds = int(match.group(5)), int(match.group(6)), int(match.group(7))
+    return {
+        'bytes': int(match.group(1).replace(',', '')),
+        'percent': int(match.group(2)),
+        'rate': float(match.group(3)) * UNITS.get(match.group(4), 1),
+        'eta': hours * 3600 + minutes * 60 + seconds,
+    }
+
+
+def format_rate(rate: float) -> str:
+    return f"{rate / 1024 ** 2:.1f}MB/s"
+
+
+def format_eta(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return '--:--'
+    seconds = int(seconds)
+    return f"{seconds // 60}:{seconds % 60:02d}" if seconds < 3600 else \
+        f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+def rsync_stream(source: str, target: str, on_progress: Callable[[dict], None],
+                 excludes: Optional[List[str]] = None, preserve_all: bool = True,
+                 cancel: Optional[threading.Event] = None) -> subprocess.CompletedProcess:
+    """rsync를 실행하며 progress2 갱신마다 on_progress 호출
+
+    --no-inc-recursive: 파일 목록을 먼저 끝까지 만들어 퍼센트/남은 시간이 정확해진다.
+    """
+    flags = '-aHAXx' if preserve_all else '-rt'
+    command = ['sudo', 'rsync', flags, '--info=progress2', '--no-inc-recursive',
+               *[f'--exclude={p}' for p in (excludes or [])],
+               source.rstrip('/') + '/', target.rstrip('/') + '/']
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    # stderr는 따로 모음 (파이프가 차서 멈추지 않게)
+    errors: List[bytes] = []
+    reader = threading.Thread(target=lambda: errors.append(process.stderr.read()), daemon=True)
+    reader.start()
+
+    buffer = b''
+    fd = process.stdout.fileno()
+    while True:
+        if cancel is not None and cancel.is_set():
+            process.terminate()
+            break
+        chunk = os.read(fd, 4096)
+        if not chunk:
+            break
+        buffer += chunk
+        # progress2는 \r로 같은 줄을 갱신
+        *lines, buffer = re.split(rb'[\r\n]', buffer)
+        for line in lines:
+            progress = parse_progress(line.decode(errors='replace'))
+            if progress:
+                on_progress(progress)
+
+    returncode = process.wait()
+    reader.join(timeout=5)
+    return subprocess.CompletedProcess(command, returncode, '', b''.join(errors).decode(errors='replace'))
+
+
+# ---------- 원본 (SD 카드 / 이미지 파일) ----------
+
+def list_cards() -> List[dict]:
+    """boot(vfat) + root(ext4) 파티션이 있는 디스크 목록
+
+    [{'disk', 'size', 'model', 'boot', 'root', 'mounted': [마운트 위치]}]
+    """
+    result = subprocess.run(['lsblk', '-J', '-p', '-o', 'NAME,SIZE,TYPE,FSTYPE,MOUNTPOINT,MODEL'],
+                            capture_output=True, text=True)
+    try:
+        devices = json.loads(result.stdout).get('blockdevices', [])
+    except ValueError:
+        return []
+
+    cards = []
+    for disk in devices:
+        if disk.get('type') not in ('disk', 'loop'):
+            continue
+        parts = disk.get('children') or []
+        boot = next((p['name'] for p in parts if p.get('fstype') == 'vfat'), None)
+        root = next((p['name'] for p in parts if p.get('fstype') == 'ext4'), None)
+        if not boot or not root:
+            continue
+        cards.append({
+            'disk': disk['name'],
+            'size': disk.get('size', ''),
+            'model': (disk.get('model') or '').strip(),
+            'boot': boot,
+            'root': root,
+            'mounted': [p['mountpoint'] for p in parts if p.get('mountpoint')],
+        })
+    return cards
+
+
+class CardSource:
+    """SD 카드 (boot/root 파티션 장치)"""
+
+    def __init__(self, boot_device: str, root_device: str, label: str = ''):
+        self.boot_device = boot_device
+        self.root_device = root_device
+        self.label = label or root_device
+
+    def attach(self) -> tuple:
+        return self.boot_device, self.root_device
+
+    def detach(self):
+        pass
+
+
+class ImageSource:
+    """.img 파일 - 읽기 전용 루프 장치로 연결 (파티션 1=boot, 2=root)"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.label = self.path.name
+        self.loop_device: Optional[str] = None
+
+    def attach(self) -> tuple:
+        result = subprocess.run(['sudo', 'losetup', '--find', '--show', '--partscan', '--read-only',
+                                 str(self.path)], capture_output=True, text=True, check=True)
+        self.loop_device = result.stdout.strip()
+        boot, root = f"{self.loop_device}p1", f"{self.loop_device}p2"
+        # 파티션 장치 노드가 생길 때까지 대기
+        deadline = time.monotonic() + 10
+        while not (os.path.exists(boot) and os.path.exists(root)):
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"{self.path}: 파티션을 찾을 수 없습니다 ({self.loop_device})")
+            time.sleep(0.2)
+        return boot, root
+
+    def detach(self):
+        if self.loop_device:
+            subprocess.run(['sudo', 'losetup', '-d', self.loop_device], stderr=subprocess.DEVNULL)
+            self.loop_device = None
+
+
+def _mount_readonly(device: str, mountpoint: str):
+    result = subprocess.run(['sudo', 'mount', '-o', 'ro', device, mountpoint],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        # 저널 복구가 필요한 ext4는 읽기 전용 마운트가 거부될 수 있음
+        result = subprocess.run(['sudo', 'mount', '-o', 'ro,noload', device, mountpoint],
+                                capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"{device} 마운트 실패: {result.stderr.strip()}")
+
+
+# ---------- 작업 ----------
+
+class ImagingJob:
+    """원본 하나 → 대상 하나 (boot: TFTP 디렉토리, root: NFS 루트)
+
+    boot_target이 None이면 root만 복사한다 (골든 템플릿).
+    """
+
+    def __init__(self, source, root_target: Path, boot_target: Optional[Path] = None,
+                 name: str = '', excludes: Optional[List[str]] = None):
+        self.source = source
+        self.root_target = Path(root_target)
+        self.boot_target = Path(boot_target) if boot_target else None
+        self.name = name or self.root_target.name
+        self.excludes = DEFAULT_EXCLUDES if excludes is None else excludes
+
+        self.status = STATUS_PENDING
+        self.error = ''
+        self.started: Optional[float] = None
+        self.elapsed = 0.0
+        self.streams: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    # ---------- 진행 상황 ----------
+
+    def _update(self, part: str, progress: dict):
+        with self._lock:
+            self.streams[part] = progress
+
+    def snapshot(self) -> dict:
+        """작업 전체 진행 상황 {'status', 'percent', 'bytes', 'rate', 'eta', 'parts': {...}}"""
+        with self._lock:
+            streams = {part: dict(p) for part, p in self.streams.items()}
+        total_bytes = sum(p['bytes'] for p in streams.values())
+        # 퍼센트로 전체 크기 추정 (--no-inc-recursive라 안정적)
+        estimated = sum(p['bytes'] * 100 / p['percent'] if p['percent'] else 0 for p in streams.values())
+        percent = 100.0 if self.status == STATUS_DONE else \
+            (total_bytes * 100 / estimated if estimated else 0.0)
+        active = [p for p in streams.values() if p['percent'] < 100]
+        return {
+            'name': self.name,
+            'status': self.status,
+            'error': self.error,
+            'percent': min(percent, 100.0),
+            'bytes': total_bytes,
+            'rate': sum(p['rate'] for p in active),
+            'eta': max((p['eta'] for p in active), default=0) if self.status == STATUS_COPYING else None,
+            'elapsed': time.monotonic() - self.started if self.status in (STATUS_MOUNTING, STATUS_COPYING)
+            else self.elapsed,
+            'parts': streams,
+        }
+
+    # ---------- 실행 ----------
+
+    def run(self, cancel: Optional[threading.Event] = None) -> bool:
+        self.started = time.monotonic()
+        self.status = STATUS_MOUNTING
+        mount_dir = Path(tempfile.mkdtemp(prefix=f'rpi-pxe-img-{self.name}-'))
+        boot_mount, root_mount = mount_dir / 'boot', mount_dir / 'root'
+        mounted = []
+        try:
+            boot_device, root_device = self.source.attach()
+            for device, mountpoint, needed in ((root_device, root_mount, True),
+                                               (boot_device, boot_mount, self.boot_target is not None)):
+                if not needed:
+                    continue
+                mountpoint.mkdir()
+                _mount_readonly(device, str(mountpoint))
+                mounted.append(mountpoint)
+
+            targets = [str(self.root_target)] + ([str(self.boot_target)] if self.boot_target else [])
+            subprocess.run(['sudo', 'mkdir', '-p', *targets], check=True)
+
+            # boot와 root를 동시에 복사 (boot는 vfat이라 권한/소유자 없음)
+            self.status = STATUS_COPYING
+            copies = [('root', str(root_mount), str(self.root_target), self.excludes, True)]
+            if self.boot_target:
+                copies.append(('boot', str(boot_mount), str(self.boot_target), [], False))
+            with ThreadPoolExecutor(max_workers=len(copies)) as executor:
+                futures = {
+                    part: executor.submit(rsync_stream, source, target,
+                                          lambda progress, part=part: self._update(part, progress),
+                                          excludes, preserve_all, cancel)
+                    for part, source, target, excludes, preserve_all in copies
+                }
+                results = {part: future.result() for part, future in futures.items()}
+
+            failed = {part: r for part, r in results.items() if r.returncode != 0}
+            if cancel is not None and cancel.is_set():
+                raise RuntimeError("취소됨")
+            if failed:
+                part, result = next(iter(failed.items()))
+                raise RuntimeError(f"{part} 복사 실패 (rsync {result.returncode}): "
+                                   f"{result.stderr.strip().splitlines()[-1] if result.stderr.strip() else ''}")
+            self.status = STATUS_DONE
+            return True
+        except Exception as e:
+            self.status = STATUS_FAILED
+            self.error = str(e)
+            return False
+        finally:
+            for mountpoint in reversed(mounted):
+                subprocess.run(['sudo', 'umount', str(mountpoint)], stderr=subprocess.DEVNULL)
+            self.source.detach()
+            for path in (boot_mount, root_mount, mount_dir):
+                try:
+                    path.rmdir()
+                except OSError:
+                    pass
+            self.elapsed = time.monotonic() - self.started
+
+
+def run_jobs(jobs: List[ImagingJob], parallel: int = DEFAULT_PARALLEL,
+             on_tick: Optional[Callable[[List[dict]], None]] = None, interval: float = 0.5,
+             cancel: Optional[threading.Event] = None) -> List[dict]:
+    """작업들을 병렬 실행하고 interval마다 on_tick(스냅샷 목록) 호출. 최종 스냅샷 반환"""
+    cancel = cancel or threading.Event()
+    with ThreadPoolExecutor(max_workers=max(1, min(parallel, len(jobs)))) as executor:
+        futures = [executor.submit(job.run, cancel) for job in jobs]
+        try:
+            while not all(future.done() for future in futures):
+                if on_tick:
+                    on_tick([job.snapshot() for job in jobs])
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            cancel.set()
+            raise
+    snapshots = [job.snapshot() for job in jobs]
+    if on_tick:
+        on_tick(snapshots)
+    return snapshots
@@ -0,0 +1,193 @@
+"""
+RPI PXE Manager - 고정 IP 할당 (비트맵)
+
+클라이언트 고정 IP 범위(기본: 서버 서브넷의 .100 ~ .199, dnsmasq 동적 범위 밖)를
+정수 비트맵 하나로 관리한다. 비트 i가 1이면 범위의 i번째 주소가 사용 중이다.
+가장 낮은 빈 주소는 ((used + 1) & ~used)로 한 번에 찾으므로 수백 대를
+연속 할당해도 매번 레지스트리를 다시 훑지 않는다.
+
+레지스트리 외에 dnsmasq 리스와 ARP 테이블에서 다른 MAC이 쓰고 있는 주소도
+충돌로 보고 할당하지 않는다. CLI와 GUI가 같은 할당기를 써서 다음 주소가 같다.
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import pxe_leases
+import pxe_registry
+
+ARP_TABLE = Path('/proc/net/arp')
+ARP_FLAG_COMPLETE = 0x2
+
+DEFAULT_STATIC_START = 100
+DEFAULT_STATIC_END = 199
+
+
+class AddressExhaustedError(RuntimeError):
+    """고정 IP 범위에 빈 주소가 없음"""
+
+
+def number_to_ip(number: int) -> str:
+    return '.'.join(str((number >> shift) & 0xff) for shift in (24, 16, 8, 0))
+
+
+def static_range(config: dict) -> tuple:
+    """고정 IP 범위 (시작, 끝) - static_ip_start/end, 없으면 서버 서브넷 .100 ~ .199"""
+    prefix = '.'.join(config.get('server_ip', '192.168.0.10').split('.')[:3])
+    start = config.get('static_ip_start') or f"{prefix}.{DEFAULT_STATIC_START}"
+    end = config.get('static_ip_end') or f"{prefix}.{DEFAULT_STATIC_END}"
+    return start, end
+
+
+def read_arp(path: Path = ARP_TABLE) -> Dict[str, str]:
+    """ARP 테이블의 완성된 항목 (IP → MAC)"""
+    entries = {}
+    try:
+        lines = path.read_text().splitlines()[1:]
+    except OSError:
+        return entries
+    for line in lines:
+        parts = line.split()
+        if len(parts) >= 4 and int(parts[2], 16) & ARP_FLAG_COMPLETE:
+            entries[parts[0]] = parts[3].lower()
+    return entries
+
+
+class IPAllocator:
+    """고정 IP 범위 비트맵 할당기"""
+
+    def __init__(self, start: str, end: str, reserved: Iterable[str] = ()):
+        self.start = pxe_registry.ip_to_number(start)
+        self.end = pxe_registry.ip_to_number(end)
+        if self.start is None or self.end is None or self.end < self.start:
+            raise ValueError(f"잘못된 IP 범위: {start} - {end}")
+        self.size = self.end - self.start + 1
+        self.full = (1 << self.size) - 1
+        self.used = 0
+        # 리스/ARP에서 관찰된 사용 중 주소 (비트맵, 오프셋 → MAC)
+        self.observed = 0
+        self.observed_macs: Dict[int, str] = {}
+        self.reserve(reserved)
+
+    @classmethod
+    def from_config(cls, config: dict, clients: Iterable[dict] = (),
+                    check_network: bool = True) -> 'IPAllocator':
+        """설정의 고정 범위 + 등록된 클라이언트 IP + 서버 IP 예약"""
+        start, end = static_range(config)
+        allocator = cls(start, end, [c.get('ip') for c in clients])
+        allocator.reserve([config.get('server_ip')])
+        if check_network:
+            allocator.load_observed()
+        return allocator
+
+    # ---------- 비트 연산 ----------
+
+    def _offset(self, ip: Optional[str]) -> Optional[int]:
+        number = pxe_registry.ip_to_number(ip)
+        if number is None or not self.start <= number <= self.end:
+            return None
+        return number - self.start
+
+    def contains(self, ip: str) -> bool:
+        return self._offset(ip) is not None
+
+    def is_used(self, ip: str) -> bool:
+        offset = self._offset(ip)
+        return offset is not None and bool(self.used >> offset & 1)
+
+    def reserve(self, ips: Iterable[Optional[str]]) -> int:
+        """여러 주소를 사용 중으로 표시 (범위 밖은 무시). 표시한 수 반환"""
+        mask = 0
+        for ip in ips:
+            offset = self._offset(ip)
+            if offset is not None:
+                mask |= 1 << offset
+        added = bin(mask & ~self.used).count('1')
+        self.used |= mask
+        return added
+
+    def release(self, ips: Iterable[Optional[str]]):
+        mask = 0
+        for ip in ips:
+            offset = self._offset(ip)
+            if offset is not None:
+                mask |= 1 << offset
+        self.used &= ~mask
+
+    @property
+    def free_count(self) -> int:
+        return self.size - bin(self.used | self.observed).count('1')
+
+    # ---------- 충돌 확인 ----------
+
+    def load_observed(self, leases: Optional[List[dict]] = None, arp: Optional[Dict[str, str]] = None):
+        """dnsmasq 리스와 ARP 테이블에서 사용 중인 주소 반영"""
+        if leases is None:
+            leases = pxe_leases.shared().all()
+        if arp is None:
+            arp = read_arp()
+        self.observed = 0
+        self.observed_macs = {}
+        seen = [(lease['ip'], lease['mac']) for lease in leases] + list(arp.items())
+        for ip, mac in seen:
+            offset = self._offset(ip)
+            if offset is not None:
+                self.observed |= 1 << offset
+                self.observed_macs[offset] = mac
+
+    def _blocked(self, mac: Optional[str]) -> int:
+        """할당 불가 비트맵 - 같은 MAC이 쓰던 주소는 허용"""
+        blocked = self.used | self.observed
+        if mac:
+            mac = mac.lower()
+            for offset, seen_mac in self.observed_macs.items():
+                if seen_mac == mac and not self.used >> offset & 1:
+                    blocked &= ~(1 << offset)
+        return blocked
+
+    def conflict(self, ip: str, mac: Optional[str] = None) -> Optional[str]:
+        """직접 입력한 주소 확인 - 문제가 있으면 사유 문자열"""
+        offset = self._offset(ip)
+        if offset is None:
+            if pxe_registry.ip_to_number(ip) is None:
+                return "올바른 IP 주소가 아닙니다"
+            return None
+        if self.used >> offset & 1:
+            return "이미 다른 클라이언트가 사용 중입니다"
+        seen_mac = self.observed_macs.get(offset)
+        if seen_mac and seen_mac != (mac or '').lower():
+            return f"네트워크에서 다른 장치({seen_mac})가 사용 중입니다 (리스/ARP)"
+        return None
+
+    # ---------- 할당 ----------
+
+    def peek(self, mac: Optional[str] = None) -> Optional[str]:
+        """다음에 할당될 주소 (예약하지 않음). 빈 주소가 없으면 None"""
+        blocked = self._blocked(mac)
+        if blocked & self.full == self.full:
+            return None
+        # 가장 낮은 0 비트
+        offset = ((blocked + 1) & ~blocked).bit_length() - 1
+        return number_to_ip(self.start + offset)
+
+    def allocate(self, mac: Optional[str] = None) -> str:
+        """가장 낮은 빈 주소를 예약하고 반환"""
+        # 이 MAC이 이미 리스를 받은 주소가 있으면 그대로 사용
+        if mac:
+            for offset, seen_mac in self.observed_macs.items():
+                if seen_mac == mac.lower() and not self.used >> offset & 1:
+                    self.used |= 1 << offset
+                    return number_to_ip(self.start + offset)
+        ip = self.peek(mac)
+        if ip is None:
+            raise AddressExhaustedError(
+                f"고정 IP 범위에 빈 주소가 없습니다 ({number_to_ip(self.start)} - {number_to_ip(self.end)})")
+        self.used |= 1 << (pxe_registry.ip_to_number(ip) - self.start)
+        return ip
+
+    def allocate_many(self, count: int, macs: Optional[List[str]] = None) -> List[str]:
+        """여러 주소 한 번에 할당 (부족하면 아무것도 예약하지 않고 예외)"""
+        if count > self.free_count:
+            raise AddressExhaustedError(f"빈 고정 IP가 부족합니다 (필요 {count}, 남음 {self.free_count})")
+        macs = macs or []
+        return [self.allocate(macs[i] if i < len(macs) else None) for i in range(count)]
@@ -0,0 +1,283 @@
+"""
+RPI PXE Manager - dnsmasq 리스 인덱스와 편집기
+
+dnsmasq.leases (만료시각 MAC IP 호스트명 클라이언트ID) 를 MAC/IP/호스트명으로
+찾는 메모리 인덱스. 리스 파일 디렉토리를 inotify로 감시하다가 파일이 바뀐
+뒤 처음 조회할 때만 다시 읽는다 (inotify를 못 쓰면 조회 때 mtime 비교).
+
+편집은 LeaseEditor에 모아 두었다가 최신 파일을 다시 읽어 한 번에 판단한다.
+dnsmasq는 리스를 메모리에 들고 있다가 파일을 다시 쓰므로 실행 중에는 파일을
+고치지 않는다 - stale()로 지울 리스를 골라 DnsmasqSync.drop_leases()에 넘기면
+dhcp_release로 dnsmasq가 직접 지운다. apply()로 파일을 쓰는 것은 dnsmasq가
+멈춰 있을 때만 (dhcp_release가 없을 때의 대체 경로).
+"""
+
+import ctypes
+import os
+import select
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import pxe_privops
+
+LEASES_FILE = Path('/var/lib/misc/dnsmasq.leases')
+
+# pxe_dnsmasq.render_main_config의 dhcp-range 리스 시간 (1h)
+DEFAULT_LEASE_TIME = 3600
+
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+def parse_line(line: str) -> Optional[dict]:
+    parts = line.split()
+    if len(parts) < 4:
+        return None
+    return {'expires': int(parts[0]) if parts[0].isdigit() else 0,
+            'mac': parts[1].lower(), 'ip': parts[2], 'hostname': parts[3],
+            'client_id': parts[4] if len(parts) > 4 else '*'}
+
+
+def read_leases(path: Path = LEASES_FILE) -> List[dict]:
+    """리스 파일 파싱 (없거나 읽을 수 없으면 빈 목록)"""
+    try:
+        text = Path(path).read_text()
+    except OSError:
+        return []
+    return [lease for lease in map(parse_line, text.splitlines()) if lease]
+
+
+def lease_state(lease: dict, lease_time: int = DEFAULT_LEASE_TIME, now: Optional[float] = None) -> dict:
+    """리스 상태 - 만료까지 남은 초, 마지막 갱신(≈ 마지막으로 본) 시각
+
+    만료시각 0은 무기한 리스 (dnsmasq 예약 또는 수동 추가)라 갱신 시각을 알 수 없다.
+    """
+    now = time.time() if now is None else now
+    if not lease['expires']:
+        return {'active': True, 'expires_in': None, 'last_seen': None}
+    return {'active': lease['expires'] > now,
+            'expires_in': lease['expires'] - now,
+            'last_seen': lease['expires'] - lease_time}
+
+
+def format_remaining(state: Optional[dict]) -> str:
+    """리스 남은 시간 표시 ('42분 남음', '무기한', '만료', 리스 없음은 '-')"""
+    if state is None:
+        return '-'
+    if state['expires_in'] is None:
+        return '무기한'
+    if not state['active']:
+        return '만료'
+    minutes = int(state['expires_in'] // 60)
+    return f"{minutes // 60}시간 {minutes % 60}분 남음" if minutes >= 60 else f"{minutes}분 남음"
+
+
+class LeaseIndex:
+    """리스 파일 메모리 인덱스 (스레드 안전)"""
+
+    def __init__(self, path: Path = LEASES_FILE, lease_time: int = DEFAULT_LEASE_TIME):
+        self.path = Path(path)
+        self.lease_time = lease_time
+        self._lock = threading.Lock()
+        self._leases: List[dict] = []
+        self._by_mac: Dict[str, dict] = {}
+        self._by_ip: Dict[str, dict] = {}
+        self._by_hostname: Dict[str, dict] = {}
+        self._signature = None
+        self._dirty = True
+        self._watch_fd: Optional[int] = None
+        self._stop = threading.Event()
+        self._listeners: List[Callable[[], None]] = []
+
+    # ---------- 읽기 ----------
+
+    def _stat_signature(self):
+        try:
+            st = self.path.stat()
+        except OSError:
+            return None
+        return st.st_ino, st.st_size, st.st_mtime_ns
+
+    def refresh(self, force: bool = False) -> bool:
+        """파일이 바뀌었으면 다시 읽기. 다시 읽었으면 True"""
+        with self._lock:
+            signature = self._stat_signature()
+            if not force and not self._dirty and signature == self._signature:
+                return False
+            self._dirty = False
+            leases = read_leases(self.path)
+            self._leases = leases
+            self._by_mac = {lease['mac']: lease for lease in leases}
+            self._by_ip = {lease['ip']: lease for lease in leases}
+            self._by_hostname = {lease['hostname'].lower(): lease for lease in leases
+                                 if lease['hostname'] != '*'}
+            self._signature = signature
+            return True
+
+    def _fresh(self):
+        # 감시 중이면 변경 알림이 있을 때만, 아니면 mtime 비교
+        if self._watch_fd is None or self._dirty:
+            self.refresh()
+
+    def all(self) -> List[dict]:
+        self._fresh()
+        return list(self._leases)
+
+    def by_mac(self, mac: str) -> Optional[dict]:
+        self._fresh()
+        return self._by_mac.get((mac or '').lower())
+
+    def by_ip(self, ip: str) -> Optional[dict]:
+        self._fresh()
+        return self._by_ip.get(ip)
+
+    def by_hostname(self, hostname: str) -> Optional[dict]:
+        self._fresh()
+        return self._by_hostname.get((hostname or '').lower())
+
+    def state(self, mac: str) -> Optional[dict]:
+        """MAC의 리스와 상태 (리스가 없으면 None)"""
+        lease = self.by_mac(mac)
+        if lease is None:
+            return None
+        return dict(lease, **lease_state(lease, self.lease_time))
+
+    # ---------- inotify 감시 ----------
+
+    def add_listener(self, callback: Callable[[], None]):
+        """리스 파일이 바뀔 때마다 호출 (감시 스레드에서 호출됨)"""
+        self._listeners.append(callback)
+
+    def watch(self) -> bool:
+        """리스 파일 디렉토리 감시 시작. inotify를 쓸 수 없으면 False (조회 때 mtime 비교)"""
+        if self._watch_fd is not None:
+            return True
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            fd = libc.inotify_init1(os.O_CLOEXEC | os.O_NONBLOCK)
+            if fd < 0:
+                return False
+            mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+            if libc.inotify_add_watch(fd, str(self.path.parent).encode(), mask) < 0:
+                os.close(fd)
+                return False
+        except (OSError, AttributeError):
+            return False
+        self._watch_fd = fd
+        self._stop.clear()
+        threading.Thread(target=self._watch_loop, name='lease-watch', daemon=True).start()
+        return True
+
+    def stop(self):
+        self._stop.set()
+
+    def _watch_loop(self):
+        fd = self._watch_fd
+        name = self.path.name.encode()
+        try:
+            while not self._stop.is_set():
+                readable, _, _ = select.select([fd], [], [], 1.0)
+                if not readable:
+                    continue
+                try:
+                    data = os.read(fd, 4096)
+                except BlockingIOError:
+                    continue
+                changed = False
+                offset = 0
+                while offset + _EVENT_HEADER.size <= len(data):
+                    _, _, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                    offset += _EVENT_HEADER.size
+                    if data[offset:offset + length].rstrip(b'\0') == name:
+                        changed = True
+                    offset += length
+                if changed:
+                    self._dirty = True
+                    for callback in list(self._listeners):
+                        callback()
+        finally:
+            self._watch_fd = None
+            self._dirty = True
+            os.close(fd)
+
+class LeaseEditor:
+    """리스 편집 모음 - apply()에서 최신 파일 기준으로 한 번에 적용 (원자적 rename)"""
+
+    def __init__(self, path: Path = LEASES_FILE):
+        self.path = Path(path)
+        self.edits: List[tuple] = []
+        self.changed = 0
+
+    def release(self, mac: Optional[str] = None, ip: Optional[str] = None) -> 'LeaseEditor':
+        """MAC 또는 IP가 일치하는 리스 제거 (클라이언트 삭제/변경 전 값)"""
+        self.edits.append(('release', (mac or '').lower(), ip or ''))
+        return self
+
+    def claim(self, mac: str, ip: str) -> 'LeaseEditor':
+        """MAC이 다른 IP로 받은 리스와 다른 MAC이 이 IP로 받은 리스 제거 (고정 IP 예약 전)"""
+        self.edits.append(('claim', (mac or '').lower(), ip or ''))
+        return self
+
+    def drop(self, mac: str, ip: str) -> 'LeaseEditor':
+        """MAC과 IP가 모두 일치하는 리스만 제거"""
+        self.edits.append(('drop', (mac or '').lower(), ip or ''))
+        return self
+
+    def _keep(self, lease: dict) -> bool:
+        for kind, mac, ip in self.edits:
+            same_mac = bool(mac) and lease['mac'] == mac
+            same_ip = bool(ip) and lease['ip'] == ip
+            if kind == 'release' and (same_mac or same_ip):
+                return False
+            if kind == 'claim' and same_mac != same_ip:
+                return False
+            if kind == 'drop' and same_mac and same_ip:
+                return False
+        return True
+
+    def stale(self) -> List[dict]:
+        """편집에 걸리는 리스 목록 (파일은 쓰지 않음)"""
+        if not self.edits:
+            return []
+        return [lease for lease in read_leases(self.path) if not self._keep(lease)]
+
+    def apply(self, dry_run: bool = False) -> int:
+        """편집 적용 → 제거한 리스 수 (바뀐 것이 없거나 dry_run이면 파일을 쓰지 않음)
+
+        dnsmasq가 멈춰 있을 때만 쓴다 (실행 중이면 DnsmasqSync.drop_leases).
+        """
+        if not self.edits:
+            return 0
+        try:
+            lines = self.path.read_text().splitlines()
+        except FileNotFoundError:
+            return 0
+        kept = []
+        for line in lines:
+            lease = parse_line(line)
+            if lease is None or self._keep(lease):
+                kept.append(line)
+        self.changed = len(lines) - len(kept)
+        if self.changed and not dry_run:
+            pxe_privops.OpBatch().write(self.path, '\n'.join(kept) + '\n' if kept else '').apply()
+        self.edits = []
+        return self.changed
+
+
+_shared: Optional[LeaseIndex] = None
+
+
+def shared() -> LeaseIndex:
+    """프로세스 공용 인덱스 (처음 호출 때 감시 시작)"""
+    global _shared
+    if _shared is None:
+        _shared = LeaseIndex()
+        _shared.watch()
+    return _shared
@@ -0,0 +1,417 @@
+"""
+RPI PXE Manager - Prometheus / OpenMetrics 메트릭
+
+관리 데몬(pxe_daemon)이 이미 들고 있는 값을 메트릭으로 내보낸다.
+
+  pxe_client_up / pxe_client_rtt_seconds / pxe_client_probes_total   클라이언트 ICMP 확인 결과
+  pxe_service_up / pxe_service_state                                 dnsmasq/nfsd/tftpd 유닛 상태
+  pxe_provision_step_duration_seconds                                프로비저닝 단계별 소요 시간
+  pxe_dhcp_events_total / pxe_tftp_transfers_total / pxe_nfs_mounts_total
+  pxe_boot_duration_seconds                                          DISCOVER → NFS 마운트
+  pxe_server_* / pxe_nfsd_* / pxe_process_*                          서버 자원, NIC/디스크/nfsd 처리량 (pxe_resources)
+  pxe_client_temperature_celsius / _load1 / _memory_percent / _disk_percent   클라이언트 시스템 정보
+  pxe_client_nfs_bytes_per_second / pxe_client_nfs_packets_per_second   클라이언트별 NFS 트래픽 (pxe_nfstraffic)
+
+스크레이프는 메모리의 값만 읽는다 (프로브/서비스 모니터/로그 추적이 각자 갱신).
+DHCP/TFTP 이벤트는 journalctl -f 하나를 계속 따라가며 센다.
+CLI/GUI에서 잰 프로비저닝 단계는 데몬이 있으면 데몬으로 보낸다 (forward_to).
+
+  curl http://<서버>:9410/metrics
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import pxe_boottrace
+
+DEFAULT_PORT = 9410
+
+OPENMETRICS_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+PROMETHEUS_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+RTT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+STEP_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0)
+BOOT_BUCKETS = (1.0, 2.5, 5.0, 10.0, 15.0, 20.0, 30.0, 45.0, 60.0, 90.0, 120.0, 300.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = '') -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, '')) for name in self.labels)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def remove(self, **labels):
+        with self._lock:
+            self._values.pop(self._key(labels), None)
+
+    def retain(self, label: str, values: set):
+        """label 값이 values에 없는 시계열 삭제"""
+        index = self.labels.index(label)
+        with self._lock:
+            self._values = {key: value for key, value in self._values.items() if key[index] in values}
+
+    def _samples(self, openmetrics: bool) -> List[str]:
+        raise NotImplementedError
+
+    def render(self, openmetrics: bool) -> List[str]:
+        # OpenMetrics에서 카운터 패밀리 이름에는 _total을 붙이지 않는다
+        family = self.name[:-len('_total')] if openmetrics and self.kind == 'counter' else self.name
+        lines = [f'# HELP {family} {self.documentation}', f'# TYPE {family} {self.kind}']
+        with self._lock:
+            lines += self._samples(openmetrics)
+        return lines
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self, openmetrics: bool) -> List[str]:
+        return [f'{self.name}{_format_labels(self.labels, key)} {_format_value(value)}'
+                for key, value in sorted(self._values.items())]
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def replace(self, values: Dict[tuple, float]):
+        """전체 시계열 교체 (사라진 클라이언트/상태는 지움)"""
+        with self._lock:
+            self._values = dict(values)
+
+    def _samples(self, openmetrics: bool) -> List[str]:
+        return [f'{self.name}{_format_labels(self.labels, key)} {_format_value(value)}'
+                for key, value in sorted(self._values.items())]
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = (),
+                 buckets: Iterable[float] = STEP_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0}
+            state['counts'][bisect.bisect_left(self.buckets, value)] += 1
+            state['sum'] += value
+            state['count'] += 1
+
+    def _samples(self, openmetrics: bool) -> List[str]:
+        lines = []
+        for key, state in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), state['counts']):
+                cumulative += count
+                le = f'le="{_format_value(float(bound))}"'
+                lines.append(f'{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}')
+            lines.append(f'{self.name}_count{_format_labels(self.labels, key)} {state["count"]}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labels, key)} {_format_value(state["sum"])}')
+        return lines
+
+
+class MetricsRegistry:
+    """메트릭 모음 - collector는 스크레이프 직전에 호출되어 캐시된 값을 게이지에 옮긴다"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+
+    def _register(self, metric: _Metric) -> _Metric:
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labels: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labels))
+
+    def gauge(self, name: str, documentation: str, labels: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labels))
+
+    def histogram(self, name: str, documentation: str, labels: Iterable[str] = (),
+                  buckets: Iterable[float] = STEP_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labels, buckets))
+
+    def add_collector(self, collector: Callable[[], None]):
+        self._collectors.append(collector)
+
+    def render(self, openmetrics: bool = False) -> str:
+        for collector in list(self._collectors):
+            try:
+                collector()
+            except Exception:
+                pass
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines += metric.render(openmetrics)
+        if openmetrics:
+            lines.append('# EOF')
+        return '\n'.join(lines) + '\n'
+
+
+# ---------- 표준 메트릭 ----------
+
+_shared: Optional[MetricsRegistry] = None
+_forward: Optional[Callable[[str, float], None]] = None
+
+
+def shared() -> MetricsRegistry:
+    """프로세스 공용 레지스트리 (표준 메트릭 등록)"""
+    global _shared
+    if _shared is None:
+        registry = MetricsRegistry()
+        registry.gauge('pxe_client_up', '클라이언트 ICMP 응답 여부 (마지막 확인)', ('serial', 'ip'))
+        registry.histogram('pxe_client_rtt_seconds', '클라이언트 ICMP 왕복 시간', ('serial',), RTT_BUCKETS)
+        registry.counter('pxe_client_probes_total', '클라이언트 ICMP 확인 횟수', ('serial', 'result'))
+        registry.gauge('pxe_clients_registered', '레지스트리에 등록된 클라이언트 수')
+        registry.gauge('pxe_service_up', 'systemd 유닛 실행 중 여부', ('service',))
+        registry.gauge('pxe_service_state', 'systemd 유닛 상태 (현재 상태만 1)', ('service', 'state', 'sub'))
+        registry.histogram('pxe_provision_step_duration_seconds', '프로비저닝 단계별 소요 시간', ('step',))
+        registry.counter('pxe_dhcp_events_total', 'dnsmasq DHCP 메시지 수', ('type',))
+        registry.counter('pxe_tftp_transfers_total', 'dnsmasq TFTP 전송 완료 수', ('file',))
+        registry.counter('pxe_nfs_mounts_total', 'rpc.mountd 마운트 요청 수')
+        registry.histogram('pxe_boot_duration_seconds', 'DISCOVER부터 NFS 마운트까지', buckets=BOOT_BUCKETS)
+        registry.gauge('pxe_client_temperature_celsius', '클라이언트 CPU 온도 (마지막 수집)', ('serial',))
+        registry.gauge('pxe_client_load1', '클라이언트 1분 부하 평균', ('serial',))
+        registry.gauge('pxe_client_memory_percent', '클라이언트 메모리 사용률', ('serial',))
+        registry.gauge('pxe_client_disk_percent', '클라이언트 루트 디스크 사용률', ('serial',))
+        registry.gauge('pxe_client_nfs_bytes_per_second', '클라이언트별 NFS 읽기/쓰기 초당 바이트', ('serial', 'op'))
+        registry.gauge('pxe_client_nfs_packets_per_second', '클라이언트가 보낸 NFS 초당 패킷 (conntrack)', ('serial',))
+        registry.gauge('pxe_server_cpu_percent', '서버 CPU 사용률')
+        registry.gauge('pxe_server_memory_percent', '서버 메모리 사용률')
+        registry.gauge('pxe_server_disk_percent', '서버 루트 디스크 사용률')
+        registry.gauge('pxe_server_iowait_percent', '서버 CPU iowait 비율')
+        registry.gauge('pxe_server_network_bytes_per_second', 'network_interface 초당 바이트', ('interface', 'direction'))
+        registry.gauge('pxe_server_network_utilization_percent', 'network_interface 링크 속도 대비 사용률', ('interface',))
+        registry.gauge('pxe_server_storage_bytes_per_second', 'nfs_root 블록 장치 초당 바이트', ('device', 'direction'))
+        registry.gauge('pxe_server_storage_utilization_percent', 'nfs_root 블록 장치가 I/O 중이던 시간 비율', ('device',))
+        registry.gauge('pxe_nfsd_threads', 'nfsd 스레드 수')
+        registry.gauge('pxe_nfsd_rpc_calls_per_second', 'nfsd 초당 RPC 호출')
+        registry.gauge('pxe_nfsd_bytes_per_second', 'nfsd 초당 읽기/쓰기 바이트', ('direction',))
+        registry.gauge('pxe_nfsd_ops_per_second', 'nfsd 초당 연산 (v3/v4 합산)', ('op',))
+        registry.gauge('pxe_nfsd_queued_percent', '빈 nfsd 스레드가 없어 기다린 요청 비율')
+        registry.gauge('pxe_process_cpu_percent', '서비스 프로세스 CPU 사용률', ('process',))
+        registry.gauge('pxe_process_resident_bytes', '서비스 프로세스 RSS', ('process',))
+        registry.gauge('pxe_process_write_bytes_per_second', '서비스 프로세스 초당 송신/쓰기 바이트 (wchar)', ('process',))
+        _shared = registry
+    return _shared
+
+
+def _metric(name: str):
+    return shared()._metrics[name]
+
+
+def record_probes(results: Dict[str, Optional[float]], clients: Iterable[dict]):
+    """ICMP 확인 결과 (IP → RTT ms, 오프라인이면 None)"""
+    up = {}
+    for client in clients:
+        ip = client.get('ip')
+        if not ip or ip not in results:
+            continue
+        rtt = results[ip]
+        serial = client['serial']
+        up[(serial, ip)] = 0 if rtt is None else 1
+        _metric('pxe_client_probes_total').inc(serial=serial, result='down' if rtt is None else 'up')
+        if rtt is not None:
+            _metric('pxe_client_rtt_seconds').observe(rtt / 1000.0, serial=serial)
+    _metric('pxe_client_up').replace(up)
+
+
+def forget(serials: Iterable[str]):
+    """레지스트리에서 삭제된 클라이언트의 시계열 제거 (남길 시리얼 목록을 받음)"""
+    keep = set(serials)
+    for metric in shared()._metrics.values():
+        if 'serial' in metric.labels:
+            metric.retain('serial', keep)
+
+
+def record_services(states: Dict[str, dict]):
+    """pxe_services 상태 ({서비스: {'active', 'state', 'sub', 'load'}})"""
+    _metric('pxe_service_up').replace({(service,): int(state['active']) for service, state in states.items()})
+    _metric('pxe_service_state').replace({(service, state['state'], state['sub']): 1
+                                          for service, state in states.items()})
+
+
+def record_telemetry(entries: Dict[str, dict]):
+    """pxe_telemetry 캐시 (유효 시간 안의 값만 넘김 - 나머지 시계열은 지움)"""
+    for name, field in (('pxe_client_temperature_celsius', 'temp'), ('pxe_client_load1', 'load1'),
+                        ('pxe_client_memory_percent', 'mem_percent'), ('pxe_client_disk_percent', 'disk_percent')):
+        _metric(name).replace({(serial,): entry['data'][field] for serial, entry in entries.items()
+                               if entry.get('data') and entry['data'].get(field) is not None})
+
+
+def record_nfs_traffic(snapshot: Optional[dict]):
+    """pxe_nfstraffic 샘플 (등록된 클라이언트만 - 미등록 IP는 시계열로 내보내지 않음)"""
+    rows = [row for row in (snapshot or {}).get('clients', []) if row['serial']]
+    values = {}
+    for row in rows:
+        for op in ('read', 'write'):
+            if row[f'{op}_bytes_s'] is not None:
+                values[(row['serial'], op)] = row[f'{op}_bytes_s']
+    _metric('pxe_client_nfs_bytes_per_second').replace(values)
+    _metric('pxe_client_nfs_packets_per_second').replace(
+        {(row['serial'],): row['packets_s'] for row in rows if row['packets_s'] is not None})
+
+
+def record_clients(count: int):
+    _metric('pxe_clients_registered').set(count)
+
+
+def record_resources(resources: dict):
+    """pxe_resources 샘플 (아직 비율이 없는 값/없어진 장치는 지움)"""
+    for key in ('cpu', 'memory', 'disk', 'iowait'):
+        if resources.get(key) is not None:
+            _metric(f'pxe_server_{key}_percent').set(resources[key])
+
+    def present(values: Dict[tuple, Optional[float]]) -> Dict[tuple, float]:
+        return {key: value for key, value in values.items() if value is not None}
+
+    nic = resources.get('nic') or {}
+    interface = nic.get('interface', '')
+    _metric('pxe_server_network_bytes_per_second').replace(present(
+        {(interface, 'rx'): nic.get('rx_bytes_s'), (interface, 'tx'): nic.get('tx_bytes_s')}))
+    _metric('pxe_server_network_utilization_percent').replace(present({(interface,): nic.get('utilization')}))
+    storage = resources.get('storage') or {}
+    device = storage.get('device') or ''
+    _metric('pxe_server_storage_bytes_per_second').replace(present(
+        {(device, 'read'): storage.get('read_bytes_s'), (device, 'write'): storage.get('write_bytes_s')}))
+    _metric('pxe_server_storage_utilization_percent').replace(present({(device,): storage.get('utilization')}))
+    nfsd = resources.get('nfsd') or {}
+    _metric('pxe_nfsd_threads').replace(present({(): nfsd.get('threads')}))
+    _metric('pxe_nfsd_rpc_calls_per_second').replace(present({(): nfsd.get('rpc_calls_s')}))
+    _metric('pxe_nfsd_bytes_per_second').replace(present(
+        {('read',): nfsd.get('read_bytes_s'), ('write',): nfsd.get('write_bytes_s')}))
+    _metric('pxe_nfsd_ops_per_second').replace(present({(op,): rate for op, rate in nfsd.get('ops_s', {}).items()}))
+    _metric('pxe_nfsd_queued_percent').replace(present({(): nfsd.get('queued_percent')}))
+    processes = resources.get('processes') or {}
+    for name, field in (('pxe_process_cpu_percent', 'cpu'), ('pxe_process_resident_bytes', 'rss_bytes'),
+                        ('pxe_process_write_bytes_per_second', 'write_bytes_s')):
+        _metric(name).replace(present({(process,): stats.get(field) for process, stats in processes.items()}))
+
+
+def record_step(step: str, seconds: float):
+    """단계 소요 시간을 이 프로세스 레지스트리에만 기록 (데몬이 받은 값)"""
+    _metric('pxe_provision_step_duration_seconds').observe(seconds, step=step)
+
+
+def report_step(step: str, seconds: float):
+    """단계 소요 시간 기록 + 데몬으로 전달 (forward_to가 설정된 경우)"""
+    record_step(step, seconds)
+    if _forward is not None:
+        try:
+            _forward(step, seconds)
+        except Exception:
+            pass
+
+
+def forward_to(callback: Optional[Callable[[str, float], None]]):
+    """이 프로세스에서 잰 프로비저닝 단계를 보낼 곳 (데몬 클라이언트)"""
+    global _forward
+    _forward = callback
+
+
+@contextmanager
+def timed(step: str):
+    """with timed('rootfs_clone'): ... - 성공한 단계만 기록"""
+    started = time.monotonic()
+    yield
+    report_step(step, time.monotonic() - started)
+
+
+class LogEventCounter:
+    """dnsmasq/mountd 로그 줄로 DHCP/TFTP/마운트 이벤트를 세고 부팅 시간을 기록"""
+
+    def __init__(self, clients: Iterable[dict] = ()):
+        self.tracer = pxe_boottrace.BootTracer(clients)
+
+    def feed(self, line: str):
+        match = pxe_boottrace.DHCP_RE.search(line)
+        if match:
+            _metric('pxe_dhcp_events_total').inc(type=match.group(1).lower())
+        match = pxe_boottrace.TFTP_SENT_RE.search(line)
+        if match:
+            kind = pxe_boottrace.classify_tftp_file(match.group(1)) or 'other'
+            _metric('pxe_tftp_transfers_total').inc(file=kind)
+        if pxe_boottrace.MOUNT_RE.search(line):
+            _metric('pxe_nfs_mounts_total').inc()
+        result = self.tracer.feed(line)
+        if result and not result['missing']:
+            _metric('pxe_boot_duration_seconds').observe(result['total'])
+
+
+# ---------- HTTP ----------
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = 'pxe-metrics'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        openmetrics = 'application/openmetrics-text' in self.headers.get('Accept', '')
+        body = self.server.registry.render(openmetrics).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', OPENMETRICS_TYPE if openmetrics else PROMETHEUS_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def bind_address(config: dict) -> str:
+    """metrics_bind, 없으면 server_ip (모든 인터페이스는 '0.0.0.0'으로 명시)"""
+    return config.get('metrics_bind') or config.get('server_ip') or '127.0.0.1'
+
+
+def serve(registry: MetricsRegistry, port: int = DEFAULT_PORT, bind: str = '127.0.0.1') -> ThreadingHTTPServer:
+    """백그라운드 스레드에서 /metrics 제공 (server.shutdown()으로 중지)"""
+    server = ThreadingHTTPServer((bind, port), _Handler)
+    server.daemon_threads = True
+    server.registry = registry
+    threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+    return server
@@ -0,0 +1,253 @@
+"""
+RPI PXE Manager - 클라이언트별 NFS 트래픽
+
+NFS 지연이 튈 때 어느 Pi가 서버를 두드리는지 찾으려고 NFS 바이트를 클라이언트(시리얼)별로
+나눈다. 커널 카운터 두 가지 중 읽을 수 있는 것을 쓴다:
+
+  conntrack     /proc/net/nf_conntrack의 dport 2049 연결 - 방향별 바이트/패킷 (IP → 시리얼)
+                바이트/패킷은 net.netfilter.nf_conntrack_acct=1일 때만 기록됨
+  export_stats  /proc/fs/nfsd/export_stats의 export별 io_read/io_write (커널 6.2+)
+                클라이언트마다 nfs_root/<시리얼>을 따로 export하므로 export = 클라이언트
+
+pxe_resources처럼 직전 샘플과의 차이로 초당 값을 낸다. 연결은 소스 포트까지 구분하므로
+다시 연결한 클라이언트도 빠지지 않는다. 두 파일 모두 root만 읽을 수 있어 보통 관리 데몬이
+daemon_resource_interval마다 샘플하고 (GET /v1/traffic), CLI/GUI는 데몬이 없을 때 직접 읽는다.
+"""
+
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional
+
+import pxe_resources
+
+NFS_PORT = 2049
+DEFAULT_LIMIT = 10
+# 데몬이 없을 때 CLI/GUI 상위 클라이언트 화면을 다시 샘플하는 간격 (초)
+REFRESH_INTERVAL = 2
+
+# 정렬 기준 → 행 필드
+SORTS = {
+    'bytes': 'bytes_s',
+    'read': 'read_bytes_s',
+    'write': 'write_bytes_s',
+    'packets': 'packets_s',
+    'total': 'total_bytes',
+}
+
+ACCT_HINT = 'sudo sysctl -w net.netfilter.nf_conntrack_acct=1'
+
+_OCTAL = re.compile(r'\\([0-7]{3})')
+
+
+def _delta(current: int, previous: Optional[int]) -> int:
+    """카운터 증가분 (이전 값이 없거나 초기화됐으면 현재 값 전체)"""
+    if previous is None or current < previous:
+        return current
+    return current - previous
+
+
+def read_conntrack(proc: str = '/proc') -> Optional[Dict[tuple, dict]]:
+    """NFS 연결 (프로토콜, 클라이언트 IP, 포트) → 방향별 카운터. 읽을 수 없으면 None
+
+    rx는 클라이언트 → 서버 (쓰기/요청), tx는 서버 → 클라이언트 (읽기/응답).
+    계정(acct)이 꺼져 있으면 바이트/패킷이 None.
+    """
+    try:
+        f = open(f'{proc}/net/nf_conntrack')
+    except OSError:
+        return None
+    needle = f' dport={NFS_PORT} '
+    flows = {}
+    with f:
+        for line in f:
+            if needle not in line:
+                continue
+            fields = line.split()
+            # 같은 키가 두 번 나옴 - 처음은 원래 방향(클라이언트 → 서버), 다음은 응답 방향
+            orig, reply = {}, {}
+            for token in fields:
+                key, sep, value = token.partition('=')
+                if sep:
+                    (reply if key in orig else orig)[key] = value
+            if orig.get('dport') != str(NFS_PORT) or 'src' not in orig:
+                continue
+            counters = {}
+            for name, side in (('rx', orig), ('tx', reply)):
+                counters[f'{name}_bytes'] = int(side['bytes']) if 'bytes' in side else None
+                counters[f'{name}_packets'] = int(side['packets']) if 'packets' in side else None
+            flows[(fields[2], orig['src'], orig.get('sport', ''))] = counters
+    return flows
+
+
+def conntrack_accounting(proc: str = '/proc') -> Optional[bool]:
+    """net.netfilter.nf_conntrack_acct (모듈이 없으면 None)"""
+    try:
+        with open(f'{proc}/sys/net/netfilter/nf_conntrack_acct') as f:
+            return f.read().strip() == '1'
+    except OSError:
+        return None
+
+
+def read_export_stats(proc: str = '/proc') -> Optional[Dict[str, dict]]:
+    """export 경로 → {'read', 'write'} 바이트 (클라이언트 지정이 여러 개면 합산). 없으면 None"""
+    try:
+        with open(f'{proc}/fs/nfsd/export_stats') as f:
+            text = f.read()
+    except OSError:
+        return None
+    exports: Dict[str, dict] = {}
+    current = None
+    for line in text.splitlines():
+        if not line.strip() or line.startswith('#'):
+            continue
+        if not line[0].isspace():
+            # '<경로>\t<클라이언트>\t<시작 시각>' - 경로의 공백 등은 \040 형식
+            path = _OCTAL.sub(lambda m: chr(int(m.group(1), 8)), line.split()[0])
+            current = exports.setdefault(os.path.normpath(path), {'read': 0, 'write': 0})
+            continue
+        name, _, value = line.strip().partition(':')
+        if current is not None and name in ('io_read', 'io_write'):
+            current[name[3:]] += int(value)
+    return exports
+
+
+class NFSTrafficSampler:
+    """클라이언트별 NFS 트래픽 샘플러 - sample()마다 직전 호출과의 차이로 초당 값 (스레드 안전)"""
+
+    def __init__(self, nfs_root: str, proc: str = '/proc'):
+        self.nfs_root = nfs_root
+        self.proc = proc
+        self.started = time.time()
+        self.latest: Optional[dict] = None
+        # 행 키 → 샘플러를 만든 뒤 누적 바이트
+        self.totals: Dict[str, int] = {}
+        self._previous: Optional[dict] = None
+        self._lock = threading.Lock()
+
+    def _export_client(self, path: str, by_serial: Dict[str, dict]) -> Optional[dict]:
+        parent, name = os.path.split(path)
+        if os.path.normpath(parent) != os.path.normpath(self.nfs_root):
+            return None         # 클라이언트 루트가 아닌 공용 export
+        return by_serial.get(name)
+
+    def sample(self, clients: List[dict], min_interval: float = 0) -> dict:
+        """클라이언트별 초당 값. 첫 호출은 기준점이라 clients가 비어 있음"""
+        with self._lock:
+            if min_interval and self._previous:
+                wait = min_interval - (time.monotonic() - self._previous['at'])
+                if wait > 0:
+                    time.sleep(wait)
+            current = {'at': time.monotonic(), 'flows': read_conntrack(self.proc),
+                       'exports': read_export_stats(self.proc)}
+            previous = self._previous
+            self._previous = current
+            flows, exports = current['flows'], current['exports']
+            accounted = conntrack_accounting(self.proc)
+            if accounted is None:
+                accounted = bool(flows) and all(c['rx_bytes'] is not None for c in flows.values())
+            snapshot = {
+                'time': time.time(), 'started': self.started, 'interval': None, 'clients': [],
+                'sources': {'conntrack': None if flows is None else ('bytes' if accounted else 'connections'),
+                            'export_stats': exports is not None},
+            }
+            if previous is None:
+                self.latest = snapshot
+                return snapshot
+            dt = current['at'] - previous['at']
+            snapshot['interval'] = round(dt, 2)
+
+            by_ip = {c['ip']: c for c in clients if c.get('ip')}
+            by_serial = {c['serial']: c for c in clients}
+            rows: Dict[str, dict] = {}
+
+            def row_for(client: Optional[dict], ip: str) -> dict:
+                key = client['serial'] if client else ip
+                if key not in rows:
+                    rows[key] = {'key': key, 'serial': client['serial'] if client else None,
+                                 'hostname': (client.get('hostname') or client['serial']) if client else '',
+                                 'ip': client.get('ip', '') if client else ip, 'connections': 0,
+                                 'rx': 0, 'tx': 0, 'packets': 0, 'read': None, 'write': None}
+                return rows[key]
+
+            for key, counters in (flows or {}).items():
+                row = row_for(by_ip.get(key[1]), key[1])
+                row['connections'] += 1
+                # 직전에 파일을 못 읽었으면 이번이 기준점
+                if counters['rx_bytes'] is None or previous['flows'] is None:
+                    continue
+                before = (previous['flows'] or {}).get(key, {})
+                row['rx'] += _delta(counters['rx_bytes'], before.get('rx_bytes'))
+                row['tx'] += _delta(counters['tx_bytes'], before.get('tx_bytes'))
+                row['packets'] += _delta(counters['rx_packets'], before.get('rx_packets'))
+            for path, counters in (exports or {}).items():
+                client = self._export_client(path, by_serial)
+                if client is None or previous['exports'] is None:
+                    continue
+                row = row_for(client, client.get('ip', ''))
+                before = (previous['exports'] or {}).get(path, {})
+                row['read'] = (row['read'] or 0) + _delta(counters['read'], before.get('read'))
+                row['write'] = (row['write'] or 0) + _delta(counters['write'], before.get('write'))
+
+            def rate(value: Optional[int]) -> Optional[float]:
+                return None if value is None or dt <= 0 else round(value / dt, 1)
+
+            for row in rows.values():
+                wire = row['rx'] + row['tx'] if accounted else None
+                io = None if row['read'] is None else row['read'] + row['write']
+                moved = wire if wire is not None else io
+                if moved:
+                    self.totals[row['key']] = self.totals.get(row['key'], 0) + moved
+                # 읽기/쓰기는 클라이언트 기준 - export 카운터가 있으면 그것, 없으면 연결 방향
+                snapshot['clients'].append({
+                    'serial': row['serial'], 'hostname': row['hostname'], 'ip': row['ip'],
+                    'connections': row['connections'],
+                    'bytes_s': rate(moved),
+                    'read_bytes_s': rate(row['read'] if row['read'] is not None else (row['tx'] if accounted else None)),
+                    'write_bytes_s': rate(row['write'] if row['write'] is not None else (row['rx'] if accounted else None)),
+                    'packets_s': rate(row['packets'] if accounted else None),
+                    'total_bytes': self.totals.get(row['key'], 0),
+                })
+            snapshot['clients'] = hot(snapshot, limit=0)
+            self.latest = snapshot
+            return snapshot
+
+
+def hot(snapshot: Optional[dict], limit: int = DEFAULT_LIMIT, sort: str = 'bytes') -> List[dict]:
+    """많이 쓰는 순 (값이 없으면 뒤로). limit 0이면 전체"""
+    if not snapshot:
+        return []
+    field = SORTS[sort]
+    rows = sorted(snapshot['clients'], key=lambda r: (r[field] is None, -(r[field] or 0), r['ip']))
+    return rows[:limit] if limit else rows
+
+
+def describe_sources(snapshot: Optional[dict]) -> str:
+    """사용한 카운터 (없으면 켜는 방법)"""
+    if not snapshot:
+        return '샘플 없음'
+    sources = snapshot['sources']
+    parts = []
+    if sources['conntrack'] == 'bytes':
+        parts.append('conntrack')
+    elif sources['conntrack'] == 'connections':
+        parts.append(f"conntrack 연결 수만 (바이트: {ACCT_HINT})")
+    if sources['export_stats']:
+        parts.append('export_stats')
+    if not parts:
+        return f"읽을 수 있는 카운터 없음 (root 권한, nf_conntrack 모듈, {ACCT_HINT})"
+    return ', '.join(parts)
+
+
+def label(row: dict) -> str:
+    """'시리얼' 또는 미등록 IP는 '(미등록)'"""
+    return row['serial'] or '(미등록)'
+
+
+def format_row(row: dict) -> Dict[str, str]:
+    """표시용 문자열 (읽기/쓰기/합계/패킷/누적)"""
+    rate = pxe_resources.format_rate
+    return {'read': rate(row['read_bytes_s']), 'write': rate(row['write_bytes_s']), 'bytes': rate(row['bytes_s']),
+            'packets': '-' if row['packets_s'] is None else f"{row['packets_s']:.0f}/s",
+            'total': pxe_resources.format_size(row['total_bytes'])}
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+RPI PXE Manager - 권한 작업 일괄 실행
+
+chmod/chown/파일 쓰기/정규식 치환/심볼릭 링크 같은 파일시스템 작업을
+목록으로 모아 한 번에 적용한다. root로 실행 중이면 현재 프로세스에서 바로,
+아니면 sudo 헬퍼 프로세스 하나(이 파일)에 JSON으로 넘겨 적용하므로
+작업마다 sudo/PAM/fork-exec 비용을 내지 않는다.
+
+파일 내용 변경(write/replace)은 같은 디렉토리의 임시 파일에 쓴 뒤 rename하여
+원자적으로 교체하고, 어느 한 단계가 실패하면 나머지는 실행하지 않는다.
+"""
+
+import glob
+import grp
+import importlib
+import json
+import os
+import pwd
+import re
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+
+class BatchError(RuntimeError):
+    """일괄 작업 중 실패 (index: 실패한 작업 번호, done: 완료된 작업 수)"""
+
+    def __init__(self, message: str, index: int = -1, op: Optional[dict] = None, done: int = 0):
+        super().__init__(message)
+        self.index = index
+        self.op = op or {}
+        self.done = done
+
+
+class OpBatch:
+    """권한 작업 목록
+
+    경로에 '*'가 있으면 헬퍼에서 glob으로 확장한다.
+    optional=True인 작업은 대상이 없으면 건너뛴다.
+    """
+
+    def __init__(self):
+        self.ops: List[dict] = []
+
+    def __len__(self) -> int:
+        return len(self.ops)
+
+    def _add(self, op: str, **kwargs) -> 'OpBatch':
+        kwargs['op'] = op
+        self.ops.append(kwargs)
+        return self
+
+    def mkdir(self, path, mode: Optional[int] = None) -> 'OpBatch':
+        return self._add('mkdir', path=str(path), mode=mode)
+
+    def chmod(self, path, mode: int, optional: bool = True) -> 'OpBatch':
+        return self._add('chmod', path=str(path), mode=mode, optional=optional)
+
+    def chown(self, path, owner: str, recursive: bool = False, optional: bool = True) -> 'OpBatch':
+        return self._add('chown', path=str(path), owner=owner, recursive=recursive, optional=optional)
+
+    def write(self, path, content: str, mode: Optional[int] = None, optional: bool = False) -> 'OpBatch':
+        """파일 전체 쓰기 (원자적). optional=True면 파일이 있을 때만"""
+        return self._add('write', path=str(path), content=content, mode=mode, optional=optional)
+
+    def replace(self, path, pattern: str, repl: str, optional: bool = True) -> 'OpBatch':
+        """정규식 치환 (re.MULTILINE, 원자적)"""
+        return self._add('replace', path=str(path), pattern=pattern, repl=repl, optional=optional)
+
+    def append(self, path, content: str, optional: bool = True) -> 'OpBatch':
+        return self._add('append', path=str(path), content=content, optional=optional)
+
+    def symlink(self, target: str, link) -> 'OpBatch':
+        return self._add('symlink', target=str(target), path=str(link))
+
+    def remove(self, path) -> 'OpBatch':
+        return self._add('remove', path=str(path))
+
+    def run(self, argv: List[str]) -> 'OpBatch':
+        """외부 명령 (헬퍼 안에서 실행하므로 sudo 불필요)"""
+        return self._add('run', argv=[str(a) for a in argv])
+
+    def call(self, module: str, func: str, *args) -> 'OpBatch':
+        """pxe_* 모듈 함수 호출 (인자/반환값은 JSON 직렬화 가능해야 함). 반환값은 results에"""
+        return self._add('call', module=module, func=func, args=[str(a) if isinstance(a, Path) else a for a in args])
+
+    def apply(self, check: bool = True) -> dict:
+        """작업 적용 → {'done': n, 'total': n, 'error': None 또는 {...}, 'results': [...]}"""
+        if not self.ops:
+            return {'done': 0, 'total': 0, 'error': None, 'results': []}
+        if os.geteuid() == 0:
+            result = apply_ops(self.ops)
+        else:
+            proc = subprocess.run(['sudo', sys.executable, str(Path(__file__).resolve())],
+                                  input=json.dumps(self.ops), capture_output=True, text=True)
+            try:
+                result = json.loads(proc.stdout)
+            except ValueError:
+                result = {'done': 0, 'total': len(self.ops), 'results': [],
+                          'error': {'index': -1, 'op': {}, 'message': proc.stderr.strip() or 'sudo 헬퍼 실행 실패'}}
+        if check and result['error']:
+            error = result['error']
+            raise BatchError(error['message'], error['index'], error['op'], result['done'])
+        return result
+
+
+# ---------- 헬퍼 (root 권한으로 실행) ----------
+
+def _expand(path: str, optional: bool) -> List[str]:
+    paths = sorted(glob.glob(path)) if any(c in path for c in '*?[') else [path]
+    paths = [p for p in paths if os.path.lexists(p)]
+    if not paths and not optional:
+        raise FileNotFoundError(path)
+    return paths
+
+
+def _parse_owner(owner: str):
+    user, _, group = owner.partition(':')
+    uid = pwd.getpwnam(user).pw_uid if user else -1
+    gid = grp.getgrnam(group).gr_gid if group else -1
+    return uid, gid
+
+
+def atomic_write(path: str, content: str, mode: Optional[int] = None):
+    """임시 파일에 쓰고 rename - 기존 파일의 권한/소유자 유지"""
+    existing = None
+    try:
+        existing = os.stat(path)
+    except FileNotFoundError:
+        pass
+
+    tmp = os.path.join(os.path.dirname(path) or '.', f'.{os.path.basename(path)}.{os.getpid()}.tmp')
+    try:
+        with open(tmp, 'w') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        if existing is not None:
+            os.chown(tmp, existing.st_uid, existing.st_gid)
+            os.chmod(tmp, existing.st_mode & 0o7777)
+        if mode is not None:
+            os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def _apply_one(op: dict):
+    kind = op['op']
+    optional = op.get('optional', False)
+
+    if kind == 'mkdir':
+        os.makedirs(op['path'], exist_ok=True)
+        if op.get('mode') is not None:
+            os.chmod(op['path'], op['mode'])
+
+    elif kind == 'chmod':
+        for path in _expand(op['path'], optional):
+            os.chmod(path, op['mode'])
+
+    elif kind == 'chown':
+        uid, gid = _parse_owner(op['owner'])
+        for path in _expand(op['path'], optional):
+            os.chown(path, uid, gid, follow_symlinks=False)
+            if op.get('recursive') and os.path.isdir(path) and not os.path.islink(path):
+                for root, dirs, files in os.walk(path):
+                    for name in dirs + files:
+                        os.chown(os.path.join(root, name), uid, gid, follow_symlinks=False)
+
+    elif kind == 'write':
+        if optional and not os.path.exists(op['path']):
+            return
+        atomic_write(op['path'], op['content'], op.get('mode'))
+
+    elif kind in ('replace', 'append'):
+        for path in _expand(op['path'], optional):
+            with open(path, 'r') as f:
+                content = f.read()
+            if kind == 'replace':
+                updated = re.sub(op['pattern'], op['repl'], content, flags=re.MULTILINE)
+            else:
+                updated = content + op['content']
+            if updated != content:
+                atomic_write(path, updated)
+
+    elif kind == 'symlink':
+        if os.path.lexists(op['path']):
+            os.unlink(op['path'])
+        os.makedirs(os.path.dirname(op['path']), exist_ok=True)
+        os.symlink(op['target'], op['path'])
+
+    elif kind == 'remove':
+        for path in _expand(op['path'], True):
+            if os.path.isdir(path) and not os.path.islink(path):
+                shutil.rmtree(path)
+            else:
+                os.unlink(path)
+
+    elif kind == 'run':
+        subprocess.run(op['argv'], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+    elif kind == 'call':
+        if not re.match(r'^pxe_\w+$', op['module']) or op['func'].startswith('_'):
+            raise ValueError(f"호출할 수 없는 함수: {op['module']}.{op['func']}")
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        module = importlib.import_module(op['module'])
+        return getattr(module, op['func'])(*op.get('args', []))
+
+    else:
+        raise ValueError(f"알 수 없는 작업: {kind}")
+
+
+def apply_ops(ops: List[dict]) -> dict:
+    """작업을 순서대로 적용하고 첫 실패에서 중단"""
+    results = []
+    for index, op in enumerate(ops):
+        try:
+            results.append(_apply_one(op))
+        except Exception as e:
+            message = str(e)
+            if isinstance(e, subprocess.CalledProcessError) and e.stderr:
+                message = e.stderr.decode(errors='replace').strip() if isinstance(e.stderr, bytes) else e.stderr.strip()
+            return {'done': index, 'total': len(ops), 'results': results,
+                    'error': {'index': index, 'op': op, 'message': f"{op['op']} {op.get('path', '')}: {message}"}}
+    return {'done': len(ops), 'total': len(ops), 'error': None, 'results': results}
+
+
+def main():
+    ops = json.load(sys.stdin)
+    json.dump(apply_ops(ops), sys.stdout, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
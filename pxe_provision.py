@@ -0,0 +1,183 @@
+"""
+RPI PXE Manager - 클라이언트 루트 파일시스템 프로비저닝
+
+새 클라이언트의 NFS 루트를 골든 템플릿(또는 기존 클라이언트)에서 만든다.
+btrfs/XFS처럼 reflink를 지원하는 파일시스템이면 블록을 공유하는
+copy-on-write 복제를 사용하고, 지원하지 않으면 rsync 전체 복사로 대체한다.
+"""
+
+import os
+import subprocess
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# 프로비저닝 모드
+MODE_AUTO = 'auto'
+MODE_REFLINK = 'reflink'
+MODE_RSYNC = 'rsync'
+MODES = (MODE_AUTO, MODE_REFLINK, MODE_RSYNC)
+
+# 클라이언트 간에 복제하지 않는 경로 (rsync --exclude 패턴과 동일)
+DEFAULT_EXCLUDES = ['captures', 'videos', '*.log']
+
+# 골든 템플릿 기본 위치 (nfs_root 아래)
+GOLDEN_DIR_NAME = '.golden'
+
+# st_dev별 reflink 지원 여부 캐시
+_reflink_cache: Dict[int, bool] = {}
+
+
+def golden_template_path(config: dict) -> Path:
+    """설정의 골든 템플릿 경로 반환 (미설정 시 nfs_root/.golden)"""
+    path = config.get('golden_template') or ''
+    if path:
+        return Path(path)
+    return Path(config['nfs_root']) / GOLDEN_DIR_NAME
+
+
+def _within(path: str, parent: str) -> bool:
+    return path == parent or path.startswith(parent.rstrip('/') + '/')
+
+
+def template_path_problem(path, config: dict, serials: List[str]) -> Optional[str]:
+    """골든 템플릿 경로로 쓸 수 없으면 이유 반환 (갱신할 때 통째로 교체되므로)
+
+    /, nfs_root, tftp_root, 클라이언트 루트이거나 이들을 포함하는 경로, 클라이언트 루트 안은 거부한다.
+    """
+    if not str(path) or not os.path.isabs(str(path)):
+        return '절대 경로가 아닙니다'
+    resolved = os.path.realpath(path)
+    if resolved == '/':
+        return '루트 디렉토리입니다'
+    protected = [('NFS 루트', config['nfs_root']), ('TFTP 루트', config['tftp_root'])]
+    protected += [(f'클라이언트 {serial} 루트', os.path.join(config['nfs_root'], serial)) for serial in serials]
+    for name, other in protected:
+        other = os.path.realpath(other)
+        if _within(other, resolved):
+            return f'{name}({other})이거나 이를 포함합니다'
+        if name.startswith('클라이언트') and _within(resolved, other):
+            return f'{name}({other}) 안에 있습니다'
+    return None
+
+
+def _existing_parent(path: Path) -> Path:
+    """존재하는 가장 가까운 상위 디렉토리"""
+    path = Path(path)
+    while not path.exists() and path != path.parent:
+        path = path.parent
+    return path
+
+
+def supports_reflink(directory: Path) -> bool:
+    """디렉토리가 있는 파일시스템의 reflink(FICLONE) 지원 여부 확인"""
+    directory = _existing_parent(directory)
+    try:
+        dev = os.stat(directory).st_dev
+    except OSError:
+        return False
+
+    if dev in _reflink_cache:
+        return _reflink_cache[dev]
+
+    probe_src = directory / f'.reflink-probe-{uuid.uuid4().hex[:8]}'
+    probe_dst = Path(str(probe_src) + '.clone')
+    supported = False
+    try:
+        subprocess.run(['sudo', 'tee', str(probe_src)], input=b'probe\n',
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        result = subprocess.run(['sudo', 'cp', '--reflink=always', str(probe_src), str(probe_dst)],
+                                stderr=subprocess.DEVNULL)
+        supported = result.returncode == 0
+    except Exception:
+        supported = False
+    finally:
+        subprocess.run(['sudo', 'rm', '-f', str(probe_src), str(probe_dst)],
+                       stderr=subprocess.DEVNULL)
+
+    _reflink_cache[dev] = supported
+    return supported
+
+
+def same_filesystem(a: Path, b: Path) -> bool:
+    """두 경로가 같은 파일시스템에 있는지 확인 (reflink는 같은 파일시스템 안에서만 가능)"""
+    try:
+        return os.stat(_existing_parent(a)).st_dev == os.stat(_existing_parent(b)).st_dev
+    except OSError:
+        return False
+
+
+def choose_method(source: Path, target: Path, mode: str = MODE_AUTO) -> str:
+    """복제 방식 결정: reflink 가능하면 reflink, 아니면 rsync"""
+    if mode == MODE_RSYNC:
+        return MODE_RSYNC
+    if same_filesystem(source, target.parent) and supports_reflink(target.parent):
+        return MODE_REFLINK
+    if mode == MODE_REFLINK:
+        print(f"  ⚠️  reflink를 사용할 수 없어 rsync로 대체합니다 ({target.parent})")
+    return MODE_RSYNC
+
+
+def _prune_excludes(target: Path, excludes: List[str]):
+    """cp는 --exclude가 없으므로 복제 후 제외 대상 삭제"""
+    if not excludes:
+        return
+    expr = []
+    for pattern in excludes:
+        if expr:
+            expr.append('-o')
+        expr += ['-name', pattern]
+    subprocess.run(['sudo', 'find', str(target), '-xdev', '(', *expr, ')',
+                    '-prune', '-exec', 'rm', '-rf', '{}', '+'],
+                   stderr=subprocess.DEVNULL)
+
+
+def clone_tree(source: Path, target: Path, mode: str = MODE_AUTO,
+               excludes: Optional[List[str]] = None) -> str:
+    """source 트리를 target으로 복제하고 사용한 방식을 반환
+
+    reflink 복제는 데이터 블록을 공유하므로 파일 수에 비례한 메타데이터
+    복사만 일어나고, 이후 클라이언트별로 바뀐 블록만 디스크를 차지한다.
+    """
+    source = Path(source)
+    target = Path(target)
+    if excludes is None:
+        excludes = DEFAULT_EXCLUDES
+
+    subprocess.run(['sudo', 'mkdir', '-p', str(target)], check=True)
+    method = choose_method(source, target, mode)
+
+    if method == MODE_REFLINK:
+        # -a: 권한/소유자/하드링크/xattr/ACL 보존, -x: 다른 파일시스템으로 넘어가지 않음
+        subprocess.run(['sudo', 'cp', '-ax', '--reflink=always',
+                        str(source) + '/.', str(target)], check=True)
+        _prune_excludes(target, excludes)
+    else:
+        subprocess.run(['sudo', 'rsync', '-aHAXx', '--info=progress2',
+                        *[f'--exclude={p}' for p in excludes],
+                        str(source) + '/', str(target) + '/'], check=True)
+
+    return method
+
+
+def replace_tree(source: Path, target: Path, mode: str = MODE_AUTO,
+                 excludes: Optional[List[str]] = None) -> str:
+    """source를 target 옆 임시 디렉토리에 복제한 뒤 이름을 바꿔 교체
+
+    복제가 실패하면 기존 target이 그대로 남는다.
+    """
+    target = Path(target)
+    tag = uuid.uuid4().hex[:8]
+    staging = target.parent / f'.{target.name}.new-{tag}'
+    retired = target.parent / f'.{target.name}.old-{tag}'
+    try:
+        method = clone_tree(source, staging, mode, excludes)
+    except subprocess.CalledProcessError:
+        subprocess.run(['sudo', 'rm', '-rf', '--one-file-system', str(staging)], stderr=subprocess.DEVNULL)
+        raise
+    if target.exists():
+        subprocess.run(['sudo', 'mv', '-T', str(target), str(retired)], check=True)
+    subprocess.run(['sudo', 'mv', '-T', str(staging), str(target)], check=True)
+    if retired.exists():
+        subprocess.run(['sudo', 'rm', '-rf', '--one-file-system', str(retired)], check=True)
+    return method
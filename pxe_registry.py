@@ -0,0 +1,266 @@
+"""
+RPI PXE Manager - 클라이언트 레지스트리 (SQLite)
+
+클라이언트 목록을 JSON 리스트 대신 SQLite 테이블에 저장한다.
+시리얼/MAC/IP에 고유 인덱스가 있어 조회와 중복 검사가 인덱스로 처리되고,
+클라이언트 하나를 바꾸면 해당 행만 트랜잭션으로 기록된다.
+기존 ~/.rpi_pxe_config.json의 'clients' 목록과 clients_backup.json 형식은
+가져오기/내보내기로 계속 지원한다.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+# 테이블 컬럼으로 관리하는 필드 (나머지 필드는 extra JSON에 보존)
+FIELDS = ('serial', 'mac', 'ip', 'hostname', 'boot_mode')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS clients (
+    serial     TEXT PRIMARY KEY,
+    mac        TEXT,
+    ip         TEXT,
+    ip_num     INTEGER,
+    hostname   TEXT,
+    boot_mode  TEXT,
+    extra      TEXT NOT NULL DEFAULT '{}',
+    updated_at REAL NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS clients_mac ON clients(mac);
+CREATE UNIQUE INDEX IF NOT EXISTS clients_ip ON clients(ip);
+CREATE INDEX IF NOT EXISTS clients_ip_num ON clients(ip_num);
+"""
+
+# 실행 중 상태 값은 레지스트리에 저장하지 않음
+TRANSIENT_FIELDS = ('online',)
+
+
+class DuplicateClientError(ValueError):
+    """시리얼/MAC/IP 중복"""
+
+    def __init__(self, field: str, value: str):
+        super().__init__(f"이미 등록된 {field}: {value}")
+        self.field = field
+        self.value = value
+
+
+def ip_to_number(ip: Optional[str]) -> Optional[int]:
+    """정렬용 IP 정수 변환 (잘못된 값은 None)"""
+    try:
+        parts = [int(p) for p in (ip or '').split('.')]
+        if len(parts) != 4:
+            return None
+        return parts[0] * 256**3 + parts[1] * 256**2 + parts[2] * 256 + parts[3]
+    except ValueError:
+        return None
+
+
+class ClientRegistry:
+    """시리얼/MAC/IP 고유 인덱스를 가진 클라이언트 저장소"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SCHEMA)
+        self._depth = 0
+        # 마지막 백업 이후 변경 횟수
+        self.changes = 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def data_version(self) -> int:
+        """다른 연결(다른 프로세스)이 커밋할 때마다 바뀌는 값 - 외부 변경 감지용"""
+        with self._lock:
+            return self._conn.execute('PRAGMA data_version').fetchone()[0]
+
+    # ---------- 트랜잭션 ----------
+
+    @contextmanager
+    def transaction(self):
+        """중첩 가능한 트랜잭션 (가장 바깥에서 커밋/롤백)"""
+        with self._lock:
+            if self._depth == 0:
+                self._conn.execute('BEGIN IMMEDIATE')
+            self._depth += 1
+            try:
+                yield self
+            except Exception:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._conn.execute('ROLLBACK')
+                raise
+            else:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._conn.execute('COMMIT')
+
+    # ---------- 변환 ----------
+
+    @staticmethod
+    def _to_row(client: dict) -> dict:
+        extra = {k: v for k, v in client.items() if k not in FIELDS and k not in TRANSIENT_FIELDS}
+        return {
+            'serial': client['serial'],
+            'mac': (client.get('mac') or '').lower() or None,
+            'ip': client.get('ip') or None,
+            'ip_num': ip_to_number(client.get('ip')),
+            'hostname': client.get('hostname') or client['serial'],
+            'boot_mode': client.get('boot_mode') or 'nfs',
+            'extra': json.dumps(extra, ensure_ascii=False),
+            'updated_at': time.time(),
+        }
+
+    @staticmethod
+    def _to_client(row: sqlite3.Row) -> dict:
+        client = {'serial': row['serial'], 'hostname': row['hostname']}
+        if row['mac']:
+            client['mac'] = row['mac']
+        if row['ip']:
+            client['ip'] = row['ip']
+        client['boot_mode'] = row['boot_mode']
+        client.update(json.loads(row['extra'] or '{}'))
+        return client
+
+    def _raise_duplicate(self, row: dict, exclude_serial: Optional[str] = None):
+        """IntegrityError를 어떤 필드가 중복인지 알려주는 예외로 변환"""
+        for field, label in (('serial', '시리얼 번호'), ('mac', 'MAC 주소'), ('ip', 'IP 주소')):
+            value = row.get(field)
+            if not value:
+                continue
+            existing = self._find(field, value)
+            if existing and existing['serial'] != exclude_serial:
+                raise DuplicateClientError(label, value)
+        raise DuplicateClientError('클라이언트', row['serial'])
+
+    def _find(self, column: str, value: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(f'SELECT * FROM clients WHERE {column} = ?', (value,)).fetchone()
+        return self._to_client(row) if row else None
+
+    # ---------- 조회 ----------
+
+    def get(self, serial: str) -> Optional[dict]:
+        return self._find('serial', serial)
+
+    def get_by_mac(self, mac: str) -> Optional[dict]:
+        return self._find('mac', (mac or '').lower())
+
+    def get_by_ip(self, ip: str) -> Optional[dict]:
+        return self._find('ip', ip)
+
+    def all(self) -> List[dict]:
+        """IP 순으로 정렬된 전체 클라이언트 목록"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT * FROM clients ORDER BY ip_num IS NULL, ip_num, serial').fetchall()
+        return [self._to_client(row) for row in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM clients').fetchone()[0]
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def __iter__(self):
+        return iter(self.all())
+
+    # ---------- 변경 (행 단위) ----------
+
+    def add(self, client: dict) -> dict:
+        """새 클라이언트 추가 (중복 시 DuplicateClientError)"""
+        row = self._to_row(client)
+        with self.transaction():
+            try:
+                self._conn.execute(
+                    'INSERT INTO clients (serial, mac, ip, ip_num, hostname, boot_mode, extra, updated_at) '
+                    'VALUES (:serial, :mac, :ip, :ip_num, :hostname, :boot_mode, :extra, :updated_at)', row)
+            except sqlite3.IntegrityError:
+                self._raise_duplicate(row)
+        self.changes += 1
+        return self.get(row['serial'])
+
+    def update(self, serial: str, **fields) -> dict:
+        """기존 클라이언트 필드 변경 (해당 행만 기록)"""
+        with self.transaction():
+            current = self.get(serial)
+            if current is None:
+                raise KeyError(serial)
+            current.update(fields)
+            current['serial'] = serial
+            row = self._to_row(current)
+            try:
+                self._conn.execute(
+                    'UPDATE clients SET mac = :mac, ip = :ip, ip_num = :ip_num, hostname = :hostname, '
+                    'boot_mode = :boot_mode, extra = :extra, updated_at = :updated_at WHERE serial = :serial', row)
+            except sqlite3.IntegrityError:
+                self._raise_duplicate(row, exclude_serial=serial)
+        self.changes += 1
+        return self.get(serial)
+
+    def upsert(self, client: dict) -> dict:
+        """있으면 변경, 없으면 추가"""
+        with self.transaction():
+            if self.get(client['serial']) is None:
+                return self.add(client)
+            fields = {k: v for k, v in client.items() if k != 'serial'}
+            return self.update(client['serial'], **fields)
+
+    def remove(self, serial: str) -> bool:
+        with self.transaction():
+            cursor = self._conn.execute('DELETE FROM clients WHERE serial = ?', (serial,))
+        if cursor.rowcount:
+            self.changes += 1
+        return cursor.rowcount > 0
+
+    def replace_all(self, clients: Iterable[dict]):
+        """전체 목록 교체 (복원/가져오기) - 하나의 트랜잭션"""
+        with self.transaction():
+            self._conn.execute('DELETE FROM clients')
+            for client in clients:
+                if client.get('serial'):
+                    self.add(client)
+        self.changes += 1
+
+    # ---------- JSON 가져오기/내보내기 ----------
+
+    def import_clients(self, clients: Iterable[dict]) -> int:
+        """JSON 형식 목록 병합 (같은 시리얼은 갱신). 처리한 수 반환"""
+        count = 0
+        with self.transaction():
+            for client in clients:
+                if client.get('serial'):
+                    self.upsert(client)
+                    count += 1
+        return count
+
+    def import_json(self, path: Path) -> int:
+        """~/.rpi_pxe_config.json 또는 clients_backup.json에서 가져오기"""
+        with open(path, 'r') as f:
+            data = json.load(f)
+        clients = data if isinstance(data, list) else data.get('clients', [])
+        return self.import_clients(clients)
+
+    def export_backup(self, path: Path, server_ip: str = '', nfs_root: str = ''):
+        """clients_backup.json 형식으로 내보내기"""
+        backup_data = {
+            'backup_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'server_ip': server_ip,
+            'nfs_root': nfs_root,
+            'clients': self.all()
+        }
+        with open(path, 'w') as f:
+            json.dump(backup_data, f, indent=2, ensure_ascii=False)
+        self.changes = 0
+        return backup_data
@@ -0,0 +1,463 @@
+"""
+RPI PXE Manager - 서버 자원 샘플러
+
+부팅 폭주 때 서버가 NIC, 디스크, nfsd 스레드 중 어디에 막히는지 보려고 커널 카운터를
+읽고, 이전 샘플과의 차이로 초당 값을 낸다. 측정 구간을 기다리며 멈추지 않는다
+(psutil.cpu_percent(interval=1)처럼 1초를 막지 않음). 첫 샘플은 기준점이라 비율 값이 None.
+
+  CPU/iowait       /proc/stat
+  메모리/디스크     /proc/meminfo, statvfs('/'), statvfs(nfs_root)
+  NIC              /sys/class/net/<network_interface>/statistics, speed
+  NFS 저장소 I/O    nfs_root가 있는 블록 장치의 /sys/dev/block/<major:minor>/stat
+  nfsd             /proc/net/rpc/nfsd (바이트/RPC/연산별), /proc/fs/nfsd/threads, pool_stats
+  dnsmasq/tftpd    /proc/<pid>/stat, status, io (wchar ≈ TFTP/DHCP 송신량)
+
+관리 데몬이 daemon_resource_interval(기본 5초)마다 샘플해 state와 /metrics로 내보내고,
+CLI/GUI는 데몬이 없을 때만 직접 샘플한다.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+CLK_TCK = os.sysconf('SC_CLK_TCK')
+SECTOR_BYTES = 512
+
+NET_COUNTERS = ('rx_bytes', 'tx_bytes', 'rx_packets', 'tx_packets',
+                'rx_dropped', 'tx_dropped', 'rx_errors', 'tx_errors')
+
+# /proc/net/rpc/nfsd proc3 줄 순서
+NFS3_OPS = ('null', 'getattr', 'setattr', 'lookup', 'access', 'readlink', 'read', 'write', 'create',
+            'mkdir', 'symlink', 'mknod', 'remove', 'rmdir', 'rename', 'link', 'readdir', 'readdirplus',
+            'fsstat', 'fsinfo', 'pathconf', 'commit')
+# proc4ops 줄 위치 → 연산 (부팅 때 많은 것만)
+NFS4_OPS = {3: 'access', 9: 'getattr', 15: 'lookup', 18: 'open', 25: 'read', 26: 'readdir', 38: 'write'}
+# 초당 값을 내는 연산 (v3/v4 합산)
+NFS_OPS = ('getattr', 'lookup', 'access', 'open', 'read', 'write', 'readdir', 'readdirplus')
+
+# 기준점만 있을 때 비율을 내려고 기다리는 최소 구간 (초) - 한 번 실행하는 명령용
+MIN_INTERVAL = 0.2
+
+# 표시 이름 → /proc/<pid>/comm
+PROCESSES = {'dnsmasq': 'dnsmasq', 'tftpd': 'in.tftpd'}
+
+# 병목 판단 기준
+CPU_BUSY = 90.0         # %
+NIC_BUSY = 80.0         # 링크 속도 대비 %
+DISK_BUSY = 80.0        # 장치가 I/O 중이던 시간 %
+NFSD_QUEUED = 5.0       # 빈 nfsd 스레드가 없어 기다린 요청 %
+
+BOTTLENECK_LABELS = {'cpu': 'CPU', 'nic': 'NIC 대역폭', 'disk': 'NFS 디스크', 'nfsd': 'nfsd 스레드 부족'}
+
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _read_int(path: str) -> Optional[int]:
+    try:
+        return int(_read(path).strip())
+    except (AttributeError, ValueError):
+        return None
+
+
+def _existing(path: str) -> str:
+    """path 또는 가장 가까운 존재하는 상위 디렉토리"""
+    path = os.path.abspath(path or '/')
+    while not os.path.exists(path) and path != '/':
+        path = os.path.dirname(path)
+    return path
+
+
+def disk_percent(path: str) -> Optional[float]:
+    """파일시스템 사용률 (psutil.disk_usage와 같은 계산 - root 예약분 제외)"""
+    try:
+        st = os.statvfs(_existing(path))
+    except OSError:
+        return None
+    used = (st.f_blocks - st.f_bfree) * st.f_frsize
+    available = st.f_bavail * st.f_frsize
+    return round(100.0 * used / (used + available), 1) if used + available else 0.0
+
+
+def _mount_source(path: str, proc: str) -> Optional[str]:
+    """path가 속한 마운트의 장치 파일 (/proc/self/mountinfo, 가장 긴 마운트 지점)"""
+    best, source = '', None
+    for line in (_read(f'{proc}/self/mountinfo') or '').splitlines():
+        left, _, right = line.partition(' - ')
+        fields, tail = left.split(), right.split()
+        if len(fields) < 5 or len(tail) < 2:
+            continue
+        mount = fields[4].replace('\\040', ' ')
+        inside = path == mount or path.startswith(mount.rstrip('/') + '/')
+        if inside and len(mount) >= len(best):
+            best, source = mount, tail[1]
+    return source
+
+
+def block_device(path: str, proc: str = '/proc', sys_root: str = '/sys') -> Optional[str]:
+    """path가 있는 파일시스템의 블록 장치 ('major:minor', 못 찾으면 None)"""
+    path = os.path.realpath(_existing(path))
+    try:
+        dev = os.stat(path).st_dev
+    except OSError:
+        return None
+    key = f'{os.major(dev)}:{os.minor(dev)}'
+    if os.path.exists(f'{sys_root}/dev/block/{key}'):
+        return key
+    # btrfs 등은 st_dev가 익명 장치 - mountinfo의 장치 파일로 찾음
+    source = _mount_source(path, proc)
+    if not source or not source.startswith('/dev/'):
+        return None
+    try:
+        rdev = os.stat(source).st_rdev
+    except OSError:
+        return None
+    key = f'{os.major(rdev)}:{os.minor(rdev)}'
+    return key if os.path.exists(f'{sys_root}/dev/block/{key}') else None
+
+
+# ---------- 카운터 읽기 ----------
+
+def _cpu(proc: str) -> Optional[dict]:
+    text = _read(f'{proc}/stat')
+    if not text:
+        return None
+    # user nice system idle iowait irq softirq steal
+    fields = [int(v) for v in text.split('\n', 1)[0].split()[1:9]]
+    return {'total': sum(fields), 'idle': fields[3] + fields[4], 'iowait': fields[4]}
+
+
+def _memory_percent(proc: str) -> Optional[float]:
+    info = {}
+    for line in (_read(f'{proc}/meminfo') or '').splitlines():
+        name, _, rest = line.partition(':')
+        if rest.split():
+            info[name] = int(rest.split()[0])
+    total = info.get('MemTotal')
+    available = info.get('MemAvailable', info.get('MemFree'))
+    if not total or available is None:
+        return None
+    return round(100.0 * (total - available) / total, 1)
+
+
+def _nic(sys_root: str, interface: str) -> Optional[dict]:
+    base = f'{sys_root}/class/net/{interface}/statistics'
+    counters = {name: _read_int(f'{base}/{name}') for name in NET_COUNTERS}
+    return counters if counters['rx_bytes'] is not None else None
+
+
+def _block(sys_root: str, device: Optional[str]) -> Optional[dict]:
+    if not device:
+        return None
+    text = _read(f'{sys_root}/dev/block/{device}/stat')
+    if not text:
+        return None
+    # reads merged sectors ms / writes merged sectors ms / in_flight io_ticks ...
+    f = [int(v) for v in text.split()]
+    return {'reads': f[0], 'read_sectors': f[2], 'read_ms': f[3], 'writes': f[4], 'write_sectors': f[6],
+            'write_ms': f[7], 'io_ms': f[9]}
+
+
+def _nfsd(proc: str) -> Optional[dict]:
+    text = _read(f'{proc}/net/rpc/nfsd')
+    if text is None:
+        return None
+    lines = {}
+    for line in text.splitlines():
+        parts = line.split()
+        if parts:
+            lines[parts[0]] = parts[1:]
+
+    def number(key: str, index: int) -> Optional[int]:
+        try:
+            return int(lines[key][index])
+        except (KeyError, IndexError, ValueError):
+            return None
+
+    ops = dict.fromkeys(NFS_OPS, 0)
+    for name, count in zip(NFS3_OPS, lines.get('proc3', [])[1:]):
+        if name in ops:
+            ops[name] += int(count)
+    counts = lines.get('proc4ops', [])[1:]
+    for index, name in NFS4_OPS.items():
+        if index < len(counts):
+            ops[name] += int(counts[index])
+
+    threads = _read_int(f'{proc}/fs/nfsd/threads')
+    # 'th' 둘째 값은 모든 스레드가 바빴던 횟수 (최근 커널은 항상 0)
+    counters = {'threads': threads if threads is not None else number('th', 0),
+                'all_busy': number('th', 1), 'read_bytes': number('io', 0), 'write_bytes': number('io', 1),
+                'rpc_calls': number('rpc', 0), 'rpc_bad': number('rpc', 1), 'ops': ops,
+                'arrived': None, 'queued': None}
+    # pool packets-arrived sockets-enqueued threads-woken ... (풀마다 한 줄)
+    pools = [line.split() for line in (_read(f'{proc}/fs/nfsd/pool_stats') or '').splitlines()
+             if line and not line.startswith('#')]
+    if pools:
+        counters['arrived'] = sum(int(p[1]) for p in pools)
+        counters['queued'] = sum(int(p[2]) for p in pools)
+    return counters
+
+
+def _process(proc: str, pid: int) -> Optional[dict]:
+    stat = _read(f'{proc}/{pid}/stat')
+    if not stat:
+        return None
+    fields = stat.rsplit(')', 1)[1].split()
+    rss = None
+    for line in (_read(f'{proc}/{pid}/status') or '').splitlines():
+        if line.startswith('VmRSS:'):
+            rss = int(line.split()[1]) * 1024
+    io = {}
+    for line in (_read(f'{proc}/{pid}/io') or '').splitlines():    # 다른 사용자 프로세스는 root만
+        name, _, value = line.partition(':')
+        io[name] = int(value)
+    return {'ticks': int(fields[11]) + int(fields[12]), 'rss': rss,
+            'rchar': io.get('rchar'), 'wchar': io.get('wchar')}
+
+
+def _rate(current: Optional[float], previous: Optional[float], dt: float) -> Optional[float]:
+    if current is None or previous is None or dt <= 0:
+        return None
+    return max(current - previous, 0) / dt       # 카운터가 초기화되면 (재시작) 0
+
+
+def _round(value: Optional[float], digits: int = 1) -> Optional[float]:
+    return None if value is None else round(value, digits)
+
+
+class ResourceSampler:
+    """카운터 샘플러 - sample()을 부를 때마다 직전 호출과의 차이로 초당 값 계산 (스레드 안전)"""
+
+    def __init__(self, interface: str = 'eth0', storage_path: str = '/',
+                 proc: str = '/proc', sys_root: str = '/sys'):
+        self.interface = interface
+        self.storage_path = storage_path
+        self.proc = proc
+        self.sys_root = sys_root
+        self.device = block_device(storage_path, proc, sys_root)
+        self.device_name = os.path.basename(os.path.realpath(f'{sys_root}/dev/block/{self.device}')) \
+            if self.device else None
+        self.speed = _read_int(f'{sys_root}/class/net/{interface}/speed')    # Mbps (모르면 -1/None)
+        self.latest: Optional[dict] = None
+        self._pids: Dict[str, List[int]] = {}
+        self._previous: Optional[dict] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: dict) -> 'ResourceSampler':
+        return cls(config.get('network_interface') or 'eth0', config.get('nfs_root') or '/')
+
+    def _find_pids(self, name: str) -> List[int]:
+        """comm이 같은 프로세스 (libvirt 등 다른 용도의 dnsmasq는 뺌). 없어진 PID가 있을 때만 다시 찾음"""
+        comm = PROCESSES[name]
+        pids = self._pids.get(name)
+        if pids and all((_read(f'{self.proc}/{pid}/comm') or '').strip() == comm for pid in pids):
+            return pids
+        pids = []
+        for entry in os.listdir(self.proc):
+            if entry.isdigit() and (_read(f'{self.proc}/{entry}/comm') or '').strip() == comm:
+                if 'libvirt' not in (_read(f'{self.proc}/{entry}/cmdline') or ''):
+                    pids.append(int(entry))
+        self._pids[name] = pids
+        return pids
+
+    def _counters(self) -> dict:
+        processes = {}
+        for name in PROCESSES:
+            stats = [s for s in (_process(self.proc, pid) for pid in self._find_pids(name)) if s]
+            if stats:
+                processes[name] = {
+                    'pids': len(stats), 'ticks': sum(s['ticks'] for s in stats),
+                    'rss': sum(s['rss'] or 0 for s in stats),
+                    'rchar': None if any(s['rchar'] is None for s in stats) else sum(s['rchar'] for s in stats),
+                    'wchar': None if any(s['wchar'] is None for s in stats) else sum(s['wchar'] for s in stats)}
+        return {'at': time.monotonic(), 'cpu': _cpu(self.proc), 'nic': _nic(self.sys_root, self.interface),
+                'block': _block(self.sys_root, self.device), 'nfsd': _nfsd(self.proc), 'processes': processes}
+
+    def sample(self, min_interval: float = 0) -> dict:
+        """현재 값과 직전 샘플 이후의 초당 값. min_interval을 주면 직전 샘플과 그만큼은 떨어지게 기다림"""
+        with self._lock:
+            if min_interval and self._previous:
+                wait = min_interval - (time.monotonic() - self._previous['at'])
+                if wait > 0:
+                    time.sleep(wait)
+            current = self._counters()
+            previous = self._previous or {}
+            dt = current['at'] - previous['at'] if previous else 0.0
+            snapshot = {
+                'time': time.time(), 'interval': round(dt, 2) if dt else None,
+                'memory': _memory_percent(self.proc), 'disk': disk_percent('/'),
+                **self._cpu_rates(current['cpu'], previous.get('cpu')),
+                'nic': self._nic_rates(current['nic'], previous.get('nic'), dt),
+                'storage': self._storage_rates(current['block'], previous.get('block'), dt),
+                'nfsd': self._nfsd_rates(current['nfsd'], previous.get('nfsd'), dt),
+                'processes': {name: self._process_rates(stats, previous.get('processes', {}).get(name), dt)
+                              for name, stats in current['processes'].items()},
+            }
+            self._previous = current
+            self.latest = snapshot
+            return snapshot
+
+    # ---------- 초당 값 ----------
+
+    @staticmethod
+    def _cpu_rates(current: Optional[dict], previous: Optional[dict]) -> dict:
+        if not current or not previous or current['total'] <= previous['total']:
+            return {'cpu': None, 'iowait': None}
+        total = current['total'] - previous['total']
+        return {'cpu': round(100.0 * (total - (current['idle'] - previous['idle'])) / total, 1),
+                'iowait': round(100.0 * (current['iowait'] - previous['iowait']) / total, 1)}
+
+    def _nic_rates(self, current: Optional[dict], previous: Optional[dict], dt: float) -> Optional[dict]:
+        if current is None:
+            return None
+        previous = previous or {}
+        rates = {name: _rate(current[name], previous.get(name), dt) for name in NET_COUNTERS}
+        speed = self.speed if self.speed and self.speed > 0 else None
+        utilization = None
+        if speed and rates['rx_bytes'] is not None:
+            # 전이중 - 많은 쪽 기준
+            utilization = round(100.0 * max(rates['rx_bytes'], rates['tx_bytes']) * 8 / (speed * 1e6), 1)
+        drops = None if rates['rx_dropped'] is None else rates['rx_dropped'] + rates['tx_dropped']
+        errors = None if rates['rx_errors'] is None else rates['rx_errors'] + rates['tx_errors']
+        return {'interface': self.interface, 'speed_mbps': speed,
+                'rx_bytes_s': _round(rates['rx_bytes'], 0), 'tx_bytes_s': _round(rates['tx_bytes'], 0),
+                'rx_packets_s': _round(rates['rx_packets']), 'tx_packets_s': _round(rates['tx_packets']),
+                'drops_s': _round(drops), 'errors_s': _round(errors), 'utilization': utilization}
+
+    def _storage_rates(self, current: Optional[dict], previous: Optional[dict], dt: float) -> dict:
+        storage = {'path': self.storage_path, 'device': self.device_name, 'usage': disk_percent(self.storage_path),
+                   'read_bytes_s': None, 'write_bytes_s': None, 'read_iops': None, 'write_iops': None,
+                   'await_ms': None, 'utilization': None}
+        if current is None or previous is None or dt <= 0:
+            return storage
+        ios = (current['reads'] - previous['reads']) + (current['writes'] - previous['writes'])
+        waited = (current['read_ms'] - previous['read_ms']) + (current['write_ms'] - previous['write_ms'])
+        storage.update({
+            'read_bytes_s': _round(_rate(current['read_sectors'], previous['read_sectors'], dt) * SECTOR_BYTES, 0),
+            'write_bytes_s': _round(_rate(current['write_sectors'], previous['write_sectors'], dt) * SECTOR_BYTES, 0),
+            'read_iops': _round(_rate(current['reads'], previous['reads'], dt)),
+            'write_iops': _round(_rate(current['writes'], previous['writes'], dt)),
+            'await_ms': round(waited / ios, 1) if ios > 0 else 0.0,
+            'utilization': round(min(100.0, _rate(current['io_ms'], previous['io_ms'], dt) / 10), 1),
+        })
+        return storage
+
+    @staticmethod
+    def _nfsd_rates(current: Optional[dict], previous: Optional[dict], dt: float) -> Optional[dict]:
+        if current is None:
+            return None     # nfs-kernel-server가 없거나 nfsd 모듈이 안 올라옴
+        previous = previous or {}
+        queued = None
+        arrived = _rate(current['arrived'], previous.get('arrived'), dt)
+        if arrived:
+            queued = round(100.0 * _rate(current['queued'], previous['queued'], dt) / arrived, 1)
+        elif arrived == 0:
+            queued = 0.0
+        ops = {name: _round(_rate(count, previous.get('ops', {}).get(name), dt))
+               for name, count in current['ops'].items()}
+        return {'threads': current['threads'],
+                'rpc_calls_s': _round(_rate(current['rpc_calls'], previous.get('rpc_calls'), dt)),
+                'bad_calls_s': _round(_rate(current['rpc_bad'], previous.get('rpc_bad'), dt)),
+                'read_bytes_s': _round(_rate(current['read_bytes'], previous.get('read_bytes'), dt), 0),
+                'write_bytes_s': _round(_rate(current['write_bytes'], previous.get('write_bytes'), dt), 0),
+                'all_busy_s': _round(_rate(current['all_busy'], previous.get('all_busy'), dt), 2),
+                'queued_percent': queued, 'ops_s': ops}
+
+    @staticmethod
+    def _process_rates(current: dict, previous: Optional[dict], dt: float) -> dict:
+        previous = previous or {}
+        ticks = _rate(current['ticks'], previous.get('ticks'), dt)
+        return {'pids': current['pids'], 'cpu': None if ticks is None else round(100.0 * ticks / CLK_TCK, 1),
+                'rss_bytes': current['rss'],
+                'read_bytes_s': _round(_rate(current['rchar'], previous.get('rchar'), dt), 0),
+                'write_bytes_s': _round(_rate(current['wchar'], previous.get('wchar'), dt), 0)}
+
+
+def bottlenecks(snapshot: Optional[dict]) -> List[str]:
+    """기준을 넘은 자원 ('cpu', 'nic', 'disk', 'nfsd' - BOTTLENECK_LABELS)"""
+    if not snapshot:
+        return []
+    found = []
+    if (snapshot.get('cpu') or 0) >= CPU_BUSY:
+        found.append('cpu')
+    if ((snapshot.get('nic') or {}).get('utilization') or 0) >= NIC_BUSY:
+        found.append('nic')
+    if ((snapshot.get('storage') or {}).get('utilization') or 0) >= DISK_BUSY:
+        found.append('disk')
+    nfsd = snapshot.get('nfsd') or {}
+    if (nfsd.get('queued_percent') or 0) >= NFSD_QUEUED or (nfsd.get('all_busy_s') or 0) > 0:
+        found.append('nfsd')
+    return found
+
+
+# ---------- 표시 ----------
+
+def format_size(value: Optional[float]) -> str:
+    if value is None:
+        return '-'
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if value < 1024:
+            return f"{value:.0f}{unit}" if unit == 'B' else f"{value:.1f}{unit}"
+        value /= 1024
+    return f"{value:.1f}TB"
+
+
+def format_rate(value: Optional[float]) -> str:
+    """초당 바이트 → '12.3MB/s' (없으면 '-')"""
+    return '-' if value is None else format_size(value) + '/s'
+
+
+def _percent(value: Optional[float]) -> str:
+    return '-' if value is None else f"{value:.0f}%"
+
+
+def describe(snapshot: dict) -> List[Tuple[str, str]]:
+    """CLI/GUI 표시용 (항목, 값) - 처리량 부분"""
+    rows = []
+    nic = snapshot.get('nic')
+    if nic:
+        speed = f" / {nic['speed_mbps']}Mbps" if nic['speed_mbps'] else ''
+        drops = f", 드롭 {nic['drops_s']:.0f}/s" if nic['drops_s'] else ''
+        rows.append((f"NIC {nic['interface']}",
+                     f"수신 {format_rate(nic['rx_bytes_s'])}, 송신 {format_rate(nic['tx_bytes_s'])} "
+                     f"(사용 {_percent(nic['utilization'])}{speed}{drops})"))
+    else:
+        rows.append(('NIC', '인터페이스 카운터 없음'))
+    storage = snapshot['storage']
+    if storage['device']:
+        rows.append((f"NFS 디스크 {storage['device']}",
+                     f"읽기 {format_rate(storage['read_bytes_s'])}, 쓰기 {format_rate(storage['write_bytes_s'])} "
+                     f"(바쁨 {_percent(storage['utilization'])}, 대기 "
+                     f"{'-' if storage['await_ms'] is None else '%.1fms' % storage['await_ms']}, "
+                     f"사용량 {_percent(storage['usage'])})"))
+    else:
+        rows.append(('NFS 디스크', f"블록 장치를 찾지 못함 (사용량 {_percent(storage['usage'])})"))
+    nfsd = snapshot.get('nfsd')
+    if nfsd:
+        calls = '-' if nfsd['rpc_calls_s'] is None else f"{nfsd['rpc_calls_s']:.0f}"
+        busy = [f"{name} {rate:.0f}" for name, rate in sorted(nfsd['ops_s'].items(), key=lambda i: -(i[1] or 0))
+                if rate][:3]
+        rows.append(('nfsd', f"스레드 {nfsd['threads'] or '-'}, RPC {calls}/s, 읽기 {format_rate(nfsd['read_bytes_s'])}, "
+                             f"쓰기 {format_rate(nfsd['write_bytes_s'])}, 스레드 대기 {_percent(nfsd['queued_percent'])}"
+                             + (f" ({', '.join(busy)}/s)" if busy else '')))
+    else:
+        rows.append(('nfsd', '실행 중이 아님 (/proc/net/rpc/nfsd 없음)'))
+    processes = snapshot.get('processes', {})
+    if 'dnsmasq' not in processes:
+        rows.append(('dnsmasq', '실행 중이 아님'))
+    for name, process in processes.items():
+        rows.append((name, f"CPU {_percent(process['cpu'])}, 메모리 {format_size(process['rss_bytes'])}, "
+                           f"송신 {format_rate(process['write_bytes_s'])}"))
+    return rows
+
+
+def format_bottlenecks(snapshot: Optional[dict]) -> str:
+    found = bottlenecks(snapshot)
+    return ', '.join(BOTTLENECK_LABELS[key] for key in found) if found else '없음'
@@ -0,0 +1,442 @@
+"""
+RPI PXE Manager - 서비스 상태 (systemd D-Bus)
+
+dnsmasq / nfs-kernel-server / tftpd-hpa 상태를 서비스마다 'systemctl is-active'를
+실행하지 않고 systemd Manager.ListUnitsByNames 호출 한 번으로 가져온다.
+ServiceMonitor는 systemd에 Subscribe하고 유닛 PropertiesChanged 시그널을 받아
+상태가 바뀔 때만 리스너를 호출하므로 화면 쪽은 캐시된 값만 읽는다.
+
+D-Bus 라이브러리(dbus-python 등)에 의존하지 않도록 필요한 만큼의 와이어 프로토콜
+(EXTERNAL 인증, 메시지 직렬화)을 직접 구현한다. 시스템 버스에 연결할 수 없으면
+'systemctl show' 한 번(유닛 전체)으로 조회하고, 모니터는 주기적으로 다시 조회한다.
+"""
+
+import os
+import select
+import socket
+import struct
+import subprocess
+import threading
+from typing import Callable, Dict, Iterable, List, Optional
+
+SERVICES = ('dnsmasq', 'nfs-kernel-server', 'tftpd-hpa')
+
+SYSTEM_BUS_SOCKET = '/run/dbus/system_bus_socket'
+SYSTEMD = 'org.freedesktop.systemd1'
+SYSTEMD_PATH = '/org/freedesktop/systemd1'
+MANAGER_IFACE = 'org.freedesktop.systemd1.Manager'
+UNIT_IFACE = 'org.freedesktop.systemd1.Unit'
+PROPERTIES_IFACE = 'org.freedesktop.DBus.Properties'
+
+# D-Bus를 쓸 수 없을 때 모니터의 재조회 주기 (초)
+POLL_INTERVAL = 5.0
+TIMEOUT = 5.0
+
+METHOD_CALL, METHOD_RETURN, ERROR, SIGNAL = 1, 2, 3, 4
+FIELD_PATH, FIELD_INTERFACE, FIELD_MEMBER, FIELD_ERROR_NAME = 1, 2, 3, 4
+FIELD_REPLY_SERIAL, FIELD_DESTINATION, FIELD_SENDER, FIELD_SIGNATURE = 5, 6, 7, 8
+
+
+class DBusError(Exception):
+    """D-Bus 연결/인증 실패 또는 오류 응답"""
+
+
+# ---------- 와이어 형식 ----------
+
+_ALIGN = {'y': 1, 'b': 4, 'n': 2, 'q': 2, 'i': 4, 'u': 4, 'x': 8, 't': 8, 'd': 8, 'h': 4,
+          's': 4, 'o': 4, 'g': 1, 'a': 4, '(': 8, '{': 8, 'v': 1}
+_FIXED = {'y': 'B', 'b': 'I', 'n': 'h', 'q': 'H', 'i': 'i', 'u': 'I', 'x': 'q', 't': 'Q', 'd': 'd', 'h': 'I'}
+
+
+def _type_end(sig: str, i: int) -> int:
+    """sig[i]에서 시작하는 완전한 타입 하나가 끝나는 위치"""
+    c = sig[i]
+    if c == 'a':
+        return _type_end(sig, i + 1)
+    if c in '({':
+        close = ')' if c == '(' else '}'
+        i += 1
+        while sig[i] != close:
+            i = _type_end(sig, i)
+        return i + 1
+    return i + 1
+
+
+def split_signature(sig: str) -> List[str]:
+    types, i = [], 0
+    while i < len(sig):
+        end = _type_end(sig, i)
+        types.append(sig[i:end])
+        i = end
+    return types
+
+
+class _Writer:
+    def __init__(self):
+        self.buf = bytearray()
+
+    def align(self, n: int):
+        self.buf += b'\0' * (-len(self.buf) % n)
+
+    def write(self, sig: str, value):
+        c = sig[0]
+        self.align(_ALIGN[c])
+        if c in _FIXED:
+            self.buf += struct.pack('<' + _FIXED[c], value)
+        elif c in 'so':
+            data = value.encode()
+            self.buf += struct.pack('<I', len(data)) + data + b'\0'
+        elif c == 'g':
+            data = value.encode()
+            self.buf += bytes([len(data)]) + data + b'\0'
+        elif c == 'v':
+            inner_sig, inner = value
+            self.write('g', inner_sig)
+            self.write(inner_sig, inner)
+        elif c == 'a':
+            item = sig[1:]
+            self.buf += b'\0\0\0\0'
+            length_at = len(self.buf) - 4
+            self.align(_ALIGN[item[0]])
+            start = len(self.buf)
+            for element in (value.items() if isinstance(value, dict) else value):
+                self.write(item, element)
+            struct.pack_into('<I', self.buf, length_at, len(self.buf) - start)
+        else:
+            for item, element in zip(split_signature(sig[1:-1]), value):
+                self.write(item, element)
+
+
+class _Reader:
+    def __init__(self, data: bytes, endian: str, pos: int = 0):
+        self.data = data
+        self.endian = endian
+        self.pos = pos
+
+    def align(self, n: int):
+        self.pos += -self.pos % n
+
+    def read(self, sig: str):
+        c = sig[0]
+        self.align(_ALIGN[c])
+        if c in _FIXED:
+            fmt = self.endian + _FIXED[c]
+            value = struct.unpack_from(fmt, self.data, self.pos)[0]
+            self.pos += struct.calcsize(fmt)
+            return bool(value) if c == 'b' else value
+        if c in 'so':
+            length = self.read('u')
+            value = self.data[self.pos:self.pos + length].decode()
+            self.pos += length + 1
+            return value
+        if c == 'g':
+            length = self.data[self.pos]
+            value = self.data[self.pos + 1:self.pos + 1 + length].decode()
+            self.pos += length + 2
+            return value
+        if c == 'v':
+            return self.read(self.read('g'))
+        if c == 'a':
+            length = self.read('u')
+            item = sig[1:]
+            self.align(_ALIGN[item[0]])
+            end = self.pos + length
+            items = []
+            while self.pos < end:
+                items.append(self.read(item))
+            return dict(items) if item[0] == '{' else items
+        return tuple(self.read(item) for item in split_signature(sig[1:-1]))
+
+
+def encode_message(serial: int, path: str, interface: str, member: str,
+                   destination: Optional[str] = None, signature: str = '', args: tuple = ()) -> bytes:
+    body = _Writer()
+    for sig, value in zip(split_signature(signature), args):
+        body.write(sig, value)
+    fields = [(FIELD_PATH, ('o', path)), (FIELD_INTERFACE, ('s', interface)), (FIELD_MEMBER, ('s', member))]
+    if destination:
+        fields.append((FIELD_DESTINATION, ('s', destination)))
+    if signature:
+        fields.append((FIELD_SIGNATURE, ('g', signature)))
+    header = _Writer()
+    header.buf += b'l' + bytes([METHOD_CALL, 0, 1])
+    header.write('u', len(body.buf))
+    header.write('u', serial)
+    header.write('a(yv)', fields)
+    header.align(8)
+    return bytes(header.buf + body.buf)
+
+
+def decode_message(data: bytes) -> dict:
+    endian = '<' if data[0:1] == b'l' else '>'
+    reader = _Reader(data, endian, 12)
+    fields = dict(reader.read('a(yv)'))
+    reader.align(8)
+    body_reader = _Reader(data[reader.pos:], endian)
+    body = [body_reader.read(sig) for sig in split_signature(fields.get(FIELD_SIGNATURE, ''))]
+    return {'type': data[1], 'serial': struct.unpack_from(endian + 'I', data, 8)[0],
+            'fields': fields, 'body': body}
+
+
+def unit_path(unit: str) -> str:
+    """유닛 이름 → systemd 객체 경로 (영숫자 외 문자는 _xx)"""
+    escaped = ''.join(c if c.isascii() and c.isalnum() else f'_{ord(c):02x}' for c in unit)
+    return f'{SYSTEMD_PATH}/unit/{escaped}'
+
+
+def unit_name(service: str) -> str:
+    return service if '.' in service else f'{service}.service'
+
+
+# ---------- 시스템 버스 ----------
+
+class SystemBus:
+    """시스템 버스 연결 (메서드 호출과 시그널 수신만)"""
+
+    def __init__(self, timeout: float = TIMEOUT):
+        address = os.environ.get('DBUS_SYSTEM_BUS_ADDRESS', '')
+        path = address[len('unix:path='):].split(',')[0] if address.startswith('unix:path=') else SYSTEM_BUS_SOCKET
+        self.timeout = timeout
+        self._buf = bytearray()
+        self._serial = 0
+        self._signals: List[dict] = []
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        try:
+            self.sock.connect(path)
+            self._authenticate()
+            self.call('/org/freedesktop/DBus', 'org.freedesktop.DBus', 'Hello', 'org.freedesktop.DBus')
+        except OSError as e:
+            self.sock.close()
+            raise DBusError(f"시스템 버스 연결 실패 ({path}): {e}")
+        except DBusError:
+            self.sock.close()
+            raise
+
+    def _authenticate(self):
+        uid = str(os.geteuid()).encode().hex().encode()
+        self.sock.sendall(b'\0AUTH EXTERNAL ' + uid + b'\r\n')
+        while b'\r\n' not in self._buf:
+            chunk = self.sock.recv(4096)
+            if not chunk:
+                raise DBusError("인증 중 연결이 끊겼습니다")
+            self._buf += chunk
+        line, _, rest = bytes(self._buf).partition(b'\r\n')
+        if not line.startswith(b'OK'):
+            raise DBusError(f"인증 실패: {line.decode(errors='replace')}")
+        self._buf = bytearray(rest)
+        self.sock.sendall(b'BEGIN\r\n')
+
+    def close(self):
+        self.sock.close()
+
+    def fileno(self) -> int:
+        return self.sock.fileno()
+
+    def _recv_exact(self, size: int) -> bytes:
+        while len(self._buf) < size:
+            chunk = self.sock.recv(65536)
+            if not chunk:
+                raise DBusError("시스템 버스 연결이 끊겼습니다")
+            self._buf += chunk
+        data = bytes(self._buf[:size])
+        del self._buf[:size]
+        return data
+
+    def _read_raw(self) -> dict:
+        head = self._recv_exact(16)
+        endian = '<' if head[0:1] == b'l' else '>'
+        body_length, _, fields_length = struct.unpack_from(endian + 'III', head, 4)
+        rest = self._recv_exact(fields_length + (-(16 + fields_length) % 8) + body_length)
+        return decode_message(head + rest)
+
+    def send(self, path: str, interface: str, member: str, destination: Optional[str] = None,
+             signature: str = '', *args) -> int:
+        self._serial += 1
+        self.sock.sendall(encode_message(self._serial, path, interface, member, destination, signature, args))
+        return self._serial
+
+    def call(self, path: str, interface: str, member: str, destination: Optional[str] = SYSTEMD,
+             signature: str = '', *args) -> list:
+        """메서드 호출 → 응답 본문. 기다리는 동안 온 시그널은 read_signal()용으로 보관"""
+        serial = self.send(path, interface, member, destination, signature, *args)
+        while True:
+            message = self._read_raw()
+            if message['type'] == SIGNAL:
+                self._signals.append(message)
+            elif message['fields'].get(FIELD_REPLY_SERIAL) == serial:
+                if message['type'] == ERROR:
+                    detail = message['body'][0] if message['body'] else ''
+                    raise DBusError(f"{message['fields'].get(FIELD_ERROR_NAME)}: {detail}")
+                return message['body']
+
+    def read_signal(self, timeout: Optional[float] = None) -> Optional[dict]:
+        """다음 시그널 (timeout 동안 없으면 None)"""
+        while True:
+            if self._signals:
+                return self._signals.pop(0)
+            if not self._buf:
+                readable, _, _ = select.select([self.sock], [], [], timeout)
+                if not readable:
+                    return None
+            message = self._read_raw()
+            if message['type'] == SIGNAL:
+                return message
+
+
+# ---------- 조회 ----------
+
+def _state(load: str, active: str, sub: str) -> dict:
+    return {'active': active == 'active', 'state': active, 'sub': sub, 'load': load}
+
+
+def _list_units(bus: SystemBus, services: List[str]) -> Dict[str, dict]:
+    """ListUnitsByNames 한 번으로 여러 유닛 상태 조회"""
+    units = {unit_name(service): service for service in services}
+    rows = bus.call(SYSTEMD_PATH, MANAGER_IFACE, 'ListUnitsByNames', SYSTEMD, 'as', list(units))[0]
+    states = {service: _state('not-found', 'inactive', 'dead') for service in services}
+    for row in rows:
+        if row[0] in units:
+            states[units[row[0]]] = _state(row[2], row[3], row[4])
+    return states
+
+
+def _systemctl_show(services: List[str]) -> Dict[str, dict]:
+    """systemctl show 한 번으로 여러 유닛 상태 조회 (D-Bus를 쓸 수 없을 때)"""
+    states = {service: _state('unknown', 'unknown', 'unknown') for service in services}
+    try:
+        result = subprocess.run(['systemctl', 'show', '--no-pager', '-p', 'LoadState,ActiveState,SubState']
+                                + [unit_name(service) for service in services],
+                                capture_output=True, text=True, timeout=TIMEOUT)
+    except (OSError, subprocess.SubprocessError):
+        return states
+    # 유닛마다 빈 줄로 구분된 블록이 인자 순서대로 나온다
+    blocks = [block for block in result.stdout.strip().split('\n\n') if block.strip()]
+    for service, block in zip(services, blocks):
+        props = dict(line.split('=', 1) for line in block.splitlines() if '=' in line)
+        states[service] = _state(props.get('LoadState', 'unknown'), props.get('ActiveState', 'unknown'),
+                                 props.get('SubState', 'unknown'))
+    return states
+
+
+def query(services: Iterable[str] = SERVICES) -> Dict[str, dict]:
+    """서비스 상태 한 번 조회 → {서비스: {'active', 'state', 'sub', 'load'}}"""
+    services = list(services)
+    try:
+        bus = SystemBus()
+    except DBusError:
+        return _systemctl_show(services)
+    try:
+        return _list_units(bus, services)
+    except (DBusError, OSError):
+        return _systemctl_show(services)
+    finally:
+        bus.close()
+
+
+def active_map(states: Dict[str, dict]) -> Dict[str, bool]:
+    return {service: state['active'] for service, state in states.items()}
+
+
+# ---------- 변경 감시 ----------
+
+class ServiceMonitor:
+    """서비스 상태 캐시 - 바뀔 때만 리스너 호출 (감시 스레드에서 호출됨)"""
+
+    def __init__(self, services: Iterable[str] = SERVICES, poll_interval: float = POLL_INTERVAL):
+        self.services = list(services)
+        self.poll_interval = poll_interval
+        self.states: Dict[str, dict] = {}
+        self.mode: Optional[str] = None  # 'dbus' 또는 'poll'
+        self._listeners: List[Callable[[Dict[str, dict]], None]] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add_listener(self, callback: Callable[[Dict[str, dict]], None]):
+        self._listeners.append(callback)
+
+    def snapshot(self) -> Dict[str, dict]:
+        """캐시된 상태 (아직 없으면 한 번 조회)"""
+        if not self.states:
+            self.refresh()
+        return dict(self.states)
+
+    def active(self) -> Dict[str, bool]:
+        return active_map(self.snapshot())
+
+    def refresh(self) -> Dict[str, dict]:
+        self._update(query(self.services))
+        return dict(self.states)
+
+    def poke(self):
+        """바로 다시 조회 (서비스 시작/중지 직후 - 폴링 모드에서만 의미 있음)"""
+        self._wake.set()
+
+    def _update(self, states: Dict[str, dict]):
+        with self._lock:
+            if states == self.states:
+                return
+            self.states = states
+        for callback in list(self._listeners):
+            callback(dict(states))
+
+    def start(self) -> 'ServiceMonitor':
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='service-monitor', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._watch_dbus()
+            except (DBusError, OSError):
+                self._poll()
+
+    def _watch_dbus(self):
+        bus = SystemBus()
+        try:
+            paths = {unit_path(unit_name(service)): service for service in self.services}
+            bus.call(SYSTEMD_PATH, MANAGER_IFACE, 'Subscribe')
+            for path in paths:
+                rule = (f"type='signal',sender='{SYSTEMD}',interface='{PROPERTIES_IFACE}',"
+                        f"member='PropertiesChanged',path='{path}'")
+                bus.call('/org/freedesktop/DBus', 'org.freedesktop.DBus', 'AddMatch',
+                         'org.freedesktop.DBus', 's', rule)
+            self.mode = 'dbus'
+            self._update(_list_units(bus, self.services))
+            while not self._stop.is_set():
+                message = bus.read_signal(timeout=1.0)
+                if self._wake.is_set():
+                    self._wake.clear()
+                    self._update(_list_units(bus, self.services))
+                if message is None:
+                    continue
+                service = paths.get(message['fields'].get(FIELD_PATH))
+                if service is None or not message['body'] or message['body'][0] != UNIT_IFACE:
+                    continue
+                _, changed, invalidated = message['body']
+                if {'LoadState', 'ActiveState', 'SubState'} & set(invalidated):
+                    self._update(_list_units(bus, self.services))
+                elif {'LoadState', 'ActiveState', 'SubState'} & set(changed):
+                    current = self.states.get(service, _state('unknown', 'unknown', 'unknown'))
+                    state = _state(changed.get('LoadState', current['load']),
+                                   changed.get('ActiveState', current['state']),
+                                   changed.get('SubState', current['sub']))
+                    self._update(dict(self.states, **{service: state}))
+        finally:
+            bus.close()
+
+    def _poll(self):
+        self.mode = 'poll'
+        while not self._stop.is_set():
+            self._update(_systemctl_show(self.services))
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
@@ -0,0 +1,194 @@
+"""
+RPI PXE Manager - SSH 세션 풀 (OpenSSH ControlMaster)
+
+클라이언트마다 인증된 마스터 연결을 하나씩 유지하고, 이후 명령은 같은
+제어 소켓으로 다중화하여 매번 TCP/키 교환/비밀번호 인증을 하지 않는다.
+마스터는 ControlPersist로 유휴 시간이 지나면 스스로 종료되고, 동시에
+유지하는 마스터 수가 상한을 넘으면 가장 오래 쓰지 않은 연결부터 닫는다.
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+DEFAULT_USER = 'pi'
+DEFAULT_PASSWORD = 'raspberry'
+
+# 유휴 마스터 연결 유지 시간(초)과 동시 마스터 연결 상한
+DEFAULT_IDLE_TIMEOUT = 300
+DEFAULT_MAX_CONNECTIONS = 32
+
+CONNECT_TIMEOUT = 5
+
+
+def default_control_dir() -> Path:
+    """제어 소켓 디렉토리 (유닉스 소켓 경로 길이 제한 때문에 짧게 유지)"""
+    return Path(tempfile.gettempdir()) / f'rpi-pxe-ssh-{os.getuid()}'
+
+
+class SSHPool:
+    """클라이언트별 ControlMaster 연결 풀"""
+
+    def __init__(self, user: str = DEFAULT_USER, password: Optional[str] = DEFAULT_PASSWORD,
+                 idle_timeout: int = DEFAULT_IDLE_TIMEOUT,
+                 max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 control_dir: Optional[Path] = None):
+        self.user = user
+        self.password = password
+        self.idle_timeout = idle_timeout
+        self.max_connections = max_connections
+        self.control_dir = Path(control_dir) if control_dir else default_control_dir()
+        self.control_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._host_locks: Dict[str, threading.Lock] = {}
+        # IP → 마지막 사용 시각 (오래된 순서)
+        self._last_used: 'OrderedDict[str, float]' = OrderedDict()
+
+    @classmethod
+    def from_config(cls, config: dict) -> 'SSHPool':
+        return cls(user=config.get('ssh_user', DEFAULT_USER),
+                   password=config.get('ssh_password', DEFAULT_PASSWORD),
+                   idle_timeout=int(config.get('ssh_idle_timeout', DEFAULT_IDLE_TIMEOUT)),
+                   max_connections=int(config.get('ssh_max_connections', DEFAULT_MAX_CONNECTIONS)))
+
+    # ---------- ssh 인자 ----------
+
+    def control_path(self, ip: str) -> Path:
+        return self.control_dir / ip
+
+    def _common_options(self, ip: str) -> List[str]:
+        return ['-o', 'StrictHostKeyChecking=no',
+                '-o', f'ConnectTimeout={CONNECT_TIMEOUT}',
+                '-o', f'ControlPath={self.control_path(ip)}']
+
+    def _password_prefix(self) -> List[str]:
+        if self.password and shutil.which('sshpass'):
+            return ['sshpass', '-p', self.password]
+        return []
+
+    def _target(self, ip: str) -> str:
+        return f'{self.user}@{ip}'
+
+    # ---------- 마스터 연결 ----------
+
+    def is_connected(self, ip: str) -> bool:
+        if not self.control_path(ip).exists():
+            return False
+        result = subprocess.run(['ssh', '-O', 'check', *self._common_options(ip), self._target(ip)],
+                                capture_output=True, timeout=CONNECT_TIMEOUT)
+        return result.returncode == 0
+
+    def has_master(self, ip: str) -> bool:
+        """이 풀이 연 마스터가 아직 유효한지 (ssh -O check 없이 캐시로 판단 - GUI 스레드에서 호출)"""
+        deadline = time.monotonic() - self.idle_timeout
+        with self._lock:
+            used = self._last_used.get(ip)
+        return used is not None and used >= deadline and self.control_path(ip).exists()
+
+    def _host_lock(self, ip: str) -> threading.Lock:
+        with self._lock:
+            return self._host_locks.setdefault(ip, threading.Lock())
+
+    def _touch(self, ip: str):
+        with self._lock:
+            self._last_used[ip] = time.monotonic()
+            self._last_used.move_to_end(ip)
+
+    def connect(self, ip: str) -> subprocess.CompletedProcess:
+        """마스터 연결 확보 (이미 있으면 재사용). 실패 시 returncode != 0"""
+        with self._host_lock(ip):
+            if self.is_connected(ip):
+                self._touch(ip)
+                return subprocess.CompletedProcess([], 0, '', '')
+
+            self.evict_idle()
+            self._enforce_limit(reserve=1)
+
+            # -N -f: 인증이 끝나면 백그라운드로 전환, ControlPersist 동안 유지
+            result = subprocess.run(
+                [*self._password_prefix(), 'ssh', *self._common_options(ip),
+                 '-o', 'ControlMaster=yes',
+                 '-o', f'ControlPersist={self.idle_timeout}',
+                 '-o', 'ServerAliveInterval=15',
+                 '-N', '-f', self._target(ip)],
+                stdin=subprocess.DEVNULL, capture_output=True, text=True,
+                timeout=CONNECT_TIMEOUT + 10
+            )
+            if result.returncode == 0:
+                self._touch(ip)
+            return result
+
+    def close(self, ip: str):
+        """마스터 연결 종료"""
+        with self._lock:
+            self._last_used.pop(ip, None)
+        if self.control_path(ip).exists():
+            subprocess.run(['ssh', '-O', 'exit', *self._common_options(ip), self._target(ip)],
+                           capture_output=True, timeout=CONNECT_TIMEOUT)
+
+    def close_all(self):
+        with self._lock:
+            hosts = list(self._last_used)
+        for ip in hosts:
+            self.close(ip)
+
+    def evict_idle(self):
+        """유휴 시간이 지난 연결 정리 (ControlPersist로 이미 종료된 것 포함)"""
+        deadline = time.monotonic() - self.idle_timeout
+        with self._lock:
+            expired = [ip for ip, used in self._last_used.items() if used < deadline]
+        for ip in expired:
+            self.close(ip)
+
+    def _enforce_limit(self, reserve: int = 0):
+        """상한을 넘으면 가장 오래 쓰지 않은 연결부터 닫음"""
+        while True:
+            with self._lock:
+                if len(self._last_used) + reserve <= self.max_connections or not self._last_used:
+                    return
+                oldest = next(iter(self._last_used))
+            self.close(oldest)
+
+    @property
+    def connections(self) -> List[str]:
+        with self._lock:
+            return list(self._last_used)
+
+    # ---------- 명령 실행 ----------
+
+    def run(self, ip: str, command: str, timeout: float = 15) -> subprocess.CompletedProcess:
+        """마스터 연결을 통해 원격 명령 실행"""
+        master = self.connect(ip)
+        if master.returncode != 0:
+            return master
+
+        result = subprocess.run(
+            ['ssh', *self._common_options(ip), '-o', 'ControlMaster=no', self._target(ip), command],
+            stdin=subprocess.DEVNULL, capture_output=True, text=True, timeout=timeout
+        )
+        self._touch(ip)
+        return result
+
+    def run_detached(self, ip: str, command: str, timeout: float = 15) -> subprocess.CompletedProcess:
+        """재부팅/종료처럼 연결이 끊기는 명령 - 실행 후 마스터 연결을 닫음"""
+        try:
+            return self.run(ip, command, timeout=timeout)
+        finally:
+            self.close(ip)
+
+    def terminal_command(self, ip: str) -> List[str]:
+        """대화형 터미널용 ssh 명령 (마스터가 있으면 인증 없이 바로 연결)
+
+        subprocess를 띄우지 않으므로 UI 스레드에서 불러도 막히지 않는다.
+        """
+        args = ['ssh', *self._common_options(ip), '-o', 'ControlMaster=no', self._target(ip)]
+        if self.has_master(ip):
+            return args
+        return [*self._password_prefix(), *args]
@@ -0,0 +1,388 @@
+"""
+RPI PXE Manager - 클라이언트 시스템 정보 수집 (온도/부하/메모리/디스크)
+
+온라인 클라이언트에 SSH 명령 하나(/proc 읽기 + vcgencmd)를 병렬로 보내고
+(pxe_fleet, SSH 마스터 연결 재사용) 결과를 필드로 파싱해 캐시에 둔다.
+관리 데몬이 있으면 데몬이 주기적으로 수집하고, 없으면 GUI가 수집한다.
+상세 보기는 캐시를 바로 보여 주고, 목록은 온도/부하/메모리/디스크로 정렬·필터한다.
+
+  entry = {'serial', 'ip', 'time': 마지막 성공 시각, 'checked': 마지막 시도 시각,
+           'error': 마지막 시도 오류 또는 None, 'data': 파싱 결과 또는 None}
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pxe_fleet
+
+TELEMETRY_FILE = Path.home() / '.rpi_pxe_telemetry.json'
+
+# 수집 주기와 캐시 유효 시간(초) - 유효 시간이 지난 값은 '오래됨'으로 표시
+DEFAULT_INTERVAL = 300
+DEFAULT_TTL = 900
+DEFAULT_PARALLEL = 16
+DEFAULT_TIMEOUT = 20
+
+# 구역 표시(@이름) 뒤에 명령 출력 - 명령 하나가 실패해도 나머지는 파싱
+REMOTE_COMMAND = '; '.join([
+    'echo @uname', 'uname -srm',
+    'echo @model', "tr -d '\\0' < /proc/device-tree/model 2>/dev/null", 'echo',
+    'echo @cpuinfo', "grep -E '^(Revision|Hardware)' /proc/cpuinfo",
+    'echo @cpus', 'nproc',
+    'echo @uptime', 'cat /proc/uptime',
+    'echo @loadavg', 'cat /proc/loadavg',
+    'echo @meminfo', "grep -E '^(MemTotal|MemAvailable|SwapTotal|SwapFree):' /proc/meminfo",
+    'echo @df', 'df -Pk / | tail -1',
+    'echo @temp', 'vcgencmd measure_temp 2>/dev/null || cat /sys/class/thermal/thermal_zone0/temp 2>/dev/null',
+    'echo @throttled', 'vcgencmd get_throttled 2>/dev/null',
+    'echo @addr', 'hostname -I',
+    'exit 0',
+])
+
+# 정렬/필터 키 → (data 필드, 단위, 표시 이름)
+FIELDS = {
+    'temp': ('temp', '°C', '온도'),
+    'load': ('load1', '', '부하'),
+    'memory': ('mem_percent', '%', '메모리'),
+    'disk': ('disk_percent', '%', '디스크'),
+}
+
+# 온도 경고 기준(°C) - RPi는 80°C부터 클럭을 낮춘다
+TEMP_WARNING = 70.0
+TEMP_CRITICAL = 80.0
+
+# vcgencmd get_throttled 현재 상태 비트
+THROTTLE_FLAGS = {0x1: '저전압', 0x2: '클럭 제한', 0x4: '스로틀링', 0x8: '온도 제한'}
+
+_FILTER_RE = re.compile(r'^\s*(\w+)\s*(>=|<=|>|<|=)\s*(-?[\d.]+)\s*$')
+_OPERATORS = {
+    '>': lambda a, b: a > b, '>=': lambda a, b: a >= b,
+    '<': lambda a, b: a < b, '<=': lambda a, b: a <= b,
+    '=': lambda a, b: a == b,
+}
+
+
+# ---------- 파싱 ----------
+
+def _sections(text: str) -> Dict[str, List[str]]:
+    sections: Dict[str, List[str]] = {}
+    current = None
+    for line in text.splitlines():
+        if line.startswith('@') and ' ' not in line:
+            current = sections.setdefault(line[1:], [])
+        elif current is not None and line.strip():
+            current.append(line.strip())
+    return sections
+
+
+def _float(value: str) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse(text: str) -> dict:
+    """REMOTE_COMMAND 출력 → 필드 (없는 값은 None, 용량은 바이트)"""
+    sections = _sections(text)
+    first = lambda name: (sections.get(name) or [''])[0]
+    data = {'kernel': None, 'arch': None, 'model': first('model') or None, 'revision': None,
+            'cpus': None, 'uptime': None, 'load1': None, 'load5': None, 'load15': None,
+            'mem_total': None, 'mem_available': None, 'mem_percent': None,
+            'swap_total': None, 'swap_used': None,
+            'disk_total': None, 'disk_used': None, 'disk_percent': None,
+            'temp': None, 'throttled': None, 'addresses': first('addr').split()}
+
+    uname = first('uname').split()
+    if len(uname) >= 3:
+        data['kernel'] = f"{uname[0]} {uname[1]}"
+        data['arch'] = uname[2]
+
+    for line in sections.get('cpuinfo', []):
+        key, _, value = line.partition(':')
+        if key.strip() == 'Revision':
+            data['revision'] = value.strip()
+        elif key.strip() == 'Hardware' and not data['model']:
+            data['model'] = value.strip()
+
+    cpus = _float(first('cpus'))
+    data['cpus'] = int(cpus) if cpus else None
+    data['uptime'] = _float(first('uptime').split(' ')[0])
+
+    load = first('loadavg').split()
+    if len(load) >= 3:
+        data['load1'], data['load5'], data['load15'] = (_float(v) for v in load[:3])
+
+    meminfo = {}
+    for line in sections.get('meminfo', []):
+        key, _, value = line.partition(':')
+        number = _float(value.split()[0]) if value.split() else None
+        if number is not None:
+            meminfo[key] = int(number) * 1024
+    if meminfo.get('MemTotal'):
+        data['mem_total'] = meminfo['MemTotal']
+        data['mem_available'] = meminfo.get('MemAvailable')
+        if data['mem_available'] is not None:
+            used = data['mem_total'] - data['mem_available']
+            data['mem_percent'] = round(100.0 * used / data['mem_total'], 1)
+    if 'SwapTotal' in meminfo:
+        data['swap_total'] = meminfo['SwapTotal']
+        data['swap_used'] = meminfo['SwapTotal'] - meminfo.get('SwapFree', 0)
+
+    # Filesystem 1024-blocks Used Available Capacity Mounted-on
+    df = first('df').split()
+    if len(df) >= 5 and df[1].isdigit() and df[2].isdigit():
+        total, used, available = int(df[1]) * 1024, int(df[2]) * 1024, int(df[3]) * 1024
+        data['disk_total'] = total
+        data['disk_used'] = used
+        # df와 같은 방식 (root 예약 블록 제외)
+        data['disk_percent'] = round(100.0 * used / (used + available), 1) if used + available else None
+
+    temp = first('temp')
+    if temp.startswith('temp='):
+        data['temp'] = _float(temp[5:].rstrip("'C"))
+    elif temp.isdigit():
+        data['temp'] = round(int(temp) / 1000.0, 1)
+
+    throttled = first('throttled')
+    if throttled.startswith('throttled='):
+        try:
+            data['throttled'] = int(throttled.split('=', 1)[1], 16)
+        except ValueError:
+            pass
+    return data
+
+
+# ---------- 캐시 ----------
+
+class TelemetryCache:
+    """시리얼 → 마지막 수집 결과 (스레드 안전, JSON 파일에 저장)"""
+
+    def __init__(self, path: Path = TELEMETRY_FILE, ttl: float = DEFAULT_TTL):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.entries: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def get(self, serial: str) -> Optional[dict]:
+        with self._lock:
+            entry = self.entries.get(serial)
+            return dict(entry) if entry else None
+
+    def all(self) -> Dict[str, dict]:
+        with self._lock:
+            return {serial: dict(entry) for serial, entry in self.entries.items()}
+
+    def fresh(self, now: Optional[float] = None) -> Dict[str, dict]:
+        """유효 시간 안에 수집된 값만"""
+        now = time.time() if now is None else now
+        return {serial: entry for serial, entry in self.all().items() if is_fresh(entry, self.ttl, now)}
+
+    def update(self, entries: Iterable[dict]):
+        """수집 결과 반영 - 실패한 호스트는 이전 값을 남기고 오류만 기록"""
+        with self._lock:
+            for entry in entries:
+                previous = self.entries.get(entry['serial'])
+                if entry.get('data') is None and previous and previous.get('data') is not None:
+                    entry = dict(previous, ip=entry['ip'], checked=entry['checked'], error=entry['error'])
+                self.entries[entry['serial']] = entry
+
+    def forget(self, keep: Iterable[str]):
+        keep = set(keep)
+        with self._lock:
+            for serial in [s for s in self.entries if s not in keep]:
+                del self.entries[serial]
+
+    def due(self, clients: Iterable[dict], online: Iterable[str], interval: float,
+            now: Optional[float] = None) -> List[dict]:
+        """온라인이고 마지막 시도가 interval보다 오래된 클라이언트"""
+        now = time.time() if now is None else now
+        online = set(online)
+        with self._lock:
+            return [client for client in clients
+                    if client.get('ip') in online
+                    and now - self.entries.get(client['serial'], {}).get('checked', 0) >= interval]
+
+    def save(self):
+        with self._lock:
+            data = json.dumps(self.entries, ensure_ascii=False)
+        tmp = self.path.with_name(f'.{self.path.name}.{os.getpid()}.tmp')
+        with open(tmp, 'w') as f:
+            f.write(data)
+        os.replace(tmp, self.path)
+
+    def load(self) -> bool:
+        try:
+            with open(self.path, 'r') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if not isinstance(entries, dict):
+            return False
+        with self._lock:
+            self.entries = entries
+        return True
+
+
+def load(path: Path = TELEMETRY_FILE, ttl: float = DEFAULT_TTL) -> TelemetryCache:
+    cache = TelemetryCache(path, ttl)
+    cache.load()
+    return cache
+
+
+def from_config(config: dict) -> TelemetryCache:
+    return load(Path(config.get('telemetry_file') or TELEMETRY_FILE),
+                float(config.get('telemetry_ttl', DEFAULT_TTL)))
+
+
+def is_fresh(entry: Optional[dict], ttl: float = DEFAULT_TTL, now: Optional[float] = None) -> bool:
+    if not entry or entry.get('data') is None:
+        return False
+    return (time.time() if now is None else now) - entry['time'] < ttl
+
+
+# ---------- 수집 ----------
+
+def collect(pool, clients: List[dict], parallel: int = DEFAULT_PARALLEL, timeout: float = DEFAULT_TIMEOUT,
+            cancel: Optional[threading.Event] = None) -> List[dict]:
+    """클라이언트들에서 병렬 수집 → entry 목록 (끝난 순서)"""
+    entries = []
+    for result in pxe_fleet.run_fleet(pool, clients, pxe_fleet.ACTION_COMMAND, REMOTE_COMMAND,
+                                      parallel=parallel, timeout=timeout, cancel=cancel):
+        if result['status'] == pxe_fleet.STATUS_CANCELLED:
+            continue
+        now = time.time()
+        entry = {'serial': result['serial'], 'ip': result['ip'], 'time': None, 'checked': now,
+                 'error': None, 'data': None}
+        if result['status'] == pxe_fleet.STATUS_OK:
+            entry.update(time=now, data=parse(result['stdout'] or ''))
+        else:
+            lines = (result['stderr'] or '').strip().splitlines()
+            entry['error'] = lines[-1] if lines else result['status']
+        entries.append(entry)
+    return entries
+
+
+# ---------- 정렬/필터/표시 ----------
+
+def value(entry: Optional[dict], key: str) -> Optional[float]:
+    """정렬/필터 키(temp/load/memory/disk)의 값"""
+    if not entry or not entry.get('data'):
+        return None
+    return entry['data'].get(FIELDS[key][0])
+
+
+def sort_key(entry: Optional[dict], key: str) -> Tuple[int, float]:
+    """높은 값이 먼저, 값이 없으면 마지막"""
+    number = value(entry, key)
+    return (1, 0.0) if number is None else (0, -number)
+
+
+def parse_filter(text: str) -> Tuple[str, str, float]:
+    """'temp>70', 'disk >= 90' → (키, 연산자, 값). 잘못되면 ValueError"""
+    match = _FILTER_RE.match(text)
+    if not match or match.group(1) not in FIELDS:
+        raise ValueError(f"필터 형식: {'|'.join(FIELDS)} [>, >=, <, <=, =] 숫자 (입력: {text})")
+    return match.group(1), match.group(2), float(match.group(3))
+
+
+def matches(entry: Optional[dict], filters: Iterable[Tuple[str, str, float]]) -> bool:
+    """모든 조건을 만족하면 True (값이 없는 클라이언트는 조건이 있으면 제외)"""
+    for key, operator, limit in filters:
+        number = value(entry, key)
+        if number is None or not _OPERATORS[operator](number, limit):
+            return False
+    return True
+
+
+def temp_level(entry: Optional[dict]) -> int:
+    """0 정상/알 수 없음, 1 경고, 2 위험"""
+    temp = value(entry, 'temp')
+    if temp is None:
+        return 0
+    return 2 if temp >= TEMP_CRITICAL else 1 if temp >= TEMP_WARNING else 0
+
+
+def format_bytes(size: Optional[float]) -> str:
+    if size is None:
+        return '-'
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024:
+            return f"{size:.0f}{unit}" if unit == 'B' else f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}TB"
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return '-'
+    seconds = int(seconds)
+    days, rest = divmod(seconds, 86400)
+    hours, rest = divmod(rest, 3600)
+    if days:
+        return f"{days}일 {hours}시간"
+    if hours:
+        return f"{hours}시간 {rest // 60}분"
+    return f"{rest // 60}분"
+
+
+def format_throttled(flags: Optional[int]) -> str:
+    if flags is None:
+        return '-'
+    current = [label for bit, label in THROTTLE_FLAGS.items() if flags & bit]
+    if current:
+        return ', '.join(current)
+    return '정상 (이전에 발생)' if flags & 0xF0000 else '정상'
+
+
+def format_brief(entry: Optional[dict]) -> str:
+    """'52.1°C  0.41  38%  61%' (온도, 부하, 메모리, 디스크)"""
+    if not entry or not entry.get('data'):
+        return '-'
+    parts = []
+    for key, (_, unit, _label) in FIELDS.items():
+        number = value(entry, key)
+        parts.append('-' if number is None else f"{number:.2f}" if key == 'load' else f"{number:.0f}{unit}")
+    return '  '.join(parts)
+
+
+def format_age(entry: Optional[dict], now: Optional[float] = None) -> str:
+    if not entry or not entry.get('time'):
+        return '수집 안 됨'
+    age = (time.time() if now is None else now) - entry['time']
+    return '방금' if age < 60 else f"{format_duration(age)} 전"
+
+
+def describe(entry: Optional[dict], ttl: float = DEFAULT_TTL) -> List[Tuple[str, str]]:
+    """상세 보기용 (항목, 값) 목록"""
+    if not entry or not entry.get('data'):
+        error = entry.get('error') if entry else None
+        return [('상태', f"수집 실패: {error}" if error else '아직 수집되지 않았습니다')]
+    data = entry['data']
+    mem = (f"{format_bytes(data['mem_total'] - data['mem_available'])} / {format_bytes(data['mem_total'])} "
+           f"({data['mem_percent']:.0f}%)") if data.get('mem_percent') is not None else '-'
+    disk = (f"{format_bytes(data['disk_used'])} / {format_bytes(data['disk_total'])} "
+            f"({data['disk_percent']:.0f}%)") if data.get('disk_percent') is not None else '-'
+    load = ' / '.join('-' if data.get(k) is None else f"{data[k]:.2f}" for k in ('load1', 'load5', 'load15'))
+    collected = format_age(entry)
+    if not is_fresh(entry, ttl):
+        collected += ' (오래됨)'
+    if entry.get('error'):
+        collected += f" - 마지막 시도 실패: {entry['error']}"
+    return [
+        ('모델', ' '.join(filter(None, [data.get('model'), data.get('revision') and f"(rev {data['revision']})"])) or '-'),
+        ('커널', ' '.join(filter(None, [data.get('kernel'), data.get('arch')])) or '-'),
+        ('업타임', format_duration(data.get('uptime'))),
+        ('부하 (1/5/15분)', load + (f"  (CPU {data['cpus']}개)" if data.get('cpus') else '')),
+        ('CPU 온도', '-' if data.get('temp') is None else f"{data['temp']:.1f}°C"),
+        ('스로틀링', format_throttled(data.get('throttled'))),
+        ('메모리', mem),
+        ('디스크 (/)', disk),
+        ('IP 주소', ' '.join(data.get('addresses') or []) or '-'),
+        ('수집', collected),
+    ]
@@ -0,0 +1,237 @@
+"""
+RPI PXE Manager - TFTP 부트 파일 공유 저장소
+
+펌웨어(start*.elf, fixup*.dat), 커널, DTB/오버레이는 모든 클라이언트가 같으므로
+<tftp_root>/.store/<sha256 앞 2자리>/<sha256> 에 내용 기준으로 한 벌만 두고,
+클라이언트 디렉토리(<tftp_root>/<시리얼>/)의 파일은 저장소 파일의 하드 링크로 만든다.
+클라이언트마다 다른 cmdline.txt / config.txt 만 일반 파일로 복사한다.
+
+하드 링크는 TFTP 서버 입장에서 일반 파일과 같아 dnsmasq의 심볼릭 링크 제한과
+상관없고, 저장소가 tftp_root 안에 있어 항상 같은 파일시스템이다.
+공유 파일을 제자리에서 고치면 모든 클라이언트에 반영되므로 파일을 바꿀 때는
+새 파일을 쓰고 rename한다 (rsync, atomic_write는 그렇게 동작한다).
+
+populate/dedupe/prune은 root 권한이 필요하다. CLI/GUI에서는 privileged()로
+pxe_privops 헬퍼를 통해 한 번의 sudo로 실행한다.
+"""
+
+import hashlib
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, Optional
+
+import pxe_privops
+
+STORE_DIR_NAME = '.store'
+
+# 클라이언트별로 내용이 다른 파일 (저장소에 넣지 않음)
+PER_CLIENT_FILES = {'cmdline.txt', 'config.txt'}
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def store_path(tftp_root) -> Path:
+    return Path(tftp_root) / STORE_DIR_NAME
+
+
+def file_hash(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _blob_path(store: Path, digest: str) -> Path:
+    return store / digest[:2] / digest
+
+
+def _new_stats() -> dict:
+    return {'files': 0, 'linked': 0, 'stored': 0, 'copied': 0, 'saved_bytes': 0}
+
+
+def _is_per_client(relpath: str) -> bool:
+    return os.path.basename(relpath) in PER_CLIENT_FILES
+
+
+class BootStore:
+    """내용 주소 저장소 - inode로 이미 저장소에 있는 파일은 다시 해시하지 않는다"""
+
+    def __init__(self, tftp_root):
+        self.root = store_path(tftp_root)
+        self._by_inode: Optional[Dict[tuple, str]] = None
+
+    def _index(self) -> Dict[tuple, str]:
+        """(st_dev, st_ino) → 해시 - 저장소를 한 번만 훑는다"""
+        if self._by_inode is None:
+            self._by_inode = {}
+            if self.root.is_dir():
+                for bucket in os.scandir(self.root):
+                    if not bucket.is_dir(follow_symlinks=False):
+                        continue
+                    for entry in os.scandir(bucket.path):
+                        if entry.is_file(follow_symlinks=False):
+                            st = entry.stat(follow_symlinks=False)
+                            self._by_inode[(st.st_dev, st.st_ino)] = entry.name
+        return self._by_inode
+
+    def lookup(self, path) -> Optional[str]:
+        """이미 저장소 파일의 하드 링크이면 그 해시"""
+        st = os.stat(path, follow_symlinks=False)
+        if st.st_nlink < 2:
+            return None
+        return self._index().get((st.st_dev, st.st_ino))
+
+    def add(self, path, digest: str) -> bool:
+        """path를 저장소 파일로 하드 링크. 같은 내용이 이미 있으면 False
+
+        여러 스레드가 같은 파일을 동시에 넣을 수 있으므로 (병렬 등록) 먼저 확인하지 않고
+        링크를 시도해 이미 있으면 그대로 쓴다.
+        """
+        blob = _blob_path(self.root, digest)
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(path, blob)
+        except FileExistsError:
+            return False
+        st = os.stat(blob)
+        self._index()[(st.st_dev, st.st_ino)] = digest
+        return True
+
+    def ingest(self, path) -> str:
+        """파일을 저장소에 넣고 해시 반환 - 데이터 복사 없이 하드 링크로 넣는다"""
+        digest = self.lookup(path)
+        if digest:
+            return digest
+        digest = file_hash(path)
+        self.add(path, digest)
+        return digest
+
+    def link(self, digest: str, target) -> bool:
+        """target을 저장소 파일의 하드 링크로 교체 (임시 링크 후 rename). 이미 같으면 False"""
+        blob = _blob_path(self.root, digest)
+        if os.path.lexists(target) and os.path.samefile(blob, target):
+            return False
+        tmp = os.path.join(os.path.dirname(target), f'.{os.path.basename(target)}.{os.getpid()}.tmp')
+        os.link(blob, tmp)
+        try:
+            os.replace(tmp, target)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        return True
+
+
+def populate(source, target, tftp_root) -> dict:
+    """source의 부트 파일로 target 구성 - 공유 파일은 저장소 하드 링크, 클라이언트별 파일은 복사
+
+    저장소에 없던 내용은 source 파일의 하드 링크로 들어가므로 데이터를 복사하지 않는다.
+    """
+    store = BootStore(tftp_root)
+    stats = _new_stats()
+    source, target = str(source), str(target)
+    os.makedirs(target, exist_ok=True)
+    shutil.copystat(source, target)
+
+    for root, dirs, files in os.walk(source):
+        rel = os.path.relpath(root, source)
+        out_dir = os.path.normpath(os.path.join(target, rel))
+        for name in dirs:
+            os.makedirs(os.path.join(out_dir, name), exist_ok=True)
+            shutil.copystat(os.path.join(root, name), os.path.join(out_dir, name))
+        for name in files:
+            src = os.path.join(root, name)
+            dst = os.path.join(out_dir, name)
+            relpath = os.path.join(rel, name)
+            stats['files'] += 1
+            if os.path.islink(src) or not os.path.isfile(src) or _is_per_client(relpath):
+                if os.path.lexists(dst):
+                    os.unlink(dst)
+                shutil.copy2(src, dst, follow_symlinks=False)
+                stats['copied'] += 1
+                continue
+            store.link(store.ingest(src), dst)
+            stats['linked'] += 1
+            stats['saved_bytes'] += os.path.getsize(dst)
+    return stats
+
+
+def dedupe(tftp_root, serials=None) -> dict:
+    """기존 클라이언트 디렉토리를 제자리에서 저장소 하드 링크로 변환
+
+    serials가 없으면 tftp_root 아래 모든 디렉토리 (숨김 디렉토리 제외).
+    """
+    store = BootStore(tftp_root)
+    stats = _new_stats()
+    tftp_root = str(tftp_root)
+    if serials is None:
+        serials = sorted(entry.name for entry in os.scandir(tftp_root)
+                         if entry.is_dir(follow_symlinks=False) and not entry.name.startswith('.'))
+
+    for serial in serials:
+        client_dir = os.path.join(tftp_root, serial)
+        for root, dirs, files in os.walk(client_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                if os.path.islink(path) or not os.path.isfile(path):
+                    continue
+                if _is_per_client(os.path.relpath(path, client_dir)):
+                    continue
+                stats['files'] += 1
+                if store.lookup(path):
+                    continue
+                digest = file_hash(path)
+                if store.add(path, digest):
+                    stats['stored'] += 1
+                else:
+                    size = os.path.getsize(path)
+                    store.link(digest, path)
+                    stats['linked'] += 1
+                    stats['saved_bytes'] += size
+    return stats
+
+
+def prune(tftp_root) -> dict:
+    """어느 클라이언트도 링크하지 않는 저장소 파일 삭제 (링크 수 1)"""
+    root = store_path(tftp_root)
+    removed = freed = 0
+    if root.is_dir():
+        for bucket in os.scandir(root):
+            if not bucket.is_dir(follow_symlinks=False):
+                continue
+            for entry in os.scandir(bucket.path):
+                st = entry.stat(follow_symlinks=False)
+                if entry.is_file(follow_symlinks=False) and st.st_nlink == 1:
+                    os.unlink(entry.path)
+                    removed += 1
+                    freed += st.st_size
+            if not os.listdir(bucket.path):
+                os.rmdir(bucket.path)
+    return {'removed': removed, 'freed_bytes': freed}
+
+
+def usage(tftp_root) -> dict:
+    """TFTP 트리 사용량 - 논리 크기(클라이언트별 합)와 실제 크기(inode당 한 번)"""
+    logical = actual = files = 0
+    seen = set()
+    for root, dirs, names in os.walk(str(tftp_root)):
+        for name in names:
+            try:
+                st = os.stat(os.path.join(root, name), follow_symlinks=False)
+            except OSError:
+                continue
+            if STORE_DIR_NAME not in os.path.relpath(root, str(tftp_root)).split(os.sep):
+                logical += st.st_size
+                files += 1
+            key = (st.st_dev, st.st_ino)
+            if key not in seen:
+                seen.add(key)
+                actual += st.st_size
+    return {'files': files, 'logical_bytes': logical, 'actual_bytes': actual}
+
+
+def privileged(func: str, *args) -> dict:
+    """populate/dedupe/prune을 root 권한으로 실행 (pxe_privops 헬퍼, sudo 한 번)"""
+    result = pxe_privops.OpBatch().call(__name__, func, *args).apply()
+    return result['results'][0]